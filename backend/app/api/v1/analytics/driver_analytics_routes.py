@@ -35,6 +35,18 @@ def get_driver_utilization(
     return service.get_driver_utilization(org.id)
 
 
+@router.get("/workload")
+def get_driver_workload(
+    db: Session = Depends(get_db),
+    org=Depends(get_current_organization),
+    _: bool = Depends(require_permission("analytics:view")),
+):
+
+    service = DriverAnalyticsService(db)
+
+    return service.get_driver_workload(org.id)
+
+
 @router.get("/performance/{driver_id}")
 def get_driver_performance(
     driver_id: UUID,
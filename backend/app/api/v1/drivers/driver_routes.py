@@ -1,23 +1,35 @@
+from datetime import date, datetime, timezone
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_db, SessionLocal
 from app.core.dependencies import get_current_user
 from app.core.permissions import require_permission
 
 from app.services.driver_service import DriverService
+from app.services.manifest_service import ManifestService
+from app.services.vehicle_service import VehicleService
 
 from app.utils.enums import DriverStatus
+from app.utils.serialization import FastJSONResponse
 
 from app.api.v1.drivers.driver_schemas import (
     DriverCreateRequest,
     DriverUpdateRequest,
     DriverResponse,
+    DriverManifestResponse,
     DriverAvailabilityUpdateRequest,
     DriverLocationUpdateRequest,
+    NearestDriverResponse,
+    VehicleCreateRequest,
+    VehicleUpdateRequest,
+    VehicleResponse,
+    DriverVehicleAssignRequest,
+    DriverVehicleResponse,
 )
 
 
@@ -58,6 +70,150 @@ def get_available_drivers(
     return drivers
 
 
+@router.get(
+    "/nearest",
+    response_model=List[NearestDriverResponse],
+)
+def get_nearest_drivers(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    k: int = Query(5, ge=1, le=50),
+    organization_id: Optional[UUID] = None,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+    _: bool = Depends(require_permission("driver:view")),
+):
+
+    org_id = get_org_id(current_user, organization_id)
+    service = DriverService(db)
+
+    return service.get_nearest_drivers(
+        organization_id=org_id,
+        latitude=lat,
+        longitude=lng,
+        k=k,
+    )
+
+
+@router.get(
+    "/me/manifest",
+    response_model=DriverManifestResponse,
+)
+def get_my_manifest(
+    manifest_date: Optional[date] = Query(None, alias="date", description="UTC day, defaults to today"),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+    _: bool = Depends(require_permission("pickup.view")),
+):
+    """
+    Everything the driver app needs for a day in one call: the signed-in
+    driver's stops in order with pickup and assignment details, and
+    totals. Unscheduled pickups the driver still holds come last.
+    """
+    return FastJSONResponse(ManifestService.get_manifest(db, current_user.id, manifest_date))
+
+
+def _capacity_json(limits):
+    "JSONB keys are plain waste type strings"
+    if limits is None:
+        return None
+    return {waste_type.value: limit for waste_type, limit in limits.items()}
+
+
+@router.post(
+    "/vehicles",
+    response_model=VehicleResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+def create_vehicle(
+    request: VehicleCreateRequest,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+    _: bool = Depends(require_permission("driver:create")),
+):
+
+    org_id = get_org_id(current_user, request.organization_id)
+    service = VehicleService(db)
+
+    try:
+        vehicle = service.create_vehicle(
+            organization_id=org_id,
+            registration_number=request.registration_number,
+            vehicle_type=request.vehicle_type,
+            capacity_kg=request.capacity_kg,
+            waste_type_capacity_kg=_capacity_json(request.waste_type_capacity_kg),
+            created_by=current_user.id,
+        )
+
+        db.commit()
+        return vehicle
+
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+
+@router.get(
+    "/vehicles",
+    response_model=List[VehicleResponse],
+)
+def list_vehicles(
+    skip: int = 0,
+    limit: int = 50,
+    organization_id: Optional[UUID] = None,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+    _: bool = Depends(require_permission("driver:view")),
+):
+
+    org_id = get_org_id(current_user, organization_id)
+    service = VehicleService(db)
+
+    return service.list_vehicles(
+        organization_id=org_id,
+        skip=skip,
+        limit=limit,
+    )
+
+
+@router.patch(
+    "/vehicles/{vehicle_id}",
+    response_model=VehicleResponse,
+)
+def update_vehicle(
+    vehicle_id: UUID,
+    request: VehicleUpdateRequest,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+    _: bool = Depends(require_permission("driver:update")),
+):
+
+    org_id = get_org_id(current_user, request.organization_id)
+    service = VehicleService(db)
+
+    update_data = request.dict(exclude_unset=True, exclude={"organization_id"})
+    if "waste_type_capacity_kg" in update_data:
+        update_data["waste_type_capacity_kg"] = _capacity_json(request.waste_type_capacity_kg)
+
+    try:
+        vehicle = service.update_vehicle(
+            vehicle_id=vehicle_id,
+            organization_id=org_id,
+            update_data=update_data,
+            updated_by=current_user.id,
+        )
+
+        db.commit()
+        return vehicle
+
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=404, detail=str(e))
+
+
 @router.post(
     "",
     response_model=DriverResponse,
@@ -117,7 +273,7 @@ def list_drivers(
         limit=limit,
     )
 
-    return drivers
+    return FastJSONResponse(drivers)
 
 
 @router.get(
@@ -303,6 +459,59 @@ def get_driver_latest_location(
     return location
 
 
+@router.get(
+    "/{driver_id}/track",
+)
+def get_driver_track(
+    driver_id: UUID,
+    start: datetime = Query(..., alias="from"),
+    end: datetime = Query(..., alias="to"),
+    tolerance: Optional[float] = Query(None, ge=0, description="Simplification tolerance in metres"),
+    organization_id: Optional[UUID] = None,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+    _: bool = Depends(require_permission("driver:view")),
+):
+
+    org_id = get_org_id(current_user, organization_id)
+
+    # Naive timestamps are treated as UTC, recorded_at is timezone aware
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+
+    if end <= start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' must be after 'from'",
+        )
+
+    driver = DriverService(db).get_driver(
+        driver_id=driver_id,
+        organization_id=org_id,
+    )
+
+    if not driver:
+        raise HTTPException(status_code=404, detail="Driver not found")
+
+    # The stream outlives the request scoped session, so it gets its own
+    track_db = SessionLocal()
+
+    def body():
+        try:
+            yield from DriverService(track_db).stream_driver_track(
+                driver_id=driver_id,
+                start=start,
+                end=end,
+                tolerance=tolerance,
+            )
+        finally:
+            track_db.close()
+
+    return StreamingResponse(body(), media_type="application/json")
+
+
 @router.patch(
     "/{driver_id}/activate",
     response_model=DriverResponse,
@@ -362,4 +571,65 @@ def deactivate_driver(
 
     except ValueError as e:
         db.rollback()
-        raise HTTPException(status_code=404, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.put(
+    "/{driver_id}/vehicle",
+    response_model=DriverVehicleResponse,
+)
+def assign_driver_vehicle(
+    driver_id: UUID,
+    request: DriverVehicleAssignRequest,
+    organization_id: Optional[UUID] = None,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+    _: bool = Depends(require_permission("driver:update")),
+):
+
+    org_id = get_org_id(current_user, organization_id)
+    service = VehicleService(db)
+
+    try:
+        mapping = service.assign_vehicle(
+            driver_id=driver_id,
+            vehicle_id=request.vehicle_id,
+            organization_id=org_id,
+            assigned_by=current_user.id,
+        )
+
+        db.commit()
+        return mapping
+
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete(
+    "/{driver_id}/vehicle",
+    response_model=DriverVehicleResponse,
+)
+def release_driver_vehicle(
+    driver_id: UUID,
+    organization_id: Optional[UUID] = None,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+    _: bool = Depends(require_permission("driver:update")),
+):
+
+    org_id = get_org_id(current_user, organization_id)
+    service = VehicleService(db)
+
+    try:
+        mapping = service.release_vehicle(
+            driver_id=driver_id,
+            organization_id=org_id,
+            released_by=current_user.id,
+        )
+
+        db.commit()
+        return mapping
+
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=404, detail=str(e))
@@ -1,9 +1,11 @@
-from datetime import datetime
-from typing import Optional,List
+from datetime import date, datetime
+from typing import Optional,List,Dict
 from uuid import UUID
-from pydantic import BaseModel,Field,EmailStr
+from pydantic import BaseModel,Field,EmailStr,field_validator
 
-from app.utils.enums import DriverStatus,DriverAvailabilityStatus
+from app.models.pickup import PickupStatus, WasteType
+from app.models.pickup_assignment import AssignmentStatus
+from app.utils.enums import DriverStatus,DriverAvailabilityStatus,VehicleStatus
 
 
 class DriverCreateRequest(BaseModel):
@@ -27,7 +29,7 @@ class DriverUpdateRequest(BaseModel):
 class DriverResponse(BaseModel):
 
     id: UUID
-    organization_id: UUID
+    organization_id: int
     name: str
     mobile: str
     email: Optional[str]
@@ -56,3 +58,107 @@ class DriverListResponse(BaseModel):
     drivers: List[DriverResponse]
     total: int
 
+
+class NearestDriverResponse(BaseModel):
+    driver_id: UUID
+    name: str
+    mobile: str
+    latitude: float
+    longitude: float
+    distance_km: float
+    eta_minutes: float
+
+
+class VehicleCreateRequest(BaseModel):
+    organization_id: Optional[UUID] = None
+    registration_number: str = Field(..., min_length=2, max_length=50)
+    vehicle_type: Optional[str] = Field(None, max_length=50)
+    capacity_kg: float = Field(..., gt=0, description="Total payload in kg")
+    waste_type_capacity_kg: Optional[Dict[WasteType, float]] = Field(
+        None, description="Optional per-waste-type payload limits in kg"
+    )
+
+    @field_validator("waste_type_capacity_kg")
+    @classmethod
+    def non_negative_limits(cls, value):
+        if value and any(limit < 0 for limit in value.values()):
+            raise ValueError("waste type capacities must not be negative")
+        return value
+
+class VehicleUpdateRequest(BaseModel):
+    organization_id: Optional[UUID] = None
+    vehicle_type: Optional[str] = Field(None, max_length=50)
+    capacity_kg: Optional[float] = Field(None, gt=0)
+    waste_type_capacity_kg: Optional[Dict[WasteType, float]] = None
+    status: Optional[VehicleStatus] = None
+
+    @field_validator("waste_type_capacity_kg")
+    @classmethod
+    def non_negative_limits(cls, value):
+        if value and any(limit < 0 for limit in value.values()):
+            raise ValueError("waste type capacities must not be negative")
+        return value
+
+class VehicleResponse(BaseModel):
+    id: UUID
+    organization_id: int
+    registration_number: str
+    vehicle_type: Optional[str]
+    capacity_kg: float
+    waste_type_capacity_kg: Optional[Dict[str, float]]
+    status: VehicleStatus
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+class DriverVehicleAssignRequest(BaseModel):
+    vehicle_id: UUID
+
+class DriverVehicleResponse(BaseModel):
+    driver_id: UUID
+    vehicle_id: UUID
+    is_active: bool
+    assigned_at: datetime
+    released_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class ManifestStop(BaseModel):
+    sequence: int
+    pickup_id: int
+    organization_id: int
+    waste_type: WasteType
+    waste_weight: float
+    address: str
+    latitude: float
+    longitude: float
+    zone_id: Optional[int] = None
+    status: PickupStatus
+    scheduled_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    overdue_at: Optional[datetime] = None
+    assignment_id: int
+    assignment_status: AssignmentStatus
+    assigned_at: datetime
+
+
+class ManifestSummary(BaseModel):
+    total_stops: int
+    open_stops: int
+    completed_stops: int
+    cancelled_stops: int
+    overdue_stops: int
+    planned_weight_kg: float
+    collected_weight_kg: float
+
+
+class DriverManifestResponse(BaseModel):
+    driver_id: int
+    date: date
+    stops: List[ManifestStop]
+    summary: ManifestSummary
+    cached: bool
@@ -1,7 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import csv
+import io
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from typing import List, Literal, Optional
 
+from app.core.config import BULK_PICKUP_MAX_ROWS
 from app.core.database import get_db
 from app.core.permissions import require_permission
 from app.api.v1.pickups.pickup_schemas import (
@@ -9,7 +16,12 @@ from app.api.v1.pickups.pickup_schemas import (
     PickupResponse, 
     PickupUpdateStatusRequest, 
     PickupAssignmentResponse,
-    PickupListResponse
+    PickupListResponse,
+    AutoAssignRequest,
+    AutoAssignResponse,
+    DriverRouteResponse,
+    PickupClusterResponse,
+    BulkPickupResponse
 )
 from app.api.v1.pickups.pickup_workflow_schemas import (
     PickupCancelRequest,
@@ -18,9 +30,14 @@ from app.api.v1.pickups.pickup_workflow_schemas import (
     PickupCompleteRequest
 )
 from app.api.v1.pickups.pickup_service import PickupService
-from app.models.pickup import PickupStatus
+from app.repositories.pickup_repo import PickupFilter
+from app.services.assignment_service import AssignmentService
+from app.services.clustering_service import ClusteringService
+from app.services.route_service import RouteService
+from app.models.pickup import PickupStatus, WasteType
 from app.models.pickup_assignment import AssignmentStatus
 from app.models.user import User
+from app.utils.serialization import FastJSONResponse
 
 from app.core.dependencies import get_db, get_user_org
 from app.core.permissions import require_permission
@@ -38,22 +55,118 @@ def create_pickup(
     Validates subscription, limits, and inherently increments usage safely.
     """
     org = get_user_org(db, current_user)
-    return PickupService.create_pickup(db, org, request)
+    return PickupService.create_pickup(db, org, request, current_user)
+
+
+BULK_CSV_COLUMNS = ("waste_type", "waste_weight", "address", "latitude", "longitude", "scheduled_at")
+
+
+def _parse_bulk_rows(body: bytes, content_type: str) -> list:
+    """
+    Rows of a bulk upload: a CSV file with a header line, or a JSON array
+    (bare or as {"pickups": [...]}). 400 when the upload is malformed,
+    empty or longer than BULK_PICKUP_MAX_ROWS.
+    """
+    if content_type.split(";")[0].strip().lower() == "text/csv":
+        try:
+            reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+            missing = [column for column in BULK_CSV_COLUMNS[:5] if column not in (reader.fieldnames or [])]
+            if missing:
+                raise HTTPException(status_code=400, detail=f"CSV is missing columns: {', '.join(missing)}")
+            # blank cells mean "not given", e.g. an unscheduled pickup
+            rows = [{key: value or None for key, value in row.items() if key} for row in reader]
+        except (UnicodeDecodeError, csv.Error):
+            raise HTTPException(status_code=400, detail="Malformed CSV upload")
+    else:
+        try:
+            rows = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Malformed JSON upload")
+        if isinstance(rows, dict):
+            rows = rows.get("pickups")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of pickups")
+
+    if not rows:
+        raise HTTPException(status_code=400, detail="Upload contains no pickups")
+    if len(rows) > BULK_PICKUP_MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_PICKUP_MAX_ROWS} pickups per upload")
+    return rows
+
+
+@router.post("/bulk", response_model=BulkPickupResponse, status_code=status.HTTP_201_CREATED)
+async def bulk_create_pickups(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("pickup.create"))
+):
+    """
+    Creates up to BULK_PICKUP_MAX_ROWS pickups from a CSV (text/csv) or
+    JSON upload in one transaction. Rows that fail validation are reported
+    by position and the rest are created; a batch that would exceed the
+    plan's limits is rejected as a whole.
+    """
+    rows = _parse_bulk_rows(await request.body(), request.headers.get("content-type", ""))
+
+    def create():
+        org = get_user_org(db, current_user)
+        return PickupService.bulk_create_pickups(db, org, rows, current_user)
+
+    return await run_in_threadpool(create)
 
 
 @router.get("/", response_model=PickupListResponse)
 def list_pickups(
     p_status: PickupStatus = None,
     a_status: AssignmentStatus = None,
+    status_in: Optional[List[PickupStatus]] = Query(None, alias="status", description="Repeat for several statuses"),
+    waste_type: Optional[List[WasteType]] = Query(None, description="Repeat for several waste types"),
+    scheduled_from: Optional[datetime] = None,
+    scheduled_to: Optional[datetime] = None,
+    zone_id: Optional[int] = None,
+    min_lat: Optional[float] = Query(None, ge=-90, le=90),
+    min_lng: Optional[float] = Query(None, ge=-180, le=180),
+    max_lat: Optional[float] = Query(None, ge=-90, le=90),
+    max_lng: Optional[float] = Query(None, ge=-180, le=180),
+    driver_id: Optional[int] = Query(None, description="Pickups assigned to this driver; ignored for drivers"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    sort: Optional[Literal["created_at", "scheduled_at"]] = Query(None, description="Defaults to scheduled_at for drivers, created_at otherwise"),
+    include_total: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("pickup.view"))
 ):
     """
-    Lists pickups based on the user's role.
+    Lists pickups based on the user's role, one page at a time.
     - DRIVER: sees assigned pickups
     - ADMIN: sees all
     - ORG/DEFAULT: sees organization's pickups
+    Filters combine with AND. A bounding box needs all four corners.
+    Follow next_cursor for further pages; the cursor is tied to the sort.
+    Rows are read as column projections and encoded straight to JSON.
     """
+    bbox = (min_lat, min_lng, max_lat, max_lng)
+    if any(v is not None for v in bbox) and any(v is None for v in bbox):
+        raise HTTPException(status_code=400, detail="min_lat, min_lng, max_lat and max_lng must be given together")
+    if bbox[0] is not None and (min_lat > max_lat or min_lng > max_lng):
+        raise HTTPException(status_code=400, detail="Bounding box minimums must not exceed maximums")
+    if scheduled_from and scheduled_to and scheduled_from >= scheduled_to:
+        raise HTTPException(status_code=400, detail="scheduled_from must be before scheduled_to")
+
+    statuses = set(status_in or [])
+    if p_status:
+        statuses.add(p_status)
+
+    filters = PickupFilter(
+        statuses=sorted(statuses) or None,
+        waste_types=waste_type or None,
+        scheduled_from=scheduled_from,
+        scheduled_to=scheduled_to,
+        zone_id=zone_id,
+        bbox=bbox if min_lat is not None else None,
+        driver_id=driver_id,
+    )
+
     # Simple role check (assuming roles are properly mapped and populated, using admin check for now)
     # A complete solution would check the permissions table.
     is_admin = False
@@ -66,15 +179,77 @@ def list_pickups(
         if role_mapping.role.name == "DRIVER":
             is_driver = True
 
+    page = {"cursor": cursor, "limit": limit, "include_total": include_total}
+
     if is_admin:
-        pickups = PickupService.list_all_pickups(db, p_status)
+        result = PickupService.list_all_pickups(db, filters, sort=sort or "created_at", **page)
     elif is_driver:
-        pickups = PickupService.list_pickups_for_driver(db, current_user.id, a_status)
+        filters.driver_id = None
+        result = PickupService.list_pickups_for_driver(db, current_user.id, a_status, filters, sort=sort or "scheduled_at", **page)
     else:
         org = get_user_org(db, current_user)
-        pickups = PickupService.list_pickups_for_org(db, org.id, p_status)
-        
-    return {"pickups": pickups, "total": len(pickups)}
+        result = PickupService.list_pickups_for_org(db, org.id, filters, sort=sort or "created_at", **page)
+    return FastJSONResponse(result)
+
+
+@router.get("/route", response_model=DriverRouteResponse)
+def get_driver_route(
+    driver_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("pickup.view"))
+):
+    """
+    Suggested visiting order for a driver's open pickups with per-stop ETAs.
+    - DRIVER: always their own route
+    - ADMIN: any driver
+    - ORG/DEFAULT: a driver's pickups within their organization
+    """
+    is_admin = any(rm.role.name == "ADMIN" for rm in current_user.roles)
+    is_driver = any(rm.role.name == "DRIVER" for rm in current_user.roles)
+
+    if is_driver and not is_admin:
+        return RouteService(db).get_driver_route(current_user.id)
+
+    if driver_id is None:
+        raise HTTPException(status_code=400, detail="driver_id is required")
+
+    if is_admin:
+        return RouteService(db).get_driver_route(driver_id)
+
+    org = get_user_org(db, current_user)
+    return RouteService(db).get_driver_route(driver_id, organization_id=org.id)
+
+
+@router.get("/clusters", response_model=PickupClusterResponse)
+def cluster_pending_pickups(
+    eps_km: float = Query(0.5, gt=0, le=20, description="Pickups this close chain into the same run"),
+    min_samples: int = Query(3, ge=1, le=100, description="Neighbours, counting itself, a pickup needs to anchor a run"),
+    max_weight_kg: Optional[float] = Query(None, gt=0, description="Split runs carrying more than this"),
+    scheduled_from: Optional[datetime] = None,
+    scheduled_to: Optional[datetime] = None,
+    zone_id: Optional[int] = None,
+    limit: int = Query(50000, ge=1, le=100000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("pickup.manage"))
+):
+    """
+    Groups the organization's PENDING pickups into nearby collection runs
+    with their centroids. Suggestions only; nothing is assigned.
+    """
+    if scheduled_from and scheduled_to and scheduled_from >= scheduled_to:
+        raise HTTPException(status_code=400, detail="scheduled_from must be before scheduled_to")
+
+    org = get_user_org(db, current_user)
+    return ClusteringService(db).cluster_pending(
+        organization_id=org.id,
+        eps_km=eps_km,
+        min_samples=min_samples,
+        max_weight_kg=max_weight_kg,
+        scheduled_from=scheduled_from,
+        scheduled_to=scheduled_to,
+        zone_id=zone_id,
+        limit=limit,
+    )
 
 
 @router.get("/{pickup_id}", response_model=PickupResponse)
@@ -136,6 +311,26 @@ def assign_driver(
     # Assuming assigning requires an explicitly elevated role check beyond just pickup.manage if needed
     return PickupService.assign_driver(db, pickup_id, driver_id)
 
+@router.post("/auto-assign", response_model=AutoAssignResponse)
+def auto_assign_pickups(
+    request: AutoAssignRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("pickup.manage"))
+):
+    """
+    Assigns the organization's PENDING pickups to on-duty drivers in one batch,
+    minimising total driver-to-pickup distance.
+    """
+    org = get_user_org(db, current_user)
+    return AssignmentService(db).auto_assign(
+        organization_id=org.id,
+        assigned_by=current_user.id,
+        max_per_driver=request.max_per_driver,
+        max_distance_km=request.max_distance_km,
+        limit=request.limit,
+        zone_id=request.zone_id,
+    )
+
 @router.post("/{pickup_id}/cancel", response_model=PickupResponse)
 def cancel_pickup(
     pickup_id: int,
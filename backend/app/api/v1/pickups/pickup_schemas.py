@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, conint, confloat
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime
 from app.models.pickup import WasteType, PickupStatus
 from app.models.pickup_assignment import AssignmentStatus
@@ -16,14 +16,17 @@ class PickupResponse(BaseModel):
     id: int
     organization_id: int
     subscription_id: Optional[int] = None
+    recurring_pickup_id: Optional[int] = None
     waste_type: WasteType
     waste_weight: float
     address: str
     latitude: float
     longitude: float
+    zone_id: Optional[int] = None
     status: PickupStatus
     scheduled_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
+    overdue_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
@@ -43,4 +46,67 @@ class PickupAssignmentResponse(BaseModel):
 
 class PickupListResponse(BaseModel):
     pickups: List[PickupResponse]
-    total: int
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor to fetch the next page; null on the last page")
+    total: Optional[int] = Field(None, description="Count of all matching pickups, only when include_total is set")
+
+class AutoAssignRequest(BaseModel):
+    max_per_driver: int = Field(10, ge=1, le=100, description="Maximum open pickups per driver, including ones already held")
+    max_distance_km: Optional[float] = Field(None, gt=0, description="Never assign a driver further away than this")
+    limit: int = Field(1000, ge=1, le=5000, description="Maximum number of pending pickups to consider")
+    zone_id: Optional[int] = Field(None, description="Only dispatch pickups in, and drivers currently in, this zone")
+
+class AutoAssignment(BaseModel):
+    pickup_id: int
+    driver_id: int
+    distance_km: float
+
+class AutoAssignResponse(BaseModel):
+    assigned: List[AutoAssignment]
+    unassigned_pickup_ids: List[int]
+    solver: str
+    driver_count: int
+    elapsed_ms: float
+
+class RouteStop(BaseModel):
+    sequence: int
+    pickup_id: int
+    address: str
+    latitude: float
+    longitude: float
+    scheduled_at: Optional[datetime] = None
+    leg_distance_km: float
+    cumulative_distance_km: float
+    eta: datetime
+    late_minutes: float
+
+class DriverRouteResponse(BaseModel):
+    driver_id: int
+    total_distance_km: float
+    stops: List[RouteStop]
+    cached: bool
+
+class PickupCluster(BaseModel):
+    cluster_id: int
+    centroid_latitude: float
+    centroid_longitude: float
+    pickup_count: int
+    total_weight_kg: float
+    radius_km: float
+    pickup_ids: List[int]
+
+class PickupClusterResponse(BaseModel):
+    clusters: List[PickupCluster]
+    unclustered_pickup_ids: List[int]
+    pickup_count: int
+    elapsed_ms: float
+
+class BulkPickupRowResult(BaseModel):
+    row: int = Field(..., description="1-based position of the row in the upload")
+    status: Literal["created", "error"]
+    pickup_id: Optional[int] = None
+    errors: Optional[List[str]] = None
+
+class BulkPickupResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkPickupRowResult]
@@ -1,11 +1,10 @@
 from fastapi import HTTPException, status
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from datetime import datetime
 
-from app.repositories.pickup_repo import PickupRepository
-from app.repositories.subscription_repo import SubscriptionRepository
-from app.models.pickup import Pickup, PickupStatus
-from app.models.subscription import SubscriptionStatus
+from app.repositories.pickup_repo import PickupFilter, PickupRepository
+from app.models.pickup import PickupStatus
 from app.models.pickup_assignment import AssignmentStatus
 from app.api.v1.pickups.pickup_schemas import PickupCreateRequest, PickupUpdateStatusRequest
 from app.api.v1.pickups.pickup_workflow_schemas import (
@@ -15,72 +14,247 @@ from app.api.v1.pickups.pickup_workflow_schemas import (
     PickupCompleteRequest
 )
 from app.services.audit_service import log_event
+from app.services.manifest_service import driver_manifest_cache
+from app.services.outbox_service import emit_events, emit_pickup_event
+from app.services.pickup_state_machine import STATUS_TRANSITIONS, apply_transition
+from app.services.quota_service import current_usage, record_usage, reserve_quota, usage_entry
+from app.services.pickup_job_service import schedule_jobs_for_pickups, schedule_pickup_jobs
+from app.services.scheduler_service import job_scheduler
+from app.services.subscription_service import ActiveSubscription, active_subscription_cache
+from app.services.vehicle_service import VehicleService
+from app.services.zone_service import locate_zone, zone_index_cache
+from app.utils.enums import UsageEventType
+from app.utils.helpers import to_naive_utc
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.serialization import rows_to_dicts
 
 class PickupService:
 
     @staticmethod
-    def create_pickup(db: Session, organization, request: PickupCreateRequest) -> Pickup:
-        # 1. Fetch ACTIVE subscription for organization
-        sub = SubscriptionRepository.get_active_subscription(db, organization.id)
-        if not sub:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No active subscription found. Please subscribe to a plan.")
-        
-        # 2. Validate not expired
-        if datetime.utcnow() > sub.end_date:
-            SubscriptionRepository.update_subscription_status(db, sub.id, SubscriptionStatus.EXPIRED)
-            db.commit()
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Subscription has expired.")
+    def create_pickup(db: Session, organization, request: PickupCreateRequest, user=None):
+        """
+        Creates a pickup in one short transaction: a conditional UPDATE
+        takes the quota and an INSERT ... RETURNING hands back the row, so
+        the usage row stays locked only for those two statements and the
+        job writes before the single commit.
+        """
+        # 1-2. ACTIVE, unexpired subscription and plan limits, usually cached
+        sub = PickupService._active_subscription(db, organization.id)
 
-        # 3. Lock subscription_usage row and safely increment usage using the existing atomic validator
-        try:
-            # Reusing the tested atomic validator from the subscription module.
-            from app.services.subscription_service import SubscriptionService
-            incremented_usage = SubscriptionService.validate_and_increment_usage(
-                db=db, 
-                subscription_id=sub.id, 
-                pickups=1, 
-                weight=request.waste_weight, 
-                drivers=0
-            ) 
-        except HTTPException as e:
-            raise e
-        except Exception as e:
-            # If the atomic increment fails for an unforeseen reason, rollback everything to be safe
+        # 3. Everything that needs no lock happens before the quota is taken
+        zone_id = locate_zone(db, organization.id, request.latitude, request.longitude)
+        scheduled_at = to_naive_utc(request.scheduled_at)
+
+        # 4. Take the quota; no row means a limit would be exceeded
+        if not reserve_quota(db, sub, 1, request.waste_weight):
             db.rollback()
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to process pickup due to a system error.")
-
-        # 4. Create the pickup since usage was validated
-        new_pickup = Pickup(
-            organization_id=organization.id,
-            subscription_id=sub.id,
-            waste_type=request.waste_type,
-            waste_weight=request.waste_weight,
-            address=request.address,
-            latitude=request.latitude,
-            longitude=request.longitude,
-            status=PickupStatus.PENDING,
-            scheduled_at=request.scheduled_at
+            PickupService._raise_quota_error(db, sub, 1, request.waste_weight)
+
+        # 5. Create the pickup, reading the stored row straight back
+        created_pickup = PickupRepository.insert_pickup(db, {
+            "organization_id": organization.id,
+            "subscription_id": sub.id,
+            "waste_type": request.waste_type,
+            "waste_weight": request.waste_weight,
+            "address": request.address,
+            "latitude": request.latitude,
+            "longitude": request.longitude,
+            "zone_id": zone_id,
+            "status": PickupStatus.PENDING,
+            "scheduled_at": scheduled_at,
+        })
+
+        record_usage(db, [usage_entry(
+            UsageEventType.PICKUP_CREATED, created_pickup.id, organization.id, sub.id, request.waste_weight
+        )])
+
+        # 6. Queue the scheduled-time automation in the same transaction
+        jobs = schedule_jobs_for_pickups(
+            db,
+            [(created_pickup.id, organization.id, created_pickup.scheduled_at)],
+            user.id if user else None,
         )
 
-        created_pickup = PickupRepository.create_pickup(db, new_pickup)
-        
-        # 5. Commit atomic transaction
+        emit_pickup_event(
+            db, "pickup.created", created_pickup,
+            scheduled_at=scheduled_at.isoformat() if scheduled_at else None,
+            zone_id=zone_id,
+            created_by=user.id if user else None,
+        )
+
+        # 7. Commit atomic transaction
         db.commit()
-        db.refresh(created_pickup)
+        job_scheduler.watch(jobs)
         
         return created_pickup
 
     @staticmethod
-    def list_pickups_for_org(db: Session, organization_id: int, p_status: PickupStatus = None):
-        return PickupRepository.list_org_pickups(db, organization_id, p_status)
+    def bulk_create_pickups(db: Session, organization, rows: list, user) -> dict:
+        """
+        Creates many pickups in one transaction. Every row is validated up
+        front and invalid ones are reported without blocking the rest;
+        quota for all valid rows is reserved at once and the pickups go in
+        with one multi-row INSERT. A batch that would exceed the plan's
+        limits is rejected as a whole.
+        """
+        results = [None] * len(rows)
+        valid = []
+        for index, raw in enumerate(rows):
+            try:
+                valid.append((index, PickupCreateRequest.model_validate(raw)))
+            except ValidationError as e:
+                results[index] = {
+                    "row": index + 1,
+                    "status": "error",
+                    "errors": [
+                        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" if err["loc"] else err["msg"]
+                        for err in e.errors()
+                    ],
+                }
+
+        if valid:
+            sub = PickupService._active_subscription(db, organization.id)
+
+            # One reservation for the whole batch
+            requests = [request for _, request in valid]
+            total_weight = sum(request.waste_weight for request in requests)
+            if not reserve_quota(db, sub, len(requests), total_weight):
+                db.rollback()
+                PickupService._raise_quota_error(db, sub, len(requests), total_weight)
+
+            zones = zone_index_cache.get(db, organization.id).locate_many(
+                [request.latitude for request in requests],
+                [request.longitude for request in requests],
+            )
+            pickup_rows = [
+                {
+                    "organization_id": organization.id,
+                    "subscription_id": sub.id,
+                    "waste_type": request.waste_type,
+                    "waste_weight": request.waste_weight,
+                    "address": request.address,
+                    "latitude": request.latitude,
+                    "longitude": request.longitude,
+                    "zone_id": zone_id,
+                    "status": PickupStatus.PENDING,
+                    "scheduled_at": to_naive_utc(request.scheduled_at),
+                }
+                for request, zone_id in zip(requests, zones)
+            ]
+            pickup_ids = PickupRepository.bulk_create_pickups(db, pickup_rows)
+            record_usage(db, [
+                usage_entry(UsageEventType.PICKUP_CREATED, pickup_id, organization.id, sub.id, row["waste_weight"])
+                for pickup_id, row in zip(pickup_ids, pickup_rows)
+            ])
+
+            jobs = schedule_jobs_for_pickups(
+                db,
+                [(pickup_id, organization.id, row["scheduled_at"]) for pickup_id, row in zip(pickup_ids, pickup_rows)],
+                user.id,
+            )
+
+            emit_events(db, [
+                {
+                    "event_type": "pickup.created",
+                    "aggregate_type": "pickup",
+                    "aggregate_id": pickup_id,
+                    "organization_id": organization.id,
+                    "payload": {
+                        "status": PickupStatus.PENDING.value,
+                        "scheduled_at": row["scheduled_at"].isoformat() if row["scheduled_at"] else None,
+                        "zone_id": row["zone_id"],
+                        "created_by": user.id,
+                        "bulk": True,
+                    },
+                }
+                for pickup_id, row in zip(pickup_ids, pickup_rows)
+            ])
+
+            # log_event commits the batch
+            log_event(
+                db=db,
+                user_id=user.id,
+                action="BULK_CREATE_PICKUPS",
+                org_id=organization.id,
+                metadata={"entity_type": "pickup", "created": len(pickup_ids), "failed": len(rows) - len(pickup_ids)},
+            )
+            job_scheduler.watch(jobs)
+
+            for (index, _), pickup_id in zip(valid, pickup_ids):
+                results[index] = {"row": index + 1, "status": "created", "pickup_id": pickup_id}
+
+        return {
+            "created": len(valid),
+            "failed": len(rows) - len(valid),
+            "results": results,
+        }
 
     @staticmethod
-    def list_pickups_for_driver(db: Session, driver_id: int, a_status: AssignmentStatus = None):
-        return PickupRepository.list_driver_pickups(db, driver_id, a_status)
+    def _active_subscription(db: Session, organization_id: int) -> ActiveSubscription:
+        "the org's ACTIVE subscription, or 403 when it has none or it has run out"
+        sub = active_subscription_cache.get(db, organization_id)
+        if not sub:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No active subscription found. Please subscribe to a plan.")
+
+        # the subscription sweeper expires or renews it; this check never writes
+        if datetime.utcnow() > sub.end_date:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Subscription has expired.")
+        return sub
 
     @staticmethod
-    def list_all_pickups(db: Session, p_status: PickupStatus = None):
-        return PickupRepository.list_all_pickups(db, p_status)
+    def _raise_quota_error(db: Session, sub: ActiveSubscription, pickups: int, weight: float):
+        "explains why reserve_quota refused"
+        used = current_usage(db, sub.id)
+        if not used:
+            raise HTTPException(status_code=404, detail="Usage record not found")
+        pickups_used, weight_used = used
+
+        if sub.pickup_limit > 0 and pickups_used + pickups > sub.pickup_limit:
+            remaining = max(sub.pickup_limit - pickups_used, 0)
+            raise HTTPException(status_code=403, detail=f"Pickup limit exceeded: {remaining} pickups left on the plan")
+        remaining = max(sub.waste_weight_limit - weight_used, 0.0)
+        raise HTTPException(status_code=403, detail=f"Waste weight limit exceeded: {remaining:.1f} kg left on the plan")
+
+    @staticmethod
+    def list_pickups_for_org(db: Session, organization_id: int, filters: PickupFilter = None,
+                             cursor: str = None, limit: int = 50, sort: str = "created_at", include_total: bool = False):
+        return PickupService._page(
+            lambda after: PickupRepository.list_org_pickups(db, organization_id, filters, sort, after, limit, include_total),
+            sort, cursor, limit,
+        )
+
+    @staticmethod
+    def list_pickups_for_driver(db: Session, driver_id: int, a_status: AssignmentStatus = None, filters: PickupFilter = None,
+                                cursor: str = None, limit: int = 50, sort: str = "scheduled_at", include_total: bool = False):
+        return PickupService._page(
+            lambda after: PickupRepository.list_driver_pickups(db, driver_id, a_status, filters, sort, after, limit, include_total),
+            sort, cursor, limit,
+        )
+
+    @staticmethod
+    def list_all_pickups(db: Session, filters: PickupFilter = None,
+                         cursor: str = None, limit: int = 50, sort: str = "created_at", include_total: bool = False):
+        return PickupService._page(
+            lambda after: PickupRepository.list_all_pickups(db, filters, sort, after, limit, include_total),
+            sort, cursor, limit,
+        )
+
+    @staticmethod
+    def _page(fetch, sort: str, cursor: str, limit: int) -> dict:
+        "runs a keyset list query from an opaque cursor and builds the next one"
+        try:
+            after = decode_cursor(cursor, sort)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        rows, total = fetch(after)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(sort, (getattr(last, sort), last.id))
+
+        return {"pickups": rows_to_dicts(rows), "next_cursor": next_cursor, "total": total}
 
     @staticmethod
     def get_pickup_by_id(db: Session, pickup_id: int):
@@ -91,52 +265,13 @@ class PickupService:
 
     @staticmethod
     def update_pickup_status(db: Session, pickup_id: int, request: PickupUpdateStatusRequest, user, is_admin: bool):
-        pickup = PickupService.get_pickup_by_id(db, pickup_id)
-        
-        # Validate permissions depending on the operation
-        if not is_admin:
-            # Validate driver owns the assignment if they are trying to mark it complete
-            if request.status in [PickupStatus.IN_PROGRESS, PickupStatus.COMPLETED]:
-                is_assigned = any(assignment.driver_id == user.id for assignment in pickup.assignments)
-                if not is_assigned:
-                    raise HTTPException(status_code=403, detail="You are not assigned to this pickup.")
-
-        old_status = pickup.status
-        new_status = request.status
-
-        # Strict State Machine Transition Rules
-        valid_transitions = {
-            PickupStatus.PENDING: [PickupStatus.ASSIGNED, PickupStatus.CANCELLED],
-            PickupStatus.ASSIGNED: [PickupStatus.IN_PROGRESS, PickupStatus.CANCELLED],
-            PickupStatus.IN_PROGRESS: [PickupStatus.COMPLETED, PickupStatus.CANCELLED],
-            PickupStatus.COMPLETED: [],
-            PickupStatus.CANCELLED: []
-        }
+        name = STATUS_TRANSITIONS.get(request.status)
+        if name is None:
+            pickup = PickupService.get_pickup_by_id(db, pickup_id)
+            raise HTTPException(status_code=400, detail=f"Invalid transition from {pickup.status.value} to {request.status.value}")
 
-        if new_status not in valid_transitions.get(old_status, []):
-            raise HTTPException(status_code=400, detail=f"Invalid transition from {old_status} to {new_status}")
-
-        # If cancelled early, ideally we return the usage back. Note: If we do this, we need to lock the usage row again.
-        if new_status == PickupStatus.CANCELLED and old_status != PickupStatus.COMPLETED:
-            from app.services.subscription_service import SubscriptionService
-            # Decrement securely
-            try:
-                SubscriptionService.validate_and_increment_usage(
-                    db=db, 
-                    subscription_id=pickup.subscription_id, 
-                    pickups=-1, 
-                    weight=-pickup.waste_weight, 
-                    drivers=0
-                )
-            except Exception:
-                # ignore decrement errors if subscription is missing/deleted
-                pass
-
-        updated_pickup = PickupRepository.update_pickup_status(db, pickup_id, new_status)
-        db.commit()
-        db.refresh(updated_pickup)
-        
-        return updated_pickup
+        # Drivers may only start or complete pickups assigned to them
+        return apply_transition(db, name, pickup_id, user, check_assignment=not is_admin)
 
     @staticmethod
     def assign_driver(db: Session, pickup_id: int, driver_id: int):
@@ -144,52 +279,33 @@ class PickupService:
         pickup = PickupService.get_pickup_by_id(db, pickup_id)
         if pickup.status != PickupStatus.PENDING:
             raise HTTPException(status_code=400, detail="Pickup must be PENDING to be assigned.")
+
+        # 2. Check the driver's vehicle can take the extra load
+        tracker = VehicleService(db).build_capacity_tracker([driver_id])
+        if not tracker.fits(driver_id, pickup.waste_type.value, pickup.waste_weight):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Driver's vehicle has only {tracker.remaining(driver_id, pickup.waste_type.value):.1f} kg spare for {pickup.waste_type.value} waste."
+            )
             
-        # 2. Assign Driver
+        # 3. Assign Driver
         assignment = PickupRepository.assign_driver(db, pickup_id, driver_id)
         
-        # 3. Transition Pickup state to ASSIGNED
+        # 4. Transition Pickup state to ASSIGNED
         pickup.status = PickupStatus.ASSIGNED
+        emit_pickup_event(db, "pickup.assigned", pickup, driver_id=driver_id)
         
         db.commit()
         db.refresh(pickup)
+        driver_manifest_cache.invalidate_driver(driver_id)
         return assignment
 
     @staticmethod
     def cancel_pickup(db: Session, pickup_id: int, request: PickupCancelRequest, user):
-        pickup = PickupRepository.get_with_lock(db, pickup_id)
-        if not pickup:
-            raise HTTPException(status_code=404, detail="Pickup not found")
-        
-        if pickup.status not in [PickupStatus.PENDING, PickupStatus.ASSIGNED]:
-            raise HTTPException(status_code=400, detail="Only PENDING or ASSIGNED pickups can be cancelled")
-
-        # Rollback subscription usage
-        from app.services.subscription_service import SubscriptionService
-        try:
-            SubscriptionService.validate_and_increment_usage(
-                db=db, 
-                subscription_id=pickup.subscription_id, 
-                pickups=-1, 
-                weight=-pickup.waste_weight, 
-                drivers=0
-            )
-        except Exception:
-            pass
-
-        updated_pickup = PickupRepository.update_pickup_status(db, pickup_id, PickupStatus.CANCELLED)
-        
-        log_event(
-            db=db, 
-            user_id=user.id, 
-            action="CANCEL", 
-            org_id=pickup.organization_id, 
-            metadata={"entity_type": "pickup", "pickup_id": pickup_id, "reason": request.cancellation_reason}
+        return apply_transition(
+            db, "cancel", pickup_id, user,
+            params={"reason": request.cancellation_reason},
         )
-        
-        db.commit()
-        db.refresh(updated_pickup)
-        return updated_pickup
 
     @staticmethod
     def reschedule_pickup(db: Session, pickup_id: int, request: PickupRescheduleRequest, user):
@@ -201,8 +317,17 @@ class PickupService:
             raise HTTPException(status_code=400, detail="Only PENDING or ASSIGNED pickups can be rescheduled")
 
         old_schedule = pickup.scheduled_at.isoformat() if pickup.scheduled_at else None
+        driver_ids = {assignment.driver_id for assignment in pickup.assignments}
         
         updated_pickup = PickupRepository.update_schedule(db, pickup_id, request.new_scheduled_at)
+        # moves the pickup's pending jobs to the new time
+        jobs = schedule_pickup_jobs(db, updated_pickup, user.id)
+        emit_pickup_event(
+            db, "pickup.rescheduled", updated_pickup,
+            old_schedule=old_schedule,
+            scheduled_at=updated_pickup.scheduled_at.isoformat(),
+            actor_id=user.id,
+        )
         
         log_event(
             db=db, 
@@ -220,86 +345,27 @@ class PickupService:
         
         db.commit()
         db.refresh(updated_pickup)
+        job_scheduler.watch(jobs)
+        # the pickup may move onto another day's manifest
+        for driver_id in driver_ids:
+            driver_manifest_cache.invalidate_driver(driver_id)
         return updated_pickup
 
     @staticmethod
     def accept_pickup(db: Session, pickup_id: int, user):
-        pickup = PickupRepository.get_with_lock(db, pickup_id)
-        if not pickup:
-            raise HTTPException(status_code=404, detail="Pickup not found")
-            
-        if pickup.status != PickupStatus.ASSIGNED:
-            raise HTTPException(status_code=400, detail="Only ASSIGNED pickups can be accepted")
-
-        is_assigned = any(assignment.driver_id == user.id for assignment in pickup.assignments)
-        if not is_assigned:
-            raise HTTPException(status_code=403, detail="You are not assigned to this pickup")
-
-        updated_pickup = PickupRepository.update_pickup_status(db, pickup_id, PickupStatus.IN_PROGRESS)
-        
-        log_event(
-            db=db, 
-            user_id=user.id, 
-            action="ACCEPT_PICKUP", 
-            org_id=pickup.organization_id, 
-            metadata={"entity_type": "pickup", "pickup_id": pickup_id}
-        )
-        
-        db.commit()
-        db.refresh(updated_pickup)
-        return updated_pickup
+        return apply_transition(db, "accept", pickup_id, user)
 
     @staticmethod
     def reject_pickup(db: Session, pickup_id: int, request: PickupRejectRequest, user):
-        pickup = PickupRepository.get_with_lock(db, pickup_id)
-        if not pickup:
-            raise HTTPException(status_code=404, detail="Pickup not found")
-            
-        if pickup.status != PickupStatus.ASSIGNED:
-            raise HTTPException(status_code=400, detail="Only ASSIGNED pickups can be rejected")
-
-        is_assigned = any(assignment.driver_id == user.id for assignment in pickup.assignments)
-        if not is_assigned:
-            raise HTTPException(status_code=403, detail="You are not assigned to this pickup")
-
-        PickupRepository.remove_assignment(db, pickup_id, user.id)
-        updated_pickup = PickupRepository.update_pickup_status(db, pickup_id, PickupStatus.PENDING)
-        
-        log_event(
-            db=db, 
-            user_id=user.id, 
-            action="REJECT_PICKUP", 
-            org_id=pickup.organization_id, 
-            metadata={"entity_type": "pickup", "pickup_id": pickup_id, "reason": request.reason}
+        return apply_transition(
+            db, "reject", pickup_id, user,
+            params={"reason": request.reason},
         )
-        
-        db.commit()
-        db.refresh(updated_pickup)
-        return updated_pickup
 
     @staticmethod
     def complete_pickup(db: Session, pickup_id: int, request: PickupCompleteRequest, user):
-        pickup = PickupRepository.get_with_lock(db, pickup_id)
-        if not pickup:
-            raise HTTPException(status_code=404, detail="Pickup not found")
-            
-        if pickup.status != PickupStatus.IN_PROGRESS:
-            raise HTTPException(status_code=400, detail="Only IN_PROGRESS pickups can be completed")
-
-        is_assigned = any(assignment.driver_id == user.id for assignment in pickup.assignments)
-        if not is_assigned:
-            raise HTTPException(status_code=403, detail="You are not assigned to this pickup")
-
-        updated_pickup = PickupRepository.update_completion(db, pickup_id, request.actual_weight)
-        
-        log_event(
-            db=db, 
-            user_id=user.id, 
-            action="COMPLETE_PICKUP", 
-            org_id=pickup.organization_id, 
-            metadata={"entity_type": "pickup", "pickup_id": pickup_id, "actual_weight": request.actual_weight, "notes": request.notes}
+        return apply_transition(
+            db, "complete", pickup_id, user,
+            params={"actual_weight": request.actual_weight, "notes": request.notes},
+            values={"waste_weight": request.actual_weight},
         )
-        
-        db.commit()
-        db.refresh(updated_pickup)
-        return updated_pickup
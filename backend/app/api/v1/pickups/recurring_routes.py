@@ -0,0 +1,76 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.orm import Session
+
+from app.core.dependencies import get_db, get_user_org
+from app.core.permissions import require_permission
+from app.models.user import User
+from app.services.recurring_pickup_service import RecurringPickupService
+from app.api.v1.pickups.recurring_schemas import (
+    RecurringPickupCreateRequest,
+    RecurringPickupUpdateRequest,
+    RecurringPickupResponse,
+)
+
+router = APIRouter(prefix="/recurring-pickups", tags=["Recurring Pickups"])
+
+
+@router.post("", response_model=RecurringPickupResponse, status_code=status.HTTP_201_CREATED)
+def create_recurring_pickup(
+    request: RecurringPickupCreateRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("pickup.create"))
+):
+    """
+    Sets up a pickup that repeats daily, weekly or monthly. Its occurrences
+    over the coming RECURRING_PICKUP_HORIZON_DAYS are created as ordinary
+    pickups right away and topped up by a scheduled run after that.
+    """
+    org = get_user_org(db, current_user)
+    return RecurringPickupService(db).create_rule(
+        organization_id=org.id,
+        data=request.model_dump(exclude_none=True),
+        created_by=current_user.id,
+    )
+
+
+@router.get("", response_model=List[RecurringPickupResponse])
+def list_recurring_pickups(
+    include_inactive: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("pickup.view"))
+):
+    org = get_user_org(db, current_user)
+    return RecurringPickupService(db).list_rules(org.id, include_inactive)
+
+
+@router.get("/{rule_id}", response_model=RecurringPickupResponse)
+def get_recurring_pickup(
+    rule_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("pickup.view"))
+):
+    org = get_user_org(db, current_user)
+    return RecurringPickupService(db).get_rule(rule_id, org.id)
+
+
+@router.patch("/{rule_id}", response_model=RecurringPickupResponse)
+def update_recurring_pickup(
+    rule_id: int,
+    request: RecurringPickupUpdateRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("pickup.manage"))
+):
+    """
+    Edits or (de)activates a recurring pickup. Future occurrences still
+    pending with no driver are regenerated; past, assigned and cancelled
+    ones are left alone.
+    """
+    org = get_user_org(db, current_user)
+    return RecurringPickupService(db).update_rule(
+        rule_id=rule_id,
+        organization_id=org.id,
+        update_data=request.model_dump(exclude_unset=True),
+        updated_by=current_user.id,
+    )
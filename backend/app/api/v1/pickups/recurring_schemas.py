@@ -0,0 +1,72 @@
+from datetime import date, datetime, time
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from app.models.pickup import WasteType
+from app.utils.enums import RecurrenceFrequency
+
+Weekday = Literal["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+
+
+class RecurringPickupCreateRequest(BaseModel):
+    waste_type: WasteType
+    waste_weight: float = Field(..., gt=0, description="Weight of the waste in kg per pickup")
+    address: str = Field(..., max_length=500)
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    frequency: RecurrenceFrequency
+    repeat_interval: int = Field(1, ge=1, le=52, description="Every n days, weeks or months")
+    by_weekday: Optional[List[Weekday]] = Field(None, description="Weekdays of a WEEKLY rule; defaults to the weekday of starts_on")
+    time_of_day: time = Field(..., description="UTC time of each occurrence")
+    starts_on: date
+    ends_on: Optional[date] = None
+
+    @model_validator(mode="after")
+    def _check_dates(self):
+        if self.ends_on is not None and self.ends_on < self.starts_on:
+            raise ValueError("ends_on must not be before starts_on")
+        return self
+
+class RecurringPickupUpdateRequest(BaseModel):
+    waste_type: Optional[WasteType] = None
+    waste_weight: Optional[float] = Field(None, gt=0)
+    address: Optional[str] = Field(None, max_length=500)
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    frequency: Optional[RecurrenceFrequency] = None
+    repeat_interval: Optional[int] = Field(None, ge=1, le=52)
+    by_weekday: Optional[List[Weekday]] = None
+    time_of_day: Optional[time] = None
+    starts_on: Optional[date] = None
+    ends_on: Optional[date] = None
+    is_active: Optional[bool] = None
+
+class RecurringPickupResponse(BaseModel):
+    id: int
+    organization_id: int
+    waste_type: WasteType
+    waste_weight: float
+    address: str
+    latitude: float
+    longitude: float
+    frequency: RecurrenceFrequency
+    repeat_interval: int
+    by_weekday: List[str] = []
+    time_of_day: time
+    starts_on: date
+    ends_on: Optional[date] = None
+    is_active: bool
+    materialized_until: Optional[datetime] = None
+    paused_reason: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+    @field_validator("by_weekday", mode="before")
+    @classmethod
+    def _split_weekdays(cls, value):
+        if isinstance(value, str):
+            return value.split(",")
+        return value or []
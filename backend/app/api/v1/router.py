@@ -9,6 +9,7 @@ from app.api.v1.organizations.org_routes import router as org_router
 from app.api.v1.organizations.category_routes import router as category_router
 from app.api.v1.subscriptions.subscription_routes import router as subscription_router
 from app.api.v1.pickups.pickup_routes import router as pickup_router
+from app.api.v1.pickups.recurring_routes import router as recurring_pickup_router
 from app.api.v1.drivers.driver_routes import router as driver_router
 from app.api.v1.notifications.notification_routes import router as notification_router
 from app.api.v1.audit.audit_route import router as audit_router
@@ -18,6 +19,7 @@ from app.api.v1.admin.rbac_routes import router as rbac_router
 from app.api.v1.system.system_setting_routes import router as system_setting_router
 from app.api.v1.analytics.driver_analytics_routes import router as driver_analytics_router
 from app.api.v1.websockets.driver_tracking_routes import router as ws_router
+from app.api.v1.zones.zone_routes import router as zone_router
 
 
 
@@ -66,6 +68,16 @@ api_router.include_router(
     pickup_router,
 )
 
+api_router.include_router(
+    recurring_pickup_router,
+)
+
+api_router.include_router(
+    zone_router,
+    prefix="/zones",
+    tags=["Zones"]
+)
+
 api_router.include_router(
     media_routes,
     prefix="/media",
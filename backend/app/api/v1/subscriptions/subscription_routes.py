@@ -1,5 +1,7 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, status, HTTPException, Header, Response
 from sqlalchemy.orm import Session
+from app.core.config import PLAN_CATALOG_MAX_AGE_SECONDS
 from app.core.database import get_db
 from app.core.permissions import require_permission
 from app.core.dependencies import get_current_user, get_user_org
@@ -20,11 +22,31 @@ from app.services.subscription_service import SubscriptionService
 
 router = APIRouter(prefix="/subscription", tags=["Subscriptions"])
 
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    "If-None-Match uses the weak comparison, so a W/ prefix is ignored"
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
 @router.get("/plans", response_model=list[PlanResponse])
 def get_plans(
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
-    return SubscriptionService.list_plans(db)
+    """
+    Lists the plans on offer. The catalog is served from memory with a
+    strong ETag; a request whose If-None-Match carries it gets an empty
+    304, and clients may reuse it for PLAN_CATALOG_MAX_AGE_SECONDS.
+    """
+    body, etag = SubscriptionService.plan_catalog(db)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={PLAN_CATALOG_MAX_AGE_SECONDS}"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
 @router.post("/plans", response_model=PlanResponse, dependencies=[Depends(require_permission("subscription.manage"))])
 def create_plan(
@@ -1,4 +1,5 @@
 import json
+from uuid import UUID
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
 from sqlalchemy.orm import Session
 
@@ -62,10 +63,13 @@ async def driver_ws(
 
             # Save to database using your existing logic
             driver_service.update_driver_location(
-                driver_id=driver_id,
+                driver_id=UUID(driver_id),
+                organization_id=organization_id,
                 latitude=lat,
                 longitude=lng,
+                accuracy=location.get("accuracy"),
             )
+            db.commit()
 
             # Broadcast to dispatchers
             await manager.broadcast_location(
@@ -0,0 +1,110 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.dependencies import get_db, get_user_org
+from app.core.permissions import require_permission
+from app.models.user import User
+from app.services.zone_service import ZoneService
+from app.api.v1.zones.zone_schemas import (
+    ZoneCreateRequest,
+    ZoneUpdateRequest,
+    ZoneResponse,
+    ZoneSummaryResponse,
+)
+
+router = APIRouter()
+
+
+@router.post("", response_model=ZoneResponse, status_code=status.HTTP_201_CREATED)
+def create_zone(
+    request: ZoneCreateRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("zone.manage"))
+):
+    """
+    Creates a service zone for the user's organization. Open pickups inside
+    the new boundary are re-tagged.
+    """
+    org = get_user_org(db, current_user)
+    try:
+        zone = ZoneService(db).create_zone(
+            organization_id=org.id,
+            name=request.name,
+            boundary=[list(point) for point in request.boundary],
+            created_by=current_user.id,
+        )
+        db.commit()
+        return zone
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("", response_model=List[ZoneResponse])
+def list_zones(
+    include_inactive: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("zone.view"))
+):
+    org = get_user_org(db, current_user)
+    return ZoneService(db).list_zones(org.id, include_inactive)
+
+
+@router.get("/{zone_id}", response_model=ZoneResponse)
+def get_zone(
+    zone_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("zone.view"))
+):
+    org = get_user_org(db, current_user)
+    zone = ZoneService(db).get_zone(zone_id, org.id)
+    if not zone:
+        raise HTTPException(status_code=404, detail="Zone not found")
+    return zone
+
+
+@router.patch("/{zone_id}", response_model=ZoneResponse)
+def update_zone(
+    zone_id: int,
+    request: ZoneUpdateRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("zone.manage"))
+):
+    """
+    Renames, reshapes or (de)activates a zone. Boundary and activation
+    changes re-tag the organization's open pickups.
+    """
+    org = get_user_org(db, current_user)
+    update_data = request.model_dump(exclude_unset=True)
+    if update_data.get("boundary") is not None:
+        update_data["boundary"] = [list(point) for point in update_data["boundary"]]
+    try:
+        zone = ZoneService(db).update_zone(
+            zone_id=zone_id,
+            organization_id=org.id,
+            update_data=update_data,
+            updated_by=current_user.id,
+        )
+        db.commit()
+        return zone
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/{zone_id}/summary", response_model=ZoneSummaryResponse)
+def get_zone_summary(
+    zone_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("zone.view"))
+):
+    """
+    Pickup counts by status and drivers currently in the zone.
+    """
+    org = get_user_org(db, current_user)
+    try:
+        return ZoneService(db).get_zone_summary(zone_id, org.id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
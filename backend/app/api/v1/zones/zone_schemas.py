@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field, field_validator
+
+
+Coordinate = Tuple[float, float]
+
+
+def _validate_boundary(value):
+    if value is None:
+        return value
+    for latitude, longitude in value:
+        if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+            raise ValueError("boundary coordinates must be valid (latitude, longitude) pairs")
+    distinct = {tuple(point) for point in value}
+    if len(distinct) < 3:
+        raise ValueError("boundary needs at least 3 distinct vertices")
+    return value
+
+
+class ZoneCreateRequest(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+    boundary: List[Coordinate] = Field(..., description="Polygon vertices as [latitude, longitude] pairs")
+
+    _check_boundary = field_validator("boundary")(_validate_boundary)
+
+class ZoneUpdateRequest(BaseModel):
+    name: Optional[str] = Field(None, min_length=1, max_length=100)
+    boundary: Optional[List[Coordinate]] = None
+    is_active: Optional[bool] = None
+
+    _check_boundary = field_validator("boundary")(_validate_boundary)
+
+class ZoneResponse(BaseModel):
+    id: int
+    organization_id: int
+    name: str
+    boundary: List[Coordinate]
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+class ZonePickupStats(BaseModel):
+    count: int
+    weight_kg: float
+
+class ZoneDriverStats(BaseModel):
+    total: int
+    on_duty: int
+    available: int
+
+class ZoneSummaryResponse(BaseModel):
+    zone_id: int
+    name: str
+    pickups: Dict[str, ZonePickupStats]
+    drivers: ZoneDriverStats
@@ -60,3 +60,268 @@ OTP_EXPIRY_MINUTES = int(
 ACCESS_TOKEN_EXPIRE_MINUTES = int(
     os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60)
 )
+
+# ========================
+# ROUTING CONFIGURATION
+# ========================
+
+ROUTE_AVERAGE_SPEED_KMPH = float(
+    os.getenv("ROUTE_AVERAGE_SPEED_KMPH", 25)
+)
+
+# Time spent at each stop
+ROUTE_SERVICE_MINUTES = float(
+    os.getenv("ROUTE_SERVICE_MINUTES", 10)
+)
+
+# A pickup scheduled at T may be served between T and T + window
+ROUTE_WINDOW_MINUTES = float(
+    os.getenv("ROUTE_WINDOW_MINUTES", 60)
+)
+
+# 24 comma-separated hourly speeds (km/h). Defaults to the average speed,
+# slowed at rush hours and faster overnight.
+ROUTE_SPEED_PROFILE_KMPH = [
+    float(speed)
+    for speed in os.getenv(
+        "ROUTE_SPEED_PROFILE_KMPH",
+        ",".join(
+            str(
+                ROUTE_AVERAGE_SPEED_KMPH
+                * (0.7 if hour in (8, 9, 17, 18, 19) else 1.3 if hour < 6 or hour >= 22 else 1.0)
+            )
+            for hour in range(24)
+        ),
+    ).split(",")
+]
+
+# Hours in the speed profile are local to this timezone
+ROUTE_SPEED_PROFILE_TZ = os.getenv("ROUTE_SPEED_PROFILE_TZ", "UTC")
+
+# Road distance over great-circle distance
+DISTANCE_ROAD_FACTOR = float(
+    os.getenv("DISTANCE_ROAD_FACTOR", 1.3)
+)
+
+# Coordinates are snapped to this many decimals (3 ~ 110 m) for caching
+DISTANCE_CELL_DECIMALS = int(
+    os.getenv("DISTANCE_CELL_DECIMALS", 3)
+)
+
+# Upper bound on cached cell-pair distances (16 bytes each)
+DISTANCE_CACHE_MAX_CELLS = int(
+    os.getenv("DISTANCE_CACHE_MAX_CELLS", 4_000_000)
+)
+
+# ========================
+# SCHEDULER CONFIGURATION
+# ========================
+
+# Runs the in-process job scheduler in every API worker; jobs are claimed
+# in the database so several workers never run the same one
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+
+SCHEDULER_TICK_SECONDS = float(
+    os.getenv("SCHEDULER_TICK_SECONDS", 1)
+)
+
+# How often the job table is re-read for jobs written by other workers
+SCHEDULER_REFILL_SECONDS = float(
+    os.getenv("SCHEDULER_REFILL_SECONDS", 60)
+)
+
+# A RUNNING job untouched for this long is assumed lost and retried
+SCHEDULER_LOCK_TIMEOUT_SECONDS = float(
+    os.getenv("SCHEDULER_LOCK_TIMEOUT_SECONDS", 300)
+)
+
+SCHEDULER_MAX_ATTEMPTS = int(
+    os.getenv("SCHEDULER_MAX_ATTEMPTS", 5)
+)
+
+# Scheduled pickup automation, relative to Pickup.scheduled_at
+PICKUP_AUTO_ASSIGN_LEAD_MINUTES = float(
+    os.getenv("PICKUP_AUTO_ASSIGN_LEAD_MINUTES", 60)
+)
+
+PICKUP_REMINDER_LEAD_MINUTES = float(
+    os.getenv("PICKUP_REMINDER_LEAD_MINUTES", 30)
+)
+
+PICKUP_OVERDUE_GRACE_MINUTES = float(
+    os.getenv("PICKUP_OVERDUE_GRACE_MINUTES", ROUTE_WINDOW_MINUTES)
+)
+
+# ========================
+# PICKUP CONFIGURATION
+# ========================
+
+# Rows accepted by one POST /pickups/bulk request
+BULK_PICKUP_MAX_ROWS = int(
+    os.getenv("BULK_PICKUP_MAX_ROWS", 1000)
+)
+
+# ========================
+# RECURRING PICKUPS
+# ========================
+
+# Occurrences of a recurring rule exist as pickups this far ahead
+RECURRING_PICKUP_HORIZON_DAYS = int(
+    os.getenv("RECURRING_PICKUP_HORIZON_DAYS", 14)
+)
+
+# Most occurrences one rule adds per run, e.g. a daily rule over the horizon
+RECURRING_PICKUP_MAX_OCCURRENCES = int(
+    os.getenv("RECURRING_PICKUP_MAX_OCCURRENCES", 31)
+)
+
+# Rules materialized per transaction by the scheduled run
+RECURRING_PICKUP_BATCH_SIZE = int(
+    os.getenv("RECURRING_PICKUP_BATCH_SIZE", 200)
+)
+
+RECURRING_PICKUP_RUN_MINUTES = float(
+    os.getenv("RECURRING_PICKUP_RUN_MINUTES", 60)
+)
+
+# ========================
+# SUBSCRIPTION CACHE
+# ========================
+
+# Longest another worker's subscription or plan change can take to reach
+# this worker's cache of active subscriptions
+SUBSCRIPTION_CACHE_TTL_SECONDS = float(
+    os.getenv("SUBSCRIPTION_CACHE_TTL_SECONDS", 60)
+)
+
+# Longest another worker's plan change can take to reach this worker's
+# cached plan catalog
+PLAN_CATALOG_CACHE_TTL_SECONDS = float(
+    os.getenv("PLAN_CATALOG_CACHE_TTL_SECONDS", 300)
+)
+
+# How long clients may reuse the plan catalog before revalidating it
+# with If-None-Match
+PLAN_CATALOG_MAX_AGE_SECONDS = int(
+    os.getenv("PLAN_CATALOG_MAX_AGE_SECONDS", 60)
+)
+
+# ========================
+# SUBSCRIPTION SWEEPER
+# ========================
+
+# Longest between two runs of the sweeper that expires or renews lapsed
+# subscriptions; it otherwise wakes at the next subscription's end_date
+SUBSCRIPTION_SWEEP_MINUTES = float(
+    os.getenv("SUBSCRIPTION_SWEEP_MINUTES", 15)
+)
+
+# Subscriptions expired or renewed per transaction
+SUBSCRIPTION_SWEEP_BATCH_SIZE = int(
+    os.getenv("SUBSCRIPTION_SWEEP_BATCH_SIZE", 500)
+)
+
+# ========================
+# USAGE CYCLES
+# ========================
+
+# Plan limits apply per usage cycle; a subscription's counters are
+# snapshotted and reset this often while it runs
+USAGE_CYCLE_DAYS = int(
+    os.getenv("USAGE_CYCLE_DAYS", 30)
+)
+
+USAGE_RESET_RUN_MINUTES = float(
+    os.getenv("USAGE_RESET_RUN_MINUTES", 15)
+)
+
+# Usage rows reset per transaction
+USAGE_RESET_BATCH_SIZE = int(
+    os.getenv("USAGE_RESET_BATCH_SIZE", 1000)
+)
+
+# ========================
+# DRIVER MANIFEST
+# ========================
+
+# Longest another worker's assignment or pickup change can take to reach
+# this worker's cached driver manifests
+MANIFEST_CACHE_TTL_SECONDS = float(
+    os.getenv("MANIFEST_CACHE_TTL_SECONDS", 30)
+)
+
+MANIFEST_CACHE_MAX_ENTRIES = int(
+    os.getenv("MANIFEST_CACHE_MAX_ENTRIES", 4096)
+)
+
+# ========================
+# QUOTA LEASES
+# ========================
+
+# Serve pickup quota from per-worker blocks taken off the usage row instead
+# of locking that row for every pickup
+QUOTA_LEASE_ENABLED = os.getenv("QUOTA_LEASE_ENABLED", "false").lower() == "true"
+
+QUOTA_LEASE_PICKUPS = int(
+    os.getenv("QUOTA_LEASE_PICKUPS", 20)
+)
+
+QUOTA_LEASE_WEIGHT_KG = float(
+    os.getenv("QUOTA_LEASE_WEIGHT_KG", 200)
+)
+
+# Unused allowance goes back to the plan at the latest this long after a lease is taken
+QUOTA_LEASE_TTL_SECONDS = float(
+    os.getenv("QUOTA_LEASE_TTL_SECONDS", 30)
+)
+
+# ========================
+# USAGE LEDGER
+# ========================
+
+# Count pickup quota through append-only usage_events instead of updating
+# the usage row per pickup; a compactor folds them into the totals. Takes
+# precedence over quota leases.
+USAGE_LEDGER_ENABLED = os.getenv("USAGE_LEDGER_ENABLED", "false").lower() == "true"
+
+# Share of a plan limit, below it, from which ledger reservations lock the
+# usage row and check again so concurrent ones cannot overshoot the limit
+# together; further from the limit they write no shared row
+USAGE_LEDGER_LOCK_MARGIN = float(
+    os.getenv("USAGE_LEDGER_LOCK_MARGIN", 0.1)
+)
+
+USAGE_COMPACT_SECONDS = float(
+    os.getenv("USAGE_COMPACT_SECONDS", 30)
+)
+
+# Ledger entries folded per transaction
+USAGE_COMPACT_BATCH_SIZE = int(
+    os.getenv("USAGE_COMPACT_BATCH_SIZE", 5000)
+)
+
+# ========================
+# OUTBOX
+# ========================
+
+# Runs the outbox dispatcher in every API worker; batches are claimed with
+# SKIP LOCKED so workers never deliver the same event at once
+OUTBOX_ENABLED = os.getenv("OUTBOX_ENABLED", "true").lower() == "true"
+
+# Longest an event waits when no commit in this process signalled new ones
+OUTBOX_POLL_SECONDS = float(
+    os.getenv("OUTBOX_POLL_SECONDS", 2)
+)
+
+OUTBOX_BATCH_SIZE = int(
+    os.getenv("OUTBOX_BATCH_SIZE", 100)
+)
+
+OUTBOX_MAX_ATTEMPTS = int(
+    os.getenv("OUTBOX_MAX_ATTEMPTS", 8)
+)
+
+# Delivered events are kept this long for inspection
+OUTBOX_RETENTION_HOURS = float(
+    os.getenv("OUTBOX_RETENTION_HOURS", 72)
+)
@@ -1,6 +1,14 @@
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from app.api.v1.router import api_router
+from app.core.config import OUTBOX_ENABLED, SCHEDULER_ENABLED
+from app.services.outbox_service import outbox_dispatcher
+from app.services.quota_service import quota_leases
+from app.services.scheduler_service import job_scheduler
+from app.services import pickup_job_service  # noqa: F401  registers the pickup job handlers
+from app.services import notification_service  # noqa: F401  registers the outbox subscribers
+from app.services.recurring_pickup_service import arm_recurring_pickups
+from app.services.subscription_job_service import arm_subscription_jobs
 import traceback
 
 app=FastAPI(
@@ -11,6 +19,35 @@ app=FastAPI(
 app.include_router(api_router,prefix="/api/v1") 
 
 
+@app.on_event("startup")
+def start_job_scheduler():
+    if SCHEDULER_ENABLED:
+        job_scheduler.start()
+        arm_recurring_pickups()
+        arm_subscription_jobs()
+
+
+@app.on_event("shutdown")
+def stop_job_scheduler():
+    job_scheduler.stop(timeout=5)
+
+
+@app.on_event("startup")
+def start_outbox_dispatcher():
+    if OUTBOX_ENABLED:
+        outbox_dispatcher.start()
+
+
+@app.on_event("shutdown")
+def stop_outbox_dispatcher():
+    outbox_dispatcher.stop(timeout=5)
+
+
+@app.on_event("shutdown")
+def release_quota_leases():
+    quota_leases.release_all()
+
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
@@ -4,10 +4,18 @@ from .role import Role, Permission
 from .role_mapping import UserRole, RolePermission
 from .organization import Organization, OrganizationCategory
 from .driver import Driver, DriverLocation, DriverAvailability
+from .vehicle import Vehicle, DriverVehicleMap
 from .subscription_plan import SubscriptionPlan
 from .subscription import Subscription
 from .subscription_usage import SubscriptionUsage
+from .subscription_usage_history import SubscriptionUsageHistory
+from .usage_event import UsageEvent
+from .location import Zone, Location
 from .pickup import Pickup
+from .recurring_pickup import RecurringPickup
 from .pickup_assignment import PickupAssignment
 from .pickup_media import PickupMedia
-from .audit_log import AuditLog
\ No newline at end of file
+from .audit_log import AuditLog
+from .scheduled_job import ScheduledJob
+from .quota_lease import QuotaLease
+from .outbox_event import OutboxEvent
\ No newline at end of file
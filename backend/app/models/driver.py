@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, Enum, Float, Integer, Boolean, ForeignKey
+from sqlalchemy import Column, String, DateTime, Enum, Float, Integer, Boolean, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -54,9 +54,14 @@ class DriverLocation(Base):
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
     accuracy = Column(Float, nullable=True)
+    zone_id = Column(Integer, ForeignKey("zones.id", ondelete="SET NULL"), nullable=True)
 
     recorded_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
 
+    __table_args__ = (
+        Index("ix_driver_locations_driver_recorded", "driver_id", "recorded_at"),
+    )
+
 
 class DriverAvailability(Base):
     __tablename__ = "driver_availability"
@@ -79,4 +84,19 @@ class DriverAvailability(Base):
 
     is_on_duty = Column(Boolean, default=False, nullable=False)
 
+    # Last known position, denormalised from driver_locations for dispatch
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geohash = Column(String(12), nullable=True)
+    location_updated_at = Column(DateTime(timezone=True), nullable=True)
+    zone_id = Column(Integer, ForeignKey("zones.id", ondelete="SET NULL"), nullable=True, index=True)
+
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_driver_availability_geohash",
+            "geohash",
+            postgresql_ops={"geohash": "varchar_pattern_ops"},
+        ),
+    )
@@ -1,9 +1,47 @@
-from .base import Base
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship
 
-class Zone(Base):
+from .base import Base, TimestampMixin
+
+
+class Zone(Base, TimestampMixin):
     __tablename__ = "zones"
-    pass
 
-class Location(Base):
+    id = Column(Integer, primary_key=True, index=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    name = Column(String(100), nullable=False)
+
+    # Outer ring as [[latitude, longitude], ...]; the bounding box is kept
+    # alongside so candidate zones can be found without parsing it
+    boundary = Column(JSONB, nullable=False)
+    min_latitude = Column(Float, nullable=False)
+    max_latitude = Column(Float, nullable=False)
+    min_longitude = Column(Float, nullable=False)
+    max_longitude = Column(Float, nullable=False)
+
+    is_active = Column(Boolean, default=True, nullable=False)
+
+    organization = relationship("Organization", backref="zones")
+
+    __table_args__ = (
+        UniqueConstraint("organization_id", "name", name="uq_zone_org_name"),
+    )
+
+
+class Location(Base, TimestampMixin):
+    "a fixed site such as a depot or transfer station, tagged with its zone"
     __tablename__ = "locations"
-    pass
+
+    id = Column(Integer, primary_key=True, index=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False, index=True)
+    zone_id = Column(Integer, ForeignKey("zones.id", ondelete="SET NULL"), nullable=True, index=True)
+
+    name = Column(String(255), nullable=False)
+    location_type = Column(String(50), nullable=True)
+    address = Column(String(500), nullable=True)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+
+    zone = relationship("Zone")
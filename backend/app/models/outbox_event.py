@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, Enum, Text, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.models.base import Base
+from app.utils.enums import OutboxStatus
+
+
+class OutboxEvent(Base):
+    """
+    Domain event written in the same transaction as the change it
+    describes, so it exists exactly when the change committed. The outbox
+    dispatcher hands it to in-process subscribers afterwards.
+    """
+    __tablename__ = "outbox_events"
+
+    id = Column(Integer, primary_key=True)
+    event_type = Column(String(100), nullable=False)
+
+    # what changed, e.g. ("pickup", 42)
+    aggregate_type = Column(String(50), nullable=False)
+    aggregate_id = Column(Integer, nullable=False)
+    organization_id = Column(Integer, nullable=True)
+    payload = Column(JSONB, nullable=True)
+
+    status = Column(Enum(OutboxStatus), default=OutboxStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    available_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    processed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # the dispatcher's claim query; delivered rows drop out of it
+        Index(
+            "ix_outbox_events_pending",
+            "available_at",
+            "id",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+        Index("ix_outbox_events_aggregate", "aggregate_type", "aggregate_id"),
+    )
@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, CheckConstraint
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, CheckConstraint, Index, text
 from sqlalchemy.orm import relationship
 from app.models.base import Base, TimestampMixin
 
@@ -17,6 +17,10 @@ class PickupStatus(str, enum.Enum):
     COMPLETED = "COMPLETED"
     CANCELLED = "CANCELLED"
 
+# Open pickups; dispatch screens filter on these far more than on history
+ACTIVE_STATUSES = (PickupStatus.PENDING, PickupStatus.ASSIGNED, PickupStatus.IN_PROGRESS)
+_ACTIVE_PREDICATE = text("status IN ('PENDING', 'ASSIGNED', 'IN_PROGRESS')")
+
 class Pickup(Base, TimestampMixin):
     __tablename__ = "pickups"
 
@@ -30,11 +34,17 @@ class Pickup(Base, TimestampMixin):
     address = Column(String(500), nullable=False)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
+    zone_id = Column(Integer, ForeignKey("zones.id", ondelete="SET NULL"), nullable=True)
     
     status = Column(Enum(PickupStatus), default=PickupStatus.PENDING, nullable=False, index=True)
     
     scheduled_at = Column(DateTime, nullable=True, index=True)
     completed_at = Column(DateTime, nullable=True)
+    # Set by the scheduler when a pickup is still open well past scheduled_at
+    overdue_at = Column(DateTime, nullable=True)
+
+    # the recurring pickup this is an occurrence of
+    recurring_pickup_id = Column(Integer, ForeignKey("recurring_pickups.id", ondelete="SET NULL"), nullable=True)
 
     # Relationships
     organization = relationship("Organization", backref="pickups")
@@ -44,4 +54,22 @@ class Pickup(Base, TimestampMixin):
 
     __table_args__ = (
         CheckConstraint("waste_weight >= 0", name="check_waste_weight_non_negative"),
+        Index("ix_pickups_org_zone_status", "organization_id", "zone_id", "status"),
+        # keyset pagination: (sort column, id) with and without the org prefix
+        Index("ix_pickups_org_created_id", "organization_id", "created_at", "id"),
+        Index("ix_pickups_org_scheduled_id", "organization_id", "scheduled_at", "id"),
+        Index("ix_pickups_created_id", "created_at", "id"),
+        Index("ix_pickups_scheduled_id", "scheduled_at", "id"),
+        # list filters
+        Index("ix_pickups_org_status_created", "organization_id", "status", "created_at", "id"),
+        Index(
+            "ix_pickups_org_active_status_scheduled",
+            "organization_id", "status", "scheduled_at",
+            postgresql_where=_ACTIVE_PREDICATE,
+            sqlite_where=_ACTIVE_PREDICATE,
+        ),
+        Index("ix_pickups_org_waste_created", "organization_id", "waste_type", "created_at"),
+        Index("ix_pickups_org_lat_lng", "organization_id", "latitude", "longitude"),
+        # one pickup per occurrence of a recurring pickup
+        Index("uq_pickups_recurring_occurrence", "recurring_pickup_id", "scheduled_at", unique=True),
     )
@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, Integer, ForeignKey, Enum, UniqueConstraint, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, Enum, UniqueConstraint, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.models.base import Base, TimestampMixin
 from datetime import datetime
@@ -25,4 +25,6 @@ class PickupAssignment(Base, TimestampMixin):
     
     __table_args__ = (
         UniqueConstraint("pickup_id", "status", name="uq_active_assignment_per_pickup"),
+        # driver pickup lists resolve their EXISTS from this index alone
+        Index("ix_pickup_assignments_driver_status_pickup", "driver_id", "status", "pickup_id"),
     )
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
+
+from app.models.base import Base, TimestampMixin
+
+
+class QuotaLease(Base, TimestampMixin):
+    """
+    Block of pickup and weight allowance a worker took off a subscription's
+    usage row. The usage row already counts the whole block; pickups the
+    holder creates draw the remaining figures down, and whatever is left
+    goes back to the usage row when the lease is released or found expired.
+    """
+    __tablename__ = "quota_leases"
+
+    id = Column(Integer, primary_key=True, index=True)
+    subscription_id = Column(Integer, ForeignKey("subscriptions.id", ondelete="CASCADE"), nullable=False)
+
+    # host:pid of the worker serving from the block
+    holder = Column(String(100), nullable=False)
+
+    pickups_remaining = Column(Integer, nullable=False)
+    weight_remaining = Column(Float, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_quota_leases_subscription_expires", "subscription_id", "expires_at"),
+    )
@@ -0,0 +1,54 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Time, Boolean, Enum, ForeignKey, CheckConstraint, Index, text
+
+from app.models.base import Base, TimestampMixin
+from app.models.pickup import WasteType
+from app.utils.enums import RecurrenceFrequency
+
+
+class RecurringPickup(Base, TimestampMixin):
+    """
+    A pickup an organization wants on a repeating schedule. Its
+    occurrences only exist as Pickup rows up to a rolling horizon; the
+    recurring pickup job adds the next ones as the horizon moves.
+    """
+    __tablename__ = "recurring_pickups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # template for every occurrence
+    waste_type = Column(Enum(WasteType), nullable=False)
+    waste_weight = Column(Float, nullable=False)
+    address = Column(String(500), nullable=False)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+
+    # RRULE-style FREQ, INTERVAL and BYDAY ("MO,TH", weekly rules only),
+    # starting on starts_on at time_of_day (UTC) and ending after ends_on;
+    # monthly rules repeat on starts_on's day of the month
+    frequency = Column(Enum(RecurrenceFrequency), nullable=False)
+    repeat_interval = Column(Integer, default=1, nullable=False)
+    by_weekday = Column(String(27), nullable=True)
+    time_of_day = Column(Time, nullable=False)
+    starts_on = Column(Date, nullable=False)
+    ends_on = Column(Date, nullable=True)
+
+    is_active = Column(Boolean, default=True, nullable=False)
+
+    # every occurrence up to here exists as a pickup
+    materialized_until = Column(DateTime, nullable=True)
+    # why the last run added nothing, e.g. the plan's limit was reached
+    paused_reason = Column(String(200), nullable=True)
+
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+    __table_args__ = (
+        CheckConstraint("waste_weight > 0", name="check_recurring_waste_weight_positive"),
+        CheckConstraint("repeat_interval >= 1", name="check_recurring_interval_positive"),
+        # the scheduled run's scan for rules whose horizon has moved on
+        Index(
+            "ix_recurring_pickups_active_materialized",
+            "materialized_until", "id",
+            postgresql_where=text("is_active"),
+        ),
+    )
@@ -0,0 +1,45 @@
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Text, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.models.base import Base, TimestampMixin
+from app.utils.enums import ScheduledJobStatus
+
+
+class ScheduledJob(Base, TimestampMixin):
+    """
+    Durable queue behind the in-process job scheduler. A row is the source
+    of truth for one deferred action; the timing wheel only decides when
+    this process next looks at it.
+    """
+    __tablename__ = "scheduled_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String(50), nullable=False)
+
+    # At most one PENDING job per key, e.g. "pickup:42:remind_driver", so
+    # re-scheduling an entity moves its jobs instead of adding more
+    dedupe_key = Column(String(200), nullable=True)
+
+    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), nullable=True, index=True)
+    entity_type = Column(String(50), nullable=True)
+    entity_id = Column(Integer, nullable=True)
+    payload = Column(JSONB, nullable=True)
+
+    run_at = Column(DateTime, nullable=False)
+    status = Column(Enum(ScheduledJobStatus), default=ScheduledJobStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+    __table_args__ = (
+        Index("ix_scheduled_jobs_status_run_at", "status", "run_at"),
+        Index("ix_scheduled_jobs_entity", "entity_type", "entity_id"),
+        Index(
+            "uq_scheduled_jobs_pending_dedupe_key",
+            "dedupe_key",
+            unique=True,
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+    )
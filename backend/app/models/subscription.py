@@ -33,6 +33,8 @@ class Subscription(Base, TimestampMixin):
 
     __table_args__ = (
         Index('ix_subscriptions_org_status', 'organization_id', 'status'),
+        # the sweeper's scan for lapsed ACTIVE subscriptions
+        Index('ix_subscriptions_status_end_date', 'status', 'end_date'),
         # Note: partial unique index for ACTIVE subscriptions would be ideal, but Alembic handling varies.
         # UniqueConstraint is added to schema, but logic will also enforce unique ACTIVE per organization.
     )
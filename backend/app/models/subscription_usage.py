@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.models.base import Base
@@ -17,3 +17,8 @@ class SubscriptionUsage(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     subscription = relationship("Subscription", back_populates="usage")
+
+    __table_args__ = (
+        # the usage reset's scan for rows whose cycle has ended
+        Index("ix_subscription_usage_last_reset_at", "last_reset_at"),
+    )
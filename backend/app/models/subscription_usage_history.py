@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, Index, UniqueConstraint
+
+from app.models.base import Base
+
+
+class SubscriptionUsageHistory(Base):
+    """
+    What a subscription used during one closed usage cycle, written when
+    its SubscriptionUsage row is reset for the next cycle.
+    """
+    __tablename__ = "subscription_usage_history"
+
+    id = Column(Integer, primary_key=True, index=True)
+    subscription_id = Column(Integer, ForeignKey("subscriptions.id", ondelete="CASCADE"), nullable=False)
+    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False)
+
+    period_start = Column(DateTime, nullable=False)
+    period_end = Column(DateTime, nullable=False)
+
+    pickups_used = Column(Integer, nullable=False)
+    waste_weight_used = Column(Float, nullable=False)
+    # drivers are a standing count rather than a per-cycle allowance
+    drivers_used = Column(Integer, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("subscription_id", "period_start", name="uq_usage_history_subscription_period"),
+        Index("ix_usage_history_org_period", "organization_id", "period_start"),
+    )
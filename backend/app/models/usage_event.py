@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, Float, Boolean, DateTime, Enum, ForeignKey, Index, text
+
+from app.models.base import Base
+from app.utils.enums import UsageEventType
+
+
+class UsageEvent(Base):
+    """
+    Append-only record of one change to a subscription's usage, e.g. +1
+    pickup and +12 kg when a pickup is created. Entries are never edited
+    apart from `folded`, which is set once the change is part of the
+    SubscriptionUsage totals.
+    """
+    __tablename__ = "usage_events"
+
+    id = Column(Integer, primary_key=True)
+    subscription_id = Column(Integer, ForeignKey("subscriptions.id", ondelete="CASCADE"), nullable=False)
+    organization_id = Column(Integer, nullable=False)
+    # kept without a foreign key so the history outlives deleted pickups
+    pickup_id = Column(Integer, nullable=True)
+
+    event_type = Column(Enum(UsageEventType), nullable=False)
+    delta_pickups = Column(Integer, default=0, nullable=False)
+    delta_weight = Column(Float, default=0.0, nullable=False)
+    delta_drivers = Column(Integer, default=0, nullable=False)
+
+    folded = Column(Boolean, default=False, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # quota checks add up a subscription's unfolded entries
+        Index("ix_usage_events_unfolded", "subscription_id", "id", postgresql_where=text("NOT folded")),
+        Index("ix_usage_events_subscription_created", "subscription_id", "created_at"),
+        Index("ix_usage_events_pickup_id", "pickup_id"),
+    )
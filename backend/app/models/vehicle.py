@@ -1,9 +1,86 @@
+import uuid
+from sqlalchemy import Column, String, DateTime, Enum, Float, Integer, Boolean, ForeignKey, Index, CheckConstraint, UniqueConstraint, text
+from sqlalchemy.sql import func
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+from app.utils.enums import VehicleStatus
 from .base import Base
 
+
 class Vehicle(Base):
     __tablename__ = "vehicles"
-    pass
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    organization_id = Column(
+        Integer,
+        ForeignKey("organizations.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    registration_number = Column(String(50), nullable=False)
+    vehicle_type = Column(String(50), nullable=True)
+
+    # Total payload, plus optional per-waste-type limits ({"HAZARDOUS": 200.0}).
+    # Waste types without an entry are bounded by capacity_kg alone.
+    capacity_kg = Column(Float, nullable=False)
+    waste_type_capacity_kg = Column(JSONB, nullable=True)
+
+    status = Column(
+        Enum(VehicleStatus),
+        nullable=False,
+        default=VehicleStatus.ACTIVE,
+        index=True,
+    )
+
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    updated_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("organization_id", "registration_number", name="uq_vehicle_org_registration"),
+        CheckConstraint("capacity_kg > 0", name="check_vehicle_capacity_positive"),
+    )
+
 
 class DriverVehicleMap(Base):
     __tablename__ = "driver_vehicle_map"
-    pass
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    driver_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("drivers.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    vehicle_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("vehicles.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    is_active = Column(Boolean, nullable=False, default=True)
+
+    assigned_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    assigned_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    released_at = Column(DateTime(timezone=True), nullable=True)
+
+    # a driver drives one vehicle and a vehicle has one driver at a time
+    __table_args__ = (
+        Index(
+            "uq_driver_vehicle_map_active_driver",
+            "driver_id",
+            unique=True,
+            postgresql_where=text("is_active"),
+        ),
+        Index(
+            "uq_driver_vehicle_map_active_vehicle",
+            "vehicle_id",
+            unique=True,
+            postgresql_where=text("is_active"),
+        ),
+    )
@@ -4,8 +4,8 @@ from typing import List
 
 
 from app.models.driver import Driver
-from app.models.pickup import Pickup
-from app.models.pickup_assignment import PickupAssignment
+from app.models.pickup import Pickup, PickupStatus
+from app.models.pickup_assignment import PickupAssignment, AssignmentStatus
 
 
 class DriverAnalyticsRepository:
@@ -67,3 +67,27 @@ class DriverAnalyticsRepository:
         )
 
         return self.db.execute(stmt).first()
+
+
+    def get_open_stops(
+        self,
+        organization_id: int,
+        ):
+        "(driver user id, latitude, longitude, waste_weight) of every open assigned pickup"
+
+        stmt = (
+            select(
+                PickupAssignment.driver_id,
+                Pickup.latitude,
+                Pickup.longitude,
+                Pickup.waste_weight,
+            )
+            .join(Pickup, Pickup.id == PickupAssignment.pickup_id)
+            .where(
+                Pickup.organization_id == organization_id,
+                PickupAssignment.status.in_([AssignmentStatus.ASSIGNED, AssignmentStatus.ACCEPTED]),
+                Pickup.status.in_([PickupStatus.ASSIGNED, PickupStatus.IN_PROGRESS]),
+            )
+            .order_by(PickupAssignment.driver_id)
+        )
+        return self.db.execute(stmt).all()
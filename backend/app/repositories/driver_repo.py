@@ -1,13 +1,31 @@
-from typing import Optional, List
+from datetime import datetime
+from typing import Optional, List, Iterator
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import select, update, or_, func
 from sqlalchemy.orm import Session
 
 from app.models.driver import Driver, DriverLocation, DriverAvailability
+from app.models.user import User
 from app.utils.enums import DriverStatus, DriverAvailabilityStatus
 
 
+DRIVER_LIST_COLUMNS = (
+    Driver.id,
+    Driver.organization_id,
+    Driver.name,
+    Driver.mobile,
+    Driver.email,
+    Driver.license_number,
+    Driver.license_expiry,
+    Driver.status,
+    Driver.created_by,
+    Driver.updated_by,
+    Driver.created_at,
+    Driver.updated_at,
+)
+
+
 class DriverRepository:
 
     def __init__(self, db: Session):
@@ -45,10 +63,10 @@ class DriverRepository:
         organization_id: UUID,
         skip: int = 0,
         limit: int = 50,
-    ) -> List[Driver]:
-
+    ) -> list:
+        "DriverResponse fields as plain rows, without loading Driver objects"
         stmt = (
-            select(Driver)
+            select(*DRIVER_LIST_COLUMNS)
             .where(
                 Driver.organization_id == organization_id,
                 Driver.status != DriverStatus.DELETED,
@@ -56,7 +74,7 @@ class DriverRepository:
             .offset(skip)
             .limit(limit)
         )
-        return list(self.db.scalars(stmt).all())
+        return list(self.db.execute(stmt).all())
 
     def create_driver(self, driver: Driver) -> Driver:
         self.db.add(driver)
@@ -172,6 +190,139 @@ class DriverRepository:
         self.db.flush()
         return availability
 
+    def update_availability_position(
+        self,
+        driver_id: UUID,
+        latitude: float,
+        longitude: float,
+        geohash: str,
+        zone_id: Optional[int] = None,
+    ):
+        "stores the last known position and returns (status, is_on_duty), or None without an availability row"
+
+        stmt = (
+            update(DriverAvailability)
+            .where(DriverAvailability.driver_id == driver_id)
+            .values(
+                latitude=latitude,
+                longitude=longitude,
+                geohash=geohash,
+                zone_id=zone_id,
+                location_updated_at=func.now(),
+            )
+            .returning(DriverAvailability.status, DriverAvailability.is_on_duty)
+        )
+        return self.db.execute(stmt).first()
+
+    def get_available_driver_positions(
+        self,
+        organization_id: int,
+        geohash_prefixes: List[str],
+        updated_since: datetime,
+    ) -> list:
+        """
+        (driver_id, latitude, longitude, location_updated_at) of on-duty
+        available drivers inside the given geohash cells whose position was
+        reported at or after updated_since
+        """
+
+        stmt = (
+            select(
+                Driver.id,
+                DriverAvailability.latitude,
+                DriverAvailability.longitude,
+                DriverAvailability.location_updated_at,
+            )
+            .join(
+                DriverAvailability,
+                DriverAvailability.driver_id == Driver.id,
+            )
+            .where(
+                Driver.organization_id == organization_id,
+                Driver.status == DriverStatus.ACTIVE,
+                DriverAvailability.status == DriverAvailabilityStatus.AVAILABLE,
+                DriverAvailability.is_on_duty == True,
+                DriverAvailability.location_updated_at >= updated_since,
+                or_(*[
+                    DriverAvailability.geohash.like(prefix + "%")
+                    for prefix in geohash_prefixes
+                ]),
+            )
+        )
+        return self.db.execute(stmt).all()
+
+    def get_dispatchable_drivers(
+        self,
+        organization_id: int,
+        zone_id: Optional[int] = None,
+    ) -> list:
+        """
+        (driver_id, user_id, latitude, longitude) of on-duty available
+        drivers with a known position, optionally only those currently in
+        a zone. Pickup assignments reference the driver's user account,
+        which is matched on the mobile number.
+        """
+
+        stmt = (
+            select(
+                Driver.id,
+                User.id,
+                DriverAvailability.latitude,
+                DriverAvailability.longitude,
+            )
+            .join(
+                DriverAvailability,
+                DriverAvailability.driver_id == Driver.id,
+            )
+            .join(User, User.mobile == Driver.mobile)
+            .where(
+                Driver.organization_id == organization_id,
+                Driver.status == DriverStatus.ACTIVE,
+                DriverAvailability.status == DriverAvailabilityStatus.AVAILABLE,
+                DriverAvailability.is_on_duty == True,
+                DriverAvailability.latitude.isnot(None),
+                User.is_active == True,
+            )
+        )
+        if zone_id is not None:
+            stmt = stmt.where(DriverAvailability.zone_id == zone_id)
+        return self.db.execute(stmt).all()
+
+    def get_position_by_user(
+        self,
+        user_id: int,
+    ) -> Optional[tuple]:
+        "last known (latitude, longitude) of the driver behind a user account"
+
+        positions = self.get_positions_by_users([user_id])
+        return positions.get(user_id)
+
+    def get_positions_by_users(
+        self,
+        user_ids: List[int],
+    ) -> dict:
+        "user id -> last known (latitude, longitude) of the driver behind it"
+
+        if not user_ids:
+            return {}
+
+        stmt = (
+            select(User.id, DriverAvailability.latitude, DriverAvailability.longitude)
+            .join(Driver, Driver.mobile == User.mobile)
+            .join(DriverAvailability, DriverAvailability.driver_id == Driver.id)
+            .where(
+                User.id.in_(user_ids),
+                Driver.status != DriverStatus.DELETED,
+                DriverAvailability.latitude.isnot(None),
+            )
+            .order_by(User.id, DriverAvailability.location_updated_at.desc().nullslast())
+            .distinct(User.id)
+        )
+        return {
+            user_id: (latitude, longitude)
+            for user_id, latitude, longitude in self.db.execute(stmt).all()
+        }
+
     
 
     def create_driver_location(
@@ -196,6 +347,31 @@ class DriverRepository:
         )
         return self.db.scalar(stmt)
 
+    def iter_driver_locations(
+        self,
+        driver_id: UUID,
+        start: datetime,
+        end: datetime,
+        batch_size: int = 5000,
+    ) -> Iterator[list]:
+        "yields (latitude, longitude, recorded_at) rows in batches from a server-side cursor"
+
+        stmt = (
+            select(
+                DriverLocation.latitude,
+                DriverLocation.longitude,
+                DriverLocation.recorded_at,
+            )
+            .where(
+                DriverLocation.driver_id == driver_id,
+                DriverLocation.recorded_at >= start,
+                DriverLocation.recorded_at <= end,
+            )
+            .order_by(DriverLocation.recorded_at)
+            .execution_options(stream_results=True, yield_per=batch_size)
+        )
+        yield from self.db.execute(stmt).partitions()
+
     
 
     def get_drivers_by_ids(
@@ -0,0 +1,58 @@
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.models.outbox_event import OutboxEvent
+from app.utils.enums import OutboxStatus
+
+
+class OutboxRepository:
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add_events(self, events: List[dict]):
+        "queues events in the caller's unit of work; they are written with its commit"
+        now = datetime.utcnow()
+        self.db.add_all([
+            OutboxEvent(
+                status=OutboxStatus.PENDING,
+                attempts=0,
+                available_at=now,
+                created_at=now,
+                **event,
+            )
+            for event in events
+        ])
+
+    def claim_batch(self, limit: int, now: datetime) -> List[OutboxEvent]:
+        """
+        Oldest deliverable events, locked until the caller's transaction
+        ends. SKIP LOCKED lets every worker's dispatcher take a different
+        batch instead of queueing behind one another.
+        """
+        stmt = (
+            select(OutboxEvent)
+            .where(
+                OutboxEvent.status == OutboxStatus.PENDING,
+                OutboxEvent.available_at <= now,
+            )
+            .order_by(OutboxEvent.available_at, OutboxEvent.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return list(self.db.execute(stmt).scalars())
+
+    def purge_processed(self, processed_before: datetime) -> int:
+        "drops delivered events once they are past retention"
+        result = self.db.execute(
+            delete(OutboxEvent)
+            .where(
+                OutboxEvent.status == OutboxStatus.DONE,
+                OutboxEvent.processed_at < processed_before,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
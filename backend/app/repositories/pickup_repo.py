@@ -1,7 +1,46 @@
-from sqlalchemy.orm import Session, joinedload
-from app.models.pickup import Pickup, PickupStatus
+from sqlalchemy import select, insert, update, delete, exists, func, and_, or_, tuple_, bindparam
+from sqlalchemy.orm import Session, aliased, joinedload
+from app.models.pickup import ACTIVE_STATUSES, Pickup, PickupStatus, WasteType
 from app.models.pickup_assignment import PickupAssignment, AssignmentStatus
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
+
+
+@dataclass
+class PickupFilter:
+    "optional, ANDed pickup list filters"
+    statuses: Optional[list[PickupStatus]] = None
+    waste_types: Optional[list[WasteType]] = None
+    scheduled_from: Optional[datetime] = None
+    scheduled_to: Optional[datetime] = None
+    zone_id: Optional[int] = None
+    # (min_latitude, min_longitude, max_latitude, max_longitude)
+    bbox: Optional[tuple[float, float, float, float]] = None
+    driver_id: Optional[int] = None
+
+
+# what list pages select: the PickupResponse fields, as plain rows that
+# never enter the session
+PICKUP_LIST_COLUMNS = (
+    Pickup.id,
+    Pickup.organization_id,
+    Pickup.subscription_id,
+    Pickup.recurring_pickup_id,
+    Pickup.waste_type,
+    Pickup.waste_weight,
+    Pickup.address,
+    Pickup.latitude,
+    Pickup.longitude,
+    Pickup.zone_id,
+    Pickup.status,
+    Pickup.scheduled_at,
+    Pickup.completed_at,
+    Pickup.overdue_at,
+    Pickup.created_at,
+    Pickup.updated_at,
+)
+
 
 class PickupRepository:
     
@@ -12,6 +51,67 @@ class PickupRepository:
         db.flush()
         return pickup
         
+    @staticmethod
+    def insert_pickup(db: Session, values: dict):
+        """
+        Inserts one pickup with INSERT ... RETURNING and returns the stored
+        row (every column, including server defaults) without loading it
+        into the session. The caller owns the transaction.
+        """
+        now = datetime.utcnow()
+        stmt = (
+            insert(Pickup)
+            .values(created_at=now, updated_at=now, **values)
+            .returning(*Pickup.__table__.columns)
+        )
+        return db.execute(stmt).one()
+
+    @staticmethod
+    def bulk_create_pickups(db: Session, rows: list[dict]) -> list[int]:
+        """
+        Inserts many pickups with multi-row INSERT ... RETURNING and gives
+        back their ids in input order. The caller owns the transaction.
+        """
+        if not rows:
+            return []
+        now = datetime.utcnow()
+        stmt = insert(Pickup).returning(Pickup.id, sort_by_parameter_order=True)
+        result = db.execute(stmt, [{"created_at": now, "updated_at": now, **row} for row in rows])
+        return list(result.scalars())
+
+    @staticmethod
+    def get_recurring_occurrences(db: Session, rule_ids: list[int], after: datetime) -> set:
+        "(recurring_pickup_id, scheduled_at) of the rules' pickups scheduled after `after`, in any status"
+        if not rule_ids:
+            return set()
+        rows = db.execute(
+            select(Pickup.recurring_pickup_id, Pickup.scheduled_at).where(
+                Pickup.recurring_pickup_id.in_(rule_ids),
+                Pickup.scheduled_at > after,
+            )
+        ).all()
+        return {tuple(row) for row in rows}
+
+    @staticmethod
+    def delete_unassigned_occurrences(db: Session, rule_id: int, after: datetime) -> list:
+        """
+        Deletes a recurring pickup's occurrences scheduled after `after`
+        that are still PENDING with no driver on them, and returns their
+        (id, subscription_id, waste_weight). The caller owns the transaction.
+        """
+        stmt = (
+            delete(Pickup)
+            .where(
+                Pickup.recurring_pickup_id == rule_id,
+                Pickup.scheduled_at > after,
+                Pickup.status == PickupStatus.PENDING,
+                ~exists().where(PickupAssignment.pickup_id == Pickup.id),
+            )
+            .returning(Pickup.id, Pickup.subscription_id, Pickup.waste_weight)
+            .execution_options(synchronize_session=False)
+        )
+        return db.execute(stmt).all()
+
     @staticmethod
     def get_pickup_by_id(db: Session, pickup_id: int) -> Pickup:
         return db.query(Pickup).options(
@@ -19,41 +119,166 @@ class PickupRepository:
         ).filter(Pickup.id == pickup_id).first()
 
     @staticmethod
-    def list_org_pickups(db: Session, organization_id: int, status: PickupStatus = None) -> list[Pickup]:
-        query = db.query(Pickup).options(
-            joinedload(Pickup.assignments)
-        ).filter(Pickup.organization_id == organization_id)
-        if status:
-            query = query.filter(Pickup.status == status)
-        return query.order_by(Pickup.created_at.desc()).all()
+    def list_org_pickups(
+        db: Session,
+        organization_id: int,
+        filters: "PickupFilter" = None,
+        sort: str = "created_at",
+        after: tuple = None,
+        limit: int = 50,
+        with_total: bool = False,
+    ) -> tuple[list, int | None]:
+        query = db.query(*PICKUP_LIST_COLUMNS).filter(Pickup.organization_id == organization_id)
+        query = PickupRepository._filter(query, filters)
+        return PickupRepository._page(query, sort, after, limit, with_total)
 
     @staticmethod
-    def list_driver_pickups(db: Session, driver_id: int, status: AssignmentStatus = None) -> list[Pickup]:
-        query = db.query(Pickup).join(PickupAssignment).options(
-            joinedload(Pickup.assignments)
-        ).filter(PickupAssignment.driver_id == driver_id)
+    def list_driver_pickups(
+        db: Session,
+        driver_id: int,
+        status: AssignmentStatus = None,
+        filters: "PickupFilter" = None,
+        sort: str = "scheduled_at",
+        after: tuple = None,
+        limit: int = 50,
+        with_total: bool = False,
+    ) -> tuple[list, int | None]:
+        # EXISTS rather than a join, so a pickup reassigned to the same
+        # driver still appears once per page
+        criteria = [PickupAssignment.driver_id == driver_id]
         if status:
-            query = query.filter(PickupAssignment.status == status)
-        return query.order_by(Pickup.scheduled_at.desc(), Pickup.created_at.desc()).all()
+            criteria.append(PickupAssignment.status == status)
+        query = db.query(*PICKUP_LIST_COLUMNS).filter(Pickup.assignments.any(and_(*criteria)))
+        query = PickupRepository._filter(query, filters)
+        return PickupRepository._page(query, sort, after, limit, with_total)
 
     @staticmethod
-    def list_all_pickups(db: Session, status: PickupStatus = None) -> list[Pickup]:
-        query = db.query(Pickup).options(
-            joinedload(Pickup.assignments)
+    def list_all_pickups(
+        db: Session,
+        filters: "PickupFilter" = None,
+        sort: str = "created_at",
+        after: tuple = None,
+        limit: int = 50,
+        with_total: bool = False,
+    ) -> tuple[list, int | None]:
+        query = PickupRepository._filter(db.query(*PICKUP_LIST_COLUMNS), filters)
+        return PickupRepository._page(query, sort, after, limit, with_total)
+
+    @staticmethod
+    def _filter(query, filters: "PickupFilter"):
+        """
+        Compiles a PickupFilter to WHERE clauses. Each filter has a
+        composite index led by organization_id behind it; the partial
+        active-status index serves status sets drawn from ACTIVE_STATUSES.
+        """
+        if filters is None:
+            return query
+        if filters.statuses:
+            query = query.filter(Pickup.status.in_(filters.statuses))
+            if set(filters.statuses) <= set(ACTIVE_STATUSES):
+                # restates the partial index's predicate with literal values:
+                # neither planner proves a bound IN list implies it
+                query = query.filter(Pickup.status.in_(
+                    bindparam("active_statuses", list(ACTIVE_STATUSES), expanding=True, literal_execute=True)
+                ))
+        if filters.waste_types:
+            query = query.filter(Pickup.waste_type.in_(filters.waste_types))
+        if filters.scheduled_from is not None:
+            query = query.filter(Pickup.scheduled_at >= filters.scheduled_from)
+        if filters.scheduled_to is not None:
+            query = query.filter(Pickup.scheduled_at < filters.scheduled_to)
+        if filters.zone_id is not None:
+            query = query.filter(Pickup.zone_id == filters.zone_id)
+        if filters.bbox is not None:
+            min_lat, min_lng, max_lat, max_lng = filters.bbox
+            query = query.filter(
+                Pickup.latitude.between(min_lat, max_lat),
+                Pickup.longitude.between(min_lng, max_lng),
+            )
+        if filters.driver_id is not None:
+            query = query.filter(Pickup.assignments.any(and_(
+                PickupAssignment.driver_id == filters.driver_id,
+                PickupAssignment.status != AssignmentStatus.REJECTED,
+            )))
+        return query
+
+    @staticmethod
+    def _page(query, sort: str, after: tuple, limit: int, with_total: bool) -> tuple[list, int | None]:
+        """
+        Keyset page of up to limit + 1 rows (the extra one tells the caller
+        another page exists) after the (sort value, id) key `after`.
+        Newest first by created_at, or latest scheduled_at first with
+        unscheduled pickups last. Each page is a range scan on the
+        matching (..., sort column, id) index, whatever its depth.
+        Rows are PICKUP_LIST_COLUMNS tuples.
+        """
+        total = query.order_by(None).count() if with_total else None
+
+        if sort == "created_at":
+            if after is not None:
+                query = query.filter(tuple_(Pickup.created_at, Pickup.id) < tuple_(*after))
+            rows = query.order_by(Pickup.created_at.desc(), Pickup.id.desc()).limit(limit + 1).all()
+            return rows, total
+
+        if sort != "scheduled_at":
+            raise ValueError(f"Unsupported sort: {sort}")
+
+        rows = []
+        if after is None or after[0] is not None:
+            # scheduled pickups; the row comparison excludes NULLs by itself
+            scheduled = query.filter(Pickup.scheduled_at.isnot(None))
+            if after is not None:
+                scheduled = scheduled.filter(tuple_(Pickup.scheduled_at, Pickup.id) < tuple_(*after))
+            rows = scheduled.order_by(Pickup.scheduled_at.desc(), Pickup.id.desc()).limit(limit + 1).all()
+
+        if len(rows) <= limit:
+            unscheduled = query.filter(Pickup.scheduled_at.is_(None))
+            if after is not None and after[0] is None:
+                unscheduled = unscheduled.filter(Pickup.id < after[1])
+            rows += unscheduled.order_by(Pickup.id.desc()).limit(limit + 1 - len(rows)).all()
+
+        return rows, total
+
+    @staticmethod
+    def transition_status(
+        db: Session,
+        pickup_id: int,
+        sources,
+        target: PickupStatus,
+        values: dict = None,
+        driver_id: int = None,
+    ):
+        """
+        Moves a pickup to `target` in one conditional UPDATE ... RETURNING
+        that only matches while its status is one of `sources` (and, with
+        driver_id, while that driver holds an assignment on it). Returns the
+        updated row, or None when nothing matched.
+        """
+        stmt = update(Pickup).where(Pickup.id == pickup_id, Pickup.status.in_(list(sources)))
+        if driver_id is not None:
+            stmt = stmt.where(
+                exists().where(
+                    PickupAssignment.pickup_id == Pickup.id,
+                    PickupAssignment.driver_id == driver_id,
+                )
+            )
+        stmt = (
+            stmt.values(status=target, updated_at=datetime.utcnow(), **(values or {}))
+            .returning(*Pickup.__table__.columns)
+            .execution_options(synchronize_session=False)
         )
-        if status:
-            query = query.filter(Pickup.status == status)
-        return query.order_by(Pickup.created_at.desc()).all()
+        return db.execute(stmt).first()
 
     @staticmethod
-    def update_pickup_status(db: Session, pickup_id: int, status: PickupStatus) -> Pickup:
-        pickup = db.query(Pickup).filter(Pickup.id == pickup_id).first()
-        if pickup:
-            pickup.status = status
-            if status == PickupStatus.COMPLETED:
-                pickup.completed_at = datetime.utcnow()
-            db.flush()
-        return pickup
+    def get_status_and_assignment(db: Session, pickup_id: int, driver_id: int = None):
+        "(status, whether driver_id is assigned) of a pickup, or None when it does not exist"
+        assigned = exists().where(
+            PickupAssignment.pickup_id == Pickup.id,
+            PickupAssignment.driver_id == driver_id,
+        )
+        return db.execute(
+            select(Pickup.status, assigned).where(Pickup.id == pickup_id)
+        ).first()
 
     @staticmethod
     def assign_driver(db: Session, pickup_id: int, driver_id: int) -> PickupAssignment:
@@ -74,28 +299,240 @@ class PickupRepository:
 
     @staticmethod
     def remove_assignment(db: Session, pickup_id: int, driver_id: int):
-        assignment = db.query(PickupAssignment).filter(
-            PickupAssignment.pickup_id == pickup_id,
-            PickupAssignment.driver_id == driver_id
-        ).first()
-        if assignment:
-            db.delete(assignment)
-            db.flush()
+        db.execute(
+            delete(PickupAssignment)
+            .where(
+                PickupAssignment.pickup_id == pickup_id,
+                PickupAssignment.driver_id == driver_id,
+            )
+            .execution_options(synchronize_session=False)
+        )
 
     @staticmethod
     def update_schedule(db: Session, pickup_id: int, scheduled_at: datetime) -> Pickup:
         pickup = db.query(Pickup).filter(Pickup.id == pickup_id).first()
         if pickup:
             pickup.scheduled_at = scheduled_at
+            pickup.overdue_at = None
             db.flush()
         return pickup
 
     @staticmethod
-    def update_completion(db: Session, pickup_id: int, actual_weight: float) -> Pickup:
-        pickup = db.query(Pickup).filter(Pickup.id == pickup_id).first()
-        if pickup:
-            pickup.status = PickupStatus.COMPLETED
-            pickup.completed_at = datetime.utcnow()
-            pickup.waste_weight = actual_weight
-            db.flush()
-        return pickup
+    def mark_overdue(db: Session, pickup_id: int, open_statuses: list[PickupStatus]) -> bool:
+        "flags a still-open pickup as overdue; False when it was closed or already flagged"
+        now = datetime.utcnow()
+        result = db.execute(
+            update(Pickup)
+            .where(
+                Pickup.id == pickup_id,
+                Pickup.status.in_(open_statuses),
+                Pickup.overdue_at.is_(None),
+            )
+            .values(overdue_at=now, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    @staticmethod
+    def lock_pending_pickups(db: Session, organization_id: int, limit: int = 1000, zone_id: int = None, pickup_ids: list[int] = None) -> list:
+        """
+        (id, latitude, longitude, waste_weight, waste_type) of PENDING
+        pickups, oldest schedule first, optionally within one zone or
+        among the given ids. Rows are locked with SKIP LOCKED so concurrent
+        dispatch runs never pick the same pickup.
+        """
+        stmt = (
+            select(Pickup.id, Pickup.latitude, Pickup.longitude, Pickup.waste_weight, Pickup.waste_type)
+            .where(
+                Pickup.organization_id == organization_id,
+                Pickup.status == PickupStatus.PENDING,
+            )
+            .order_by(Pickup.scheduled_at.asc().nullslast(), Pickup.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        if zone_id is not None:
+            stmt = stmt.where(Pickup.zone_id == zone_id)
+        if pickup_ids is not None:
+            stmt = stmt.where(Pickup.id.in_(pickup_ids))
+        return db.execute(stmt).all()
+
+    @staticmethod
+    def get_pending_positions(
+        db: Session,
+        organization_id: int,
+        scheduled_from: datetime = None,
+        scheduled_to: datetime = None,
+        zone_id: int = None,
+        limit: int = 50000,
+    ) -> list:
+        """
+        (id, latitude, longitude, waste_weight, scheduled_at) of PENDING
+        pickups for planning. Read-only and unlocked; with a schedule window
+        unscheduled pickups are left out.
+        """
+        stmt = (
+            select(Pickup.id, Pickup.latitude, Pickup.longitude, Pickup.waste_weight, Pickup.scheduled_at)
+            .where(
+                Pickup.organization_id == organization_id,
+                Pickup.status == PickupStatus.PENDING,
+            )
+            .order_by(Pickup.id)
+            .limit(limit)
+        )
+        if scheduled_from is not None:
+            stmt = stmt.where(Pickup.scheduled_at >= scheduled_from)
+        if scheduled_to is not None:
+            stmt = stmt.where(Pickup.scheduled_at < scheduled_to)
+        if zone_id is not None:
+            stmt = stmt.where(Pickup.zone_id == zone_id)
+        return db.execute(stmt).all()
+
+    @staticmethod
+    def count_active_assignments(db: Session, driver_ids: list[int]) -> dict:
+        "driver user id -> number of pickups currently ASSIGNED or IN_PROGRESS"
+        if not driver_ids:
+            return {}
+        stmt = (
+            select(PickupAssignment.driver_id, func.count(PickupAssignment.id))
+            .join(Pickup, Pickup.id == PickupAssignment.pickup_id)
+            .where(
+                PickupAssignment.driver_id.in_(driver_ids),
+                PickupAssignment.status.in_([AssignmentStatus.ASSIGNED, AssignmentStatus.ACCEPTED]),
+                Pickup.status.in_([PickupStatus.ASSIGNED, PickupStatus.IN_PROGRESS]),
+            )
+            .group_by(PickupAssignment.driver_id)
+        )
+        return dict(db.execute(stmt).all())
+
+    @staticmethod
+    def sum_active_load(db: Session, driver_ids: list[int]) -> list:
+        "(driver_id, waste_type, total kg) of the open pickups each driver is carrying or will collect"
+        if not driver_ids:
+            return []
+        stmt = (
+            select(PickupAssignment.driver_id, Pickup.waste_type, func.sum(Pickup.waste_weight))
+            .join(Pickup, Pickup.id == PickupAssignment.pickup_id)
+            .where(
+                PickupAssignment.driver_id.in_(driver_ids),
+                PickupAssignment.status.in_([AssignmentStatus.ASSIGNED, AssignmentStatus.ACCEPTED]),
+                Pickup.status.in_([PickupStatus.ASSIGNED, PickupStatus.IN_PROGRESS]),
+            )
+            .group_by(PickupAssignment.driver_id, Pickup.waste_type)
+        )
+        return db.execute(stmt).all()
+
+    @staticmethod
+    def bulk_assign(db: Session, pairs: list[tuple[int, int]]) -> int:
+        """
+        Assigns many (pickup_id, driver_id) pairs with one multi-row insert
+        and one status update; the caller owns the transaction.
+        """
+        if not pairs:
+            return 0
+        now = datetime.utcnow()
+        db.execute(
+            insert(PickupAssignment),
+            [
+                {
+                    "pickup_id": pickup_id,
+                    "driver_id": driver_id,
+                    "status": AssignmentStatus.ASSIGNED,
+                    "assigned_at": now,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for pickup_id, driver_id in pairs
+            ],
+        )
+        result = db.execute(
+            update(Pickup)
+            .where(
+                Pickup.id.in_([pickup_id for pickup_id, _ in pairs]),
+                Pickup.status == PickupStatus.PENDING,
+            )
+            .values(status=PickupStatus.ASSIGNED, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    @staticmethod
+    def get_driver_manifest(db: Session, driver_id: int, day_start: datetime, day_end: datetime) -> list:
+        """
+        A driver's pickups for one day, with the driver's assignment on
+        each, in a single query: those scheduled in [day_start, day_end)
+        plus unscheduled ones still open, ordered by scheduled time with
+        the unscheduled last. Starts from the driver's assignments and
+        keeps only the latest non-rejected one per pickup, so a pickup
+        assigned to the driver more than once is listed once.
+        """
+        open_assignment = and_(
+            PickupAssignment.driver_id == driver_id,
+            PickupAssignment.status != AssignmentStatus.REJECTED,
+        )
+        newer = aliased(PickupAssignment)
+        stmt = (
+            select(
+                Pickup.id,
+                Pickup.organization_id,
+                Pickup.waste_type,
+                Pickup.waste_weight,
+                Pickup.address,
+                Pickup.latitude,
+                Pickup.longitude,
+                Pickup.zone_id,
+                Pickup.status,
+                Pickup.scheduled_at,
+                Pickup.completed_at,
+                Pickup.overdue_at,
+                PickupAssignment.id.label("assignment_id"),
+                PickupAssignment.status.label("assignment_status"),
+                PickupAssignment.assigned_at,
+            )
+            .select_from(PickupAssignment)
+            .join(Pickup, Pickup.id == PickupAssignment.pickup_id)
+            .where(
+                open_assignment,
+                ~exists().where(
+                    newer.pickup_id == PickupAssignment.pickup_id,
+                    newer.driver_id == driver_id,
+                    newer.status != AssignmentStatus.REJECTED,
+                    newer.id > PickupAssignment.id,
+                ),
+                or_(
+                    and_(Pickup.scheduled_at >= day_start, Pickup.scheduled_at < day_end),
+                    and_(
+                        Pickup.scheduled_at.is_(None),
+                        Pickup.status.in_([PickupStatus.ASSIGNED, PickupStatus.IN_PROGRESS]),
+                    ),
+                ),
+            )
+            .order_by(Pickup.scheduled_at.is_(None), Pickup.scheduled_at, Pickup.id)
+        )
+        return db.execute(stmt).all()
+
+    @staticmethod
+    def get_route_stops(db: Session, driver_id: int, organization_id: int = None) -> list:
+        """
+        (id, latitude, longitude, scheduled_at, address) of the open
+        pickups a driver still has to visit.
+        """
+        stmt = (
+            select(
+                Pickup.id,
+                Pickup.latitude,
+                Pickup.longitude,
+                Pickup.scheduled_at,
+                Pickup.address,
+            )
+            .join(PickupAssignment, PickupAssignment.pickup_id == Pickup.id)
+            .where(
+                PickupAssignment.driver_id == driver_id,
+                PickupAssignment.status.in_([AssignmentStatus.ASSIGNED, AssignmentStatus.ACCEPTED]),
+                Pickup.status.in_([PickupStatus.ASSIGNED, PickupStatus.IN_PROGRESS]),
+            )
+            .order_by(Pickup.id)
+        )
+        if organization_id is not None:
+            stmt = stmt.where(Pickup.organization_id == organization_id)
+        return db.execute(stmt).all()
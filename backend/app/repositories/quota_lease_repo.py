@@ -0,0 +1,112 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.quota_lease import QuotaLease
+
+
+class QuotaLeaseRepository:
+
+    @staticmethod
+    def create_lease(
+        db: Session,
+        subscription_id: int,
+        holder: str,
+        pickups: int,
+        weight: float,
+        expires_at: datetime,
+    ) -> int:
+        now = datetime.utcnow()
+        stmt = insert(QuotaLease).values(
+            subscription_id=subscription_id,
+            holder=holder,
+            pickups_remaining=pickups,
+            weight_remaining=weight,
+            expires_at=expires_at,
+            created_at=now,
+            updated_at=now,
+        ).returning(QuotaLease.id)
+        return db.execute(stmt).scalar_one()
+
+    @staticmethod
+    def consume(db: Session, lease_id: int, pickups: int, weight: float, now: datetime) -> bool:
+        """
+        Draws allowance from a live lease in the caller's transaction.
+        False when the lease is gone, expired or has too little left.
+        """
+        stmt = (
+            update(QuotaLease)
+            .where(
+                QuotaLease.id == lease_id,
+                QuotaLease.expires_at > now,
+                QuotaLease.pickups_remaining >= pickups,
+                QuotaLease.weight_remaining >= weight,
+            )
+            .values(
+                pickups_remaining=QuotaLease.pickups_remaining - pickups,
+                weight_remaining=QuotaLease.weight_remaining - weight,
+                updated_at=now,
+            )
+            .returning(QuotaLease.id)
+            .execution_options(synchronize_session=False)
+        )
+        return db.execute(stmt).first() is not None
+
+    @staticmethod
+    def credit(db: Session, lease_id: int, pickups: int, weight: float, now: datetime) -> bool:
+        "hands allowance freed by a cancellation to a live lease"
+        stmt = (
+            update(QuotaLease)
+            .where(QuotaLease.id == lease_id, QuotaLease.expires_at > now)
+            .values(
+                pickups_remaining=QuotaLease.pickups_remaining + pickups,
+                weight_remaining=QuotaLease.weight_remaining + weight,
+                updated_at=now,
+            )
+            .returning(QuotaLease.id)
+            .execution_options(synchronize_session=False)
+        )
+        return db.execute(stmt).first() is not None
+
+    @staticmethod
+    def delete_lease(db: Session, lease_id: int) -> Optional[tuple]:
+        "(subscription_id, pickups_remaining, weight_remaining) of the deleted lease"
+        stmt = (
+            delete(QuotaLease)
+            .where(QuotaLease.id == lease_id)
+            .returning(QuotaLease.subscription_id, QuotaLease.pickups_remaining, QuotaLease.weight_remaining)
+            .execution_options(synchronize_session=False)
+        )
+        return db.execute(stmt).first()
+
+    @staticmethod
+    def delete_expired(db: Session, subscription_id: int, expired_before: datetime) -> List[tuple]:
+        "same as delete_lease for every lease on the subscription that ran out before the cutoff"
+        stmt = (
+            delete(QuotaLease)
+            .where(
+                QuotaLease.subscription_id == subscription_id,
+                QuotaLease.expires_at < expired_before,
+            )
+            .returning(QuotaLease.subscription_id, QuotaLease.pickups_remaining, QuotaLease.weight_remaining)
+            .execution_options(synchronize_session=False)
+        )
+        return db.execute(stmt).all()
+
+    @staticmethod
+    def outstanding(db: Session, subscription_ids: List[int]) -> Dict[int, Tuple[int, float]]:
+        "unused (pickups, weight) still leased out per subscription; their usage rows count it as used"
+        if not subscription_ids:
+            return {}
+        rows = db.execute(
+            select(
+                QuotaLease.subscription_id,
+                func.sum(QuotaLease.pickups_remaining),
+                func.sum(QuotaLease.weight_remaining),
+            )
+            .where(QuotaLease.subscription_id.in_(subscription_ids))
+            .group_by(QuotaLease.subscription_id)
+        ).all()
+        return {subscription_id: (int(pickups), float(weight)) for subscription_id, pickups, weight in rows}
@@ -0,0 +1,55 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.models.recurring_pickup import RecurringPickup
+
+
+class RecurringPickupRepository:
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_rule(self, rule: RecurringPickup) -> RecurringPickup:
+        self.db.add(rule)
+        self.db.flush()
+        return rule
+
+    def get_rule(self, rule_id: int, organization_id: int, for_update: bool = False) -> Optional[RecurringPickup]:
+        stmt = select(RecurringPickup).where(
+            RecurringPickup.id == rule_id,
+            RecurringPickup.organization_id == organization_id,
+        )
+        if for_update:
+            stmt = stmt.with_for_update()
+        return self.db.scalars(stmt).first()
+
+    def list_rules(self, organization_id: int, include_inactive: bool = False) -> List[RecurringPickup]:
+        stmt = select(RecurringPickup).where(RecurringPickup.organization_id == organization_id)
+        if not include_inactive:
+            stmt = stmt.where(RecurringPickup.is_active.is_(True))
+        return list(self.db.scalars(stmt.order_by(RecurringPickup.id)).all())
+
+    def lock_due(self, horizon: datetime, after_id: int, limit: int) -> List[RecurringPickup]:
+        """
+        Active rules after `after_id` (by id) not yet materialized up to
+        `horizon`, locked for the caller's transaction. Rules another
+        worker is materializing are skipped rather than waited for.
+        """
+        stmt = (
+            select(RecurringPickup)
+            .where(
+                RecurringPickup.is_active.is_(True),
+                RecurringPickup.id > after_id,
+                or_(
+                    RecurringPickup.materialized_until.is_(None),
+                    RecurringPickup.materialized_until < horizon,
+                ),
+            )
+            .order_by(RecurringPickup.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return list(self.db.scalars(stmt).all())
@@ -0,0 +1,158 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.scheduled_job import ScheduledJob
+from app.utils.enums import ScheduledJobStatus
+
+
+class ScheduledJobRepository:
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def upsert_pending(self, jobs: List[dict]) -> list:
+        """
+        Inserts jobs keyed by dedupe_key, or moves the PENDING job already
+        holding the key to the new run_at and payload. Returns (id, run_at)
+        per job. The caller owns the transaction.
+        """
+        if not jobs:
+            return []
+        now = datetime.utcnow()
+        stmt = insert(ScheduledJob).values([
+            {
+                "status": ScheduledJobStatus.PENDING,
+                "attempts": 0,
+                "created_at": now,
+                "updated_at": now,
+                **job,
+            }
+            for job in jobs
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ScheduledJob.dedupe_key],
+            # literal predicate so PostgreSQL can match the partial index
+            index_where=text("status = 'PENDING'"),
+            set_={
+                "run_at": stmt.excluded.run_at,
+                "payload": stmt.excluded.payload,
+                "created_by": stmt.excluded.created_by,
+                "updated_at": now,
+            },
+        ).returning(ScheduledJob.id, ScheduledJob.run_at)
+        return self.db.execute(stmt).all()
+
+    def cancel_pending(self, entity_type: str, entity_id: int, job_types: Optional[List[str]] = None) -> List[int]:
+        "cancels an entity's PENDING jobs and returns their ids"
+        stmt = (
+            update(ScheduledJob)
+            .where(
+                ScheduledJob.entity_type == entity_type,
+                ScheduledJob.entity_id == entity_id,
+                ScheduledJob.status == ScheduledJobStatus.PENDING,
+            )
+            .values(status=ScheduledJobStatus.CANCELLED, updated_at=datetime.utcnow())
+            .returning(ScheduledJob.id)
+            .execution_options(synchronize_session=False)
+        )
+        if job_types:
+            stmt = stmt.where(ScheduledJob.job_type.in_(job_types))
+        return list(self.db.execute(stmt).scalars())
+
+    def cancel_pending_many(self, entity_type: str, entity_ids: List[int], job_types: Optional[List[str]] = None) -> List[int]:
+        "cancel_pending for many entities in one UPDATE"
+        if not entity_ids:
+            return []
+        stmt = (
+            update(ScheduledJob)
+            .where(
+                ScheduledJob.entity_type == entity_type,
+                ScheduledJob.entity_id.in_(entity_ids),
+                ScheduledJob.status == ScheduledJobStatus.PENDING,
+            )
+            .values(status=ScheduledJobStatus.CANCELLED, updated_at=datetime.utcnow())
+            .returning(ScheduledJob.id)
+            .execution_options(synchronize_session=False)
+        )
+        if job_types:
+            stmt = stmt.where(ScheduledJob.job_type.in_(job_types))
+        return list(self.db.execute(stmt).scalars())
+
+    def get_pending_before(self, until: datetime, limit: int = 10000) -> list:
+        "(id, run_at) of PENDING jobs due by `until`, earliest first"
+        stmt = (
+            select(ScheduledJob.id, ScheduledJob.run_at)
+            .where(
+                ScheduledJob.status == ScheduledJobStatus.PENDING,
+                ScheduledJob.run_at <= until,
+            )
+            .order_by(ScheduledJob.run_at)
+            .limit(limit)
+        )
+        return self.db.execute(stmt).all()
+
+    def claim(self, job_id: int, now: datetime) -> Optional[ScheduledJob]:
+        """
+        Marks a due PENDING job RUNNING and returns it, or None when it was
+        cancelled, moved later or claimed by another worker meanwhile.
+        """
+        stmt = (
+            update(ScheduledJob)
+            .where(
+                ScheduledJob.id == job_id,
+                ScheduledJob.status == ScheduledJobStatus.PENDING,
+                ScheduledJob.run_at <= now,
+            )
+            .values(
+                status=ScheduledJobStatus.RUNNING,
+                attempts=ScheduledJob.attempts + 1,
+                locked_at=now,
+                updated_at=now,
+            )
+            .returning(ScheduledJob)
+            .execution_options(synchronize_session=False)
+        )
+        return self.db.execute(stmt).scalar_one_or_none()
+
+    def finish(
+        self,
+        job_id: int,
+        status: ScheduledJobStatus,
+        error: Optional[str] = None,
+        run_at: Optional[datetime] = None,
+    ):
+        "records the outcome of a RUNNING job; PENDING with run_at retries it"
+        values = {
+            "status": status,
+            "last_error": error,
+            "locked_at": None,
+            "updated_at": datetime.utcnow(),
+        }
+        if run_at is not None:
+            values["run_at"] = run_at
+        self.db.execute(
+            update(ScheduledJob)
+            .where(
+                ScheduledJob.id == job_id,
+                ScheduledJob.status == ScheduledJobStatus.RUNNING,
+            )
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+    def release_stale(self, locked_before: datetime) -> int:
+        "puts RUNNING jobs whose worker died back to PENDING"
+        result = self.db.execute(
+            update(ScheduledJob)
+            .where(
+                ScheduledJob.status == ScheduledJobStatus.RUNNING,
+                ScheduledJob.locked_at < locked_before,
+            )
+            .values(status=ScheduledJobStatus.PENDING, locked_at=None, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
@@ -1,8 +1,12 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import select, update
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import bindparam, func, insert, select, update
 from app.models.subscription_plan import SubscriptionPlan
 from app.models.subscription import Subscription, SubscriptionStatus
 from app.models.subscription_usage import SubscriptionUsage
+from app.models.subscription_usage_history import SubscriptionUsageHistory
 
 class SubscriptionRepository:
     @staticmethod
@@ -42,7 +46,10 @@ class SubscriptionRepository:
 
     @staticmethod
     def get_active_subscription(db: Session, organization_id: int) -> Subscription:
-        return db.query(Subscription).filter(
+        # the plan's limits are read on every quota check
+        return db.query(Subscription).options(
+            joinedload(Subscription.plan)
+        ).filter(
             Subscription.organization_id == organization_id,
             Subscription.status == SubscriptionStatus.ACTIVE
         ).first()
@@ -63,6 +70,87 @@ class SubscriptionRepository:
             db.flush()
         return sub
 
+    @staticmethod
+    def lock_lapsed(db: Session, now: datetime, limit: int) -> list:
+        """
+        ACTIVE subscriptions whose end_date has passed, oldest first, with
+        what renewing them needs from the plan. Locked for the caller's
+        transaction; rows another worker is sweeping are skipped.
+        """
+        stmt = (
+            select(
+                Subscription.id,
+                Subscription.organization_id,
+                Subscription.plan_id,
+                Subscription.end_date,
+                Subscription.auto_renew,
+                SubscriptionPlan.billing_cycle,
+                SubscriptionPlan.is_active.label("plan_is_active"),
+            )
+            .join(SubscriptionPlan, SubscriptionPlan.id == Subscription.plan_id)
+            .where(
+                Subscription.status == SubscriptionStatus.ACTIVE,
+                Subscription.end_date < now,
+            )
+            .order_by(Subscription.end_date, Subscription.id)
+            .limit(limit)
+            .with_for_update(of=Subscription, skip_locked=True)
+        )
+        return db.execute(stmt).all()
+
+    @staticmethod
+    def expire_subscriptions(db: Session, subscription_ids: list[int], now: datetime):
+        "marks the ACTIVE ones among the subscriptions EXPIRED in one UPDATE"
+        if not subscription_ids:
+            return
+        db.execute(
+            update(Subscription)
+            .where(
+                Subscription.id.in_(subscription_ids),
+                Subscription.status == SubscriptionStatus.ACTIVE,
+            )
+            .values(status=SubscriptionStatus.EXPIRED, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def bulk_create_subscriptions(db: Session, rows: list[dict]) -> list[int]:
+        "multi-row INSERT ... RETURNING; ids come back in input order"
+        if not rows:
+            return []
+        now = datetime.utcnow()
+        stmt = insert(Subscription).returning(Subscription.id, sort_by_parameter_order=True)
+        result = db.execute(stmt, [{"created_at": now, "updated_at": now, **row} for row in rows])
+        return list(result.scalars())
+
+    @staticmethod
+    def bulk_create_usage(db: Session, usage: list[tuple]):
+        "zeroed usage rows for new subscriptions, given (subscription_id, cycle start), in one multi-row INSERT"
+        if not usage:
+            return
+        now = datetime.utcnow()
+        db.execute(insert(SubscriptionUsage), [
+            {
+                "subscription_id": subscription_id,
+                "pickups_used": 0,
+                "waste_weight_used": 0.0,
+                "drivers_used": 0,
+                "last_reset_at": started_at,
+                "updated_at": now,
+            }
+            for subscription_id, started_at in usage
+        ])
+
+    @staticmethod
+    def next_end_date(db: Session, after: datetime) -> Optional[datetime]:
+        "earliest end_date among ACTIVE subscriptions still running at `after`"
+        return db.scalar(
+            select(func.min(Subscription.end_date)).where(
+                Subscription.status == SubscriptionStatus.ACTIVE,
+                Subscription.end_date >= after,
+            )
+        )
+
     @staticmethod
     def create_usage_record(db: Session, usage: SubscriptionUsage) -> SubscriptionUsage:
         db.add(usage)
@@ -85,3 +173,131 @@ class SubscriptionRepository:
             usage.drivers_used += drivers
             db.flush()
         return usage
+
+    @staticmethod
+    def reserve_usage(
+        db: Session,
+        subscription_id: int,
+        pickups: int,
+        weight: float,
+        pickup_limit: int,
+        weight_limit: float,
+    ):
+        """
+        Adds to the usage counters in one conditional UPDATE that only
+        matches while the result stays within the limits (0 = unlimited).
+        Returns (pickups_used, waste_weight_used) after the change, or None
+        when a limit would be exceeded or there is no usage row. The row
+        stays locked until the caller's transaction ends.
+        """
+        conditions = [SubscriptionUsage.subscription_id == subscription_id]
+        if pickup_limit > 0:
+            conditions.append(SubscriptionUsage.pickups_used + pickups <= pickup_limit)
+        if weight_limit > 0:
+            conditions.append(SubscriptionUsage.waste_weight_used + weight <= weight_limit)
+
+        stmt = (
+            update(SubscriptionUsage)
+            .where(*conditions)
+            .values(
+                pickups_used=SubscriptionUsage.pickups_used + pickups,
+                waste_weight_used=SubscriptionUsage.waste_weight_used + weight,
+                updated_at=datetime.utcnow(),
+            )
+            .returning(SubscriptionUsage.pickups_used, SubscriptionUsage.waste_weight_used)
+            .execution_options(synchronize_session=False)
+        )
+        return db.execute(stmt).first()
+
+    @staticmethod
+    def lock_usage(db: Session, subscription_id: int) -> bool:
+        "row-locks the usage row until the caller's transaction ends; False without one"
+        stmt = (
+            select(SubscriptionUsage.id)
+            .where(SubscriptionUsage.subscription_id == subscription_id)
+            .with_for_update()
+        )
+        return db.execute(stmt).first() is not None
+
+    @staticmethod
+    def release_usage(db: Session, subscription_id: int, pickups: int, weight: float):
+        "gives allowance back to the usage row in one UPDATE; the caller owns the transaction"
+        db.execute(
+            update(SubscriptionUsage)
+            .where(SubscriptionUsage.subscription_id == subscription_id)
+            .values(
+                pickups_used=SubscriptionUsage.pickups_used - pickups,
+                waste_weight_used=SubscriptionUsage.waste_weight_used - weight,
+                updated_at=datetime.utcnow(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def lock_usage_due(db: Session, due_before: datetime, now: datetime, limit: int) -> list:
+        """
+        Usage rows last reset at or before `due_before` whose subscription is
+        ACTIVE and still running past `now` (one that is about to end is
+        renewed with a fresh row instead). Oldest first, locked for the
+        caller's transaction; rows another worker holds are skipped.
+        """
+        stmt = (
+            select(
+                SubscriptionUsage.id,
+                SubscriptionUsage.subscription_id,
+                Subscription.organization_id,
+                SubscriptionUsage.pickups_used,
+                SubscriptionUsage.waste_weight_used,
+                SubscriptionUsage.drivers_used,
+                SubscriptionUsage.last_reset_at,
+            )
+            .join(Subscription, Subscription.id == SubscriptionUsage.subscription_id)
+            .where(
+                SubscriptionUsage.last_reset_at <= due_before,
+                Subscription.status == SubscriptionStatus.ACTIVE,
+                Subscription.end_date > now,
+            )
+            .order_by(SubscriptionUsage.last_reset_at, SubscriptionUsage.id)
+            .limit(limit)
+            .with_for_update(of=SubscriptionUsage, skip_locked=True)
+        )
+        return db.execute(stmt).all()
+
+    @staticmethod
+    def bulk_create_usage_history(db: Session, rows: list[dict]):
+        "closed-cycle snapshots in one multi-row INSERT"
+        if not rows:
+            return
+        now = datetime.utcnow()
+        db.execute(insert(SubscriptionUsageHistory), [{"created_at": now, **row} for row in rows])
+
+    @staticmethod
+    def bulk_reset_usage(db: Session, rows: list[dict]):
+        "UPDATE by primary key for each {id, pickups_used, waste_weight_used, drivers_used, last_reset_at}"
+        if not rows:
+            return
+        now = datetime.utcnow()
+        db.execute(update(SubscriptionUsage), [{"updated_at": now, **row} for row in rows])
+
+    @staticmethod
+    def apply_usage_deltas(db: Session, deltas: dict):
+        "adds {subscription_id: (pickups, weight, drivers)} to the usage rows with one batched UPDATE"
+        if not deltas:
+            return
+        usage = SubscriptionUsage.__table__
+        stmt = (
+            update(usage)
+            .where(usage.c.subscription_id == bindparam("target_id"))
+            .values(
+                pickups_used=usage.c.pickups_used + bindparam("add_pickups"),
+                waste_weight_used=usage.c.waste_weight_used + bindparam("add_weight"),
+                drivers_used=usage.c.drivers_used + bindparam("add_drivers"),
+                updated_at=bindparam("now"),
+            )
+        )
+        now = datetime.utcnow()
+        # a fixed order keeps concurrent compactors from deadlocking
+        db.execute(stmt, [
+            {"target_id": subscription_id, "add_pickups": pickups, "add_weight": weight, "add_drivers": drivers, "now": now}
+            for subscription_id, (pickups, weight, drivers) in sorted(deltas.items())
+        ])
@@ -0,0 +1,77 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, insert, select, true, update
+from sqlalchemy.orm import Session
+
+from app.models.subscription_usage import SubscriptionUsage
+from app.models.usage_event import UsageEvent
+
+
+class UsageEventRepository:
+
+    @staticmethod
+    def append(db: Session, rows: List[dict]):
+        "writes ledger entries with one multi-row INSERT; the caller owns the transaction"
+        if not rows:
+            return
+        now = datetime.utcnow()
+        db.execute(insert(UsageEvent), [{"delta_drivers": 0, "created_at": now, **row} for row in rows])
+
+    @staticmethod
+    def current_totals(db: Session, subscription_id: int) -> Optional[Tuple[int, float]]:
+        """
+        (pickups, weight) of the subscription's totals plus its entries not
+        yet folded into them, or None without a usage row. One statement,
+        so a compaction committing meanwhile is seen entirely or not at all.
+        """
+        pending = select(
+            func.coalesce(func.sum(UsageEvent.delta_pickups), 0).label("pickups"),
+            func.coalesce(func.sum(UsageEvent.delta_weight), 0.0).label("weight"),
+        ).where(
+            UsageEvent.subscription_id == subscription_id,
+            ~UsageEvent.folded,
+        ).subquery()
+
+        row = db.execute(
+            select(
+                SubscriptionUsage.pickups_used + pending.c.pickups,
+                SubscriptionUsage.waste_weight_used + pending.c.weight,
+            )
+            .select_from(SubscriptionUsage)
+            .join(pending, true())
+            .where(SubscriptionUsage.subscription_id == subscription_id)
+        ).first()
+        if row is None:
+            return None
+        return int(row[0]), float(row[1])
+
+    @staticmethod
+    def fold(db: Session, limit: Optional[int] = None, subscription_ids: Optional[List[int]] = None) -> list:
+        """
+        Marks unfolded entries folded and returns their (subscription_id,
+        delta_pickups, delta_weight, delta_drivers) so the caller can add
+        them to the totals in the same transaction. Takes the oldest
+        `limit` entries, or those of `subscription_ids`; entries another
+        transaction is folding are skipped rather than waited for.
+        """
+        candidates = select(UsageEvent.id).where(~UsageEvent.folded)
+        if subscription_ids is not None:
+            candidates = candidates.where(UsageEvent.subscription_id.in_(subscription_ids))
+        if limit is not None:
+            candidates = candidates.order_by(UsageEvent.id).limit(limit)
+        candidates = candidates.with_for_update(skip_locked=True)
+
+        stmt = (
+            update(UsageEvent)
+            .where(UsageEvent.id.in_(candidates.scalar_subquery()))
+            .values(folded=True)
+            .returning(
+                UsageEvent.subscription_id,
+                UsageEvent.delta_pickups,
+                UsageEvent.delta_weight,
+                UsageEvent.delta_drivers,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return db.execute(stmt).all()
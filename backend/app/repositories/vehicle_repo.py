@@ -0,0 +1,132 @@
+from datetime import datetime, timezone
+from typing import Optional, List
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.driver import Driver
+from app.models.user import User
+from app.models.vehicle import Vehicle, DriverVehicleMap
+from app.utils.enums import DriverStatus, VehicleStatus
+
+
+class VehicleRepository:
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_vehicle_by_id(
+        self,
+        vehicle_id: UUID,
+        organization_id: UUID,
+    ) -> Optional[Vehicle]:
+
+        stmt = select(Vehicle).where(
+            Vehicle.id == vehicle_id,
+            Vehicle.organization_id == organization_id,
+        )
+        return self.db.scalar(stmt)
+
+    def get_vehicle_by_registration(
+        self,
+        registration_number: str,
+        organization_id: UUID,
+    ) -> Optional[Vehicle]:
+
+        stmt = select(Vehicle).where(
+            Vehicle.registration_number == registration_number,
+            Vehicle.organization_id == organization_id,
+        )
+        return self.db.scalar(stmt)
+
+    def list_vehicles_by_organization(
+        self,
+        organization_id: UUID,
+        skip: int = 0,
+        limit: int = 50,
+    ) -> List[Vehicle]:
+
+        stmt = (
+            select(Vehicle)
+            .where(Vehicle.organization_id == organization_id)
+            .order_by(Vehicle.registration_number)
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(self.db.scalars(stmt).all())
+
+    def create_vehicle(self, vehicle: Vehicle) -> Vehicle:
+        self.db.add(vehicle)
+        self.db.flush()
+        return vehicle
+
+    def update_vehicle(
+        self,
+        vehicle: Vehicle,
+        update_data: dict,
+        updated_by: int,
+    ) -> Vehicle:
+
+        for field, value in update_data.items():
+            setattr(vehicle, field, value)
+
+        vehicle.updated_by = updated_by
+        self.db.flush()
+        return vehicle
+
+    def get_active_mapping(
+        self,
+        driver_id: Optional[UUID] = None,
+        vehicle_id: Optional[UUID] = None,
+    ) -> Optional[DriverVehicleMap]:
+
+        stmt = select(DriverVehicleMap).where(DriverVehicleMap.is_active == True)
+        if driver_id is not None:
+            stmt = stmt.where(DriverVehicleMap.driver_id == driver_id)
+        if vehicle_id is not None:
+            stmt = stmt.where(DriverVehicleMap.vehicle_id == vehicle_id)
+        return self.db.scalar(stmt)
+
+    def create_mapping(self, mapping: DriverVehicleMap) -> DriverVehicleMap:
+        self.db.add(mapping)
+        self.db.flush()
+        return mapping
+
+    def release_mapping(self, mapping: DriverVehicleMap) -> DriverVehicleMap:
+        mapping.is_active = False
+        mapping.released_at = datetime.now(timezone.utc)
+        self.db.flush()
+        return mapping
+
+    def get_capacities_for_users(
+        self,
+        user_ids: List[int],
+    ) -> list:
+        """
+        (user_id, capacity_kg, waste_type_capacity_kg) of the active vehicle
+        each driver account is currently linked to. Drivers without a
+        vehicle are simply absent.
+        """
+        if not user_ids:
+            return []
+
+        stmt = (
+            select(
+                User.id,
+                Vehicle.capacity_kg,
+                Vehicle.waste_type_capacity_kg,
+            )
+            .join(Driver, Driver.mobile == User.mobile)
+            .join(
+                DriverVehicleMap,
+                (DriverVehicleMap.driver_id == Driver.id) & (DriverVehicleMap.is_active == True),
+            )
+            .join(Vehicle, Vehicle.id == DriverVehicleMap.vehicle_id)
+            .where(
+                User.id.in_(user_ids),
+                Driver.status != DriverStatus.DELETED,
+                Vehicle.status == VehicleStatus.ACTIVE,
+            )
+        )
+        return self.db.execute(stmt).all()
@@ -0,0 +1,131 @@
+from typing import Optional, List
+
+from sqlalchemy import select, update, func, bindparam
+from sqlalchemy.orm import Session
+
+from app.models.driver import DriverAvailability
+from app.models.location import Zone
+from app.models.pickup import Pickup, PickupStatus
+
+
+OPEN_PICKUP_STATUSES = [PickupStatus.PENDING, PickupStatus.ASSIGNED, PickupStatus.IN_PROGRESS]
+
+
+class ZoneRepository:
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_zone_by_id(
+        self,
+        zone_id: int,
+        organization_id: int,
+    ) -> Optional[Zone]:
+
+        stmt = select(Zone).where(
+            Zone.id == zone_id,
+            Zone.organization_id == organization_id,
+        )
+        return self.db.scalar(stmt)
+
+    def list_zones_by_organization(
+        self,
+        organization_id: int,
+        include_inactive: bool = False,
+    ) -> List[Zone]:
+
+        stmt = select(Zone).where(Zone.organization_id == organization_id)
+        if not include_inactive:
+            stmt = stmt.where(Zone.is_active == True)
+        return list(self.db.scalars(stmt.order_by(Zone.name)).all())
+
+    def get_active_boundaries(
+        self,
+        organization_id: int,
+    ) -> list:
+        "(id, boundary) of the organization's active zones"
+
+        stmt = select(Zone.id, Zone.boundary).where(
+            Zone.organization_id == organization_id,
+            Zone.is_active == True,
+        )
+        return self.db.execute(stmt).all()
+
+    def create_zone(self, zone: Zone) -> Zone:
+        self.db.add(zone)
+        self.db.flush()
+        return zone
+
+    def update_zone(
+        self,
+        zone: Zone,
+        update_data: dict,
+    ) -> Zone:
+
+        for field, value in update_data.items():
+            setattr(zone, field, value)
+
+        self.db.flush()
+        return zone
+
+    def get_open_pickup_positions(
+        self,
+        organization_id: int,
+    ) -> list:
+        "(id, latitude, longitude, zone_id) of the organization's open pickups"
+
+        stmt = select(Pickup.id, Pickup.latitude, Pickup.longitude, Pickup.zone_id).where(
+            Pickup.organization_id == organization_id,
+            Pickup.status.in_(OPEN_PICKUP_STATUSES),
+        )
+        return self.db.execute(stmt).all()
+
+    def set_pickup_zones(
+        self,
+        zone_by_pickup: dict,
+    ) -> int:
+        "re-tags pickups with one executemany UPDATE"
+
+        if not zone_by_pickup:
+            return 0
+
+        self.db.execute(
+            update(Pickup.__table__)
+            .where(Pickup.__table__.c.id == bindparam("pickup_id"))
+            .values(zone_id=bindparam("new_zone_id")),
+            [
+                {"pickup_id": pickup_id, "new_zone_id": zone_id}
+                for pickup_id, zone_id in zone_by_pickup.items()
+            ],
+        )
+        return len(zone_by_pickup)
+
+    def get_pickup_counts(
+        self,
+        zone_id: int,
+        organization_id: int,
+    ) -> list:
+        "(status, count, total waste_weight) of the zone's pickups"
+
+        stmt = (
+            select(Pickup.status, func.count(Pickup.id), func.coalesce(func.sum(Pickup.waste_weight), 0.0))
+            .where(
+                Pickup.organization_id == organization_id,
+                Pickup.zone_id == zone_id,
+            )
+            .group_by(Pickup.status)
+        )
+        return self.db.execute(stmt).all()
+
+    def get_driver_counts(
+        self,
+        zone_id: int,
+    ) -> list:
+        "(availability status, on duty, count) of drivers last seen in the zone"
+
+        stmt = (
+            select(DriverAvailability.status, DriverAvailability.is_on_duty, func.count(DriverAvailability.id))
+            .where(DriverAvailability.zone_id == zone_id)
+            .group_by(DriverAvailability.status, DriverAvailability.is_on_duty)
+        )
+        return self.db.execute(stmt).all()
@@ -0,0 +1,167 @@
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.repositories.driver_repo import DriverRepository
+from app.repositories.pickup_repo import PickupRepository
+from app.services.audit_service import log_event
+from app.services.distance_service import distance_service
+from app.services.manifest_service import driver_manifest_cache
+from app.services.outbox_service import emit_events
+from app.services.vehicle_service import VehicleService
+from app.utils.matching import capacitated_assignment
+
+
+# Matching rounds when vehicle payload turns down proposed assignments
+CAPACITY_ROUNDS = 3
+
+
+class AssignmentService:
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.driver_repo = DriverRepository(db)
+
+    def auto_assign(
+        self,
+        organization_id: int,
+        assigned_by: int,
+        max_per_driver: int = 10,
+        max_distance_km: Optional[float] = None,
+        limit: int = 1000,
+        zone_id: Optional[int] = None,
+        pickup_ids: Optional[List[int]] = None,
+    ) -> Dict:
+        """
+        Matches the org's PENDING pickups to on-duty available drivers at
+        minimum total travel distance, with each driver taking at most
+        max_per_driver pickups (counting what they already hold) and no more
+        waste than their vehicle can carry. With zone_id only that zone's
+        pickups and the drivers currently in it take part; with pickup_ids
+        only those pickups are considered. The whole batch is written in
+        one transaction.
+        """
+        started = time.perf_counter()
+
+        pickups = PickupRepository.lock_pending_pickups(
+            self.db, organization_id, limit, zone_id, pickup_ids
+        )
+        drivers = self.driver_repo.get_dispatchable_drivers(organization_id, zone_id)
+
+        if not pickups or not drivers:
+            self.db.rollback()
+            return {
+                "assigned": [],
+                "unassigned_pickup_ids": [p.id for p in pickups],
+                "solver": "none",
+                "driver_count": len(drivers),
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            }
+
+        user_ids = [d[1] for d in drivers]
+        active = PickupRepository.count_active_assignments(self.db, user_ids)
+        capacity = np.array(
+            [max(max_per_driver - active.get(user_id, 0), 0) for user_id in user_ids]
+        )
+        tracker = VehicleService(self.db).build_capacity_tracker(user_ids)
+
+        cost = distance_service.matrix(
+            [p.latitude for p in pickups],
+            [p.longitude for p in pickups],
+            [d[2] for d in drivers],
+            [d[3] for d in drivers],
+        ).distance_km.copy()
+        if max_distance_km is not None:
+            cost[cost > max_distance_km] = np.inf
+
+        weights = np.array([p.waste_weight for p in pickups], dtype=float)
+        waste_types = [p.waste_type.value for p in pickups]
+
+        # Solve on distance and trip count, then load the proposed pickups
+        # onto vehicles heaviest first; whatever no longer fits goes back
+        # into the next round with the spare payload updated.
+        columns = np.full(len(pickups), -1, dtype=int)
+        solver = "none"
+        for _ in range(CAPACITY_ROUNDS):
+            rows = np.flatnonzero(columns < 0)
+            if rows.size == 0 or not capacity.any():
+                break
+
+            round_cost = cost[rows]
+            for waste_type in set(waste_types[row] for row in rows):
+                spare = np.array([tracker.remaining(user_id, waste_type) for user_id in user_ids])
+                of_type = np.array([waste_types[row] == waste_type for row in rows])
+                too_heavy = of_type[:, None] & (weights[rows][:, None] > spare[None, :] + 1e-9)
+                round_cost[too_heavy] = np.inf
+
+            proposed, solver = capacitated_assignment(round_cost, capacity)
+
+            turned_down = 0
+            for index in np.argsort(-weights[rows], kind="stable"):
+                column = proposed[index]
+                if column < 0:
+                    continue
+                row = rows[index]
+                if tracker.reserve(user_ids[column], waste_types[row], weights[row]):
+                    columns[row] = column
+                    capacity[column] -= 1
+                else:
+                    turned_down += 1
+
+            if not turned_down:
+                break
+
+        assigned = []
+        unassigned = []
+        for row, column in enumerate(columns):
+            pickup = pickups[row]
+            if column < 0:
+                unassigned.append(pickup.id)
+                continue
+            assigned.append({
+                "pickup_id": pickup.id,
+                "driver_id": user_ids[column],
+                "distance_km": round(float(cost[row, column]), 3),
+            })
+
+        PickupRepository.bulk_assign(
+            self.db,
+            [(a["pickup_id"], a["driver_id"]) for a in assigned],
+        )
+        emit_events(self.db, [
+            {
+                "event_type": "pickup.assigned",
+                "aggregate_type": "pickup",
+                "aggregate_id": a["pickup_id"],
+                "organization_id": organization_id,
+                "payload": {"status": "ASSIGNED", "driver_id": a["driver_id"], "auto": True},
+            }
+            for a in assigned
+        ])
+
+        # log_event commits, closing the dispatch transaction
+        log_event(
+            db=self.db,
+            user_id=assigned_by,
+            action="AUTO_ASSIGN",
+            org_id=organization_id,
+            metadata={
+                "entity_type": "pickup",
+                "assigned": len(assigned),
+                "unassigned": len(unassigned),
+                "drivers": len(drivers),
+                "solver": solver,
+            },
+        )
+        for driver_id in {a["driver_id"] for a in assigned}:
+            driver_manifest_cache.invalidate_driver(driver_id)
+
+        return {
+            "assigned": assigned,
+            "unassigned_pickup_ids": unassigned,
+            "solver": solver,
+            "driver_count": len(drivers),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
@@ -0,0 +1,73 @@
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.repositories.pickup_repo import PickupRepository
+from app.utils.clustering import cluster_runs
+from app.utils.geo import haversine
+
+
+class ClusteringService:
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def cluster_pending(
+        self,
+        organization_id: int,
+        eps_km: float = 0.5,
+        min_samples: int = 3,
+        max_weight_kg: Optional[float] = None,
+        scheduled_from: Optional[datetime] = None,
+        scheduled_to: Optional[datetime] = None,
+        zone_id: Optional[int] = None,
+        limit: int = 50000,
+    ) -> Dict:
+        """
+        Groups the org's PENDING pickups into candidate collection runs:
+        pickups within eps_km of each other chain into one run, runs
+        heavier than max_weight_kg are split, and pickups with too few
+        neighbours are reported separately. Nothing is written.
+        """
+        started = time.perf_counter()
+
+        rows = PickupRepository.get_pending_positions(
+            self.db,
+            organization_id,
+            scheduled_from=scheduled_from,
+            scheduled_to=scheduled_to,
+            zone_id=zone_id,
+            limit=limit,
+        )
+
+        ids = np.array([r[0] for r in rows], dtype=np.int64)
+        lats = np.array([r[1] for r in rows], dtype=float)
+        lngs = np.array([r[2] for r in rows], dtype=float)
+        weights = np.array([r[3] or 0.0 for r in rows], dtype=float)
+
+        runs, noise = cluster_runs(lats, lngs, weights, eps_km, min_samples, max_weight_kg)
+
+        clusters = []
+        for number, members in enumerate(runs):
+            centroid_lat = float(lats[members].mean())
+            centroid_lng = float(lngs[members].mean())
+            radius = haversine(centroid_lat, centroid_lng, lats[members], lngs[members])
+            clusters.append({
+                "cluster_id": number,
+                "centroid_latitude": round(centroid_lat, 6),
+                "centroid_longitude": round(centroid_lng, 6),
+                "pickup_count": int(members.size),
+                "total_weight_kg": round(float(weights[members].sum()), 2),
+                "radius_km": round(float(radius.max()), 3),
+                "pickup_ids": ids[members].tolist(),
+            })
+
+        return {
+            "clusters": clusters,
+            "unclustered_pickup_ids": ids[noise].tolist(),
+            "pickup_count": len(rows),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
@@ -0,0 +1,222 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from app.core.config import (
+    DISTANCE_CACHE_MAX_CELLS,
+    DISTANCE_CELL_DECIMALS,
+    DISTANCE_ROAD_FACTOR,
+    ROUTE_SPEED_PROFILE_KMPH,
+    ROUTE_SPEED_PROFILE_TZ,
+)
+from app.utils.geo import haversine
+
+
+class DistanceMatrix(NamedTuple):
+    distance_km: np.ndarray
+    duration_min: np.ndarray
+
+
+# (origin latitudes, origin longitudes, destination latitudes, destination longitudes)
+MatrixRequest = Tuple[Sequence[float], Sequence[float], Sequence[float], Sequence[float]]
+
+
+class DistanceMatrixService:
+    """
+    Road distance and drive time estimates between sets of coordinates:
+    great-circle distance scaled by a road factor, driven at the speed the
+    hourly profile gives for the departure time.
+
+    Coordinates are snapped to cells of cell_decimals decimal places and
+    distances are cached per pair of cells, as one row per cell holding
+    its distances to the cells it has been paired with. Rows are evicted
+    least recently used, bounded by the total number of cached pairs. A
+    matrix is assembled from the rows of whichever side has fewer
+    distinct cells (distance is symmetric), and only the pairs no row
+    holds yet are computed, so dispatch runs over mostly the same stops
+    and parked drivers reuse earlier results even when a pickup is added
+    or a driver moves. Drive times are derived from the distances on
+    every call since they depend on the departure hour.
+
+    Returned arrays are read-only; copy before modifying.
+    """
+
+    def __init__(
+        self,
+        road_factor: float = 1.3,
+        speed_profile_kmph: Optional[Sequence[float]] = None,
+        profile_tz: str = "UTC",
+        cell_decimals: int = 3,
+        max_cached_cells: int = 4_000_000,
+    ):
+        self.road_factor = road_factor
+        self.speed_profile = list(speed_profile_kmph or [25.0] * 24)
+        if len(self.speed_profile) != 24:
+            raise ValueError("speed profile needs one speed per hour of the day")
+        self.profile_tz = ZoneInfo(profile_tz)
+        self.cell_scale = 10 ** cell_decimals
+        self.max_cached_cells = max_cached_cells
+
+        # cell key -> (sorted keys of the cells paired with it, road km to each)
+        self._rows: "OrderedDict[int, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        self._cached_cells = 0
+        self._lock = threading.Lock()
+        # counted per cell pair
+        self.hits = 0
+        self.misses = 0
+
+    def speed_kmph(self, depart_at: Optional[datetime] = None) -> float:
+        "profile speed for the hour of departure; naive datetimes are UTC"
+        depart_at = depart_at or datetime.now(timezone.utc)
+        if depart_at.tzinfo is None:
+            depart_at = depart_at.replace(tzinfo=timezone.utc)
+        return self.speed_profile[depart_at.astimezone(self.profile_tz).hour]
+
+    def matrix(
+        self,
+        origin_lats,
+        origin_lngs,
+        dest_lats,
+        dest_lngs,
+        depart_at: Optional[datetime] = None,
+    ) -> DistanceMatrix:
+        "len(origins) x len(destinations) road km and drive minutes"
+        distance = self._distance(
+            self._cells(origin_lats, origin_lngs),
+            self._cells(dest_lats, dest_lngs),
+        )
+        duration = distance / self.speed_kmph(depart_at) * 60.0
+        duration.setflags(write=False)
+        return DistanceMatrix(distance, duration)
+
+    def batch(
+        self,
+        requests: List[MatrixRequest],
+        depart_at: Optional[datetime] = None,
+    ) -> List[DistanceMatrix]:
+        """
+        Several matrices at one departure time. Identical requests in the
+        batch are computed once.
+        """
+        speed = self.speed_kmph(depart_at)
+        results = []
+        seen = {}
+
+        for origin_lats, origin_lngs, dest_lats, dest_lngs in requests:
+            origins = self._cells(origin_lats, origin_lngs)
+            dests = self._cells(dest_lats, dest_lngs)
+            key = (origins.tobytes(), dests.tobytes())
+
+            if key not in seen:
+                distance = self._distance(origins, dests)
+                duration = distance / speed * 60.0
+                duration.setflags(write=False)
+                seen[key] = DistanceMatrix(distance, duration)
+            results.append(seen[key])
+
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+            self._cached_cells = 0
+
+    def _cells(self, lats, lngs) -> np.ndarray:
+        "(n, 2) integer cell coordinates"
+        lats = np.asarray(lats, dtype=float)
+        lngs = np.asarray(lngs, dtype=float)
+        return np.stack(
+            [np.rint(lats * self.cell_scale), np.rint(lngs * self.cell_scale)],
+            axis=1,
+        ).astype(np.int64)
+
+    @staticmethod
+    def _keys(cells: np.ndarray) -> np.ndarray:
+        "one int64 per cell, ordered like the (lat, lng) cell coordinates"
+        return cells[:, 0] * (1 << 32) + cells[:, 1]
+
+    def _distance(self, origins: np.ndarray, dests: np.ndarray) -> np.ndarray:
+        origin_keys, origin_at, origin_inv = np.unique(self._keys(origins), return_index=True, return_inverse=True)
+        dest_keys, dest_at, dest_inv = np.unique(self._keys(dests), return_index=True, return_inverse=True)
+
+        if len(dest_keys) < len(origin_keys):
+            block = self._block(dest_keys, dests[dest_at], origin_keys, origins[origin_at]).T
+        else:
+            block = self._block(origin_keys, origins[origin_at], dest_keys, dests[dest_at])
+
+        distance = block[origin_inv.reshape(-1)][:, dest_inv.reshape(-1)]
+        distance.setflags(write=False)
+        return distance
+
+    def _block(self, row_keys, row_cells, col_keys, col_cells) -> np.ndarray:
+        "distances between distinct sorted cells, filled from the rows and completed"
+        block = np.empty((len(row_keys), len(col_keys)))
+        missing = []
+
+        with self._lock:
+            for i, key in enumerate(row_keys.tolist()):
+                row = self._rows.get(key)
+                if row is None:
+                    missing.append((i, slice(None)))
+                    continue
+                self._rows.move_to_end(key)
+                keys, distances = row
+                at = np.minimum(np.searchsorted(keys, col_keys), len(keys) - 1)
+                found = keys[at] == col_keys
+                block[i, found] = distances[at[found]]
+                if not found.all():
+                    missing.append((i, ~found))
+            misses = sum(len(col_keys[cols]) for _, cols in missing)
+            self.misses += misses
+            self.hits += block.size - misses
+
+        # distances between cell centres, so a cached pair is exactly what
+        # recomputing it would give
+        computed = []
+        for i, cols in missing:
+            distances = haversine(
+                row_cells[i, 0] / self.cell_scale,
+                row_cells[i, 1] / self.cell_scale,
+                col_cells[cols, 0] / self.cell_scale,
+                col_cells[cols, 1] / self.cell_scale,
+            ) * self.road_factor
+            block[i, cols] = distances
+            computed.append((int(row_keys[i]), col_keys[cols], distances))
+
+        if computed:
+            with self._lock:
+                for key, keys, distances in computed:
+                    self._store(key, keys, distances)
+                while self._cached_cells > self.max_cached_cells:
+                    _, (evicted, _) = self._rows.popitem(last=False)
+                    self._cached_cells -= evicted.size
+
+        return block
+
+    def _store(self, key: int, keys: np.ndarray, distances: np.ndarray):
+        "merges newly computed pairs into the cell's row; call with the lock held"
+        row = self._rows.pop(key, None)
+        if row is not None:
+            self._cached_cells -= row[0].size
+            keys = np.concatenate([row[0], keys])
+            distances = np.concatenate([row[1], distances])
+            # another call may have added some of the same pairs meanwhile
+            keys, first = np.unique(keys, return_index=True)
+            distances = distances[first]
+        if keys.size > self.max_cached_cells:
+            return
+        self._rows[key] = (keys, distances)
+        self._cached_cells += keys.size
+
+
+distance_service = DistanceMatrixService(
+    road_factor=DISTANCE_ROAD_FACTOR,
+    speed_profile_kmph=ROUTE_SPEED_PROFILE_KMPH,
+    profile_tz=ROUTE_SPEED_PROFILE_TZ,
+    cell_decimals=DISTANCE_CELL_DECIMALS,
+    max_cached_cells=DISTANCE_CACHE_MAX_CELLS,
+)
@@ -1,6 +1,10 @@
+from itertools import groupby
+
 from sqlalchemy.orm import Session
 
 from app.repositories.driver_analytics_repo import DriverAnalyticsRepository
+from app.repositories.driver_repo import DriverRepository
+from app.services.distance_service import distance_service
 
 
 class DriverAnalyticsService:
@@ -37,4 +41,56 @@ class DriverAnalyticsService:
         return self.repo.get_driver_performance(
             organization_id,
             driver_id,
-        )
\ No newline at end of file
+        )
+
+    def get_driver_workload(
+        self,
+        organization_id: int,
+    ):
+        """
+        Open pickups per driver with the road distance and drive time from
+        the driver's last known position to each of them; all drivers'
+        matrices are fetched in one batch.
+        """
+
+        stops = {
+            driver_id: list(rows)
+            for driver_id, rows in groupby(
+                self.repo.get_open_stops(organization_id),
+                key=lambda row: row[0],
+            )
+        }
+        positions = DriverRepository(self.db).get_positions_by_users(list(stops))
+
+        located = [driver_id for driver_id in stops if driver_id in positions]
+        matrices = dict(zip(
+            located,
+            distance_service.batch([
+                (
+                    [positions[driver_id][0]],
+                    [positions[driver_id][1]],
+                    [row[1] for row in stops[driver_id]],
+                    [row[2] for row in stops[driver_id]],
+                )
+                for driver_id in located
+            ]),
+        ))
+
+        workload = []
+        for driver_id, rows in stops.items():
+            entry = {
+                "driver_id": driver_id,
+                "open_pickups": len(rows),
+                "open_weight_kg": round(sum(row[3] for row in rows), 2),
+                "nearest_stop_km": None,
+                "farthest_stop_km": None,
+                "nearest_stop_eta_minutes": None,
+            }
+            matrix = matrices.get(driver_id)
+            if matrix is not None:
+                entry["nearest_stop_km"] = round(float(matrix.distance_km.min()), 3)
+                entry["farthest_stop_km"] = round(float(matrix.distance_km.max()), 3)
+                entry["nearest_stop_eta_minutes"] = round(float(matrix.duration_min.min()), 1)
+            workload.append(entry)
+
+        return workload
@@ -1,12 +1,35 @@
-from typing import List, Optional
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional
 from uuid import UUID
 
+import numpy as np
 from sqlalchemy.orm import Session
 
 from app.models.driver import Driver, DriverLocation
 from app.repositories.driver_repo import DriverRepository
 from app.utils.enums import DriverStatus, DriverAvailabilityStatus
 from app.services.audit_service import log_event
+from app.services.distance_service import distance_service
+from app.services.driver_spatial_index import driver_spatial_index
+from app.services.zone_service import locate_zone
+from app.utils.geo import (
+    haversine,
+    simplify_polyline,
+    geohash_encode,
+    geohash_neighbors,
+)
+from app.utils.serialization import rows_to_dicts
+
+
+TRACK_BATCH_SIZE = 5000
+
+
+def _epoch(moment: datetime) -> float:
+    "location_updated_at as a Unix time; the column is UTC even where the DB driver drops the offset"
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
 
 
 class DriverService:
@@ -71,13 +94,13 @@ class DriverService:
         organization_id: UUID,
         skip: int = 0,
         limit: int = 50,
-    ) -> List[Driver]:
+    ) -> List[dict]:
 
-        return self.driver_repo.list_drivers_by_organization(
+        return rows_to_dicts(self.driver_repo.list_drivers_by_organization(
             organization_id=organization_id,
             skip=skip,
             limit=limit,
-        )
+        ))
 
     def update_driver(
         self,
@@ -101,6 +124,9 @@ class DriverService:
             updated_by,
         )
 
+        if driver.status != DriverStatus.ACTIVE:
+            driver_spatial_index.remove(driver.id)
+
         log_event(
             db=self.db,
             user_id=updated_by,
@@ -131,6 +157,8 @@ class DriverService:
             deleted_by,
         )
 
+        driver_spatial_index.remove(driver.id)
+
         log_event(
             db=self.db,
             user_id=deleted_by,
@@ -164,6 +192,22 @@ class DriverService:
             is_on_duty=is_on_duty,
         )
 
+        if (
+            is_on_duty
+            and status == DriverAvailabilityStatus.AVAILABLE
+            and availability.latitude is not None
+        ):
+            # the position keeps its own age, however recent the status change
+            driver_spatial_index.upsert(
+                organization_id,
+                driver_id,
+                availability.latitude,
+                availability.longitude,
+                _epoch(availability.location_updated_at) if availability.location_updated_at else None,
+            )
+        else:
+            driver_spatial_index.remove(driver_id)
+
         log_event(
             db=self.db,
             user_id=updated_by,
@@ -194,14 +238,36 @@ class DriverService:
         if not driver:
             raise ValueError("Driver not found")
 
+        zone_id = locate_zone(self.db, organization_id, latitude, longitude)
+
         location = DriverLocation(
             driver_id=driver_id,
             latitude=latitude,
             longitude=longitude,
             accuracy=accuracy,
+            zone_id=zone_id,
+        )
+
+        location = self.driver_repo.create_driver_location(location)
+
+        availability = self.driver_repo.update_availability_position(
+            driver_id=driver_id,
+            latitude=latitude,
+            longitude=longitude,
+            geohash=geohash_encode(latitude, longitude),
+            zone_id=zone_id,
         )
 
-        return self.driver_repo.create_driver_location(location)
+        if (
+            availability
+            and availability.is_on_duty
+            and availability.status == DriverAvailabilityStatus.AVAILABLE
+        ):
+            driver_spatial_index.upsert(organization_id, driver_id, latitude, longitude)
+        else:
+            driver_spatial_index.remove(driver_id)
+
+        return location
 
 
     def get_available_drivers(
@@ -213,3 +279,151 @@ class DriverService:
             organization_id=organization_id,
             limit=limit,
         )
+
+    def get_nearest_drivers(
+        self,
+        organization_id: int,
+        latitude: float,
+        longitude: float,
+        k: int = 5,
+    ) -> List[dict]:
+        """
+        k nearest on-duty available drivers. Served from the in-memory grid;
+        when it knows fewer than k drivers for the org (cold start, or the
+        updates landed on another worker) it falls back to the geohash
+        column, widening the cells until k drivers are found. Orgs with
+        fewer than k drivers only hit the fallback once per resync window.
+        """
+
+        nearest = driver_spatial_index.nearest(organization_id, latitude, longitude, k)
+
+        if len(nearest) < k and driver_spatial_index.needs_sync(organization_id):
+            # positions the grid would already have aged out are not loaded
+            updated_since = datetime.now(timezone.utc) - timedelta(seconds=driver_spatial_index.max_age)
+            for precision in (6, 5, 4, 3, 2):
+                rows = self.driver_repo.get_available_driver_positions(
+                    organization_id=organization_id,
+                    geohash_prefixes=geohash_neighbors(
+                        geohash_encode(latitude, longitude, precision)
+                    ),
+                    updated_since=updated_since,
+                )
+                if len(rows) >= k:
+                    break
+
+            for row in rows:
+                driver_spatial_index.upsert(organization_id, row[0], row[1], row[2], _epoch(row[3]))
+            driver_spatial_index.mark_synced(organization_id)
+
+            if rows:
+                distances = haversine(
+                    latitude,
+                    longitude,
+                    np.array([r[1] for r in rows]),
+                    np.array([r[2] for r in rows]),
+                )
+                nearest = [
+                    (rows[i][0], rows[i][1], rows[i][2], float(distances[i]))
+                    for i in np.argsort(distances)[:k]
+                ]
+
+        if not nearest:
+            return []
+
+        drivers = {
+            driver.id: driver
+            for driver in self.driver_repo.get_drivers_by_ids(
+                organization_id,
+                [driver_id for driver_id, _, _, _ in nearest],
+            )
+        }
+
+        # the road factor is uniform, so ranking on great-circle distance
+        # above gives the same order as ranking on these estimates
+        road = distance_service.matrix(
+            [r[1] for r in nearest],
+            [r[2] for r in nearest],
+            [latitude],
+            [longitude],
+        )
+
+        return [
+            {
+                "driver_id": driver_id,
+                "name": drivers[driver_id].name,
+                "mobile": drivers[driver_id].mobile,
+                "latitude": lat,
+                "longitude": lng,
+                "distance_km": round(float(road.distance_km[i, 0]), 3),
+                "eta_minutes": round(float(road.duration_min[i, 0]), 1),
+            }
+            for i, (driver_id, lat, lng, _) in enumerate(nearest)
+            if driver_id in drivers
+        ]
+
+    def stream_driver_track(
+        self,
+        driver_id: UUID,
+        start: datetime,
+        end: datetime,
+        tolerance: Optional[float] = None,
+        batch_size: int = TRACK_BATCH_SIZE,
+    ) -> Iterator[str]:
+        """
+        Streams a driver's trail between two timestamps as a JSON document.
+        Points are read in batches from a server-side cursor, optionally
+        simplified per batch (tolerance in metres) and the distance is
+        accumulated over the raw points, so memory stays bounded by the
+        batch size regardless of the shift length.
+        """
+
+        yield '{"driver_id": %s, "points": [' % json.dumps(str(driver_id))
+
+        total_km = 0.0
+        raw_count = 0
+        kept_count = 0
+        carry = None
+
+        for rows in self.driver_repo.iter_driver_locations(
+            driver_id=driver_id,
+            start=start,
+            end=end,
+            batch_size=batch_size,
+        ):
+            if carry is not None:
+                rows = [carry] + list(rows)
+                offset = 1
+            else:
+                offset = 0
+
+            lats = np.fromiter((r[0] for r in rows), dtype=float, count=len(rows))
+            lngs = np.fromiter((r[1] for r in rows), dtype=float, count=len(rows))
+
+            raw_count += len(rows) - offset
+            total_km += float(haversine(lats[:-1], lngs[:-1], lats[1:], lngs[1:]).sum())
+
+            if tolerance:
+                keep = simplify_polyline(lats, lngs, tolerance)
+            else:
+                keep = np.ones(len(rows), dtype=bool)
+
+            points = [
+                json.dumps({
+                    "lat": rows[i][0],
+                    "lng": rows[i][1],
+                    "recorded_at": rows[i][2].isoformat(),
+                })
+                for i in np.flatnonzero(keep[offset:]) + offset
+            ]
+
+            if points:
+                yield ("," if kept_count else "") + ",".join(points)
+                kept_count += len(points)
+
+            carry = rows[-1]
+
+        yield '], "point_count": %d, "raw_point_count": %d, "total_distance_km": %s}' % (
+            kept_count,
+            raw_count,
+            json.dumps(round(total_km, 3)),
+        )
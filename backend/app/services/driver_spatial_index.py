@@ -0,0 +1,192 @@
+import heapq
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from app.utils.geo import EARTH_RADIUS_KM
+
+
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+
+
+def _distance_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    p1 = math.radians(lat1)
+    p2 = math.radians(lat2)
+    a = (
+        math.sin((p2 - p1) / 2.0) ** 2
+        + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lng2 - lng1) / 2.0) ** 2
+    )
+    return 2.0 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+
+
+class _OrgGrid:
+
+    def __init__(self):
+        self.cells: Dict[Tuple[int, int], Set[UUID]] = {}
+        self.positions: Dict[UUID, Tuple[float, float, Tuple[int, int], float]] = {}
+
+
+class DriverSpatialIndex:
+    """
+    Uniform grid of on-duty, available drivers' last known positions,
+    partitioned by organization. Kept up to date from location writes and
+    availability changes; entries that stop receiving updates age out.
+    """
+
+    def __init__(
+        self,
+        cell_size_deg: float = 0.01,
+        max_age_seconds: float = 900,
+        resync_seconds: float = 60,
+    ):
+        self.cell_size = cell_size_deg
+        self.max_age = max_age_seconds
+        self.resync = resync_seconds
+        self._orgs: Dict[int, _OrgGrid] = {}
+        self._driver_org: Dict[UUID, int] = {}
+        self._synced_at: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def needs_sync(self, organization_id: int) -> bool:
+        "whether the org should be reloaded from the database"
+        return time.time() - self._synced_at.get(organization_id, 0.0) > self.resync
+
+    def mark_synced(self, organization_id: int):
+        self._synced_at[organization_id] = time.time()
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return (
+            int(math.floor(lat / self.cell_size)),
+            int(math.floor(lng / self.cell_size)),
+        )
+
+    def upsert(
+        self,
+        organization_id: int,
+        driver_id: UUID,
+        latitude: float,
+        longitude: float,
+        updated_at: Optional[float] = None,
+    ):
+        cell = self._cell(latitude, longitude)
+
+        with self._lock:
+            self._remove_locked(driver_id)
+
+            grid = self._orgs.setdefault(organization_id, _OrgGrid())
+            grid.cells.setdefault(cell, set()).add(driver_id)
+            grid.positions[driver_id] = (
+                latitude,
+                longitude,
+                cell,
+                updated_at if updated_at is not None else time.time(),
+            )
+            self._driver_org[driver_id] = organization_id
+
+    def remove(self, driver_id: UUID):
+        with self._lock:
+            self._remove_locked(driver_id)
+
+    def _remove_locked(self, driver_id: UUID):
+        organization_id = self._driver_org.pop(driver_id, None)
+        if organization_id is None:
+            return
+
+        grid = self._orgs[organization_id]
+        _, _, cell, _ = grid.positions.pop(driver_id)
+        members = grid.cells[cell]
+        members.discard(driver_id)
+        if not members:
+            del grid.cells[cell]
+        if not grid.positions:
+            del self._orgs[organization_id]
+
+    def count(self, organization_id: int) -> int:
+        grid = self._orgs.get(organization_id)
+        return len(grid.positions) if grid else 0
+
+    def nearest(
+        self,
+        organization_id: int,
+        latitude: float,
+        longitude: float,
+        k: int,
+    ) -> List[Tuple[UUID, float, float, float]]:
+        """
+        Returns up to k (driver_id, latitude, longitude, distance_km) tuples,
+        nearest first. Searches square rings of cells outward and stops once
+        the k-th best distance is closer than anything an unsearched ring
+        could contain.
+        """
+        cutoff = time.time() - self.max_age
+
+        with self._lock:
+            grid = self._orgs.get(organization_id)
+            if not grid:
+                return []
+
+            cx, cy = self._cell(latitude, longitude)
+            best: List[Tuple[float, UUID]] = []
+            ring = 0
+
+            # Lower bound on the distance to any cell outside the searched
+            # square; longitude cells shrink with cos(latitude).
+            cos_lat = max(math.cos(math.radians(min(abs(latitude) + 1.0, 89.0))), 0.01)
+            ring_km = self.cell_size * KM_PER_DEGREE * cos_lat
+
+            while True:
+                if (2 * ring + 1) ** 2 >= len(grid.cells):
+                    # cheaper to finish with every occupied cell
+                    candidates = [
+                        driver_id
+                        for cell, members in grid.cells.items()
+                        if max(abs(cell[0] - cx), abs(cell[1] - cy)) >= ring
+                        for driver_id in members
+                    ]
+                    self._push(grid, candidates, latitude, longitude, cutoff, best)
+                    break
+
+                self._push(
+                    grid,
+                    self._ring_members(grid, cx, cy, ring),
+                    latitude,
+                    longitude,
+                    cutoff,
+                    best,
+                )
+
+                if len(best) >= k and heapq.nsmallest(k, best)[-1][0] <= ring * ring_km:
+                    break
+
+                ring += 1
+
+            return [
+                (driver_id, grid.positions[driver_id][0], grid.positions[driver_id][1], dist)
+                for dist, driver_id in heapq.nsmallest(k, best)
+            ]
+
+    @staticmethod
+    def _ring_members(grid: _OrgGrid, cx: int, cy: int, ring: int):
+        if ring == 0:
+            yield from grid.cells.get((cx, cy), ())
+            return
+
+        for dx in range(-ring, ring + 1):
+            for dy in (-ring, ring):
+                yield from grid.cells.get((cx + dx, cy + dy), ())
+        for dy in range(-ring + 1, ring):
+            for dx in (-ring, ring):
+                yield from grid.cells.get((cx + dx, cy + dy), ())
+
+    @staticmethod
+    def _push(grid, candidates, latitude, longitude, cutoff, best):
+        for driver_id in candidates:
+            lat, lng, _, updated_at = grid.positions[driver_id]
+            if updated_at < cutoff:
+                continue
+            best.append((_distance_km(latitude, longitude, lat, lng), driver_id))
+
+
+driver_spatial_index = DriverSpatialIndex()
@@ -0,0 +1,130 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import MANIFEST_CACHE_MAX_ENTRIES, MANIFEST_CACHE_TTL_SECONDS
+from app.models.pickup import PickupStatus
+from app.repositories.pickup_repo import PickupRepository
+from app.utils.serialization import rows_to_dicts
+
+
+OPEN_STATUSES = (PickupStatus.ASSIGNED, PickupStatus.IN_PROGRESS)
+
+ManifestKey = Tuple[int, date]
+
+
+class DriverManifestCache:
+    """
+    Built manifests per (driver, day). An entry is dropped after
+    ttl_seconds, when this process gives the driver a new assignment, or
+    when it changes any pickup on the manifest. The TTL bounds how long
+    another worker's changes take to show up here.
+    """
+
+    def __init__(self, ttl_seconds: float = 30, max_entries: int = 4096):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[ManifestKey, tuple]" = OrderedDict()
+        # pickup id -> manifests listing it
+        self._by_pickup: Dict[int, Set[ManifestKey]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, driver_id: int, day: date) -> Optional[dict]:
+        key = (driver_id, day)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] >= self.ttl:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, driver_id: int, day: date, manifest: dict):
+        key = (driver_id, day)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (time.monotonic(), manifest)
+            for stop in manifest["stops"]:
+                self._by_pickup.setdefault(stop["pickup_id"], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_driver(self, driver_id: int):
+        "every day of the driver's, e.g. after a new assignment"
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == driver_id]:
+                self._drop(key)
+
+    def invalidate_pickups(self, pickup_ids: Iterable[int]):
+        "every manifest listing one of the pickups"
+        with self._lock:
+            for pickup_id in pickup_ids:
+                for key in list(self._by_pickup.get(pickup_id, ())):
+                    self._drop(key)
+
+    def _drop(self, key: ManifestKey):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for stop in entry[1]["stops"]:
+            keys = self._by_pickup.get(stop["pickup_id"])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_pickup[stop["pickup_id"]]
+
+
+driver_manifest_cache = DriverManifestCache(MANIFEST_CACHE_TTL_SECONDS, MANIFEST_CACHE_MAX_ENTRIES)
+
+
+class ManifestService:
+
+    @staticmethod
+    def get_manifest(db: Session, driver_id: int, day: Optional[date] = None) -> dict:
+        """
+        The driver's stops for `day` (UTC, default today) in visiting order
+        by scheduled time, each with its pickup details and the driver's
+        assignment, plus summary totals. Built from one query and cached
+        in driver_manifest_cache.
+        """
+        day = day or datetime.utcnow().date()
+        manifest = driver_manifest_cache.get(driver_id, day)
+        if manifest is not None:
+            return {**manifest, "cached": True}
+
+        day_start = datetime(day.year, day.month, day.day)
+        rows = rows_to_dicts(
+            PickupRepository.get_driver_manifest(db, driver_id, day_start, day_start + timedelta(days=1))
+        )
+        stops = [
+            {"sequence": sequence, "pickup_id": row.pop("id"), **row}
+            for sequence, row in enumerate(rows, start=1)
+        ]
+        manifest = {
+            "driver_id": driver_id,
+            "date": day,
+            "stops": stops,
+            "summary": ManifestService._summarize(stops),
+        }
+        driver_manifest_cache.put(driver_id, day, manifest)
+        return {**manifest, "cached": False}
+
+    @staticmethod
+    def _summarize(stops: list) -> dict:
+        completed = [s for s in stops if s["status"] == PickupStatus.COMPLETED]
+        planned = [s for s in stops if s["status"] != PickupStatus.CANCELLED]
+        return {
+            "total_stops": len(stops),
+            "open_stops": sum(1 for s in stops if s["status"] in OPEN_STATUSES),
+            "completed_stops": len(completed),
+            "cancelled_stops": len(stops) - len(planned),
+            "overdue_stops": sum(1 for s in stops if s["overdue_at"] is not None and s["status"] in OPEN_STATUSES),
+            "planned_weight_kg": round(sum(s["waste_weight"] for s in planned), 3),
+            "collected_weight_kg": round(sum(s["waste_weight"] for s in completed), 3),
+        }
@@ -1,10 +1,16 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from uuid import UUID
+from uuid import UUID, uuid5
 from datetime import datetime, timezone
 
+from app.core.database import SessionLocal
 from app.models.notification import Notification
-from app.utils.enums import NotificationStatus
+from app.models.pickup import Pickup
+from app.services.outbox_service import OutboxMessage, outbox_subscriber
+from app.utils.enums import NotificationStatus, NotificationType
+
+# namespace for the ids of notifications written from outbox events
+OUTBOX_NOTIFICATIONS = UUID("5b0f3c1e-7d2a-4e8b-9c61-2f4a8d7e3b90")
 
 
 class NotificationService:
@@ -102,3 +108,39 @@ class NotificationService:
             .order_by(Notification.created_at.desc())
             .all()
         )
+
+
+@outbox_subscriber("pickup.assigned")
+def notify_assigned_driver(message: OutboxMessage):
+    """
+    Tells the driver a pickup was assigned to them, whether by hand or by
+    auto-assign. Status changes that name no driver are skipped. The
+    notification id is derived from the event's, so a redelivered event
+    finds its notification already written.
+    """
+    driver_id = message.payload.get("driver_id")
+    if driver_id is None:
+        return
+
+    db = SessionLocal()
+    try:
+        notification_id = uuid5(OUTBOX_NOTIFICATIONS, str(message.id))
+        pickup = db.get(Pickup, message.aggregate_id)
+        if pickup is None or db.get(Notification, notification_id) is not None:
+            return
+
+        when = f" for {pickup.scheduled_at:%Y-%m-%d %H:%M} UTC" if pickup.scheduled_at else ""
+        db.add(
+            Notification(
+                id=notification_id,
+                organization_id=pickup.organization_id,
+                user_id=driver_id,
+                title="New pickup assigned",
+                message=f"Pickup #{pickup.id} at {pickup.address} has been assigned to you{when}.",
+                type=NotificationType.DRIVER_ASSIGNED,
+                entity_type="pickup",
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,232 @@
+import fnmatch
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_POLL_SECONDS,
+    OUTBOX_RETENTION_HOURS,
+)
+from app.core.database import SessionLocal
+from app.repositories.outbox_repo import OutboxRepository
+from app.utils.enums import OutboxStatus
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OutboxMessage:
+    "what subscribers receive; detached from any session"
+    id: int
+    event_type: str
+    aggregate_type: str
+    aggregate_id: int
+    organization_id: Optional[int]
+    payload: dict
+    created_at: datetime
+
+
+# event type pattern ("pickup.created", "pickup.*", "*") -> subscribers
+OutboxSubscriber = Callable[[OutboxMessage], None]
+_subscribers: Dict[str, List[OutboxSubscriber]] = {}
+
+
+def outbox_subscriber(*patterns: str):
+    """
+    Registers a function to receive events whose type matches any of the
+    glob patterns. Delivery is at least once: an event is retried while
+    any of its subscribers fails, so subscribers must tolerate repeats.
+    """
+    def register(func: OutboxSubscriber) -> OutboxSubscriber:
+        for pattern in patterns:
+            _subscribers.setdefault(pattern, []).append(func)
+        return func
+    return register
+
+
+def _subscribers_for(event_type: str) -> List[OutboxSubscriber]:
+    return [
+        func
+        for pattern, funcs in _subscribers.items()
+        if fnmatch.fnmatchcase(event_type, pattern)
+        for func in funcs
+    ]
+
+
+def emit_event(
+    db: Session,
+    event_type: str,
+    aggregate_type: str,
+    aggregate_id: int,
+    organization_id: Optional[int] = None,
+    payload: Optional[dict] = None,
+):
+    "writes an event in the caller's transaction; it is delivered only if that commits"
+    emit_events(db, [{
+        "event_type": event_type,
+        "aggregate_type": aggregate_type,
+        "aggregate_id": aggregate_id,
+        "organization_id": organization_id,
+        "payload": payload or {},
+    }])
+
+
+def emit_pickup_event(db: Session, event_type: str, pickup, **payload):
+    "emit_event for a pickup (ORM object or RETURNING row), carrying its current status"
+    emit_event(
+        db, event_type, "pickup", pickup.id, pickup.organization_id,
+        {"status": pickup.status.value, **payload},
+    )
+
+
+def emit_events(db: Session, events: List[dict]):
+    if not events:
+        return
+    OutboxRepository(db).add_events(events)
+    # lets the after-commit hook wake the dispatcher
+    db.info["outbox_dirty"] = True
+
+
+class OutboxDispatcher:
+    """
+    Delivers committed outbox events to the subscribers registered in
+    this process. Each step claims a batch with FOR UPDATE SKIP LOCKED,
+    calls the subscribers and records the outcome in the same
+    transaction, so a crash mid-batch leaves the events to be claimed
+    again. Failed events are retried with backoff up to max_attempts.
+
+    A commit in this process that wrote events wakes the dispatcher at
+    once; events from other workers are picked up within poll_seconds.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        poll_seconds: float = 2.0,
+        batch_size: int = 100,
+        max_attempts: int = 8,
+        retention_hours: float = 72.0,
+    ):
+        self.session_factory = session_factory
+        self.poll = poll_seconds
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retention = timedelta(hours=retention_hours)
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._next_purge = 0.0
+
+    def start(self):
+        "no-op while nothing in this process subscribes; events then wait in the table"
+        if self._thread and self._thread.is_alive():
+            return
+        if not _subscribers:
+            logger.warning("outbox dispatcher not started: no subscribers are registered")
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="outbox-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def notify(self):
+        "new events were committed"
+        self._wake.set()
+
+    def run_once(self) -> int:
+        "delivers one batch and returns how many events it claimed"
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            events = OutboxRepository(db).claim_batch(self.batch_size, now)
+            for outbox_event in events:
+                self._deliver(outbox_event, now)
+            db.commit()
+            return len(events)
+        finally:
+            db.close()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                while self.run_once() >= self.batch_size and not self._stop.is_set():
+                    pass
+                self._purge()
+            except Exception:
+                logger.exception("outbox dispatch step failed")
+            self._wake.wait(self.poll)
+            self._wake.clear()
+
+    def _deliver(self, outbox_event, now: datetime):
+        message = OutboxMessage(
+            id=outbox_event.id,
+            event_type=outbox_event.event_type,
+            aggregate_type=outbox_event.aggregate_type,
+            aggregate_id=outbox_event.aggregate_id,
+            organization_id=outbox_event.organization_id,
+            payload=outbox_event.payload or {},
+            created_at=outbox_event.created_at,
+        )
+        outbox_event.attempts += 1
+        try:
+            for subscriber in _subscribers_for(message.event_type):
+                subscriber(message)
+        except Exception as exc:
+            logger.exception("outbox event %s (%s) failed", message.id, message.event_type)
+            outbox_event.last_error = str(exc)
+            if outbox_event.attempts >= self.max_attempts:
+                outbox_event.status = OutboxStatus.FAILED
+                outbox_event.processed_at = now
+            else:
+                # exponential backoff from 5 s, capped at ten minutes
+                outbox_event.available_at = now + timedelta(seconds=min(5 * 2 ** (outbox_event.attempts - 1), 600))
+            return
+
+        outbox_event.status = OutboxStatus.DONE
+        outbox_event.processed_at = now
+
+    def _purge(self):
+        if time.monotonic() < self._next_purge:
+            return
+        self._next_purge = time.monotonic() + 3600
+        db = self.session_factory()
+        try:
+            OutboxRepository(db).purge_processed(datetime.utcnow() - self.retention)
+            db.commit()
+        finally:
+            db.close()
+
+
+outbox_dispatcher = OutboxDispatcher(
+    poll_seconds=OUTBOX_POLL_SECONDS,
+    batch_size=OUTBOX_BATCH_SIZE,
+    max_attempts=OUTBOX_MAX_ATTEMPTS,
+    retention_hours=OUTBOX_RETENTION_HOURS,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_dispatcher(session: Session):
+    if session.info.pop("outbox_dirty", False):
+        outbox_dispatcher.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_events(session: Session):
+    session.info.pop("outbox_dirty", None)
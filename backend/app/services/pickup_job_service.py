@@ -0,0 +1,166 @@
+from datetime import timedelta
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    PICKUP_AUTO_ASSIGN_LEAD_MINUTES,
+    PICKUP_OVERDUE_GRACE_MINUTES,
+    PICKUP_REMINDER_LEAD_MINUTES,
+)
+from app.models.notification import Notification
+from app.models.pickup import ACTIVE_STATUSES, Pickup, PickupStatus
+from app.models.pickup_assignment import AssignmentStatus
+from app.models.scheduled_job import ScheduledJob
+from app.repositories.notification_repo import NotificationRepository
+from app.repositories.pickup_repo import PickupRepository
+from app.repositories.scheduled_job_repo import ScheduledJobRepository
+from app.services.assignment_service import AssignmentService
+from app.services.audit_service import log_event
+from app.services.manifest_service import driver_manifest_cache
+from app.services.outbox_service import emit_pickup_event
+from app.services.scheduler_service import cancel_jobs, job_handler, schedule_jobs
+from app.utils.enums import NotificationType
+
+
+PICKUP_JOB_AUTO_ASSIGN = "pickup.auto_assign"
+PICKUP_JOB_REMIND_DRIVER = "pickup.remind_driver"
+PICKUP_JOB_MARK_OVERDUE = "pickup.mark_overdue"
+
+# job type -> minutes relative to scheduled_at
+PICKUP_JOB_OFFSETS = {
+    PICKUP_JOB_AUTO_ASSIGN: -PICKUP_AUTO_ASSIGN_LEAD_MINUTES,
+    PICKUP_JOB_REMIND_DRIVER: -PICKUP_REMINDER_LEAD_MINUTES,
+    PICKUP_JOB_MARK_OVERDUE: PICKUP_OVERDUE_GRACE_MINUTES,
+}
+
+
+def schedule_pickup_jobs(db: Session, pickup: Pickup, created_by: Optional[int]) -> list:
+    """
+    Arms (or moves) the automation for a scheduled pickup in the caller's
+    transaction. Returns (job_id, run_at) pairs for job_scheduler.watch
+    after commit; an unscheduled pickup gets no jobs.
+    """
+    if pickup.scheduled_at is None:
+        return []
+
+    # read back the stored value so handlers compare like with like even
+    # when the request carried a timezone
+    db.flush()
+    db.refresh(pickup, attribute_names=["scheduled_at"])
+
+    return schedule_jobs_for_pickups(
+        db, [(pickup.id, pickup.organization_id, pickup.scheduled_at)], created_by
+    )
+
+
+def schedule_jobs_for_pickups(db: Session, pickups: list, created_by: Optional[int]) -> list:
+    """
+    Same as schedule_pickup_jobs for many (pickup_id, organization_id,
+    scheduled_at) rows at once, with scheduled_at exactly as stored.
+    """
+    return schedule_jobs(db, [
+        {
+            "job_type": job_type,
+            "dedupe_key": f"pickup:{pickup_id}:{job_type}",
+            "organization_id": organization_id,
+            "entity_type": "pickup",
+            "entity_id": pickup_id,
+            "payload": {"scheduled_at": scheduled_at.isoformat()},
+            "run_at": scheduled_at + timedelta(minutes=offset),
+            "created_by": created_by,
+        }
+        for pickup_id, organization_id, scheduled_at in pickups
+        if scheduled_at is not None
+        for job_type, offset in PICKUP_JOB_OFFSETS.items()
+    ])
+
+
+def cancel_pickup_jobs(db: Session, pickup_id: int) -> List[int]:
+    "for pickups that were cancelled or completed; unwatch the ids after commit"
+    return cancel_jobs(db, "pickup", pickup_id, list(PICKUP_JOB_OFFSETS))
+
+
+def cancel_jobs_for_pickups(db: Session, pickup_ids: List[int]) -> List[int]:
+    "cancel_pickup_jobs for many pickups in one statement"
+    return ScheduledJobRepository(db).cancel_pending_many("pickup", pickup_ids, list(PICKUP_JOB_OFFSETS))
+
+
+def _current_pickup(db: Session, job: ScheduledJob) -> Optional[Pickup]:
+    "the job's pickup, or None when it is gone or was rescheduled past this job"
+    pickup = db.get(Pickup, job.entity_id)
+    if pickup is None or pickup.scheduled_at is None:
+        return None
+    if (job.payload or {}).get("scheduled_at") != pickup.scheduled_at.isoformat():
+        return None
+    return pickup
+
+
+@job_handler(PICKUP_JOB_AUTO_ASSIGN)
+def run_auto_assign(db: Session, job: ScheduledJob):
+    pickup = _current_pickup(db, job)
+    if pickup is None or pickup.status != PickupStatus.PENDING:
+        return
+    if job.created_by is None:
+        raise ValueError("Scheduled auto-assign needs the user who scheduled the pickup")
+
+    result = AssignmentService(db).auto_assign(
+        organization_id=pickup.organization_id,
+        assigned_by=job.created_by,
+        pickup_ids=[pickup.id],
+    )
+    if not result["assigned"]:
+        # retried with backoff; the overdue check still fires if nobody comes free
+        raise RuntimeError("No available driver could take the pickup")
+
+
+@job_handler(PICKUP_JOB_REMIND_DRIVER)
+def run_driver_reminder(db: Session, job: ScheduledJob):
+    pickup = _current_pickup(db, job)
+    if pickup is None or pickup.status not in (PickupStatus.ASSIGNED, PickupStatus.IN_PROGRESS):
+        return
+
+    repo = NotificationRepository(db)
+    for assignment in pickup.assignments:
+        if assignment.status not in (AssignmentStatus.ASSIGNED, AssignmentStatus.ACCEPTED):
+            continue
+        repo.create_notification(
+            Notification(
+                organization_id=pickup.organization_id,
+                user_id=assignment.driver_id,
+                title="Upcoming pickup",
+                message=f"Pickup #{pickup.id} at {pickup.address} is scheduled for {pickup.scheduled_at:%Y-%m-%d %H:%M} UTC.",
+                type=NotificationType.PICKUP_REMINDER,
+                entity_type="pickup",
+            )
+        )
+    db.commit()
+
+
+@job_handler(PICKUP_JOB_MARK_OVERDUE)
+def run_mark_overdue(db: Session, job: ScheduledJob):
+    pickup = _current_pickup(db, job)
+    if pickup is None:
+        return
+
+    if not PickupRepository.mark_overdue(db, pickup.id, list(ACTIVE_STATUSES)):
+        return
+    emit_pickup_event(db, "pickup.overdue", pickup, scheduled_at=pickup.scheduled_at.isoformat())
+
+    if job.created_by is None:
+        db.commit()
+    else:
+        # log_event commits the flag with the audit entry
+        log_event(
+            db=db,
+            user_id=job.created_by,
+            action="PICKUP_OVERDUE",
+            org_id=pickup.organization_id,
+            metadata={
+                "entity_type": "pickup",
+                "pickup_id": pickup.id,
+                "scheduled_at": pickup.scheduled_at.isoformat(),
+                "status": pickup.status.value,
+            },
+        )
+    driver_manifest_cache.invalidate_pickups([pickup.id])
@@ -0,0 +1,222 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.models.pickup import PickupStatus
+from app.repositories.pickup_repo import PickupRepository
+from app.services.audit_service import log_event
+from app.services.manifest_service import driver_manifest_cache
+from app.services.outbox_service import emit_pickup_event
+from app.services.pickup_job_service import cancel_pickup_jobs
+from app.services.quota_service import record_usage, release_quota, usage_entry
+from app.services.scheduler_service import job_scheduler
+from app.utils.enums import UsageEventType
+
+
+@dataclass
+class TransitionContext:
+    "what a hook gets besides the updated row; hooks may add audit metadata and post-commit work"
+    user: object
+    params: dict = field(default_factory=dict)
+    metadata: dict = field(default_factory=dict)
+    after_commit: List[Callable[[], None]] = field(default_factory=list)
+
+
+# hook(db, pickup row as updated, context), run in the transition's transaction
+TransitionHook = Callable[[Session, object, TransitionContext], None]
+
+
+def refund_quota(db: Session, pickup, ctx: TransitionContext):
+    "a pickup that will not happen gives its quota back"
+    if pickup.subscription_id:
+        release_quota(db, pickup.subscription_id, 1, pickup.waste_weight)
+        record_usage(db, [usage_entry(
+            UsageEventType.PICKUP_CANCELLED, pickup.id, pickup.organization_id, pickup.subscription_id, pickup.waste_weight
+        )])
+
+
+def record_completion(db: Session, pickup, ctx: TransitionContext):
+    "completion uses no further quota but belongs in the usage history"
+    record_usage(db, [usage_entry(
+        UsageEventType.PICKUP_COMPLETED, pickup.id, pickup.organization_id, pickup.subscription_id, pickup.waste_weight
+    )])
+
+
+def cancel_jobs(db: Session, pickup, ctx: TransitionContext):
+    "a closed pickup needs no reminders, auto-assignment or overdue checks"
+    job_ids = cancel_pickup_jobs(db, pickup.id)
+    if job_ids:
+        ctx.after_commit.append(lambda: job_scheduler.unwatch(job_ids))
+
+
+def drop_assignment(db: Session, pickup, ctx: TransitionContext):
+    "the rejecting driver lets go of the pickup"
+    PickupRepository.remove_assignment(db, pickup.id, ctx.user.id)
+
+
+@dataclass(frozen=True)
+class PickupTransition:
+    sources: FrozenSet[PickupStatus]
+    target: PickupStatus
+    # error for a pickup in any other status; {status} is its current one
+    invalid: str
+    # outbox event written with the change
+    event: str
+    # the acting user must hold an assignment on the pickup
+    assigned_only: bool = False
+    # columns set to the transition time
+    stamps: Tuple[str, ...] = ()
+    audit_action: Optional[str] = None
+    hooks: Tuple[TransitionHook, ...] = ()
+
+
+_CLOSING = (refund_quota, cancel_jobs)
+
+PICKUP_TRANSITIONS: Dict[str, PickupTransition] = {
+    # driver and customer workflow
+    "cancel": PickupTransition(
+        sources=frozenset({PickupStatus.PENDING, PickupStatus.ASSIGNED}),
+        target=PickupStatus.CANCELLED,
+        invalid="Only PENDING or ASSIGNED pickups can be cancelled",
+        event="pickup.cancelled",
+        audit_action="CANCEL",
+        hooks=_CLOSING,
+    ),
+    "accept": PickupTransition(
+        sources=frozenset({PickupStatus.ASSIGNED}),
+        target=PickupStatus.IN_PROGRESS,
+        invalid="Only ASSIGNED pickups can be accepted",
+        event="pickup.started",
+        assigned_only=True,
+        audit_action="ACCEPT_PICKUP",
+    ),
+    "reject": PickupTransition(
+        sources=frozenset({PickupStatus.ASSIGNED}),
+        target=PickupStatus.PENDING,
+        invalid="Only ASSIGNED pickups can be rejected",
+        event="pickup.rejected",
+        assigned_only=True,
+        audit_action="REJECT_PICKUP",
+        hooks=(drop_assignment,),
+    ),
+    "complete": PickupTransition(
+        sources=frozenset({PickupStatus.IN_PROGRESS}),
+        target=PickupStatus.COMPLETED,
+        invalid="Only IN_PROGRESS pickups can be completed",
+        event="pickup.completed",
+        assigned_only=True,
+        stamps=("completed_at",),
+        audit_action="COMPLETE_PICKUP",
+        hooks=(record_completion, cancel_jobs),
+    ),
+
+    # direct status changes through PATCH /pickups/{id}/status
+    "set_assigned": PickupTransition(
+        sources=frozenset({PickupStatus.PENDING}),
+        target=PickupStatus.ASSIGNED,
+        invalid="Invalid transition from {status} to ASSIGNED",
+        event="pickup.assigned",
+    ),
+    "set_in_progress": PickupTransition(
+        sources=frozenset({PickupStatus.ASSIGNED}),
+        target=PickupStatus.IN_PROGRESS,
+        invalid="Invalid transition from {status} to IN_PROGRESS",
+        event="pickup.started",
+        assigned_only=True,
+    ),
+    "set_completed": PickupTransition(
+        sources=frozenset({PickupStatus.IN_PROGRESS}),
+        target=PickupStatus.COMPLETED,
+        invalid="Invalid transition from {status} to COMPLETED",
+        event="pickup.completed",
+        assigned_only=True,
+        stamps=("completed_at",),
+        hooks=(record_completion, cancel_jobs),
+    ),
+    "set_cancelled": PickupTransition(
+        sources=frozenset({PickupStatus.PENDING, PickupStatus.ASSIGNED, PickupStatus.IN_PROGRESS}),
+        target=PickupStatus.CANCELLED,
+        invalid="Invalid transition from {status} to CANCELLED",
+        event="pickup.cancelled",
+        hooks=_CLOSING,
+    ),
+}
+
+# PATCH /pickups/{id}/status target -> transition
+STATUS_TRANSITIONS: Dict[PickupStatus, str] = {
+    PickupStatus.ASSIGNED: "set_assigned",
+    PickupStatus.IN_PROGRESS: "set_in_progress",
+    PickupStatus.COMPLETED: "set_completed",
+    PickupStatus.CANCELLED: "set_cancelled",
+}
+
+
+def apply_transition(
+    db: Session,
+    name: str,
+    pickup_id: int,
+    user,
+    params: Optional[dict] = None,
+    values: Optional[dict] = None,
+    check_assignment: bool = True,
+):
+    """
+    Moves a pickup along PICKUP_TRANSITIONS[name] with one conditional
+    UPDATE ... RETURNING, runs the transition's hooks and audit entry in
+    the same transaction and commits. `values` are extra columns to set,
+    `params` go to the hooks and the audit metadata. Returns the updated
+    row; a pickup that is missing, in the wrong status or not assigned to
+    the user raises the matching HTTPException without changing anything.
+    """
+    transition = PICKUP_TRANSITIONS[name]
+    driver_id = user.id if transition.assigned_only and check_assignment else None
+
+    now = datetime.utcnow()
+    changes = {column: now for column in transition.stamps}
+    changes.update(values or {})
+    pickup = PickupRepository.transition_status(
+        db, pickup_id, transition.sources, transition.target, changes, driver_id=driver_id
+    )
+    if pickup is None:
+        db.rollback()
+        _raise_rejected(db, transition, pickup_id, driver_id)
+
+    ctx = TransitionContext(user=user, params=dict(params or {}))
+    for hook in transition.hooks:
+        hook(db, pickup, ctx)
+    emit_pickup_event(db, transition.event, pickup, transition=name, actor_id=user.id, **ctx.params)
+
+    if transition.audit_action:
+        # log_event commits the transition with its audit entry
+        log_event(
+            db=db,
+            user_id=user.id,
+            action=transition.audit_action,
+            org_id=pickup.organization_id,
+            metadata={"entity_type": "pickup", "pickup_id": pickup.id, **ctx.params, **ctx.metadata},
+        )
+    else:
+        db.commit()
+
+    driver_manifest_cache.invalidate_pickups([pickup.id])
+    for callback in ctx.after_commit:
+        callback()
+    return pickup
+
+
+def _raise_rejected(db: Session, transition: PickupTransition, pickup_id: int, driver_id: Optional[int]):
+    "works out why the conditional UPDATE matched nothing"
+    state = PickupRepository.get_status_and_assignment(db, pickup_id, driver_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Pickup not found")
+
+    current, assigned = state
+    if current not in transition.sources:
+        raise HTTPException(status_code=400, detail=transition.invalid.format(status=current.value))
+    if driver_id is not None and not assigned:
+        raise HTTPException(status_code=403, detail="You are not assigned to this pickup")
+    # it changed between the UPDATE and this read
+    raise HTTPException(status_code=409, detail="Pickup was changed concurrently, please retry")
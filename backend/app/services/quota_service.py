@@ -0,0 +1,346 @@
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    QUOTA_LEASE_ENABLED,
+    QUOTA_LEASE_PICKUPS,
+    QUOTA_LEASE_TTL_SECONDS,
+    QUOTA_LEASE_WEIGHT_KG,
+    USAGE_LEDGER_ENABLED,
+    USAGE_LEDGER_LOCK_MARGIN,
+)
+from app.core.database import SessionLocal
+from app.repositories.quota_lease_repo import QuotaLeaseRepository
+from app.repositories.subscription_repo import SubscriptionRepository
+from app.repositories.usage_event_repo import UsageEventRepository
+from app.utils.enums import UsageEventType
+
+
+logger = logging.getLogger(__name__)
+
+
+class QuotaLeaseManager:
+    """
+    Serves pickup quota from blocks this process leases off a
+    subscription's usage row, so a burst of pickups for one organization
+    touches the shared row once per block instead of once per pickup.
+
+    The usage row counts a block as used the moment it is leased, so the
+    plan limits hold across every worker. Pickups draw on the lease row in
+    their own transaction, which keeps the lease exact even if the
+    transaction rolls back. Unused allowance returns to the usage row when
+    the lease is replaced, released at shutdown, or - for a worker that
+    died - reclaimed by the next worker that runs short once it expired.
+
+    A lease is renewed in a short transaction of its own, by one thread
+    per subscription at a time; the process-wide lock only guards the
+    in-memory mirrors and is never held across database I/O. Requests
+    fall back to reserving on the usage row directly, in the caller's
+    transaction, when:
+    - they are larger than a block, or a plan limit is smaller than one;
+    - another thread is renewing the subscription's lease;
+    - the caller's transaction already holds the subscription's usage or
+      lease row, which the renewal would wait on until that transaction
+      ends;
+    - the subscription could not spare a whole block at the last attempt,
+      which is retried once the lease TTL has passed.
+    Near a limit a pickup can therefore be refused while another worker
+    still holds unused allowance, for at most the lease TTL.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        block_pickups: int = 20,
+        block_weight: float = 200.0,
+        ttl_seconds: float = 30.0,
+        holder: Optional[str] = None,
+    ):
+        self.session_factory = session_factory
+        self.block_pickups = block_pickups
+        self.block_weight = block_weight
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}"[:100]
+
+        # subscription_id -> [lease id, pickups left, weight left, expires_at];
+        # the figures mirror the lease row so a dry lease is renewed before
+        # the caller's transaction writes anything
+        self._leases: Dict[int, list] = {}
+        # subscription_id -> held while a thread renews its lease
+        self._renewing: Dict[int, threading.Lock] = {}
+        # subscription_id -> when a refused renewal may be tried again
+        self._refused: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+
+    def reserve(
+        self,
+        db: Session,
+        subscription_id: int,
+        pickups: int,
+        weight: float,
+        pickup_limit: int,
+        weight_limit: float,
+    ) -> bool:
+        "takes quota in the caller's transaction; False when a plan limit would be exceeded"
+        if self._leasable(pickups, weight, pickup_limit, weight_limit):
+            lease_id = self._take(subscription_id, pickups, weight)
+            if lease_id is None and not _holds_quota_rows(db, subscription_id):
+                lease_id = self._renew(subscription_id, pickups, weight, pickup_limit, weight_limit)
+            if lease_id is not None and QuotaLeaseRepository.consume(db, lease_id, pickups, weight, datetime.utcnow()):
+                _hold_quota_rows(db, subscription_id)
+                return True
+
+        reserved = SubscriptionRepository.reserve_usage(
+            db, subscription_id, pickups, weight, pickup_limit, weight_limit
+        )
+        _hold_quota_rows(db, subscription_id)
+        return reserved is not None
+
+    def release(self, db: Session, subscription_id: int, pickups: int, weight: float):
+        "returns a cancelled pickup's quota in the caller's transaction"
+        lease = self._leases.get(subscription_id)
+        if lease is not None and QuotaLeaseRepository.credit(db, lease[0], pickups, weight, datetime.utcnow()):
+            with self._lock:
+                if self._leases.get(subscription_id) is lease:
+                    lease[1] += pickups
+                    lease[2] += weight
+        else:
+            SubscriptionRepository.release_usage(db, subscription_id, pickups, weight)
+        _hold_quota_rows(db, subscription_id)
+
+    def release_all(self):
+        "hands every lease this process holds back to its usage row, e.g. at shutdown"
+        with self._lock:
+            leases, self._leases = self._leases, {}
+        if not leases:
+            return
+        db = self.session_factory()
+        try:
+            for lease in leases.values():
+                self._return(db, QuotaLeaseRepository.delete_lease(db, lease[0]))
+            db.commit()
+        finally:
+            db.close()
+
+    def _leasable(self, pickups: int, weight: float, pickup_limit: int, weight_limit: float) -> bool:
+        "whether a block could ever serve the request under the plan's limits (0 = unlimited)"
+        if pickups > self.block_pickups or weight > self.block_weight:
+            return False
+        if 0 < pickup_limit < self.block_pickups or 0 < weight_limit < self.block_weight:
+            return False
+        return True
+
+    def _take(self, subscription_id: int, pickups: int, weight: float) -> Optional[int]:
+        with self._lock:
+            return self._take_locked(subscription_id, pickups, weight)
+
+    def _take_locked(self, subscription_id: int, pickups: int, weight: float) -> Optional[int]:
+        "id of the lease to draw on once its mirror is charged, or None when it is dry or expired"
+        lease = self._leases.get(subscription_id)
+        if lease is None or lease[3] <= datetime.utcnow():
+            return None
+        if lease[1] < pickups or lease[2] < weight:
+            return None
+        lease[1] -= pickups
+        lease[2] -= weight
+        return lease[0]
+
+    def _renew(
+        self,
+        subscription_id: int,
+        pickups: int,
+        weight: float,
+        pickup_limit: int,
+        weight_limit: float,
+    ) -> Optional[int]:
+        """
+        Swaps the exhausted lease for a fresh block in a short transaction of
+        its own and charges the request to it. Returns the lease to draw on,
+        or None when another thread is already renewing it or the
+        subscription cannot spare a whole block.
+        """
+        with self._lock:
+            renewing = self._renewing.setdefault(subscription_id, threading.Lock())
+        if not renewing.acquire(blocking=False):
+            return None
+        try:
+            now = datetime.utcnow()
+            with self._lock:
+                # another thread may have renewed before this one got here
+                lease_id = self._take_locked(subscription_id, pickups, weight)
+                if lease_id is not None:
+                    return lease_id
+                if self._refused.get(subscription_id, now) > now:
+                    return None
+                current = self._leases.pop(subscription_id, None)
+
+            lease_id = None
+            db = self.session_factory()
+            try:
+                if current is not None:
+                    self._return(db, QuotaLeaseRepository.delete_lease(db, current[0]))
+                # leases of workers that died; the grace covers clock skew
+                for row in QuotaLeaseRepository.delete_expired(db, subscription_id, now - self.ttl):
+                    self._return(db, row)
+
+                reserved = SubscriptionRepository.reserve_usage(
+                    db, subscription_id, self.block_pickups, self.block_weight, pickup_limit, weight_limit
+                )
+                if reserved is not None:
+                    lease_id = QuotaLeaseRepository.create_lease(
+                        db, subscription_id, self.holder, self.block_pickups, self.block_weight, now + self.ttl
+                    )
+                db.commit()
+            except Exception:
+                db.rollback()
+                logger.exception("renewing the quota lease for subscription %s failed", subscription_id)
+                return None
+            finally:
+                db.close()
+
+            with self._lock:
+                if lease_id is None:
+                    self._refused[subscription_id] = now + self.ttl
+                    return None
+                self._refused.pop(subscription_id, None)
+                self._leases[subscription_id] = [lease_id, self.block_pickups, self.block_weight, now + self.ttl]
+                return self._take_locked(subscription_id, pickups, weight)
+        finally:
+            renewing.release()
+
+    @staticmethod
+    def _return(db: Session, row: Optional[tuple]):
+        if row is None:
+            return
+        subscription_id, pickups, weight = row
+        if pickups or weight:
+            SubscriptionRepository.release_usage(db, subscription_id, pickups, weight)
+
+
+def _hold_quota_rows(db: Session, subscription_id: int):
+    "notes that the caller's transaction has written the subscription's usage or lease row"
+    held = db.info.get("quota_rows_held")
+    transaction = db.get_transaction()
+    if held is None or held[0] is not transaction:
+        held = db.info["quota_rows_held"] = (transaction, set())
+    held[1].add(subscription_id)
+
+
+def _holds_quota_rows(db: Session, subscription_id: int) -> bool:
+    "whether the caller's current transaction has written the subscription's usage or lease row"
+    held = db.info.get("quota_rows_held")
+    return held is not None and held[0] is db.get_transaction() and subscription_id in held[1]
+
+
+quota_leases = QuotaLeaseManager(
+    block_pickups=QUOTA_LEASE_PICKUPS,
+    block_weight=QUOTA_LEASE_WEIGHT_KG,
+    ttl_seconds=QUOTA_LEASE_TTL_SECONDS,
+)
+
+
+# how each ledger entry moves the usage of its pickup
+USAGE_SIGNS = {
+    UsageEventType.PICKUP_CREATED: 1,
+    UsageEventType.PICKUP_CANCELLED: -1,
+    UsageEventType.PICKUP_WITHDRAWN: -1,
+    UsageEventType.PICKUP_COMPLETED: 0,
+}
+
+
+def reserve_quota(db: Session, sub, pickups: int, weight: float) -> bool:
+    """
+    Takes quota for new pickups from `sub` (an ActiveSubscription) in the
+    caller's transaction, through quota_leases when QUOTA_LEASE_ENABLED is
+    set. False when the plan's limits would be exceeded.
+
+    With USAGE_LEDGER_ENABLED nothing is taken here: the limits are checked
+    against the totals plus the unfolded ledger, and the PICKUP_CREATED
+    entries the caller records are the reservation. Away from the limits
+    that writes no shared row. Within USAGE_LEDGER_LOCK_MARGIN of one the
+    usage row is locked for the caller's transaction and the check is
+    repeated, so reservations that could overshoot together are made one
+    after another, each seeing the entries of those before it.
+    """
+    if USAGE_LEDGER_ENABLED:
+        used = current_usage(db, sub.id)
+        if used is None or not _within_limits(sub, used, pickups, weight, 0.0):
+            return False
+        if _within_limits(sub, used, pickups, weight, USAGE_LEDGER_LOCK_MARGIN):
+            return True
+        if not SubscriptionRepository.lock_usage(db, sub.id):
+            return False
+        # read again once the lock is held, past the entries it waited on
+        used = current_usage(db, sub.id)
+        return used is not None and _within_limits(sub, used, pickups, weight, 0.0)
+    if QUOTA_LEASE_ENABLED:
+        return quota_leases.reserve(
+            db, sub.id, pickups, weight, sub.pickup_limit, sub.waste_weight_limit
+        )
+    reserved = SubscriptionRepository.reserve_usage(
+        db, sub.id, pickups, weight, sub.pickup_limit, sub.waste_weight_limit
+    )
+    return reserved is not None
+
+
+def _within_limits(sub, used: Tuple[int, float], pickups: int, weight: float, margin: float) -> bool:
+    "whether the request fits under the limits less `margin` of each (0 = unlimited)"
+    if sub.pickup_limit > 0 and used[0] + pickups > sub.pickup_limit * (1 - margin):
+        return False
+    if sub.waste_weight_limit > 0 and used[1] + weight > sub.waste_weight_limit * (1 - margin):
+        return False
+    return True
+
+
+def release_quota(db: Session, subscription_id: int, pickups: int, weight: float):
+    "gives quota back for cancelled pickups in the caller's transaction"
+    if USAGE_LEDGER_ENABLED:
+        # the caller's PICKUP_CANCELLED / PICKUP_WITHDRAWN entries are the refund
+        return
+    if QUOTA_LEASE_ENABLED:
+        quota_leases.release(db, subscription_id, pickups, weight)
+    else:
+        SubscriptionRepository.release_usage(db, subscription_id, pickups, weight)
+
+
+def current_usage(db: Session, subscription_id: int) -> Optional[Tuple[int, float]]:
+    "(pickups, weight) used so far, unfolded ledger entries included; None without a usage row"
+    if USAGE_LEDGER_ENABLED:
+        return UsageEventRepository.current_totals(db, subscription_id)
+    usage = SubscriptionRepository.get_usage(db, subscription_id)
+    if usage is None:
+        return None
+    return usage.pickups_used, usage.waste_weight_used
+
+
+def usage_entry(event_type: UsageEventType, pickup_id: int, organization_id: int, subscription_id: int, weight: float) -> dict:
+    "the ledger entry for one pickup's create, cancel, withdrawal or completion"
+    sign = USAGE_SIGNS[event_type]
+    return {
+        "subscription_id": subscription_id,
+        "organization_id": organization_id,
+        "pickup_id": pickup_id,
+        "event_type": event_type,
+        "delta_pickups": sign,
+        "delta_weight": sign * weight,
+    }
+
+
+def record_usage(db: Session, entries: List[dict]):
+    """
+    Appends usage_entry dicts to the ledger in the caller's transaction.
+    With USAGE_LEDGER_ENABLED they are the usage change itself until the
+    compactor folds them into the totals; otherwise the totals have
+    already moved and they are written folded, as history only.
+    """
+    UsageEventRepository.append(db, [
+        {**entry, "folded": not USAGE_LEDGER_ENABLED}
+        for entry in entries
+        if entry["subscription_id"] is not None
+    ])
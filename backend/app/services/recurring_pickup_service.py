@@ -0,0 +1,317 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    RECURRING_PICKUP_BATCH_SIZE,
+    RECURRING_PICKUP_HORIZON_DAYS,
+    RECURRING_PICKUP_MAX_OCCURRENCES,
+    RECURRING_PICKUP_RUN_MINUTES,
+)
+from app.core.database import SessionLocal
+from app.models.pickup import PickupStatus
+from app.models.recurring_pickup import RecurringPickup
+from app.models.scheduled_job import ScheduledJob
+from app.repositories.pickup_repo import PickupRepository
+from app.repositories.recurring_pickup_repo import RecurringPickupRepository
+from app.services.audit_service import log_event
+from app.services.outbox_service import emit_events
+from app.services.pickup_job_service import cancel_jobs_for_pickups, schedule_jobs_for_pickups
+from app.services.quota_service import record_usage, release_quota, reserve_quota, usage_entry
+from app.services.scheduler_service import job_handler, job_scheduler, schedule_jobs
+from app.services.subscription_service import active_subscription_cache
+from app.services.zone_service import zone_index_cache
+from app.utils.enums import RecurrenceFrequency, UsageEventType
+from app.utils.recurrence import WEEKDAY_CODES, format_weekdays, occurrences, parse_weekdays
+
+
+RECURRING_JOB_MATERIALIZE = "recurring_pickups.materialize"
+
+
+def _weekday_column(codes):
+    "['TH', 'MO'] -> 'MO,TH'"
+    return format_weekdays([WEEKDAY_CODES.index(code) for code in codes or []])
+
+
+def materialize_rules(db: Session, rules: List[RecurringPickup], now: datetime) -> Tuple[List[int], list]:
+    """
+    Adds the missing occurrences of `rules` (locked rows) scheduled in
+    (now, now + RECURRING_PICKUP_HORIZON_DAYS] as pickups, in the caller's
+    transaction. Quota is reserved once per organization and every pickup
+    goes in with one multi-row INSERT.
+
+    Occurrences that already have a pickup, in any status, are left
+    alone, so a cancelled one is not brought back. An organization without
+    an active subscription or without quota for all of its rules' new
+    occurrences gets none this time; its rules record a paused_reason and
+    are retried on the next run. Returns the new pickup ids and the jobs
+    to hand to job_scheduler.watch after commit.
+    """
+    horizon = now + timedelta(days=RECURRING_PICKUP_HORIZON_DAYS)
+    existing = PickupRepository.get_recurring_occurrences(db, [rule.id for rule in rules], now)
+
+    by_org: Dict[int, List[RecurringPickup]] = {}
+    for rule in rules:
+        by_org.setdefault(rule.organization_id, []).append(rule)
+
+    pickup_rows, creators = [], []
+    for organization_id, org_rules in by_org.items():
+        sub = active_subscription_cache.get(db, organization_id)
+        if sub is None or now > sub.end_date:
+            for rule in org_rules:
+                rule.paused_reason = "No active subscription"
+            continue
+
+        # occurrences past the subscription's end wait for it to be renewed
+        until = min(horizon, sub.end_date)
+        planned = []
+        for rule in org_rules:
+            times = occurrences(
+                rule.frequency, rule.repeat_interval, rule.starts_on, rule.time_of_day,
+                after=now, until=until,
+                weekdays=parse_weekdays(rule.by_weekday), ends_on=rule.ends_on,
+                limit=RECURRING_PICKUP_MAX_OCCURRENCES,
+            )
+            # a capped run picks up after its last occurrence next time
+            reached = times[-1] if len(times) == RECURRING_PICKUP_MAX_OCCURRENCES else until
+            planned.append((rule, [t for t in times if (rule.id, t) not in existing], reached))
+
+        count = sum(len(times) for _, times, _ in planned)
+        weight = sum(rule.waste_weight * len(times) for rule, times, _ in planned)
+        if count and not reserve_quota(db, sub, count, weight):
+            for rule in org_rules:
+                rule.paused_reason = "Plan limit reached"
+            continue
+
+        zones = zone_index_cache.get(db, organization_id).locate_many(
+            [rule.latitude for rule in org_rules],
+            [rule.longitude for rule in org_rules],
+        )
+        for (rule, times, reached), zone_id in zip(planned, zones):
+            for scheduled_at in times:
+                pickup_rows.append({
+                    "organization_id": organization_id,
+                    "subscription_id": sub.id,
+                    "recurring_pickup_id": rule.id,
+                    "waste_type": rule.waste_type,
+                    "waste_weight": rule.waste_weight,
+                    "address": rule.address,
+                    "latitude": rule.latitude,
+                    "longitude": rule.longitude,
+                    "zone_id": zone_id,
+                    "status": PickupStatus.PENDING,
+                    "scheduled_at": scheduled_at,
+                })
+                creators.append(rule.created_by)
+            rule.materialized_until = reached
+            rule.paused_reason = None
+            # nothing is left after ends_on
+            if rule.ends_on is not None and rule.ends_on <= reached.date():
+                rule.is_active = False
+
+    pickup_ids = PickupRepository.bulk_create_pickups(db, pickup_rows)
+    record_usage(db, [
+        usage_entry(UsageEventType.PICKUP_CREATED, pickup_id, row["organization_id"], row["subscription_id"], row["waste_weight"])
+        for pickup_id, row in zip(pickup_ids, pickup_rows)
+    ])
+
+    # scheduled auto-assignment acts as whoever set the rule up
+    by_creator: Dict[int, list] = {}
+    for pickup_id, row, created_by in zip(pickup_ids, pickup_rows, creators):
+        by_creator.setdefault(created_by, []).append((pickup_id, row["organization_id"], row["scheduled_at"]))
+    jobs = []
+    for created_by, pickups in by_creator.items():
+        jobs += schedule_jobs_for_pickups(db, pickups, created_by)
+
+    emit_events(db, [
+        {
+            "event_type": "pickup.created",
+            "aggregate_type": "pickup",
+            "aggregate_id": pickup_id,
+            "organization_id": row["organization_id"],
+            "payload": {
+                "status": PickupStatus.PENDING.value,
+                "scheduled_at": row["scheduled_at"].isoformat(),
+                "zone_id": row["zone_id"],
+                "recurring_pickup_id": row["recurring_pickup_id"],
+            },
+        }
+        for pickup_id, row in zip(pickup_ids, pickup_rows)
+    ])
+    return pickup_ids, jobs
+
+
+def withdraw_occurrences(db: Session, rule: RecurringPickup, after: datetime) -> Tuple[List[int], List[int]]:
+    """
+    Deletes the rule's occurrences after `after` that are still PENDING
+    with no driver, giving their quota back and cancelling their jobs in
+    the caller's transaction. Returns the deleted pickup ids and the job
+    ids to unwatch after commit.
+    """
+    rows = PickupRepository.delete_unassigned_occurrences(db, rule.id, after)
+
+    refunds: Dict[int, list] = {}
+    for row in rows:
+        if row.subscription_id is not None:
+            refund = refunds.setdefault(row.subscription_id, [0, 0.0])
+            refund[0] += 1
+            refund[1] += row.waste_weight
+    for subscription_id, (count, weight) in refunds.items():
+        release_quota(db, subscription_id, count, weight)
+    record_usage(db, [
+        usage_entry(UsageEventType.PICKUP_WITHDRAWN, row.id, rule.organization_id, row.subscription_id, row.waste_weight)
+        for row in rows
+    ])
+
+    pickup_ids = [row.id for row in rows]
+    emit_events(db, [
+        {
+            "event_type": "pickup.withdrawn",
+            "aggregate_type": "pickup",
+            "aggregate_id": pickup_id,
+            "organization_id": rule.organization_id,
+            "payload": {"recurring_pickup_id": rule.id},
+        }
+        for pickup_id in pickup_ids
+    ])
+    return pickup_ids, cancel_jobs_for_pickups(db, pickup_ids)
+
+
+def schedule_recurring_run(db: Session, run_at: datetime):
+    "(re)arms the single pending materialization run and commits"
+    jobs = schedule_jobs(db, [{
+        "job_type": RECURRING_JOB_MATERIALIZE,
+        "dedupe_key": RECURRING_JOB_MATERIALIZE,
+        "run_at": run_at,
+    }])
+    db.commit()
+    job_scheduler.watch(jobs)
+
+
+def arm_recurring_pickups(session_factory=SessionLocal):
+    "makes sure a materialization run is due now, e.g. at startup"
+    db = session_factory()
+    try:
+        schedule_recurring_run(db, datetime.utcnow())
+    finally:
+        db.close()
+
+
+@job_handler(RECURRING_JOB_MATERIALIZE)
+def run_materialize_recurring(db: Session, job: ScheduledJob):
+    """
+    Tops up every active rule with less than half the horizon left, in
+    batches of locked rules with one commit each, then schedules the next
+    run.
+    """
+    now = datetime.utcnow()
+    due_before = now + timedelta(days=RECURRING_PICKUP_HORIZON_DAYS / 2)
+    repo = RecurringPickupRepository(db)
+
+    after_id = 0
+    while True:
+        rules = repo.lock_due(due_before, after_id, RECURRING_PICKUP_BATCH_SIZE)
+        if not rules:
+            break
+        after_id = rules[-1].id
+        _, jobs = materialize_rules(db, rules, now)
+        db.commit()
+        job_scheduler.watch(jobs)
+        if len(rules) < RECURRING_PICKUP_BATCH_SIZE:
+            break
+
+    schedule_recurring_run(db, now + timedelta(minutes=RECURRING_PICKUP_RUN_MINUTES))
+
+
+class RecurringPickupService:
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.repo = RecurringPickupRepository(db)
+
+    def create_rule(self, organization_id: int, data: dict, created_by: int) -> RecurringPickup:
+        """
+        Saves a recurring pickup and materializes its first occurrences in
+        the same transaction.
+        """
+        if "by_weekday" in data:
+            data["by_weekday"] = _weekday_column(data["by_weekday"])
+        rule = RecurringPickup(organization_id=organization_id, created_by=created_by, is_active=True, **data)
+        self._validate(rule)
+        self.repo.create_rule(rule)
+
+        pickup_ids, jobs = materialize_rules(self.db, [rule], datetime.utcnow())
+
+        # log_event commits the rule with its first occurrences
+        log_event(
+            db=self.db,
+            user_id=created_by,
+            action="CREATE_RECURRING_PICKUP",
+            org_id=organization_id,
+            metadata={"entity_type": "recurring_pickup", "recurring_pickup_id": rule.id, "materialized": len(pickup_ids)},
+        )
+        job_scheduler.watch(jobs)
+        return rule
+
+    def list_rules(self, organization_id: int, include_inactive: bool = False) -> List[RecurringPickup]:
+        return self.repo.list_rules(organization_id, include_inactive)
+
+    def get_rule(self, rule_id: int, organization_id: int) -> RecurringPickup:
+        rule = self.repo.get_rule(rule_id, organization_id)
+        if not rule:
+            raise HTTPException(status_code=404, detail="Recurring pickup not found")
+        return rule
+
+    def update_rule(self, rule_id: int, organization_id: int, update_data: dict, updated_by: int) -> RecurringPickup:
+        """
+        Edits (or deactivates) a rule. Only its future occurrences that are
+        still PENDING with no driver are regenerated: they are withdrawn
+        with their quota and jobs and, for an active rule, created afresh
+        from the new definition. Past, assigned and cancelled occurrences
+        stay as they are.
+        """
+        rule = self.repo.get_rule(rule_id, organization_id, for_update=True)
+        if not rule:
+            raise HTTPException(status_code=404, detail="Recurring pickup not found")
+        if not update_data:
+            return rule
+
+        if "by_weekday" in update_data:
+            update_data["by_weekday"] = _weekday_column(update_data["by_weekday"])
+        for field, value in update_data.items():
+            setattr(rule, field, value)
+        self._validate(rule)
+
+        now = datetime.utcnow()
+        withdrawn, cancelled_jobs = withdraw_occurrences(self.db, rule, now)
+        rule.materialized_until = None
+        rule.paused_reason = None
+        pickup_ids, jobs = [], []
+        if rule.is_active:
+            pickup_ids, jobs = materialize_rules(self.db, [rule], now)
+
+        log_event(
+            db=self.db,
+            user_id=updated_by,
+            action="UPDATE_RECURRING_PICKUP",
+            org_id=organization_id,
+            metadata={
+                "entity_type": "recurring_pickup",
+                "recurring_pickup_id": rule_id,
+                "fields": sorted(update_data),
+                "withdrawn": len(withdrawn),
+                "materialized": len(pickup_ids),
+            },
+        )
+        job_scheduler.unwatch(cancelled_jobs)
+        job_scheduler.watch(jobs)
+        return rule
+
+    @staticmethod
+    def _validate(rule: RecurringPickup):
+        if rule.by_weekday and rule.frequency != RecurrenceFrequency.WEEKLY:
+            raise HTTPException(status_code=400, detail="by_weekday only applies to WEEKLY recurrences")
+        if rule.ends_on is not None and rule.ends_on < rule.starts_on:
+            raise HTTPException(status_code=400, detail="ends_on must not be before starts_on")
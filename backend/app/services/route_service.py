@@ -0,0 +1,161 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    ROUTE_SERVICE_MINUTES,
+    ROUTE_WINDOW_MINUTES,
+)
+from app.repositories.driver_repo import DriverRepository
+from app.repositories.pickup_repo import PickupRepository
+from app.services.distance_service import distance_service
+from app.utils.routing import sequence_stops, simulate
+
+
+class RouteSequenceCache:
+    """
+    Last computed stop order per driver, keyed by the driver's assignment
+    set. Any assignment, unassignment or reschedule changes the key, so
+    stale orders are never served; ETAs are always recomputed.
+    """
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, driver_id: int, signature: tuple):
+        with self._lock:
+            entry = self._entries.get(driver_id)
+            if entry is None or entry[0] != signature:
+                return None
+            self._entries.move_to_end(driver_id)
+            return entry[1]
+
+    def put(self, driver_id: int, signature: tuple, order: list):
+        with self._lock:
+            self._entries[driver_id] = (signature, order)
+            self._entries.move_to_end(driver_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, driver_id: int):
+        with self._lock:
+            self._entries.pop(driver_id, None)
+
+
+route_sequence_cache = RouteSequenceCache()
+
+
+class RouteService:
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.driver_repo = DriverRepository(db)
+
+    def get_driver_route(self, driver_id: int, organization_id: Optional[int] = None) -> Dict:
+        """
+        Visiting order for a driver's open pickups, starting from their last
+        known position, with per-stop distances and ETAs. Pass
+        organization_id to only consider that organization's pickups.
+        """
+        stops = PickupRepository.get_route_stops(self.db, driver_id, organization_id)
+        position = self.driver_repo.get_position_by_user(driver_id)
+        now = datetime.utcnow()
+
+        if not stops:
+            return {
+                "driver_id": driver_id,
+                "total_distance_km": 0.0,
+                "stops": [],
+                "cached": False,
+            }
+
+        signature = (organization_id,) + tuple((s.id, s.scheduled_at) for s in stops)
+        dist = self._distance_matrix(stops, position, now)
+        speed = distance_service.speed_kmph(now)
+
+        ready = np.array([self._minutes_until(s.scheduled_at, now) for s in stops])
+        due = np.where(np.isfinite(ready), ready + ROUTE_WINDOW_MINUTES, np.inf)
+
+        by_id = {s.id: index + 1 for index, s in enumerate(stops)}
+        cached_ids = route_sequence_cache.get(driver_id, signature)
+        cached = cached_ids is not None
+
+        if cached:
+            order = [by_id[pickup_id] for pickup_id in cached_ids]
+        else:
+            order = sequence_stops(
+                dist,
+                speed,
+                ready,
+                due,
+                ROUTE_SERVICE_MINUTES,
+            )
+            route_sequence_cache.put(driver_id, signature, [stops[i - 1].id for i in order])
+
+        travel = dist / speed * 60.0
+        node_ready = np.concatenate([[-np.inf], ready])
+        node_due = np.concatenate([[np.inf], due])
+        total, arrivals, _ = simulate(
+            order, dist, travel, node_ready, node_due, ROUTE_SERVICE_MINUTES
+        )
+
+        result = []
+        previous = 0
+        cumulative = 0.0
+        for sequence, (node, arrival) in enumerate(zip(order, arrivals), start=1):
+            stop = stops[node - 1]
+            leg = float(dist[previous, node])
+            cumulative += leg
+            result.append({
+                "sequence": sequence,
+                "pickup_id": stop.id,
+                "address": stop.address,
+                "latitude": stop.latitude,
+                "longitude": stop.longitude,
+                "scheduled_at": stop.scheduled_at,
+                "leg_distance_km": round(leg, 3),
+                "cumulative_distance_km": round(cumulative, 3),
+                "eta": now + timedelta(minutes=float(arrival)),
+                "late_minutes": round(max(float(arrival - node_due[node]), 0.0), 1),
+            })
+            previous = node
+
+        return {
+            "driver_id": driver_id,
+            "total_distance_km": round(float(total), 3),
+            "stops": result,
+            "cached": cached,
+        }
+
+    @staticmethod
+    def _distance_matrix(stops, position, now: datetime) -> np.ndarray:
+        """
+        (n + 1) x (n + 1) road km matrix with the driver at node 0. Without
+        a known position node 0 is zero-distance to everything, so the
+        route simply starts at whichever stop suits it best.
+        """
+        lats = [s.latitude for s in stops]
+        lngs = [s.longitude for s in stops]
+
+        if position is not None:
+            lats = [position[0]] + lats
+            lngs = [position[1]] + lngs
+            return distance_service.matrix(lats, lngs, lats, lngs, now).distance_km
+
+        dist = np.zeros((len(stops) + 1, len(stops) + 1))
+        dist[1:, 1:] = distance_service.matrix(lats, lngs, lats, lngs, now).distance_km
+        return dist
+
+    @staticmethod
+    def _minutes_until(scheduled_at, now: datetime) -> float:
+        if scheduled_at is None:
+            return -np.inf
+        if scheduled_at.tzinfo is not None:
+            scheduled_at = scheduled_at.replace(tzinfo=None) - scheduled_at.utcoffset()
+        return (scheduled_at - now).total_seconds() / 60.0
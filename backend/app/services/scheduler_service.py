@@ -0,0 +1,203 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    SCHEDULER_LOCK_TIMEOUT_SECONDS,
+    SCHEDULER_MAX_ATTEMPTS,
+    SCHEDULER_REFILL_SECONDS,
+    SCHEDULER_TICK_SECONDS,
+)
+from app.core.database import SessionLocal
+from app.models.scheduled_job import ScheduledJob
+from app.repositories.scheduled_job_repo import ScheduledJobRepository
+from app.utils.enums import ScheduledJobStatus
+from app.utils.timing_wheel import TimingWheel
+
+
+logger = logging.getLogger(__name__)
+
+# job_type -> handler(db, job); handlers own their commits
+JobHandler = Callable[[Session, ScheduledJob], None]
+_handlers: Dict[str, JobHandler] = {}
+
+
+def job_handler(job_type: str):
+    "registers the function that runs jobs of this type"
+    def register(func: JobHandler) -> JobHandler:
+        _handlers[job_type] = func
+        return func
+    return register
+
+
+def _epoch(moment: datetime) -> float:
+    "naive datetimes in this codebase are UTC"
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+class JobScheduler:
+    """
+    Runs ScheduledJob rows at their run_at. The table is the durable
+    queue; a hierarchical timing wheel holds the jobs due within the next
+    couple of refill intervals so this process wakes exactly when one is
+    due instead of polling for it.
+
+    Jobs written through this process (schedule_jobs / cancel_jobs) are
+    armed or disarmed at once. The table is re-read every refill interval
+    to pick up other workers' jobs and anything past the wheel's horizon.
+    Every run starts with a conditional claim, so a job cancelled, moved
+    later or taken by another worker in the meantime is skipped.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        tick_seconds: float = 1.0,
+        refill_seconds: float = 60.0,
+        lock_timeout_seconds: float = 300.0,
+        max_attempts: int = 5,
+    ):
+        self.session_factory = session_factory
+        self.tick = tick_seconds
+        self.refill_interval = refill_seconds
+        self.horizon = 2 * refill_seconds
+        self.lock_timeout = lock_timeout_seconds
+        self.max_attempts = max_attempts
+
+        self.wheel = TimingWheel(tick_seconds, now=time.time())
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._next_refill = 0.0
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._next_refill = 0.0
+        self._thread = threading.Thread(target=self._loop, name="job-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def watch(self, jobs: Iterable[tuple]):
+        "arms (job_id, run_at) pairs after the rows were committed"
+        limit = time.time() + self.horizon
+        with self._lock:
+            for job_id, run_at in jobs:
+                when = _epoch(run_at)
+                if when <= limit:
+                    self.wheel.schedule(job_id, when)
+                else:
+                    # the refill arms it once it comes within the horizon
+                    self.wheel.cancel(job_id)
+
+    def unwatch(self, job_ids: Iterable[int]):
+        with self._lock:
+            for job_id in job_ids:
+                self.wheel.cancel(job_id)
+
+    def run_pending(self, now: Optional[float] = None) -> int:
+        "one scheduler step: refill when due, then run whatever the wheel fires"
+        now = time.time() if now is None else now
+        if now >= self._next_refill:
+            self._refill(now)
+            self._next_refill = now + self.refill_interval
+
+        with self._lock:
+            due = self.wheel.advance(now)
+
+        for job_id, _ in due:
+            self._execute(job_id)
+        return len(due)
+
+    def _loop(self):
+        while not self._stop.wait(self.tick):
+            try:
+                self.run_pending()
+            except Exception:
+                logger.exception("job scheduler step failed")
+
+    def _refill(self, now: float):
+        db = self.session_factory()
+        try:
+            repo = ScheduledJobRepository(db)
+            moment = datetime.utcfromtimestamp(now)
+            released = repo.release_stale(moment - timedelta(seconds=self.lock_timeout))
+            db.commit()
+            if released:
+                logger.warning("released %d stale scheduled jobs", released)
+
+            rows = repo.get_pending_before(moment + timedelta(seconds=self.horizon))
+            db.commit()
+        finally:
+            db.close()
+
+        self.watch(rows)
+
+    def _execute(self, job_id: int):
+        db = self.session_factory()
+        try:
+            repo = ScheduledJobRepository(db)
+            job = repo.claim(job_id, datetime.utcnow())
+            # commit the claim so a crash mid-run leaves it RUNNING, not PENDING
+            db.commit()
+            if job is None:
+                return
+
+            handler = _handlers.get(job.job_type)
+            try:
+                if handler is None:
+                    raise LookupError(f"no handler for job type {job.job_type}")
+                handler(db, job)
+            except Exception as exc:
+                db.rollback()
+                logger.exception("scheduled job %s (%s) failed", job.id, job.job_type)
+                self._retry_or_fail(repo, job, exc)
+            else:
+                repo.finish(job.id, ScheduledJobStatus.DONE)
+            db.commit()
+        finally:
+            db.close()
+
+    def _retry_or_fail(self, repo: ScheduledJobRepository, job: ScheduledJob, exc: Exception):
+        if job.attempts >= self.max_attempts:
+            repo.finish(job.id, ScheduledJobStatus.FAILED, error=str(exc))
+            return
+
+        # exponential backoff from 30 s, capped at an hour
+        retry_at = datetime.utcnow() + timedelta(seconds=min(30 * 2 ** (job.attempts - 1), 3600))
+        repo.finish(job.id, ScheduledJobStatus.PENDING, error=str(exc), run_at=retry_at)
+        self.watch([(job.id, retry_at)])
+
+
+job_scheduler = JobScheduler(
+    tick_seconds=SCHEDULER_TICK_SECONDS,
+    refill_seconds=SCHEDULER_REFILL_SECONDS,
+    lock_timeout_seconds=SCHEDULER_LOCK_TIMEOUT_SECONDS,
+    max_attempts=SCHEDULER_MAX_ATTEMPTS,
+)
+
+
+def schedule_jobs(db: Session, jobs: list) -> list:
+    """
+    Writes jobs (dicts of ScheduledJob columns with a dedupe_key) in the
+    caller's transaction. Returns (id, run_at) pairs to hand to
+    job_scheduler.watch once that transaction has committed.
+    """
+    return ScheduledJobRepository(db).upsert_pending(jobs)
+
+
+def cancel_jobs(db: Session, entity_type: str, entity_id: int, job_types: Optional[list] = None) -> list:
+    "cancels an entity's pending jobs in the caller's transaction; unwatch the ids after commit"
+    return ScheduledJobRepository(db).cancel_pending(entity_type, entity_id, job_types)
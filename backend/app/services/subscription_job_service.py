@@ -0,0 +1,227 @@
+from datetime import datetime, timedelta
+from typing import Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    SUBSCRIPTION_SWEEP_BATCH_SIZE,
+    SUBSCRIPTION_SWEEP_MINUTES,
+    USAGE_COMPACT_BATCH_SIZE,
+    USAGE_COMPACT_SECONDS,
+    USAGE_CYCLE_DAYS,
+    USAGE_LEDGER_ENABLED,
+    USAGE_RESET_BATCH_SIZE,
+    USAGE_RESET_RUN_MINUTES,
+)
+from app.core.database import SessionLocal
+from app.models.scheduled_job import ScheduledJob
+from app.models.subscription import SubscriptionStatus
+from app.repositories.quota_lease_repo import QuotaLeaseRepository
+from app.repositories.subscription_repo import SubscriptionRepository
+from app.repositories.usage_event_repo import UsageEventRepository
+from app.services.outbox_service import emit_events
+from app.services.scheduler_service import job_handler, job_scheduler, schedule_jobs
+from app.services.subscription_service import BILLING_PERIODS, active_subscription_cache
+
+
+SUBSCRIPTION_JOB_SWEEP = "subscriptions.sweep"
+SUBSCRIPTION_JOB_RESET_USAGE = "subscriptions.reset_usage"
+SUBSCRIPTION_JOB_COMPACT_USAGE = "subscriptions.compact_usage"
+
+
+def _sum_deltas(entries) -> dict:
+    "subscription_id -> [pickups, weight, drivers] over folded ledger entries"
+    totals = {}
+    for subscription_id, pickups, weight, drivers in entries:
+        total = totals.setdefault(subscription_id, [0, 0.0, 0])
+        total[0] += pickups
+        total[1] += weight
+        total[2] += drivers
+    return totals
+
+
+def sweep_lapsed_subscriptions(db: Session, now: datetime, limit: int = SUBSCRIPTION_SWEEP_BATCH_SIZE) -> Tuple[int, int]:
+    """
+    Ends up to `limit` ACTIVE subscriptions past their end_date in one
+    transaction: all are marked EXPIRED with one UPDATE, and those set to
+    auto_renew on a plan that is still offered get a successor
+    subscription and a zeroed usage row, each with one multi-row INSERT.
+    Commits, and returns (swept, renewed).
+    """
+    lapsed = SubscriptionRepository.lock_lapsed(db, now, limit)
+    if not lapsed:
+        return 0, 0
+
+    SubscriptionRepository.expire_subscriptions(db, [sub.id for sub in lapsed], now)
+
+    renewing = [sub for sub in lapsed if sub.auto_renew and sub.plan_is_active]
+    successors = []
+    for sub in renewing:
+        period = BILLING_PERIODS[sub.billing_cycle]
+        # an org that went unswept for whole periods renews into the current one
+        start = sub.end_date + (now - sub.end_date) // period * period
+        successors.append({
+            "organization_id": sub.organization_id,
+            "plan_id": sub.plan_id,
+            "start_date": start,
+            "end_date": start + period,
+            "status": SubscriptionStatus.ACTIVE,
+            "auto_renew": True,
+        })
+    renewed_ids = SubscriptionRepository.bulk_create_subscriptions(db, successors)
+    SubscriptionRepository.bulk_create_usage(
+        db, list(zip(renewed_ids, [successor["start_date"] for successor in successors]))
+    )
+
+    renewed_from = {sub.id for sub in renewing}
+    emit_events(db, [
+        {
+            "event_type": "subscription.expired",
+            "aggregate_type": "subscription",
+            "aggregate_id": sub.id,
+            "organization_id": sub.organization_id,
+            "payload": {"plan_id": sub.plan_id},
+        }
+        for sub in lapsed
+        if sub.id not in renewed_from
+    ] + [
+        {
+            "event_type": "subscription.renewed",
+            "aggregate_type": "subscription",
+            "aggregate_id": new_id,
+            "organization_id": sub.organization_id,
+            "payload": {"plan_id": sub.plan_id, "renewed_from_id": sub.id},
+        }
+        for sub, new_id in zip(renewing, renewed_ids)
+    ])
+    db.commit()
+
+    for sub in lapsed:
+        active_subscription_cache.invalidate(sub.organization_id)
+    return len(lapsed), len(renewed_ids)
+
+
+def reset_usage_cycles(db: Session, now: datetime, limit: int = USAGE_RESET_BATCH_SIZE) -> int:
+    """
+    Closes the usage cycle of up to `limit` running subscriptions whose
+    cycle (USAGE_CYCLE_DAYS from last_reset_at) has ended, in one
+    transaction: each cycle's totals go to the usage history with one
+    multi-row INSERT and the counters start over with one batched UPDATE.
+    Commits, and returns how many rows were reset.
+
+    The rows stay locked from the read to the commit, so an increment
+    racing the reset waits and lands in the new cycle. Allowance leased
+    out to workers but not yet used stays counted on the row, because
+    returning a lease subtracts it again. Usage ledger entries the
+    compactor has not reached yet are folded in first. The driver count
+    is a standing total and is not reset.
+    """
+    cycle = timedelta(days=USAGE_CYCLE_DAYS)
+    due = SubscriptionRepository.lock_usage_due(db, now - cycle, now, limit)
+    if not due:
+        return 0
+
+    subscription_ids = [usage.subscription_id for usage in due]
+    leased = QuotaLeaseRepository.outstanding(db, subscription_ids)
+    # the cycle's ledger entries not yet compacted belong to its totals
+    pending = _sum_deltas(UsageEventRepository.fold(db, subscription_ids=subscription_ids))
+
+    history, resets = [], []
+    for usage in due:
+        pickups_leased, weight_leased = leased.get(usage.subscription_id, (0, 0.0))
+        pickups_pending, weight_pending, drivers_pending = pending.get(usage.subscription_id, (0, 0.0, 0))
+        # cycles stay anchored to the subscription's rather than drifting with the run
+        reset_at = usage.last_reset_at + (now - usage.last_reset_at) // cycle * cycle
+        history.append({
+            "subscription_id": usage.subscription_id,
+            "organization_id": usage.organization_id,
+            "period_start": usage.last_reset_at,
+            "period_end": reset_at,
+            "pickups_used": usage.pickups_used + pickups_pending - pickups_leased,
+            "waste_weight_used": usage.waste_weight_used + weight_pending - weight_leased,
+            "drivers_used": usage.drivers_used + drivers_pending,
+        })
+        resets.append({
+            "id": usage.id,
+            "pickups_used": pickups_leased,
+            "waste_weight_used": weight_leased,
+            "drivers_used": usage.drivers_used + drivers_pending,
+            "last_reset_at": reset_at,
+        })
+
+    SubscriptionRepository.bulk_create_usage_history(db, history)
+    SubscriptionRepository.bulk_reset_usage(db, resets)
+    db.commit()
+    return len(due)
+
+
+def compact_usage_events(db: Session, limit: int = USAGE_COMPACT_BATCH_SIZE) -> int:
+    """
+    Folds up to `limit` of the oldest unfolded usage ledger entries into
+    their subscriptions' totals in one transaction: the entries are marked
+    folded with one UPDATE ... RETURNING and every affected usage row gets
+    its summed deltas with one batched UPDATE. Marking entries, rather than
+    keeping a high-water id, means one that commits out of id order is not
+    skipped. Commits, and returns how many entries were folded.
+    """
+    entries = UsageEventRepository.fold(db, limit=limit)
+    if not entries:
+        return 0
+    SubscriptionRepository.apply_usage_deltas(db, _sum_deltas(entries))
+    db.commit()
+    return len(entries)
+
+
+def _schedule(db: Session, job_type: str, run_at: datetime):
+    "(re)arms the single pending job of the type and commits"
+    jobs = schedule_jobs(db, [{"job_type": job_type, "dedupe_key": job_type, "run_at": run_at}])
+    db.commit()
+    job_scheduler.watch(jobs)
+
+
+def arm_subscription_jobs(session_factory=SessionLocal):
+    "makes sure every subscription job is due now, e.g. at startup"
+    db = session_factory()
+    try:
+        now = datetime.utcnow()
+        _schedule(db, SUBSCRIPTION_JOB_SWEEP, now)
+        _schedule(db, SUBSCRIPTION_JOB_RESET_USAGE, now)
+        if USAGE_LEDGER_ENABLED:
+            _schedule(db, SUBSCRIPTION_JOB_COMPACT_USAGE, now)
+    finally:
+        db.close()
+
+
+@job_handler(SUBSCRIPTION_JOB_SWEEP)
+def run_subscription_sweep(db: Session, job: ScheduledJob):
+    """
+    Sweeps lapsed subscriptions batch by batch, then schedules the next
+    sweep just after the next end_date, or SUBSCRIPTION_SWEEP_MINUTES from
+    now if that is sooner.
+    """
+    now = datetime.utcnow()
+    while sweep_lapsed_subscriptions(db, now)[0] == SUBSCRIPTION_SWEEP_BATCH_SIZE:
+        pass
+
+    run_at = now + timedelta(minutes=SUBSCRIPTION_SWEEP_MINUTES)
+    next_end = SubscriptionRepository.next_end_date(db, now)
+    if next_end is not None:
+        run_at = min(run_at, next_end + timedelta(seconds=1))
+    _schedule(db, SUBSCRIPTION_JOB_SWEEP, run_at)
+
+
+@job_handler(SUBSCRIPTION_JOB_RESET_USAGE)
+def run_usage_reset(db: Session, job: ScheduledJob):
+    "resets every due usage row batch by batch, then schedules the next run"
+    now = datetime.utcnow()
+    while reset_usage_cycles(db, now) == USAGE_RESET_BATCH_SIZE:
+        pass
+    _schedule(db, SUBSCRIPTION_JOB_RESET_USAGE, now + timedelta(minutes=USAGE_RESET_RUN_MINUTES))
+
+
+@job_handler(SUBSCRIPTION_JOB_COMPACT_USAGE)
+def run_usage_compaction(db: Session, job: ScheduledJob):
+    "folds the whole usage ledger backlog batch by batch, then schedules the next run"
+    while compact_usage_events(db) == USAGE_COMPACT_BATCH_SIZE:
+        pass
+    _schedule(db, SUBSCRIPTION_JOB_COMPACT_USAGE, datetime.utcnow() + timedelta(seconds=USAGE_COMPACT_SECONDS))
@@ -1,11 +1,140 @@
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
 from fastapi import HTTPException, status
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from app.api.v1.subscriptions.subscription_schemas import PlanResponse
+from app.core.config import PLAN_CATALOG_CACHE_TTL_SECONDS, SUBSCRIPTION_CACHE_TTL_SECONDS
 from app.repositories.subscription_repo import SubscriptionRepository
+from app.services.outbox_service import emit_event
 from app.models.subscription import Subscription, SubscriptionStatus
 from app.models.subscription_usage import SubscriptionUsage
 from app.models.subscription_plan import BillingCycle
 
+
+# length of one billing period
+BILLING_PERIODS = {
+    BillingCycle.MONTHLY: timedelta(days=30),
+    BillingCycle.YEARLY: timedelta(days=365),
+}
+
+
+@dataclass(frozen=True)
+class ActiveSubscription:
+    "what the quota check needs from an org's ACTIVE subscription and its plan"
+    id: int
+    organization_id: int
+    plan_id: int
+    status: SubscriptionStatus
+    end_date: datetime
+    pickup_limit: int
+    waste_weight_limit: float
+
+
+class ActiveSubscriptionCache:
+    """
+    Per-organization ActiveSubscription (or None when the org has none),
+    so creating a pickup reads neither the subscription nor its plan.
+    Entries are dropped at the subscription's end_date, after ttl_seconds,
+    or as soon as this process changes the org's subscription or its plan.
+    The TTL bounds how long another worker's changes take to show up here.
+    """
+
+    def __init__(self, ttl_seconds: float = 60):
+        self.ttl = ttl_seconds
+        self._entries: Dict[int, tuple] = {}
+        # bumped by invalidate so a read racing it is not stored
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, organization_id: int) -> Optional[ActiveSubscription]:
+        entry = self._entries.get(organization_id)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            active = entry[1]
+            # past end_date the row is re-read so the caller sees it expire
+            if active is None or datetime.utcnow() <= active.end_date:
+                return active
+
+        generation = self._generation
+        sub = SubscriptionRepository.get_active_subscription(db, organization_id)
+        active = None
+        if sub is not None:
+            active = ActiveSubscription(
+                id=sub.id,
+                organization_id=sub.organization_id,
+                plan_id=sub.plan_id,
+                status=sub.status,
+                end_date=sub.end_date,
+                pickup_limit=sub.plan.pickup_limit,
+                waste_weight_limit=sub.plan.waste_weight_limit,
+            )
+        with self._lock:
+            if generation == self._generation:
+                self._entries[organization_id] = (time.monotonic(), active)
+        return active
+
+    def invalidate(self, organization_id: int):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(organization_id, None)
+
+    def invalidate_plan(self, plan_id: int):
+        "drops every org whose cached subscription is on the plan"
+        with self._lock:
+            self._generation += 1
+            for organization_id, (_, active) in list(self._entries.items()):
+                if active is not None and active.plan_id == plan_id:
+                    del self._entries[organization_id]
+
+
+active_subscription_cache = ActiveSubscriptionCache(SUBSCRIPTION_CACHE_TTL_SECONDS)
+
+
+class PlanCatalogCache:
+    """
+    The visible plan catalog as its serialized JSON body and a strong ETag
+    (a hash of that body, so every worker tags the same catalog alike).
+    It is rebuilt after ttl_seconds or as soon as this process creates,
+    updates or deletes a plan. The TTL bounds how long another worker's
+    plan changes take to show up here.
+    """
+
+    _serializer = TypeAdapter(List[PlanResponse])
+
+    def __init__(self, ttl_seconds: float = 300):
+        self.ttl = ttl_seconds
+        self._entry: Optional[tuple] = None
+        # bumped by invalidate so a build racing it is not stored
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> Tuple[bytes, str]:
+        "(body, etag)"
+        entry = self._entry
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            return entry[1], entry[2]
+
+        generation = self._generation
+        body = self._serializer.dump_json(SubscriptionRepository.list_visible_plans(db))
+        etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+        with self._lock:
+            if generation == self._generation:
+                self._entry = (time.monotonic(), body, etag)
+        return body, etag
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._entry = None
+
+
+plan_catalog_cache = PlanCatalogCache(PLAN_CATALOG_CACHE_TTL_SECONDS)
+
+
 class SubscriptionService:
     @staticmethod
     def create_plan(db: Session, plan_data):
@@ -13,6 +142,7 @@ class SubscriptionService:
         db_plan = SubscriptionPlan(**plan_data.model_dump())
         db.add(db_plan)
         db.commit()
+        plan_catalog_cache.invalidate()
         db.refresh(db_plan)
         return db_plan
 
@@ -20,6 +150,11 @@ class SubscriptionService:
     def list_plans(db: Session):
         return SubscriptionRepository.list_visible_plans(db)
 
+    @staticmethod
+    def plan_catalog(db: Session) -> Tuple[bytes, str]:
+        "the visible plans as a JSON body and its ETag, read from the DB only on a cache miss"
+        return plan_catalog_cache.get(db)
+
     @staticmethod
     def update_plan(db: Session, plan_id: int, plan_data):
         plan = SubscriptionRepository.get_plan_by_id(db, plan_id)
@@ -29,6 +164,8 @@ class SubscriptionService:
         update_data = plan_data.model_dump(exclude_unset=True)
         updated_plan = SubscriptionRepository.update_plan(db, plan_id, update_data)
         db.commit()
+        active_subscription_cache.invalidate_plan(plan_id)
+        plan_catalog_cache.invalidate()
         db.refresh(updated_plan)
         return updated_plan
 
@@ -44,6 +181,8 @@ class SubscriptionService:
         deleted = SubscriptionRepository.delete_plan(db, plan_id)
         if deleted:
             db.commit()
+            active_subscription_cache.invalidate_plan(plan_id)
+            plan_catalog_cache.invalidate()
             return {"message": "Plan deleted successfully"}
         raise HTTPException(status_code=400, detail="Failed to delete plan")
 
@@ -72,11 +211,8 @@ class SubscriptionService:
 
         # 4. Create PENDING subscription
         now = datetime.utcnow()
-        if plan.billing_cycle == BillingCycle.MONTHLY:
-            end_date = now + timedelta(days=30)
-        else: # YEARLY
-            end_date = now + timedelta(days=365)
-            
+        end_date = now + BILLING_PERIODS[plan.billing_cycle]
+
         new_sub = Subscription(
             organization_id=organization.id,
             plan_id=plan.id,
@@ -94,8 +230,11 @@ class SubscriptionService:
         usage = SubscriptionUsage(subscription_id=new_sub.id)
         SubscriptionRepository.create_usage_record(db, usage)
         
+        emit_event(db, "subscription.activated", "subscription", new_sub.id, organization.id, {"plan_id": plan.id})
+
         # 7. Commit transaction
         db.commit()
+        active_subscription_cache.invalidate(organization.id)
         db.refresh(new_sub)
         return new_sub
 
@@ -114,7 +253,9 @@ class SubscriptionService:
             SubscriptionStatus.CANCELLED,
             cancelled_at=datetime.utcnow()
         )
+        emit_event(db, "subscription.cancelled", "subscription", sub.id, organization_id, {"plan_id": sub.plan_id})
         db.commit()
+        active_subscription_cache.invalidate(organization_id)
         db.refresh(sub)
         return sub
 
@@ -132,11 +273,8 @@ class SubscriptionService:
         db.flush()
         
         now = datetime.utcnow()
-        if new_plan.billing_cycle == BillingCycle.MONTHLY:
-            end_date = now + timedelta(days=30)
-        else:
-            end_date = now + timedelta(days=365)
-            
+        end_date = now + BILLING_PERIODS[new_plan.billing_cycle]
+
         new_sub = Subscription(
             organization_id=organization_id,
             plan_id=new_plan.id,
@@ -150,8 +288,13 @@ class SubscriptionService:
         
         new_usage = SubscriptionUsage(subscription_id=new_sub.id)
         SubscriptionRepository.create_usage_record(db, new_usage)
+        emit_event(
+            db, "subscription.upgraded", "subscription", new_sub.id, organization_id,
+            {"plan_id": new_plan.id, "upgraded_from_id": old_sub.id},
+        )
         
         db.commit()
+        active_subscription_cache.invalidate(organization_id)
         db.refresh(new_sub)
         return new_sub
 
@@ -162,9 +305,8 @@ class SubscriptionService:
         if not sub or sub.status != SubscriptionStatus.ACTIVE:
             raise HTTPException(status_code=403, detail="Active subscription required")
             
+        # the subscription sweeper expires or renews it
         if datetime.utcnow() > sub.end_date:
-            sub.status = SubscriptionStatus.EXPIRED
-            db.commit()
             raise HTTPException(status_code=403, detail="Subscription has expired")
             
         incremented_usage = SubscriptionRepository.increment_usage(db, subscription_id, pickups, weight, drivers)
@@ -0,0 +1,196 @@
+from collections import defaultdict
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.models.vehicle import Vehicle, DriverVehicleMap
+from app.repositories.driver_repo import DriverRepository
+from app.repositories.pickup_repo import PickupRepository
+from app.repositories.vehicle_repo import VehicleRepository
+from app.services.audit_service import log_event
+from app.utils.capacity import CapacityTracker
+from app.utils.enums import VehicleStatus
+
+
+class VehicleService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.vehicle_repo = VehicleRepository(db)
+        self.driver_repo = DriverRepository(db)
+
+    def create_vehicle(
+        self,
+        organization_id: UUID,
+        registration_number: str,
+        vehicle_type: Optional[str],
+        capacity_kg: float,
+        waste_type_capacity_kg: Optional[dict],
+        created_by: int,
+    ) -> Vehicle:
+
+        "registration numbers are unique inside an organization"
+        existing = self.vehicle_repo.get_vehicle_by_registration(
+            registration_number=registration_number,
+            organization_id=organization_id,
+        )
+        if existing:
+            raise ValueError("Vehicle with this registration number already exists")
+
+        vehicle = Vehicle(
+            organization_id=organization_id,
+            registration_number=registration_number,
+            vehicle_type=vehicle_type,
+            capacity_kg=capacity_kg,
+            waste_type_capacity_kg=waste_type_capacity_kg,
+            status=VehicleStatus.ACTIVE,
+            created_by=created_by,
+        )
+        vehicle = self.vehicle_repo.create_vehicle(vehicle)
+
+        log_event(
+            db=self.db,
+            user_id=created_by,
+            action="vehicle_created",
+            org_id=organization_id,
+            metadata={"vehicle_id": str(vehicle.id)},
+        )
+        return vehicle
+
+    def list_vehicles(
+        self,
+        organization_id: UUID,
+        skip: int = 0,
+        limit: int = 50,
+    ) -> List[Vehicle]:
+
+        return self.vehicle_repo.list_vehicles_by_organization(
+            organization_id=organization_id,
+            skip=skip,
+            limit=limit,
+        )
+
+    def update_vehicle(
+        self,
+        vehicle_id: UUID,
+        organization_id: UUID,
+        update_data: dict,
+        updated_by: int,
+    ) -> Vehicle:
+
+        vehicle = self.vehicle_repo.get_vehicle_by_id(vehicle_id, organization_id)
+        if not vehicle:
+            raise ValueError("Vehicle not found")
+
+        vehicle = self.vehicle_repo.update_vehicle(vehicle, update_data, updated_by)
+
+        log_event(
+            db=self.db,
+            user_id=updated_by,
+            action="vehicle_updated",
+            org_id=organization_id,
+            metadata={"vehicle_id": str(vehicle.id)},
+        )
+        return vehicle
+
+    def assign_vehicle(
+        self,
+        driver_id: UUID,
+        vehicle_id: UUID,
+        organization_id: UUID,
+        assigned_by: int,
+    ) -> DriverVehicleMap:
+        """
+        Links a driver to a vehicle, releasing whatever vehicle the driver
+        had before. A vehicle already driven by someone else is refused.
+        """
+
+        driver = self.driver_repo.get_driver_by_id(driver_id, organization_id)
+        if not driver:
+            raise ValueError("Driver not found")
+
+        vehicle = self.vehicle_repo.get_vehicle_by_id(vehicle_id, organization_id)
+        if not vehicle:
+            raise ValueError("Vehicle not found")
+        if vehicle.status != VehicleStatus.ACTIVE:
+            raise ValueError("Vehicle is not active")
+
+        taken = self.vehicle_repo.get_active_mapping(vehicle_id=vehicle_id)
+        if taken and taken.driver_id != driver_id:
+            raise ValueError("Vehicle is already assigned to another driver")
+        if taken:
+            return taken
+
+        current = self.vehicle_repo.get_active_mapping(driver_id=driver_id)
+        if current:
+            self.vehicle_repo.release_mapping(current)
+
+        mapping = self.vehicle_repo.create_mapping(
+            DriverVehicleMap(
+                driver_id=driver_id,
+                vehicle_id=vehicle_id,
+                is_active=True,
+                assigned_by=assigned_by,
+            )
+        )
+
+        log_event(
+            db=self.db,
+            user_id=assigned_by,
+            action="vehicle_assigned",
+            org_id=organization_id,
+            metadata={"driver_id": str(driver_id), "vehicle_id": str(vehicle_id)},
+        )
+        return mapping
+
+    def release_vehicle(
+        self,
+        driver_id: UUID,
+        organization_id: UUID,
+        released_by: int,
+    ) -> DriverVehicleMap:
+
+        driver = self.driver_repo.get_driver_by_id(driver_id, organization_id)
+        if not driver:
+            raise ValueError("Driver not found")
+
+        mapping = self.vehicle_repo.get_active_mapping(driver_id=driver_id)
+        if not mapping:
+            raise ValueError("Driver has no vehicle assigned")
+
+        mapping = self.vehicle_repo.release_mapping(mapping)
+
+        log_event(
+            db=self.db,
+            user_id=released_by,
+            action="vehicle_released",
+            org_id=organization_id,
+            metadata={"driver_id": str(driver_id), "vehicle_id": str(mapping.vehicle_id)},
+        )
+        return mapping
+
+    def build_capacity_tracker(self, user_ids: List[int]) -> CapacityTracker:
+        """
+        Remaining vehicle capacity for a set of driver accounts, net of the
+        pickups they already hold. Two queries regardless of fleet size.
+        """
+        tracker = CapacityTracker()
+
+        vehicles = self.vehicle_repo.get_capacities_for_users(user_ids)
+        if not vehicles:
+            return tracker
+
+        load = defaultdict(dict)
+        for user_id, waste_type, weight in PickupRepository.sum_active_load(
+            self.db, [row[0] for row in vehicles]
+        ):
+            load[user_id][waste_type.value] = float(weight or 0.0)
+
+        for user_id, capacity_kg, waste_type_capacity_kg in vehicles:
+            tracker.add_vehicle(
+                user_id,
+                capacity_kg,
+                waste_type_capacity_kg,
+                load.get(user_id),
+            )
+        return tracker
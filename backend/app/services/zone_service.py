@@ -0,0 +1,198 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.location import Zone
+from app.repositories.zone_repo import ZoneRepository
+from app.services.audit_service import log_event
+from app.utils.zones import ZoneIndex, normalize_ring
+
+
+class ZoneIndexCache:
+    """
+    Per-organization ZoneIndex, rebuilt after ttl_seconds or as soon as
+    this process changes the org's zones. The TTL bounds how long another
+    worker's zone edits take to show up here.
+    """
+
+    def __init__(self, ttl_seconds: float = 60):
+        self.ttl = ttl_seconds
+        self._entries: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, organization_id: int) -> ZoneIndex:
+        entry = self._entries.get(organization_id)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+
+        index = ZoneIndex(ZoneRepository(db).get_active_boundaries(organization_id))
+        with self._lock:
+            self._entries[organization_id] = (time.monotonic(), index)
+        return index
+
+    def invalidate(self, organization_id: int):
+        with self._lock:
+            self._entries.pop(organization_id, None)
+
+
+zone_index_cache = ZoneIndexCache()
+
+
+def locate_zone(
+    db: Session,
+    organization_id: int,
+    latitude: float,
+    longitude: float,
+) -> Optional[int]:
+    "id of the organization's active zone containing the point, if any"
+    return zone_index_cache.get(db, organization_id).locate(latitude, longitude)
+
+
+class ZoneService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.zone_repo = ZoneRepository(db)
+
+    def create_zone(
+        self,
+        organization_id: int,
+        name: str,
+        boundary: List[List[float]],
+        created_by: int,
+    ) -> Zone:
+
+        zone = Zone(
+            organization_id=organization_id,
+            name=name,
+            is_active=True,
+            **self._boundary_fields(boundary),
+        )
+        zone = self.zone_repo.create_zone(zone)
+
+        retagged = self._retag_open_pickups(organization_id)
+
+        log_event(
+            db=self.db,
+            user_id=created_by,
+            action="zone_created",
+            org_id=organization_id,
+            metadata={"zone_id": zone.id, "retagged_pickups": retagged},
+        )
+
+        # log_event has committed; rebuild the shared index on next use
+        zone_index_cache.invalidate(organization_id)
+        return zone
+
+    def list_zones(
+        self,
+        organization_id: int,
+        include_inactive: bool = False,
+    ) -> List[Zone]:
+
+        return self.zone_repo.list_zones_by_organization(organization_id, include_inactive)
+
+    def get_zone(
+        self,
+        zone_id: int,
+        organization_id: int,
+    ) -> Optional[Zone]:
+
+        return self.zone_repo.get_zone_by_id(zone_id, organization_id)
+
+    def update_zone(
+        self,
+        zone_id: int,
+        organization_id: int,
+        update_data: dict,
+        updated_by: int,
+    ) -> Zone:
+
+        zone = self.zone_repo.get_zone_by_id(zone_id, organization_id)
+        if not zone:
+            raise ValueError("Zone not found")
+
+        if "boundary" in update_data:
+            update_data.update(self._boundary_fields(update_data.pop("boundary")))
+
+        zone = self.zone_repo.update_zone(zone, update_data)
+
+        retagged = 0
+        if {"boundary", "is_active"} & set(update_data):
+            retagged = self._retag_open_pickups(organization_id)
+
+        log_event(
+            db=self.db,
+            user_id=updated_by,
+            action="zone_updated",
+            org_id=organization_id,
+            metadata={"zone_id": zone.id, "retagged_pickups": retagged},
+        )
+
+        # log_event has committed; rebuild the shared index on next use
+        zone_index_cache.invalidate(organization_id)
+        return zone
+
+    def get_zone_summary(
+        self,
+        zone_id: int,
+        organization_id: int,
+    ) -> dict:
+        "pickup and driver counts for a zone dashboard, from the zone_id tags"
+
+        zone = self.zone_repo.get_zone_by_id(zone_id, organization_id)
+        if not zone:
+            raise ValueError("Zone not found")
+
+        pickups = {
+            status.value: {"count": count, "weight_kg": round(float(weight), 2)}
+            for status, count, weight in self.zone_repo.get_pickup_counts(zone_id, organization_id)
+        }
+
+        drivers = {"on_duty": 0, "available": 0, "total": 0}
+        for status, is_on_duty, count in self.zone_repo.get_driver_counts(zone_id):
+            drivers["total"] += count
+            if is_on_duty:
+                drivers["on_duty"] += count
+                if status.value == "AVAILABLE":
+                    drivers["available"] += count
+
+        return {
+            "zone_id": zone.id,
+            "name": zone.name,
+            "pickups": pickups,
+            "drivers": drivers,
+        }
+
+    @staticmethod
+    def _boundary_fields(boundary) -> dict:
+        ring = normalize_ring(boundary)
+        return {
+            "boundary": ring.tolist(),
+            "min_latitude": float(ring[:, 0].min()),
+            "max_latitude": float(ring[:, 0].max()),
+            "min_longitude": float(ring[:, 1].min()),
+            "max_longitude": float(ring[:, 1].max()),
+        }
+
+    def _retag_open_pickups(self, organization_id: int) -> int:
+        """
+        Zone edits move the boundaries under existing pickups; open ones
+        are re-tagged in bulk so zone filters stay exact.
+        """
+        # built from this transaction's view and not cached, in case it
+        # rolls back
+        index = ZoneIndex(self.zone_repo.get_active_boundaries(organization_id))
+
+        rows = self.zone_repo.get_open_pickup_positions(organization_id)
+        if not rows:
+            return 0
+
+        zones = index.locate_many([r[1] for r in rows], [r[2] for r in rows])
+        changed = {
+            row[0]: zone_id
+            for row, zone_id in zip(rows, zones)
+            if row[3] != zone_id
+        }
+        return self.zone_repo.set_pickup_zones(changed)
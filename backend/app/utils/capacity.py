@@ -0,0 +1,56 @@
+import math
+from typing import Dict, Hashable, Optional
+
+
+class CapacityTracker:
+    """
+    Remaining vehicle payload per driver, in total and per waste type.
+    Loaded once per dispatch run; fits() and reserve() are O(1), so every
+    candidate assignment can be checked as it is made. Drivers that were
+    never added have no vehicle limit.
+    """
+
+    def __init__(self):
+        self._total: Dict[Hashable, float] = {}
+        self._by_type: Dict[Hashable, Dict[str, float]] = {}
+
+    def add_vehicle(
+        self,
+        driver_id: Hashable,
+        capacity_kg: float,
+        waste_type_capacity_kg: Optional[Dict[str, float]] = None,
+        load_kg: Optional[Dict[str, float]] = None,
+    ):
+        "registers a driver's vehicle with the load it already carries, by waste type"
+        load_kg = load_kg or {}
+        self._total[driver_id] = capacity_kg - sum(load_kg.values())
+        self._by_type[driver_id] = {
+            waste_type: limit - load_kg.get(waste_type, 0.0)
+            for waste_type, limit in (waste_type_capacity_kg or {}).items()
+        }
+
+    def is_limited(self, driver_id: Hashable) -> bool:
+        return driver_id in self._total
+
+    def remaining(self, driver_id: Hashable, waste_type: Optional[str] = None) -> float:
+        "spare kg for the waste type (or overall); inf for drivers without a vehicle"
+        total = self._total.get(driver_id)
+        if total is None:
+            return math.inf
+        if waste_type is None:
+            return total
+        return min(total, self._by_type[driver_id].get(waste_type, math.inf))
+
+    def fits(self, driver_id: Hashable, waste_type: str, weight_kg: float) -> bool:
+        return weight_kg <= self.remaining(driver_id, waste_type) + 1e-9
+
+    def reserve(self, driver_id: Hashable, waste_type: str, weight_kg: float) -> bool:
+        "takes weight_kg out of the driver's spare capacity if it fits"
+        if not self.fits(driver_id, waste_type, weight_kg):
+            return False
+        if driver_id in self._total:
+            self._total[driver_id] -= weight_kg
+            by_type = self._by_type[driver_id]
+            if waste_type in by_type:
+                by_type[waste_type] -= weight_kg
+        return True
@@ -0,0 +1,215 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.utils.geo import EARTH_RADIUS_KM
+
+
+NOISE = -1
+
+# Cell offsets that, together with the cell itself, see every neighbouring
+# cell pair exactly once
+_FORWARD_OFFSETS = ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1))
+
+
+def project_km(lats, lngs) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Local equirectangular projection in km around the mean latitude.
+    Accurate to well under a percent across a city.
+    """
+    lats = np.asarray(lats, dtype=float)
+    lngs = np.asarray(lngs, dtype=float)
+    if lats.size == 0:
+        return lats, lngs
+
+    scale = np.radians(1.0) * EARTH_RADIUS_KM
+    cos_lat = np.cos(np.radians(lats.mean()))
+    return lngs * scale * cos_lat, lats * scale
+
+
+def neighbour_pairs(x, y, eps_km: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (i, j) index arrays of every pair of points at most eps_km apart,
+    each pair once with i != j. Points are hashed into eps-sized cells so
+    only points in adjacent cells are compared; the work grows with the
+    number of close pairs instead of n squared.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = x.size
+    if n < 2:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+
+    cx = np.floor(x / eps_km).astype(np.int64)
+    cy = np.floor(y / eps_km).astype(np.int64)
+    cx -= cx.min() - 1
+    cy -= cy.min() - 1
+    width = int(cy.max()) + 2
+    keys = cx * width + cy
+
+    order = np.argsort(keys, kind="stable")
+    cell_keys, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+
+    first, second = [], []
+    for dx, dy in _FORWARD_OFFSETS:
+        target = keys + dx * width + dy
+        pos = np.searchsorted(cell_keys, target)
+        pos[pos == cell_keys.size] = 0
+        points = np.flatnonzero(cell_keys[pos] == target)
+        if points.size == 0:
+            continue
+
+        # expand every point against every member of its neighbour cell
+        span = counts[pos[points]]
+        total = int(span.sum())
+        i = np.repeat(points, span)
+        offsets = np.arange(total) - np.repeat(np.cumsum(span) - span, span)
+        j = order[np.repeat(starts[pos[points]], span) + offsets]
+
+        if dx == 0 and dy == 0:
+            keep = i < j
+            i, j = i[keep], j[keep]
+
+        close = np.hypot(x[i] - x[j], y[i] - y[j]) <= eps_km
+        first.append(i[close])
+        second.append(j[close])
+
+    if not first:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    return np.concatenate(first), np.concatenate(second)
+
+
+def _components(n: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    "smallest member index of each node's connected component"
+    labels = np.arange(n)
+    if a.size == 0:
+        return labels
+
+    while True:
+        previous = labels.copy()
+        low = np.minimum(labels[a], labels[b])
+        np.minimum.at(labels, a, low)
+        np.minimum.at(labels, b, low)
+        # pointer jumping keeps the number of passes logarithmic in practice
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+        if np.array_equal(labels, previous):
+            return labels
+
+
+def grid_dbscan(lats, lngs, eps_km: float, min_samples: int = 3) -> np.ndarray:
+    """
+    DBSCAN on coordinates with neighbourhoods found by cell hashing.
+    Returns a cluster label per point, numbered from 0 in order of first
+    appearance, with NOISE for points in no cluster. min_samples counts
+    the point itself. A border point reachable from several clusters
+    joins the one with the lowest-indexed core point.
+    """
+    x, y = project_km(lats, lngs)
+    n = x.size
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+
+    a, b = neighbour_pairs(x, y, eps_km)
+    degree = 1 + np.bincount(a, minlength=n) + np.bincount(b, minlength=n)
+    core = degree >= min_samples
+
+    both = core[a] & core[b]
+    roots = _components(n, a[both], b[both])
+
+    labels = np.where(core, roots, n)
+    # border points take the root of a core neighbour
+    for src, dst in ((a, b), (b, a)):
+        border = core[src] & ~core[dst]
+        np.minimum.at(labels, dst[border], roots[src[border]])
+
+    clustered = labels < n
+    result = np.full(n, NOISE, dtype=np.int64)
+    _, first_seen, dense = np.unique(labels[clustered], return_index=True, return_inverse=True)
+    rank = np.empty(first_seen.size, dtype=np.int64)
+    rank[np.argsort(first_seen, kind="stable")] = np.arange(first_seen.size)
+    result[clustered] = rank[dense]
+    return result
+
+
+def split_by_weight(
+    x,
+    y,
+    weights,
+    members: np.ndarray,
+    max_weight: float,
+) -> List[np.ndarray]:
+    """
+    Splits one cluster into spatially compact pieces of at most
+    max_weight each by recursive cuts across the wider axis, sized so the
+    cluster ends up in about as few pieces as the total weight allows. A
+    single point heavier than max_weight stays on its own.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+
+    pieces = []
+    stack = [np.asarray(members)]
+    while stack:
+        part = stack.pop()
+        total = float(weights[part].sum())
+        if total <= max_weight or part.size == 1:
+            pieces.append(part)
+            continue
+
+        px, py = x[part], y[part]
+        axis = px if np.ptp(px) >= np.ptp(py) else py
+        part = part[np.argsort(axis, kind="stable")]
+
+        # cut off floor(k / 2) of the k pieces needed
+        needed = int(np.ceil(total / max_weight))
+        share = total * (needed // 2) / needed
+        cut = int(np.searchsorted(np.cumsum(weights[part]), share, side="right"))
+        cut = min(max(cut, 1), part.size - 1)
+
+        stack.append(part[cut:])
+        stack.append(part[:cut])
+
+    return pieces
+
+
+def cluster_runs(
+    lats,
+    lngs,
+    weights,
+    eps_km: float,
+    min_samples: int = 3,
+    max_weight: Optional[float] = None,
+) -> Tuple[List[np.ndarray], np.ndarray]:
+    """
+    Groups stops into collection runs: DBSCAN clusters, each split
+    further when it carries more than max_weight. Returns the member
+    indices of each run, largest run first, and the indices of the noise
+    points.
+    """
+    labels = grid_dbscan(lats, lngs, eps_km, min_samples)
+    noise = np.flatnonzero(labels == NOISE)
+    if labels.size == noise.size:
+        return [], noise
+
+    order = np.argsort(labels, kind="stable")
+    order = order[labels[order] != NOISE]
+    bounds = np.flatnonzero(np.diff(labels[order])) + 1
+    clusters = np.split(order, bounds)
+
+    if max_weight is not None:
+        x, y = project_km(lats, lngs)
+        clusters = [
+            piece
+            for members in clusters
+            for piece in split_by_weight(x, y, weights, members, max_weight)
+        ]
+
+    clusters.sort(key=lambda members: -members.size)
+    return clusters, noise
@@ -11,6 +11,34 @@ class DriverAvailabilityStatus(str, Enum):
     BUSY = "BUSY"
     OFFLINE = "OFFLINE" 
 
+class VehicleStatus(str, Enum):
+    ACTIVE = "ACTIVE"
+    MAINTENANCE = "MAINTENANCE"
+    INACTIVE = "INACTIVE"
+
+class ScheduledJobStatus(str, Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+class OutboxStatus(str, Enum):
+    PENDING = "PENDING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+class RecurrenceFrequency(str, Enum):
+    DAILY = "DAILY"
+    WEEKLY = "WEEKLY"
+    MONTHLY = "MONTHLY"
+
+class UsageEventType(str, Enum):
+    PICKUP_CREATED = "PICKUP_CREATED"
+    PICKUP_CANCELLED = "PICKUP_CANCELLED"
+    PICKUP_WITHDRAWN = "PICKUP_WITHDRAWN"
+    PICKUP_COMPLETED = "PICKUP_COMPLETED"
+
 
 class NotificationStatus(str,Enum):
     UNREAD ="UNREAD"
@@ -20,6 +48,8 @@ class NotificationType(str,Enum):
     DRIVER_ASSIGNED = "DRIVER_ASSIGNED"
     PICKUP_CREATED= "PICKUP_CREATED"
     PICKUP_COMPLETED="PICKUP_COMPLETED"
+    PICKUP_REMINDER="PICKUP_REMINDER"
+    PICKUP_OVERDUE="PICKUP_OVERDUE"
     SYSTEM = "SYSTEM"
 
 
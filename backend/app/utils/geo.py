@@ -0,0 +1,174 @@
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    """
+    Great-circle distance in km. Accepts scalars or NumPy arrays and
+    broadcasts like any other ufunc expression.
+    """
+    lat1 = np.radians(lat1)
+    lng1 = np.radians(lng1)
+    lat2 = np.radians(lat2)
+    lng2 = np.radians(lng2)
+
+    a = (
+        np.sin((lat2 - lat1) / 2.0) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2.0) ** 2
+    )
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def haversine_matrix(lats_a, lngs_a, lats_b, lngs_b) -> np.ndarray:
+    "many-to-many distance matrix (len(a) x len(b)) in km"
+    lats_a = np.asarray(lats_a, dtype=float)
+    lngs_a = np.asarray(lngs_a, dtype=float)
+    lats_b = np.asarray(lats_b, dtype=float)
+    lngs_b = np.asarray(lngs_b, dtype=float)
+
+    return haversine(
+        lats_a[:, None],
+        lngs_a[:, None],
+        lats_b[None, :],
+        lngs_b[None, :],
+    )
+
+
+def path_distance_km(lats, lngs) -> float:
+    "total length of a polyline in km"
+    lats = np.asarray(lats, dtype=float)
+    lngs = np.asarray(lngs, dtype=float)
+
+    if lats.size < 2:
+        return 0.0
+
+    return float(haversine(lats[:-1], lngs[:-1], lats[1:], lngs[1:]).sum())
+
+
+def simplify_polyline(lats, lngs, tolerance_m: float) -> np.ndarray:
+    """
+    Douglas-Peucker simplification. Returns a boolean mask of the points
+    to keep; the first and last points are always kept so consecutive
+    chunks of a long track can be simplified independently.
+    """
+    lats = np.asarray(lats, dtype=float)
+    lngs = np.asarray(lngs, dtype=float)
+    n = lats.size
+
+    keep = np.zeros(n, dtype=bool)
+    if n == 0:
+        return keep
+
+    keep[0] = True
+    keep[-1] = True
+    if n < 3 or tolerance_m <= 0:
+        keep[:] = True
+        return keep
+
+    # Local equirectangular projection in metres; accurate enough at the
+    # scale of a single shift.
+    scale = EARTH_RADIUS_KM * 1000.0
+    cos_lat = np.cos(np.radians(lats.mean()))
+    x = np.radians(lngs) * cos_lat * scale
+    y = np.radians(lats) * scale
+
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+
+        px = x[start + 1:end]
+        py = y[start + 1:end]
+        dx = x[end] - x[start]
+        dy = y[end] - y[start]
+        seg_len = np.hypot(dx, dy)
+
+        if seg_len == 0.0:
+            dist = np.hypot(px - x[start], py - y[start])
+        else:
+            dist = np.abs(dy * (px - x[start]) - dx * (py - y[start])) / seg_len
+
+        idx = int(np.argmax(dist))
+        if dist[idx] > tolerance_m:
+            split = start + 1 + idx
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+
+    return keep
+
+
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(lat: float, lng: float, precision: int = 9) -> str:
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2.0
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def geohash_bounds(geohash: str):
+    "returns (lat_min, lat_max, lng_min, lng_max) of a geohash cell"
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+
+    for char in geohash:
+        value = _GEOHASH_BASE32.index(char)
+        for shift in range(4, -1, -1):
+            rng = lng_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2.0
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+
+    return lat_range[0], lat_range[1], lng_range[0], lng_range[1]
+
+
+def geohash_neighbors(geohash: str) -> list:
+    "the cell itself plus its 8 neighbours, for prefix searches across cell edges"
+    lat_min, lat_max, lng_min, lng_max = geohash_bounds(geohash)
+    lat_c = (lat_min + lat_max) / 2.0
+    lng_c = (lng_min + lng_max) / 2.0
+    d_lat = lat_max - lat_min
+    d_lng = lng_max - lng_min
+
+    cells = []
+    for i in (-1, 0, 1):
+        lat = lat_c + i * d_lat
+        if lat < -90.0 or lat > 90.0:
+            continue
+        for j in (-1, 0, 1):
+            lng = (lng_c + j * d_lng + 180.0) % 360.0 - 180.0
+            cell = geohash_encode(lat, lng, len(geohash))
+            if cell not in cells:
+                cells.append(cell)
+
+    return cells
@@ -0,0 +1,8 @@
+from datetime import datetime, timezone
+
+
+def to_naive_utc(moment: datetime) -> datetime:
+    "aware datetimes converted to UTC and stripped, matching the naive UTC columns"
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,148 @@
+import numpy as np
+
+
+# Above this many drivers the exact solver gives way to the greedy one
+EXACT_MAX_DRIVERS = 100
+
+
+def capacitated_assignment(cost, capacity, unassigned_cost: float = None):
+    """
+    Min-cost assignment of rows (pickups) to columns (drivers) where column
+    j takes at most capacity[j] rows and np.inf marks forbidden pairs.
+    Rows left over once capacity runs out are unassigned, each costing
+    unassigned_cost (by default large enough that the number of
+    assignments is maximised first).
+
+    Returns (column_per_row, solver) with -1 for unassigned rows.
+    """
+    cost = np.asarray(cost, dtype=float)
+    capacity = np.asarray(capacity, dtype=int)
+    n, m = cost.shape
+
+    if n == 0 or m == 0:
+        return np.full(n, -1, dtype=int), "none"
+
+    if m > EXACT_MAX_DRIVERS:
+        return _greedy(cost, capacity), "greedy"
+
+    finite = np.isfinite(cost)
+    if unassigned_cost is None:
+        unassigned_cost = (cost[finite].max() if finite.any() else 0.0) * 10.0 + 1.0
+
+    return _successive_shortest_paths(cost, capacity, unassigned_cost), "hungarian"
+
+
+def _successive_shortest_paths(cost, capacity, unassigned_cost):
+    """
+    Hungarian-style successive shortest augmenting paths, run on the
+    driver side only: each new row enters the cheapest reachable driver
+    with spare capacity, possibly bumping one row per full driver along
+    the way. Edge a -> b is the cheapest move of a row from a to b, so
+    each augmentation is a Bellman-Ford over an m x m matrix instead of a
+    search over every row.
+    """
+    n, m = cost.shape
+
+    # Column m is a sink with unlimited capacity for unassigned rows
+    cost = np.hstack([cost, np.full((n, 1), unassigned_cost)])
+    capacity = np.append(capacity, n)
+    size = m + 1
+
+    load = np.zeros(size, dtype=int)
+    members = [[] for _ in range(size)]
+    column = np.full(n, -1, dtype=int)
+
+    move_cost = np.full((size, size), np.inf)
+    move_row = np.full((size, size), -1, dtype=int)
+    nodes = np.arange(size)
+
+    for i in range(n):
+        dist = cost[i].copy()
+        pred = np.full(size, -1, dtype=int)
+
+        for _ in range(size):
+            via = dist[:, None] + move_cost
+            best_from = via.argmin(axis=0)
+            best = via[best_from, nodes]
+            improve = best < dist - 1e-9
+            if not improve.any():
+                break
+            dist[improve] = best[improve]
+            pred[improve] = best_from[improve]
+
+        target = int(np.argmin(np.where(load < capacity, dist, np.inf)))
+        load[target] += 1
+
+        changed = set()
+        node = target
+        for _ in range(size):
+            source = pred[node]
+            if source < 0:
+                break
+            row = move_row[source, node]
+            members[source].remove(row)
+            members[node].append(row)
+            column[row] = node
+            changed.update((source, node))
+            node = source
+
+        members[node].append(i)
+        column[i] = node
+        changed.add(node)
+
+        for a in changed:
+            if not members[a]:
+                move_cost[a] = np.inf
+                move_row[a] = -1
+                continue
+
+            rows = np.array(members[a])
+            delta = cost[rows] - cost[rows, a][:, None]
+            arg = delta.argmin(axis=0)
+            move_cost[a] = delta[arg, nodes]
+            move_row[a] = rows[arg]
+            move_cost[a, a] = np.inf
+
+    column[column == m] = -1
+    return column
+
+
+def _greedy(cost, capacity):
+    """
+    Rounds of sealed bids: every unassigned row bids on its cheapest open
+    column and each column accepts its cheapest bidders up to the spare
+    capacity. At least one column fills (or every bid is accepted) per
+    round, so there are at most m + 1 rounds.
+    """
+    n, m = cost.shape
+    remaining = capacity.copy()
+    column = np.full(n, -1, dtype=int)
+
+    while True:
+        rows = np.flatnonzero(column < 0)
+        open_cols = remaining > 0
+        if rows.size == 0 or not open_cols.any():
+            break
+
+        masked = np.where(open_cols[None, :], cost[rows], np.inf)
+        choice = masked.argmin(axis=1)
+        bid = masked[np.arange(rows.size), choice]
+
+        valid = np.isfinite(bid)
+        if not valid.any():
+            break
+        rows, choice, bid = rows[valid], choice[valid], bid[valid]
+
+        order = np.lexsort((bid, choice))
+        rows, choice = rows[order], choice[order]
+
+        # rank of each bid within its column
+        starts = np.flatnonzero(np.r_[True, choice[1:] != choice[:-1]])
+        group = np.repeat(starts, np.diff(np.r_[starts, choice.size]))
+        rank = np.arange(choice.size) - group
+
+        accept = rank < remaining[choice]
+        column[rows[accept]] = choice[accept]
+        np.subtract.at(remaining, choice[accept], 1)
+
+    return column
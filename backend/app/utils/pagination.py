@@ -0,0 +1,34 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+
+
+def encode_cursor(sort: str, key: Sequence) -> str:
+    """
+    Opaque cursor for keyset pagination: the sort it belongs to plus the
+    sort key of the last row served. Datetimes travel as ISO strings.
+    """
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in key]
+    raw = json.dumps({"s": sort, "k": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], sort: str) -> Optional[Tuple[Optional[datetime], int]]:
+    """
+    (sort value, id) after which the next page starts, or None for the
+    first page. Raises ValueError for a malformed cursor or one issued for
+    a different sort.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        value, row_id = data["k"]
+        if data["s"] != sort:
+            raise ValueError
+        return (datetime.fromisoformat(value) if value is not None else None, int(row_id))
+    except (binascii.Error, UnicodeDecodeError, KeyError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
@@ -0,0 +1,98 @@
+import calendar
+from datetime import date, datetime, time, timedelta
+from typing import Iterator, List, Optional, Sequence
+
+WEEKDAY_CODES = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+
+def parse_weekdays(codes: Optional[str]) -> List[int]:
+    "'MO,TH' -> [0, 3]; raises ValueError for an unknown code"
+    if not codes:
+        return []
+    days = set()
+    for code in codes.split(","):
+        code = code.strip().upper()
+        if code not in WEEKDAY_CODES:
+            raise ValueError(f"Unknown weekday code: {code}")
+        days.add(WEEKDAY_CODES.index(code))
+    return sorted(days)
+
+
+def format_weekdays(days: Sequence[int]) -> Optional[str]:
+    "[0, 3] -> 'MO,TH'"
+    if not days:
+        return None
+    return ",".join(WEEKDAY_CODES[day] for day in sorted(set(days)))
+
+
+def _dates(frequency: str, interval: int, starts_on: date, weekdays: List[int], first_after: date) -> Iterator[date]:
+    """
+    Candidate dates in order from the period holding first_after (or
+    starts_on, whichever is later) onwards, without walking the periods
+    before it; unbounded.
+    """
+    first_after = max(first_after, starts_on)
+
+    if frequency == "DAILY":
+        period = -(-(first_after - starts_on).days // interval)
+        while True:
+            yield starts_on + timedelta(days=period * interval)
+            period += 1
+
+    elif frequency == "WEEKLY":
+        week_start = starts_on - timedelta(days=starts_on.weekday())
+        days = weekdays or [starts_on.weekday()]
+        period = (first_after - week_start).days // 7 // interval
+        while True:
+            start = week_start + timedelta(weeks=period * interval)
+            for day in days:
+                yield start + timedelta(days=day)
+            period += 1
+
+    elif frequency == "MONTHLY":
+        months = (first_after.year - starts_on.year) * 12 + first_after.month - starts_on.month
+        period = max(months // interval, 0)
+        while True:
+            month_index = starts_on.month - 1 + period * interval
+            year, month = starts_on.year + month_index // 12, month_index % 12 + 1
+            # months without the day are skipped, as RRULE does
+            if starts_on.day <= calendar.monthrange(year, month)[1]:
+                yield date(year, month, starts_on.day)
+            period += 1
+
+    else:
+        raise ValueError(f"Unsupported frequency: {frequency}")
+
+
+def occurrences(
+    frequency: str,
+    interval: int,
+    starts_on: date,
+    time_of_day: time,
+    after: datetime,
+    until: datetime,
+    weekdays: Optional[List[int]] = None,
+    ends_on: Optional[date] = None,
+    limit: Optional[int] = None,
+) -> List[datetime]:
+    """
+    Occurrence times of an RRULE-style rule (FREQ, INTERVAL, BYDAY for
+    weekly rules, DTSTART's day of the month for monthly ones) in
+    (after, until], earliest first, at most `limit` of them. Times are
+    naive UTC like the rest of the codebase.
+    """
+    if interval < 1:
+        raise ValueError("interval must be at least 1")
+
+    result = []
+    last_day = min(until.date(), ends_on) if ends_on else until.date()
+    for day in _dates(str(getattr(frequency, "value", frequency)), interval, starts_on, weekdays or [], after.date()):
+        if day > last_day:
+            break
+        moment = datetime.combine(day, time_of_day)
+        if day < starts_on or moment <= after or moment > until:
+            continue
+        result.append(moment)
+        if limit is not None and len(result) >= limit:
+            break
+    return result
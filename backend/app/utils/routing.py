@@ -0,0 +1,177 @@
+import numpy as np
+
+
+# Objective weight of one minute of lateness, in km of driving
+LATENESS_WEIGHT = 5.0
+
+# Exhaustive or-opt evaluates O(n^2) moves at O(n) each; above this many
+# stops only distance-improving 2-opt moves are tried
+OR_OPT_MAX_STOPS = 40
+
+
+def sequence_stops(
+    dist,
+    speed_kmph: float,
+    ready,
+    due,
+    service_minutes: float = 0.0,
+    max_passes: int = 20,
+):
+    """
+    Orders stops 1..n of an open route starting at node 0. dist is an
+    (n + 1) x (n + 1) km matrix; ready/due are per-stop time windows in
+    minutes from departure (use -inf/inf when a stop has none). Arriving
+    before ready waits, arriving after due is penalised.
+
+    Nearest-neighbour construction, then 2-opt and or-opt improvement on
+    distance plus weighted lateness. Returns the order as stop indices
+    (1-based, matching dist).
+    """
+    dist = np.asarray(dist, dtype=float)
+    ready = np.concatenate([[-np.inf], np.asarray(ready, dtype=float)])
+    due = np.concatenate([[np.inf], np.asarray(due, dtype=float)])
+    n = dist.shape[0] - 1
+
+    if n <= 1:
+        return list(range(1, n + 1))
+
+    travel = dist / speed_kmph * 60.0
+
+    def objective(order):
+        total, _, late = simulate(order, dist, travel, ready, due, service_minutes)
+        return total + LATENESS_WEIGHT * late
+
+    order = _nearest_neighbour(dist, travel, ready, due, service_minutes)
+    best = objective(order)
+
+    for _ in range(max_passes):
+        improved = False
+
+        order, best, moved = _two_opt(order, best, dist, objective)
+        improved |= moved
+
+        if n <= OR_OPT_MAX_STOPS:
+            order, best, moved = _or_opt(order, best, objective)
+            improved |= moved
+
+        if not improved:
+            break
+
+    return order
+
+
+def simulate(order, dist, travel, ready, due, service_minutes):
+    """
+    Walks the route from node 0. Returns (total_km, arrival_minutes per
+    stop, total_late_minutes). ready/due are indexed by node, like dist.
+    """
+    t = 0.0
+    total = 0.0
+    late = 0.0
+    arrivals = []
+    position = 0
+
+    for stop in order:
+        total += dist[position, stop]
+        t += travel[position, stop]
+        if t < ready[stop]:
+            t = ready[stop]
+        arrivals.append(t)
+        if t > due[stop]:
+            late += t - due[stop]
+        t += service_minutes
+        position = stop
+
+    return total, arrivals, late
+
+
+def _nearest_neighbour(dist, travel, ready, due, service_minutes):
+    n = dist.shape[0] - 1
+    remaining = np.ones(n + 1, dtype=bool)
+    remaining[0] = False
+
+    order = []
+    position = 0
+    t = 0.0
+
+    while remaining.any():
+        candidates = np.flatnonzero(remaining)
+        arrival = np.maximum(t + travel[position, candidates], ready[candidates])
+        lateness = np.maximum(arrival - due[candidates], 0.0)
+        score = dist[position, candidates] + LATENESS_WEIGHT * lateness
+
+        stop = int(candidates[np.argmin(score)])
+        order.append(stop)
+        remaining[stop] = False
+
+        t = max(t + travel[position, stop], ready[stop]) + service_minutes
+        position = stop
+
+    return order
+
+
+def _two_opt(order, best, dist, objective):
+    """
+    2-opt until no reversal improves. Distance deltas for every segment
+    reversal are computed at once; candidates are then checked against
+    the full objective, best distance gain first.
+    """
+    n = len(order)
+    if n < 2:
+        return order, best, False
+
+    # open route: a zero-distance end node stands in for "no next stop"
+    size = dist.shape[0]
+    ext = np.zeros((size + 1, size + 1))
+    ext[:size, :size] = dist
+
+    i = np.arange(1, n + 1)[:, None]
+    j = np.arange(1, n + 1)[None, :]
+    upper = j > i
+
+    moved = False
+    for _ in range(n * n):
+        seq = np.array([0] + order + [size])
+        delta = (
+            ext[seq[i - 1], seq[j]]
+            + ext[seq[i], seq[j + 1]]
+            - ext[seq[i - 1], seq[i]]
+            - ext[seq[j], seq[j + 1]]
+        )
+        delta[~upper] = np.inf
+
+        improved = False
+        for flat in np.argsort(delta, axis=None):
+            a, b = np.unravel_index(flat, delta.shape)
+            if delta[a, b] >= -1e-9:
+                break
+            candidate = order[:a] + order[a:b + 1][::-1] + order[b + 1:]
+            value = objective(candidate)
+            if value < best - 1e-9:
+                order, best, improved = candidate, value, True
+                break
+
+        if not improved:
+            break
+        moved = True
+
+    return order, best, moved
+
+
+def _or_opt(order, best, objective):
+    "relocates segments of 1-3 consecutive stops, first improvement"
+    n = len(order)
+
+    for length in (1, 2, 3):
+        for start in range(n - length + 1):
+            segment = order[start:start + length]
+            rest = order[:start] + order[start + length:]
+            for position in range(len(rest) + 1):
+                if position == start:
+                    continue
+                candidate = rest[:position] + segment + rest[position:]
+                value = objective(candidate)
+                if value < best - 1e-9:
+                    return candidate, value, True
+
+    return order, best, False
@@ -0,0 +1,110 @@
+import math
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel. Level 0 has one slot per tick, and each
+    level above covers `slots` times the span of the one below. A timer
+    sits at the lowest level where its deadline shares every higher digit
+    with the current tick, and drops a level whenever the wheel below it
+    wraps round to its slot.
+
+    schedule and cancel are O(1). Deadlines past the top level's span
+    wait in an overflow bucket that is re-sorted once per full turn.
+    Timers fire on the first advance at or after their deadline tick,
+    so they are never early and at most one tick late.
+    """
+
+    def __init__(self, tick_seconds: float = 1.0, slots: int = 64, levels: int = 4, now: float = 0.0):
+        self.tick = tick_seconds
+        self.slots = slots
+        self.levels = levels
+        self._current = int(math.floor(now / tick_seconds))
+        self._wheels: List[List[Dict[Hashable, Any]]] = [
+            [{} for _ in range(slots)] for _ in range(levels)
+        ]
+        self._overflow: Dict[Hashable, Any] = {}
+        self._ready: Dict[Hashable, Any] = {}
+        # key -> (deadline tick, bucket holding it)
+        self._timers: Dict[Hashable, Tuple[int, Dict[Hashable, Any]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._timers
+
+    def deadline(self, key: Hashable) -> Optional[float]:
+        "scheduled time of a timer, rounded up to its tick"
+        entry = self._timers.get(key)
+        return None if entry is None else entry[0] * self.tick
+
+    def schedule(self, key: Hashable, when: float, value: Any = None):
+        "arm a timer for `when` (same clock as advance); re-arming a key moves it"
+        self.cancel(key)
+        self._place(key, int(math.ceil(when / self.tick)), value)
+
+    def cancel(self, key: Hashable) -> bool:
+        entry = self._timers.pop(key, None)
+        if entry is None:
+            return False
+        del entry[1][key]
+        return True
+
+    def advance(self, now: float) -> List[Tuple[Hashable, Any]]:
+        "moves the wheel to `now` and returns the (key, value) of every timer that came due"
+        target = int(math.floor(now / self.tick))
+        fired = self._drain(self._ready)
+
+        while self._current < target:
+            if not self._timers:
+                self._current = target
+                break
+
+            self._current += 1
+            tick = self._current
+
+            # cascade every level whose lower levels just wrapped, top down
+            for level in range(self.levels, 0, -1):
+                span = self.slots ** level
+                if tick % span:
+                    continue
+                if level == self.levels:
+                    self._replace(self._overflow)
+                else:
+                    self._replace(self._wheels[level][(tick // span) % self.slots])
+
+            # a timer cascading down onto this very tick lands in _ready
+            fired.extend(self._drain(self._ready))
+            fired.extend(self._drain(self._wheels[0][tick % self.slots]))
+
+        return fired
+
+    def _place(self, key: Hashable, deadline: int, value: Any):
+        if deadline <= self._current:
+            bucket = self._ready
+        else:
+            bucket = self._overflow
+            for level in range(self.levels):
+                span = self.slots ** (level + 1)
+                if deadline // span == self._current // span:
+                    bucket = self._wheels[level][(deadline // self.slots ** level) % self.slots]
+                    break
+
+        bucket[key] = value
+        self._timers[key] = (deadline, bucket)
+
+    def _replace(self, bucket: Dict[Hashable, Any]):
+        entries = list(bucket.items())
+        bucket.clear()
+        for key, value in entries:
+            deadline, _ = self._timers[key]
+            self._place(key, deadline, value)
+
+    def _drain(self, bucket: Dict[Hashable, Any]) -> List[Tuple[Hashable, Any]]:
+        entries = list(bucket.items())
+        bucket.clear()
+        for key, _ in entries:
+            del self._timers[key]
+        return entries
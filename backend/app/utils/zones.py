@@ -0,0 +1,117 @@
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+LOCATE_CHUNK = 10000
+
+
+def normalize_ring(points: Sequence[Sequence[float]]) -> np.ndarray:
+    """
+    (n, 2) array of (latitude, longitude) vertices with any repeated
+    closing vertex dropped. Raises ValueError for fewer than 3 vertices.
+    """
+    ring = np.asarray(points, dtype=float).reshape(-1, 2)
+    if len(ring) > 1 and np.array_equal(ring[0], ring[-1]):
+        ring = ring[:-1]
+    if len(ring) < 3:
+        raise ValueError("A zone boundary needs at least 3 distinct vertices")
+    return ring
+
+
+def ring_area(ring: np.ndarray) -> float:
+    "shoelace area in squared degrees, only used to rank overlapping zones"
+    y, x = ring[:, 0], ring[:, 1]
+    return 0.5 * abs(float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))))
+
+
+def points_in_ring(lats, lngs, ring: np.ndarray) -> np.ndarray:
+    """
+    Even-odd ray cast of many points against one ring. Points exactly on
+    an edge may fall either side.
+    """
+    lats = np.asarray(lats, dtype=float)[:, None]
+    lngs = np.asarray(lngs, dtype=float)[:, None]
+    yi, xi = ring[:, 0][None, :], ring[:, 1][None, :]
+    yj, xj = np.roll(ring[:, 0], -1)[None, :], np.roll(ring[:, 1], -1)[None, :]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crosses = ((yi > lats) != (yj > lats)) & (
+            lngs < (xj - xi) * (lats - yi) / (yj - yi) + xi
+        )
+    return (crosses.sum(axis=1) % 2) == 1
+
+
+class ZoneIndex:
+    """
+    Point-to-zone lookup for one organization's polygons. Bounding boxes
+    are bucketed on a uniform grid, so a lookup only ray-casts against the
+    few zones whose box covers the point's cell. Where zones overlap the
+    smallest one wins.
+    """
+
+    def __init__(
+        self,
+        zones: Iterable[Tuple[int, Sequence[Sequence[float]]]],
+        cell_size_deg: float = 0.05,
+    ):
+        self.cell_size = cell_size_deg
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self._zones = []
+
+        entries = []
+        for zone_id, boundary in zones:
+            ring = normalize_ring(boundary)
+            bbox = (ring[:, 0].min(), ring[:, 0].max(), ring[:, 1].min(), ring[:, 1].max())
+            entries.append((ring_area(ring), zone_id, ring, bbox))
+
+        # smallest first, so the first hit in a bucket is the one to report
+        entries.sort(key=lambda entry: entry[0])
+
+        for position, (_, zone_id, ring, bbox) in enumerate(entries):
+            self._zones.append((zone_id, ring, bbox))
+            lat0, lat1 = self._cell_index(bbox[0]), self._cell_index(bbox[1])
+            lng0, lng1 = self._cell_index(bbox[2]), self._cell_index(bbox[3])
+            for i in range(lat0, lat1 + 1):
+                for j in range(lng0, lng1 + 1):
+                    self._cells.setdefault((i, j), []).append(position)
+
+    def __len__(self) -> int:
+        return len(self._zones)
+
+    def _cell_index(self, value: float) -> int:
+        return int(math.floor(value / self.cell_size))
+
+    def locate(self, latitude: float, longitude: float) -> Optional[int]:
+        "id of the zone containing the point, or None"
+        bucket = self._cells.get((self._cell_index(latitude), self._cell_index(longitude)))
+        if not bucket:
+            return None
+
+        for position in bucket:
+            zone_id, ring, (lat0, lat1, lng0, lng1) = self._zones[position]
+            if not (lat0 <= latitude <= lat1 and lng0 <= longitude <= lng1):
+                continue
+            if points_in_ring([latitude], [longitude], ring)[0]:
+                return zone_id
+        return None
+
+    def locate_many(self, lats, lngs) -> List[Optional[int]]:
+        "zone id per point, vectorized per zone; for backfills and re-tagging"
+        lats = np.asarray(lats, dtype=float)
+        lngs = np.asarray(lngs, dtype=float)
+        found = np.full(lats.size, -1, dtype=np.int64)
+
+        # largest first so smaller overlapping zones overwrite
+        for zone_id, ring, (lat0, lat1, lng0, lng1) in reversed(self._zones):
+            candidates = np.flatnonzero(
+                (lats >= lat0) & (lats <= lat1) & (lngs >= lng0) & (lngs <= lng1)
+            )
+            # bounded chunks keep the points x edges temporaries small
+            for start in range(0, candidates.size, LOCATE_CHUNK):
+                chunk = candidates[start:start + LOCATE_CHUNK]
+                inside = points_in_ring(lats[chunk], lngs[chunk], ring)
+                found[chunk[inside]] = zone_id
+
+        return [int(z) if z >= 0 else None for z in found]
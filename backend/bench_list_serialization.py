@@ -0,0 +1,150 @@
+"""
+Serialization benchmark for the pickup list page.
+
+Seeds --rows pickups (with one assignment each) into a scratch database,
+then times building and encoding a page of --limit pickups both ways:
+
+    orm         Pickup objects with their assignments, validated through
+                PickupListResponse and dumped by pydantic (the old path)
+    projection  PICKUP_LIST_COLUMNS rows turned into dicts and encoded by
+                FastJSONResponse (what GET /pickups does now)
+
+Reports the median time per page for query + serialization and for
+serialization alone, and checks both produce the same JSON.
+
+    python bench_list_serialization.py --limit 1000 --repeat 30
+
+Uses an in-memory SQLite database unless --database-url is given.
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import selectinload, sessionmaker
+
+import app.models  # noqa: F401  registers every mapper
+from app.api.v1.pickups.pickup_schemas import PickupListResponse
+from app.models.pickup import Pickup, PickupStatus, WasteType
+from app.models.pickup_assignment import AssignmentStatus, PickupAssignment
+from app.repositories.pickup_repo import PICKUP_LIST_COLUMNS
+from app.utils.serialization import FastJSONResponse, rows_to_dicts
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Pickup list serialization benchmark")
+    parser.add_argument("--rows", type=int, default=5000, help="pickups seeded")
+    parser.add_argument("--limit", type=int, default=1000, help="pickups per page")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per path")
+    parser.add_argument("--database-url", default="sqlite://", help="scratch database; tables are created and dropped")
+    return parser.parse_args()
+
+
+def seed(factory, rows):
+    db = factory()
+    start = datetime(2026, 1, 1)
+    db.add_all([
+        Pickup(
+            id=i + 1,
+            organization_id=1,
+            waste_type=list(WasteType)[i % len(WasteType)],
+            waste_weight=1.0 + i % 50,
+            address=f"{i} Benchmark Road",
+            latitude=12.9 + i * 1e-5,
+            longitude=77.5 + i * 1e-5,
+            status=PickupStatus.ASSIGNED,
+            scheduled_at=start + timedelta(minutes=i),
+            created_at=start + timedelta(seconds=i),
+            updated_at=start + timedelta(seconds=i),
+        )
+        for i in range(rows)
+    ])
+    db.flush()
+    db.add_all([
+        PickupAssignment(pickup_id=i + 1, driver_id=1, status=AssignmentStatus.ASSIGNED)
+        for i in range(rows)
+    ])
+    db.commit()
+    db.close()
+
+
+def orm_page(db, limit):
+    db.expunge_all()
+    return (
+        db.query(Pickup)
+        .options(selectinload(Pickup.assignments))
+        .order_by(Pickup.created_at.desc(), Pickup.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def orm_encode(pickups):
+    return PickupListResponse(pickups=pickups, next_cursor=None, total=None).model_dump_json().encode()
+
+
+def projection_page(db, limit):
+    return (
+        db.query(*PICKUP_LIST_COLUMNS)
+        .order_by(Pickup.created_at.desc(), Pickup.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def projection_encode(rows):
+    return FastJSONResponse({"pickups": rows_to_dicts(rows), "next_cursor": None, "total": None}).body
+
+
+def median_ms(func, repeat):
+    func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    args = parse_args()
+    engine = create_engine(args.database_url)
+    tables = [Pickup.__table__, PickupAssignment.__table__]
+    for table in tables:
+        table.create(engine)
+    factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    try:
+        seed(factory, args.rows)
+        db = factory()
+        pickups = orm_page(db, args.limit)
+        rows = projection_page(db, args.limit)
+        if orm_encode(pickups) != projection_encode(rows):
+            raise SystemExit("the two paths produced different JSON")
+
+        results = {
+            "orm": (
+                median_ms(lambda: orm_encode(orm_page(db, args.limit)), args.repeat),
+                median_ms(lambda: orm_encode(pickups), args.repeat),
+            ),
+            "projection": (
+                median_ms(lambda: projection_encode(projection_page(db, args.limit)), args.repeat),
+                median_ms(lambda: projection_encode(rows), args.repeat),
+            ),
+        }
+        db.close()
+    finally:
+        for table in reversed(tables):
+            table.drop(engine)
+
+    print(f"{args.limit} pickups per page, median of {args.repeat}")
+    for name, (total, encode) in results.items():
+        print(f"{name:<11} query+encode {total:8.2f} ms   encode {encode:8.2f} ms")
+    orm_total, orm_encode_ms = results["orm"]
+    new_total, new_encode_ms = results["projection"]
+    print(f"speedup     query+encode {orm_total / new_total:7.1f}x    encode {orm_encode_ms / new_encode_ms:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ from app.models import role
 from app.models import role_mapping
 from app.models import organization
 from app.models import driver
+from app.models import vehicle
 from app.models import notification
 from app.models import audit_log
 from app.models import subscription_plan
@@ -18,9 +19,11 @@ from app.models import subscription
 from app.models import subscription_usage
 from app.models import audit_log
 
+from app.models import location
 from app.models import pickup
 from app.models import pickup_assignment
 from app.models import pickup_media
+from app.models import scheduled_job
 from alembic import context
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,89 @@
+"""add vehicle tables
+
+Revision ID: 5e1f0b9c3a27
+Revises: 8c5e27d4a9b3
+Create Date: 2026-10-19 13:05:11.208431
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1f0b9c3a27'
+down_revision: Union[str, Sequence[str], None] = '8c5e27d4a9b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'vehicles',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column('registration_number', sa.String(length=50), nullable=False),
+        sa.Column('vehicle_type', sa.String(length=50), nullable=True),
+        sa.Column('capacity_kg', sa.Float(), nullable=False),
+        sa.Column('waste_type_capacity_kg', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('status', sa.Enum('ACTIVE', 'MAINTENANCE', 'INACTIVE', name='vehiclestatus'), nullable=False),
+        sa.Column('created_by', sa.Integer(), nullable=False),
+        sa.Column('updated_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.CheckConstraint('capacity_kg > 0', name='check_vehicle_capacity_positive'),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id']),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['updated_by'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('organization_id', 'registration_number', name='uq_vehicle_org_registration'),
+    )
+    op.create_index(op.f('ix_vehicles_organization_id'), 'vehicles', ['organization_id'], unique=False)
+    op.create_index(op.f('ix_vehicles_status'), 'vehicles', ['status'], unique=False)
+
+    op.create_table(
+        'driver_vehicle_map',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('driver_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('vehicle_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('assigned_by', sa.Integer(), nullable=False),
+        sa.Column('assigned_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('released_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['assigned_by'], ['users.id']),
+        sa.ForeignKeyConstraint(['driver_id'], ['drivers.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_driver_vehicle_map_driver_id'), 'driver_vehicle_map', ['driver_id'], unique=False)
+    op.create_index(op.f('ix_driver_vehicle_map_vehicle_id'), 'driver_vehicle_map', ['vehicle_id'], unique=False)
+    op.create_index(
+        'uq_driver_vehicle_map_active_driver',
+        'driver_vehicle_map',
+        ['driver_id'],
+        unique=True,
+        postgresql_where=sa.text('is_active'),
+    )
+    op.create_index(
+        'uq_driver_vehicle_map_active_vehicle',
+        'driver_vehicle_map',
+        ['vehicle_id'],
+        unique=True,
+        postgresql_where=sa.text('is_active'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_driver_vehicle_map_active_vehicle', table_name='driver_vehicle_map')
+    op.drop_index('uq_driver_vehicle_map_active_driver', table_name='driver_vehicle_map')
+    op.drop_index(op.f('ix_driver_vehicle_map_vehicle_id'), table_name='driver_vehicle_map')
+    op.drop_index(op.f('ix_driver_vehicle_map_driver_id'), table_name='driver_vehicle_map')
+    op.drop_table('driver_vehicle_map')
+    op.drop_index(op.f('ix_vehicles_status'), table_name='vehicles')
+    op.drop_index(op.f('ix_vehicles_organization_id'), table_name='vehicles')
+    op.drop_table('vehicles')
+    sa.Enum(name='vehiclestatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,100 @@
+"""add driver availability position
+
+Revision ID: 8c5e27d4a9b3
+Revises: f3a91c2d7b10
+Create Date: 2026-10-19 11:40:27.502914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c5e27d4a9b3'
+down_revision: Union[str, Sequence[str], None] = 'f3a91c2d7b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def _geohash_encode(lat: float, lng: float, precision: int = 9) -> str:
+    "frozen copy of the encoder at this revision, so the backfill never follows app code"
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2.0
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('driver_availability', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('driver_availability', sa.Column('longitude', sa.Float(), nullable=True))
+    op.add_column('driver_availability', sa.Column('geohash', sa.String(length=12), nullable=True))
+    op.add_column('driver_availability', sa.Column('location_updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_driver_availability_geohash',
+        'driver_availability',
+        ['geohash'],
+        unique=False,
+        postgresql_ops={'geohash': 'varchar_pattern_ops'},
+    )
+
+    # Backfill from each driver's latest recorded location
+    op.execute(
+        """
+        UPDATE driver_availability da
+        SET latitude = dl.latitude,
+            longitude = dl.longitude,
+            location_updated_at = dl.recorded_at
+        FROM (
+            SELECT DISTINCT ON (driver_id) driver_id, latitude, longitude, recorded_at
+            FROM driver_locations
+            ORDER BY driver_id, recorded_at DESC
+        ) dl
+        WHERE dl.driver_id = da.driver_id;
+        """
+    )
+
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.text("SELECT id, latitude, longitude FROM driver_availability WHERE latitude IS NOT NULL")
+    ).fetchall()
+    if rows:
+        bind.execute(
+            sa.text("UPDATE driver_availability SET geohash = :geohash WHERE id = :id"),
+            [{"id": r.id, "geohash": _geohash_encode(r.latitude, r.longitude)} for r in rows],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_driver_availability_geohash', table_name='driver_availability')
+    op.drop_column('driver_availability', 'location_updated_at')
+    op.drop_column('driver_availability', 'geohash')
+    op.drop_column('driver_availability', 'longitude')
+    op.drop_column('driver_availability', 'latitude')
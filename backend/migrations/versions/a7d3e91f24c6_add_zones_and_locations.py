@@ -0,0 +1,135 @@
+"""add zones and locations
+
+Revision ID: a7d3e91f24c6
+Revises: 5e1f0b9c3a27
+Create Date: 2026-10-19 14:22:48.117305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e91f24c6'
+down_revision: Union[str, Sequence[str], None] = '5e1f0b9c3a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'zones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('boundary', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('min_latitude', sa.Float(), nullable=False),
+        sa.Column('max_latitude', sa.Float(), nullable=False),
+        sa.Column('min_longitude', sa.Float(), nullable=False),
+        sa.Column('max_longitude', sa.Float(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('organization_id', 'name', name='uq_zone_org_name'),
+    )
+    op.create_index(op.f('ix_zones_id'), 'zones', ['id'], unique=False)
+    op.create_index(op.f('ix_zones_organization_id'), 'zones', ['organization_id'], unique=False)
+
+    op.create_table(
+        'locations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column('zone_id', sa.Integer(), nullable=True),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('location_type', sa.String(length=50), nullable=True),
+        sa.Column('address', sa.String(length=500), nullable=True),
+        sa.Column('latitude', sa.Float(), nullable=False),
+        sa.Column('longitude', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['zone_id'], ['zones.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_locations_id'), 'locations', ['id'], unique=False)
+    op.create_index(op.f('ix_locations_organization_id'), 'locations', ['organization_id'], unique=False)
+    op.create_index(op.f('ix_locations_zone_id'), 'locations', ['zone_id'], unique=False)
+
+    op.add_column('pickups', sa.Column('zone_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('fk_pickups_zone_id', 'pickups', 'zones', ['zone_id'], ['id'], ondelete='SET NULL')
+    op.create_index('ix_pickups_org_zone_status', 'pickups', ['organization_id', 'zone_id', 'status'], unique=False)
+
+    op.add_column('driver_locations', sa.Column('zone_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('fk_driver_locations_zone_id', 'driver_locations', 'zones', ['zone_id'], ['id'], ondelete='SET NULL')
+
+    op.add_column('driver_availability', sa.Column('zone_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('fk_driver_availability_zone_id', 'driver_availability', 'zones', ['zone_id'], ['id'], ondelete='SET NULL')
+    op.create_index(op.f('ix_driver_availability_zone_id'), 'driver_availability', ['zone_id'], unique=False)
+
+    # Zone permissions: ADMIN and ORGANIZATION manage, everyone with a role views
+    op.execute(
+        """
+        INSERT INTO permissions (code, description, created_at, updated_at) VALUES
+        ('zone.view', 'View service zones', NOW(), NOW()),
+        ('zone.manage', 'Create and edit service zones', NOW(), NOW())
+        ON CONFLICT (code) DO NOTHING;
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO role_permissions (role_id, permission_id, created_at, updated_at)
+        SELECT r.id, p.id, NOW(), NOW()
+        FROM roles r, permissions p
+        WHERE r.name IN ('ADMIN', 'ORGANIZATION')
+        AND p.code IN ('zone.view', 'zone.manage')
+        ON CONFLICT DO NOTHING;
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO role_permissions (role_id, permission_id, created_at, updated_at)
+        SELECT r.id, p.id, NOW(), NOW()
+        FROM roles r, permissions p
+        WHERE r.name = 'DRIVER'
+        AND p.code = 'zone.view'
+        ON CONFLICT DO NOTHING;
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        """
+        DELETE FROM role_permissions
+        WHERE permission_id IN (
+            SELECT id FROM permissions WHERE code IN ('zone.view', 'zone.manage')
+        );
+        """
+    )
+    op.execute("DELETE FROM permissions WHERE code IN ('zone.view', 'zone.manage');")
+
+    op.drop_index(op.f('ix_driver_availability_zone_id'), table_name='driver_availability')
+    op.drop_constraint('fk_driver_availability_zone_id', 'driver_availability', type_='foreignkey')
+    op.drop_column('driver_availability', 'zone_id')
+
+    op.drop_constraint('fk_driver_locations_zone_id', 'driver_locations', type_='foreignkey')
+    op.drop_column('driver_locations', 'zone_id')
+
+    op.drop_index('ix_pickups_org_zone_status', table_name='pickups')
+    op.drop_constraint('fk_pickups_zone_id', 'pickups', type_='foreignkey')
+    op.drop_column('pickups', 'zone_id')
+
+    op.drop_index(op.f('ix_locations_zone_id'), table_name='locations')
+    op.drop_index(op.f('ix_locations_organization_id'), table_name='locations')
+    op.drop_index(op.f('ix_locations_id'), table_name='locations')
+    op.drop_table('locations')
+    op.drop_index(op.f('ix_zones_organization_id'), table_name='zones')
+    op.drop_index(op.f('ix_zones_id'), table_name='zones')
+    op.drop_table('zones')
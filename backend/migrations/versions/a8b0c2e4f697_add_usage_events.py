@@ -0,0 +1,56 @@
+"""add usage events
+
+Revision ID: a8b0c2e4f697
+Revises: f7a9b1d3e586
+Create Date: 2026-10-19 21:05:52.816340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8b0c2e4f697'
+down_revision: Union[str, Sequence[str], None] = 'f7a9b1d3e586'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'usage_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('subscription_id', sa.Integer(), nullable=False),
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column('pickup_id', sa.Integer(), nullable=True),
+        sa.Column(
+            'event_type',
+            sa.Enum('PICKUP_CREATED', 'PICKUP_CANCELLED', 'PICKUP_WITHDRAWN', 'PICKUP_COMPLETED', name='usageeventtype'),
+            nullable=False,
+        ),
+        sa.Column('delta_pickups', sa.Integer(), nullable=False),
+        sa.Column('delta_weight', sa.Float(), nullable=False),
+        sa.Column('delta_drivers', sa.Integer(), nullable=False),
+        sa.Column('folded', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['subscription_id'], ['subscriptions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_usage_events_unfolded', 'usage_events', ['subscription_id', 'id'], unique=False,
+        postgresql_where=sa.text('NOT folded'),
+    )
+    op.create_index('ix_usage_events_subscription_created', 'usage_events', ['subscription_id', 'created_at'], unique=False)
+    op.create_index('ix_usage_events_pickup_id', 'usage_events', ['pickup_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_usage_events_pickup_id', table_name='usage_events')
+    op.drop_index('ix_usage_events_subscription_created', table_name='usage_events')
+    op.drop_index('ix_usage_events_unfolded', table_name='usage_events', postgresql_where=sa.text('NOT folded'))
+    op.drop_table('usage_events')
+    sa.Enum(name='usageeventtype').drop(op.get_bind(), checkfirst=True)
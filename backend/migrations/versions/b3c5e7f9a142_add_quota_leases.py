@@ -0,0 +1,44 @@
+"""add quota leases
+
+Revision ID: b3c5e7f9a142
+Revises: f8a1c3e5b724
+Create Date: 2026-10-19 17:12:40.518302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3c5e7f9a142'
+down_revision: Union[str, Sequence[str], None] = 'f8a1c3e5b724'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'quota_leases',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('subscription_id', sa.Integer(), nullable=False),
+        sa.Column('holder', sa.String(length=100), nullable=False),
+        sa.Column('pickups_remaining', sa.Integer(), nullable=False),
+        sa.Column('weight_remaining', sa.Float(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['subscription_id'], ['subscriptions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_quota_leases_id'), 'quota_leases', ['id'], unique=False)
+    op.create_index('ix_quota_leases_subscription_expires', 'quota_leases', ['subscription_id', 'expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_quota_leases_subscription_expires', table_name='quota_leases')
+    op.drop_index(op.f('ix_quota_leases_id'), table_name='quota_leases')
+    op.drop_table('quota_leases')
@@ -0,0 +1,76 @@
+"""add scheduled jobs
+
+Revision ID: d2f4a6b8c013
+Revises: a7d3e91f24c6
+Create Date: 2026-10-19 16:05:12.408133
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f4a6b8c013'
+down_revision: Union[str, Sequence[str], None] = 'a7d3e91f24c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'scheduled_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_type', sa.String(length=50), nullable=False),
+        sa.Column('dedupe_key', sa.String(length=200), nullable=True),
+        sa.Column('organization_id', sa.Integer(), nullable=True),
+        sa.Column('entity_type', sa.String(length=50), nullable=True),
+        sa.Column('entity_id', sa.Integer(), nullable=True),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('run_at', sa.DateTime(), nullable=False),
+        sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'DONE', 'FAILED', 'CANCELLED', name='scheduledjobstatus'), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('locked_at', sa.DateTime(), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_scheduled_jobs_id'), 'scheduled_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_scheduled_jobs_organization_id'), 'scheduled_jobs', ['organization_id'], unique=False)
+    op.create_index('ix_scheduled_jobs_status_run_at', 'scheduled_jobs', ['status', 'run_at'], unique=False)
+    op.create_index('ix_scheduled_jobs_entity', 'scheduled_jobs', ['entity_type', 'entity_id'], unique=False)
+    op.create_index(
+        'uq_scheduled_jobs_pending_dedupe_key',
+        'scheduled_jobs',
+        ['dedupe_key'],
+        unique=True,
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+
+    op.add_column('pickups', sa.Column('overdue_at', sa.DateTime(), nullable=True))
+
+    # New enum values cannot be used inside the transaction that adds them
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE notificationtype ADD VALUE IF NOT EXISTS 'PICKUP_REMINDER'")
+        op.execute("ALTER TYPE notificationtype ADD VALUE IF NOT EXISTS 'PICKUP_OVERDUE'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # PostgreSQL cannot drop enum values; the extra notificationtype values stay
+    op.drop_column('pickups', 'overdue_at')
+
+    op.drop_index('uq_scheduled_jobs_pending_dedupe_key', table_name='scheduled_jobs')
+    op.drop_index('ix_scheduled_jobs_entity', table_name='scheduled_jobs')
+    op.drop_index('ix_scheduled_jobs_status_run_at', table_name='scheduled_jobs')
+    op.drop_index(op.f('ix_scheduled_jobs_organization_id'), table_name='scheduled_jobs')
+    op.drop_index(op.f('ix_scheduled_jobs_id'), table_name='scheduled_jobs')
+    op.drop_table('scheduled_jobs')
+    sa.Enum(name='scheduledjobstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,82 @@
+"""add recurring pickups
+
+Revision ID: d5e7f9b1c364
+Revises: c4d6e8a0b253
+Create Date: 2026-10-19 19:12:40.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e7f9b1c364'
+down_revision: Union[str, Sequence[str], None] = 'c4d6e8a0b253'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'recurring_pickups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column(
+            'waste_type',
+            postgresql.ENUM('GENERAL', 'RECYCLABLE', 'HAZARDOUS', 'ORGANIC', 'ELECTRONIC', name='wastetype', create_type=False),
+            nullable=False,
+        ),
+        sa.Column('waste_weight', sa.Float(), nullable=False),
+        sa.Column('address', sa.String(length=500), nullable=False),
+        sa.Column('latitude', sa.Float(), nullable=False),
+        sa.Column('longitude', sa.Float(), nullable=False),
+        sa.Column('frequency', sa.Enum('DAILY', 'WEEKLY', 'MONTHLY', name='recurrencefrequency'), nullable=False),
+        sa.Column('repeat_interval', sa.Integer(), nullable=False),
+        sa.Column('by_weekday', sa.String(length=27), nullable=True),
+        sa.Column('time_of_day', sa.Time(), nullable=False),
+        sa.Column('starts_on', sa.Date(), nullable=False),
+        sa.Column('ends_on', sa.Date(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('materialized_until', sa.DateTime(), nullable=True),
+        sa.Column('paused_reason', sa.String(length=200), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.CheckConstraint('waste_weight > 0', name='check_recurring_waste_weight_positive'),
+        sa.CheckConstraint('repeat_interval >= 1', name='check_recurring_interval_positive'),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_recurring_pickups_id'), 'recurring_pickups', ['id'], unique=False)
+    op.create_index(op.f('ix_recurring_pickups_organization_id'), 'recurring_pickups', ['organization_id'], unique=False)
+    op.create_index(
+        'ix_recurring_pickups_active_materialized', 'recurring_pickups', ['materialized_until', 'id'], unique=False,
+        postgresql_where=sa.text('is_active'),
+    )
+
+    op.add_column('pickups', sa.Column('recurring_pickup_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'pickups_recurring_pickup_id_fkey', 'pickups', 'recurring_pickups',
+        ['recurring_pickup_id'], ['id'], ondelete='SET NULL',
+    )
+    op.create_index(
+        'uq_pickups_recurring_occurrence', 'pickups', ['recurring_pickup_id', 'scheduled_at'], unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_pickups_recurring_occurrence', table_name='pickups')
+    op.drop_constraint('pickups_recurring_pickup_id_fkey', 'pickups', type_='foreignkey')
+    op.drop_column('pickups', 'recurring_pickup_id')
+
+    op.drop_index('ix_recurring_pickups_active_materialized', table_name='recurring_pickups', postgresql_where=sa.text('is_active'))
+    op.drop_index(op.f('ix_recurring_pickups_organization_id'), table_name='recurring_pickups')
+    op.drop_index(op.f('ix_recurring_pickups_id'), table_name='recurring_pickups')
+    op.drop_table('recurring_pickups')
+    sa.Enum(name='recurrencefrequency').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,40 @@
+"""add pickup keyset pagination indexes
+
+Revision ID: e5b7c9d1f246
+Revises: d2f4a6b8c013
+Create Date: 2026-10-19 17:31:40.552918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b7c9d1f246'
+down_revision: Union[str, Sequence[str], None] = 'd2f4a6b8c013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_pickups_org_created_id', 'pickups', ['organization_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_pickups_org_scheduled_id', 'pickups', ['organization_id', 'scheduled_at', 'id'], unique=False)
+    op.create_index('ix_pickups_created_id', 'pickups', ['created_at', 'id'], unique=False)
+    op.create_index('ix_pickups_scheduled_id', 'pickups', ['scheduled_at', 'id'], unique=False)
+    op.create_index(
+        'ix_pickup_assignments_driver_status_pickup',
+        'pickup_assignments',
+        ['driver_id', 'status', 'pickup_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_pickup_assignments_driver_status_pickup', table_name='pickup_assignments')
+    op.drop_index('ix_pickups_scheduled_id', table_name='pickups')
+    op.drop_index('ix_pickups_created_id', table_name='pickups')
+    op.drop_index('ix_pickups_org_scheduled_id', table_name='pickups')
+    op.drop_index('ix_pickups_org_created_id', table_name='pickups')
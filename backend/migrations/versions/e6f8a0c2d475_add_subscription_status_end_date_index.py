@@ -0,0 +1,28 @@
+"""add subscription status end_date index
+
+Revision ID: e6f8a0c2d475
+Revises: d5e7f9b1c364
+Create Date: 2026-10-19 19:48:05.731920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6f8a0c2d475'
+down_revision: Union[str, Sequence[str], None] = 'd5e7f9b1c364'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_subscriptions_status_end_date', 'subscriptions', ['status', 'end_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_subscriptions_status_end_date', table_name='subscriptions')
@@ -0,0 +1,28 @@
+"""add driver location track index
+
+Revision ID: f3a91c2d7b10
+Revises: 0e0636f191fe
+Create Date: 2026-10-19 09:12:04.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a91c2d7b10'
+down_revision: Union[str, Sequence[str], None] = '0e0636f191fe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_driver_locations_driver_recorded', 'driver_locations', ['driver_id', 'recorded_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_driver_locations_driver_recorded', table_name='driver_locations')
@@ -0,0 +1,49 @@
+"""add subscription usage history
+
+Revision ID: f7a9b1d3e586
+Revises: e6f8a0c2d475
+Create Date: 2026-10-19 20:21:37.094518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7a9b1d3e586'
+down_revision: Union[str, Sequence[str], None] = 'e6f8a0c2d475'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'subscription_usage_history',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('subscription_id', sa.Integer(), nullable=False),
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column('period_start', sa.DateTime(), nullable=False),
+        sa.Column('period_end', sa.DateTime(), nullable=False),
+        sa.Column('pickups_used', sa.Integer(), nullable=False),
+        sa.Column('waste_weight_used', sa.Float(), nullable=False),
+        sa.Column('drivers_used', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['subscription_id'], ['subscriptions.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('subscription_id', 'period_start', name='uq_usage_history_subscription_period'),
+    )
+    op.create_index(op.f('ix_subscription_usage_history_id'), 'subscription_usage_history', ['id'], unique=False)
+    op.create_index('ix_usage_history_org_period', 'subscription_usage_history', ['organization_id', 'period_start'], unique=False)
+    op.create_index('ix_subscription_usage_last_reset_at', 'subscription_usage', ['last_reset_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_subscription_usage_last_reset_at', table_name='subscription_usage')
+    op.drop_index('ix_usage_history_org_period', table_name='subscription_usage_history')
+    op.drop_index(op.f('ix_subscription_usage_history_id'), table_name='subscription_usage_history')
+    op.drop_table('subscription_usage_history')
@@ -0,0 +1,40 @@
+"""add pickup filter indexes
+
+Revision ID: f8a1c3e5b724
+Revises: e5b7c9d1f246
+Create Date: 2026-10-19 18:12:03.771460
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8a1c3e5b724'
+down_revision: Union[str, Sequence[str], None] = 'e5b7c9d1f246'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_pickups_org_status_created', 'pickups', ['organization_id', 'status', 'created_at', 'id'], unique=False)
+    op.create_index(
+        'ix_pickups_org_active_status_scheduled',
+        'pickups',
+        ['organization_id', 'status', 'scheduled_at'],
+        unique=False,
+        postgresql_where=sa.text("status IN ('PENDING', 'ASSIGNED', 'IN_PROGRESS')"),
+    )
+    op.create_index('ix_pickups_org_waste_created', 'pickups', ['organization_id', 'waste_type', 'created_at'], unique=False)
+    op.create_index('ix_pickups_org_lat_lng', 'pickups', ['organization_id', 'latitude', 'longitude'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_pickups_org_lat_lng', table_name='pickups')
+    op.drop_index('ix_pickups_org_waste_created', table_name='pickups')
+    op.drop_index('ix_pickups_org_active_status_scheduled', table_name='pickups')
+    op.drop_index('ix_pickups_org_status_created', table_name='pickups')
@@ -0,0 +1,171 @@
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  registers every mapper
+from app.api.v1.pickups import pickup_routes, pickup_service
+from app.api.v1.pickups.pickup_routes import _parse_bulk_rows
+from app.api.v1.pickups.pickup_service import PickupService
+from app.models.audit_log import AuditLog
+from app.models.outbox_event import OutboxEvent
+from app.models.pickup import Pickup, PickupStatus, WasteType
+from app.models.subscription import SubscriptionStatus
+from app.models.subscription_usage import SubscriptionUsage
+from app.models.usage_event import UsageEvent
+from app.repositories.pickup_repo import PickupRepository
+from app.services.subscription_service import ActiveSubscription
+
+CSV_HEADER = "waste_type,waste_weight,address,latitude,longitude,scheduled_at\n"
+
+
+def test_csv_rows_map_blank_cells_to_none():
+    body = (
+        "\ufeff" + CSV_HEADER
+        + "GENERAL,12.5,1 Depot Rd,12.97,77.59,2026-03-02T08:00:00\n"
+        + "ORGANIC,3,2 Depot Rd,12.98,77.60,\n"
+    ).encode()
+
+    rows = _parse_bulk_rows(body, "text/csv; charset=utf-8")
+
+    assert rows[0]["waste_weight"] == "12.5"
+    assert rows[1]["scheduled_at"] is None
+    assert rows[1]["address"] == "2 Depot Rd"
+
+
+def test_csv_without_required_columns_is_rejected():
+    with pytest.raises(HTTPException) as error:
+        _parse_bulk_rows(b"waste_type,address\nGENERAL,1 Depot Rd\n", "text/csv")
+
+    assert error.value.status_code == 400
+    assert error.value.detail == "CSV is missing columns: waste_weight, latitude, longitude"
+
+
+def test_json_accepts_a_bare_array_or_a_pickups_object():
+    rows = [{"waste_type": "GENERAL", "waste_weight": 1, "address": "x", "latitude": 0, "longitude": 0}]
+
+    assert _parse_bulk_rows(json.dumps(rows).encode(), "application/json") == rows
+    assert _parse_bulk_rows(json.dumps({"pickups": rows}).encode(), "application/json") == rows
+
+
+@pytest.mark.parametrize("body, detail", [
+    (b"{not json", "Malformed JSON upload"),
+    (b'{"rows": []}', "Expected a JSON array of pickups"),
+    (b"[]", "Upload contains no pickups"),
+])
+def test_bad_json_uploads_are_rejected(body, detail):
+    with pytest.raises(HTTPException) as error:
+        _parse_bulk_rows(body, "application/json")
+
+    assert (error.value.status_code, error.value.detail) == (400, detail)
+
+
+def test_uploads_over_the_row_cap_are_rejected(monkeypatch):
+    monkeypatch.setattr(pickup_routes, "BULK_PICKUP_MAX_ROWS", 2)
+    body = (CSV_HEADER + "GENERAL,1,a,0,0,\n" * 3).encode()
+
+    with pytest.raises(HTTPException) as error:
+        _parse_bulk_rows(body, "text/csv")
+
+    assert (error.value.status_code, error.value.detail) == (400, "At most 2 pickups per upload")
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bulk.db'}")
+    for model in (Pickup, SubscriptionUsage, UsageEvent, OutboxEvent, AuditLog):
+        model.__table__.create(engine)
+
+    sub = ActiveSubscription(
+        id=1, organization_id=1, plan_id=1, status=SubscriptionStatus.ACTIVE,
+        end_date=datetime.utcnow() + timedelta(days=30), pickup_limit=4, waste_weight_limit=100.0,
+    )
+    monkeypatch.setattr(pickup_service, "active_subscription_cache", SimpleNamespace(get=lambda db, org_id: sub))
+    monkeypatch.setattr(pickup_service, "zone_index_cache", SimpleNamespace(
+        get=lambda db, org_id: SimpleNamespace(locate_many=lambda lats, lngs: [None] * len(lats))
+    ))
+    monkeypatch.setattr(pickup_service, "schedule_jobs_for_pickups", lambda db, pickups, created_by: [])
+
+    session = sessionmaker(bind=engine)()
+    session.add(SubscriptionUsage(subscription_id=1, pickups_used=1, waste_weight_used=10.0, drivers_used=0))
+    session.commit()
+    yield session
+    session.close()
+
+
+ORG = SimpleNamespace(id=1)
+USER = SimpleNamespace(id=3)
+
+
+def _row(weight, address="1 Depot Rd", **overrides):
+    row = {"waste_type": "GENERAL", "waste_weight": weight, "address": address, "latitude": 12.97, "longitude": 77.59}
+    row.update(overrides)
+    return row
+
+
+def _usage(db):
+    usage = db.query(SubscriptionUsage).one()
+    db.refresh(usage)
+    return usage.pickups_used, usage.waste_weight_used
+
+
+def test_invalid_rows_are_reported_by_position_and_the_rest_created(db):
+    rows = [
+        _row(5.0, "first"),
+        _row(-1.0, "negative"),
+        _row(2.0, "second", scheduled_at=None),
+        _row(1.0, "far", latitude=123.0, waste_type="ROCKS"),
+    ]
+
+    result = PickupService.bulk_create_pickups(db, ORG, rows, USER)
+
+    assert (result["created"], result["failed"]) == (2, 2)
+    created = [r for r in result["results"] if r["status"] == "created"]
+    assert [r["row"] for r in created] == [1, 3]
+    assert [db.get(Pickup, r["pickup_id"]).address for r in created] == ["first", "second"]
+
+    negative, far = result["results"][1], result["results"][3]
+    assert negative["row"] == 2 and negative["errors"][0].startswith("waste_weight: ")
+    assert far["row"] == 4
+    assert {error.split(":")[0] for error in far["errors"]} == {"waste_type", "latitude"}
+
+    assert _usage(db) == (3, 17.0)
+    assert db.query(UsageEvent).count() == 2
+    assert db.query(OutboxEvent).count() == 2
+
+
+@pytest.mark.parametrize("rows, detail", [
+    ([_row(1.0)] * 4, "Pickup limit exceeded: 3 pickups left on the plan"),
+    ([_row(50.0), _row(45.0)], "Waste weight limit exceeded: 90.0 kg left on the plan"),
+])
+def test_a_batch_over_the_plan_limits_is_rejected_whole(db, rows, detail):
+    with pytest.raises(HTTPException) as error:
+        PickupService.bulk_create_pickups(db, ORG, rows, USER)
+
+    assert (error.value.status_code, error.value.detail) == (403, detail)
+    assert db.query(Pickup).count() == 0
+    assert db.query(UsageEvent).count() == 0
+    assert _usage(db) == (1, 10.0)
+
+
+def test_bulk_insert_returns_ids_in_input_order(db):
+    rows = [
+        {
+            "organization_id": 2,
+            "waste_type": WasteType.GENERAL,
+            "waste_weight": float(i),
+            "address": f"{i} Bulk St",
+            "latitude": 0.0,
+            "longitude": 0.0,
+            "status": PickupStatus.PENDING,
+        }
+        for i in range(5)
+    ]
+    ids = PickupRepository.bulk_create_pickups(db, rows)
+    db.commit()
+
+    assert [db.get(Pickup, pickup_id).address for pickup_id in ids] == [row["address"] for row in rows]
@@ -0,0 +1,41 @@
+import math
+
+from app.utils.capacity import CapacityTracker
+
+
+def test_tracker_counts_existing_load():
+    """
+    Test that load already on the vehicle reduces the spare capacity.
+    """
+    tracker = CapacityTracker()
+    tracker.add_vehicle(1, 1000.0, load_kg={"GENERAL": 300.0, "ORGANIC": 200.0})
+
+    assert tracker.remaining(1) == 500.0
+    assert tracker.fits(1, "GENERAL", 500.0)
+    assert not tracker.fits(1, "GENERAL", 500.1)
+
+
+def test_tracker_enforces_per_waste_type_limits():
+    """
+    Test that a waste type limit caps reservations below the total payload.
+    """
+    tracker = CapacityTracker()
+    tracker.add_vehicle(1, 1000.0, {"HAZARDOUS": 100.0}, {"HAZARDOUS": 40.0})
+
+    assert tracker.remaining(1, "HAZARDOUS") == 60.0
+    assert tracker.reserve(1, "HAZARDOUS", 60.0)
+    assert not tracker.reserve(1, "HAZARDOUS", 1.0)
+
+    # other waste types still draw on the rest of the payload
+    assert tracker.remaining(1, "GENERAL") == 900.0
+
+
+def test_tracker_leaves_drivers_without_vehicle_unlimited():
+    """
+    Test that drivers with no linked vehicle are never refused on weight.
+    """
+    tracker = CapacityTracker()
+
+    assert not tracker.is_limited(7)
+    assert tracker.remaining(7, "GENERAL") == math.inf
+    assert tracker.reserve(7, "GENERAL", 10_000.0)
@@ -0,0 +1,115 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  registers every mapper
+from app.models.pickup import Pickup, PickupStatus, WasteType
+from app.services.clustering_service import ClusteringService
+from app.utils.clustering import NOISE, cluster_runs, grid_dbscan
+
+
+def _blob(rng, lat, lng, n, spread=0.001):
+    return lat + rng.normal(0, spread, n), lng + rng.normal(0, spread, n)
+
+
+def test_dbscan_separates_blobs_and_noise():
+    """
+    Test that two dense groups become two clusters and an isolated pickup is noise.
+    """
+    rng = np.random.default_rng(7)
+    lat_a, lng_a = _blob(rng, 12.95, 77.55, 30)
+    lat_b, lng_b = _blob(rng, 13.05, 77.65, 20)
+    lats = np.concatenate([lat_a, lat_b, [12.80]])
+    lngs = np.concatenate([lng_a, lng_b, [77.40]])
+
+    labels = grid_dbscan(lats, lngs, eps_km=0.5, min_samples=3)
+
+    assert len(set(labels[:30])) == 1
+    assert len(set(labels[30:50])) == 1
+    assert labels[0] != labels[30]
+    assert labels[50] == NOISE
+
+
+def test_chain_within_eps_is_one_cluster():
+    """
+    Test that points linked only through neighbours in other grid cells still join up.
+    """
+    # ~0.33 km apart along a line, so every hop crosses a 0.5 km cell edge
+    lats = 12.9 + np.arange(12) * 0.003
+    lngs = np.full(12, 77.5)
+
+    labels = grid_dbscan(lats, lngs, eps_km=0.5, min_samples=2)
+
+    assert set(labels) == {0}
+
+
+def test_weight_cap_splits_runs():
+    """
+    Test that a cluster heavier than the cap is split into compact runs under the cap.
+    """
+    rng = np.random.default_rng(3)
+    lats, lngs = _blob(rng, 12.95, 77.55, 40)
+    weights = np.full(40, 25.0)
+
+    runs, noise = cluster_runs(lats, lngs, weights, eps_km=0.5, min_samples=3, max_weight=300)
+
+    assert noise.size == 0
+    assert len(runs) == 4
+    assert sorted(np.concatenate(runs).tolist()) == list(range(40))
+    assert all(weights[run].sum() <= 300 for run in runs)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Pickup.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+
+    def add(lat, lng, scheduled_at, zone_id=1, status=PickupStatus.PENDING, organization_id=1):
+        session.add(Pickup(
+            organization_id=organization_id, waste_type=WasteType.GENERAL, waste_weight=2.0,
+            address="x", latitude=lat, longitude=lng, status=status,
+            scheduled_at=scheduled_at, zone_id=zone_id,
+        ))
+
+    morning, evening = datetime(2026, 3, 2, 8), datetime(2026, 3, 2, 18)
+    for i in range(4):
+        add(12.95 + i / 10000, 77.55, morning)
+        add(13.05 + i / 10000, 77.65, evening)
+    add(12.95, 77.55, morning, zone_id=2)
+    add(12.95, 77.55, None)
+    add(12.95, 77.55, morning, status=PickupStatus.ASSIGNED)
+    add(12.95, 77.55, morning, organization_id=2)
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_cluster_pending_reads_only_the_window_and_zone(db):
+    """
+    Test that the service clusters the org's PENDING pickups inside the schedule window and zone.
+    """
+    service = ClusteringService(db)
+
+    everything = service.cluster_pending(1)
+    assert everything["pickup_count"] == 10
+    assert sorted(c["pickup_count"] for c in everything["clusters"]) == [4, 6]
+
+    morning = service.cluster_pending(
+        1, scheduled_from=datetime(2026, 3, 2, 6), scheduled_to=datetime(2026, 3, 2, 12), zone_id=1,
+    )
+    assert morning["pickup_count"] == 4
+    assert [c["pickup_count"] for c in morning["clusters"]] == [4]
+    assert morning["clusters"][0]["total_weight_kg"] == 8.0
+    assert morning["unclustered_pickup_ids"] == []
+
+    # the window end is exclusive
+    evening = service.cluster_pending(1, scheduled_from=datetime(2026, 3, 2, 12), scheduled_to=datetime(2026, 3, 2, 18))
+    assert evening["pickup_count"] == 0
+
+    other_zone = service.cluster_pending(1, zone_id=2)
+    assert other_zone["pickup_count"] == 1
+    assert other_zone["clusters"] == [] and len(other_zone["unclustered_pickup_ids"]) == 1
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  registers every mapper
+from app.api.v1.pickups import pickup_service
+from app.api.v1.pickups.pickup_schemas import PickupCreateRequest, PickupResponse
+from app.api.v1.pickups.pickup_service import PickupService
+from app.models.outbox_event import OutboxEvent
+from app.models.pickup import Pickup, PickupStatus, WasteType
+from app.models.subscription import SubscriptionStatus
+from app.models.subscription_usage import SubscriptionUsage
+from app.models.usage_event import UsageEvent
+from app.services.subscription_service import ActiveSubscription
+
+ORG = SimpleNamespace(id=1)
+USER = SimpleNamespace(id=3)
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'create.db'}")
+    for model in (Pickup, SubscriptionUsage, UsageEvent, OutboxEvent):
+        model.__table__.create(engine)
+
+    sub = ActiveSubscription(
+        id=1, organization_id=1, plan_id=1, status=SubscriptionStatus.ACTIVE,
+        end_date=datetime.utcnow() + timedelta(days=30), pickup_limit=3, waste_weight_limit=50.0,
+    )
+    monkeypatch.setattr(pickup_service, "active_subscription_cache", SimpleNamespace(get=lambda db, org_id: sub))
+    monkeypatch.setattr(pickup_service, "locate_zone", lambda db, org_id, lat, lng: 4)
+    scheduled = []
+    monkeypatch.setattr(
+        pickup_service, "schedule_jobs_for_pickups",
+        lambda db, pickups, created_by: scheduled.extend(pickups) or [],
+    )
+
+    session = sessionmaker(bind=engine)()
+    session.add(SubscriptionUsage(subscription_id=1, pickups_used=1, waste_weight_used=20.0, drivers_used=0))
+    session.commit()
+    session.scheduled = scheduled
+    yield session
+    session.close()
+
+
+def _request(weight, **overrides):
+    values = dict(waste_type=WasteType.ORGANIC, waste_weight=weight, address="1 Depot Rd", latitude=12.97, longitude=77.59)
+    values.update(overrides)
+    return PickupCreateRequest(**values)
+
+
+def _usage(db):
+    usage = db.query(SubscriptionUsage).one()
+    db.refresh(usage)
+    return usage.pickups_used, usage.waste_weight_used
+
+
+def test_create_takes_quota_and_returns_the_stored_row(db):
+    scheduled_at = datetime(2026, 3, 2, 14, 30, tzinfo=timezone(timedelta(hours=5, minutes=30)))
+
+    created = PickupService.create_pickup(db, ORG, _request(12.5, scheduled_at=scheduled_at), USER)
+
+    assert _usage(db) == (2, 32.5)
+    assert (created.status, created.zone_id, created.subscription_id) == (PickupStatus.PENDING, 4, 1)
+    # stored as naive UTC, and queued for the scheduled-time jobs
+    assert created.scheduled_at == datetime(2026, 3, 2, 9, 0)
+    assert db.scheduled == [(created.id, 1, datetime(2026, 3, 2, 9, 0))]
+    assert db.query(UsageEvent).one().pickup_id == created.id
+    assert db.query(OutboxEvent).one().event_type == "pickup.created"
+
+
+def test_returned_row_serializes_like_the_loaded_pickup(db):
+    created = PickupService.create_pickup(db, ORG, _request(5.0), USER)
+
+    response = PickupResponse.model_validate(created)
+
+    assert response == PickupResponse.model_validate(db.get(Pickup, created.id))
+    assert response.model_dump_json()
+
+
+@pytest.mark.parametrize("pickups_used, weight, detail", [
+    (3, 1.0, "Pickup limit exceeded: 0 pickups left on the plan"),
+    (1, 30.5, "Waste weight limit exceeded: 30.0 kg left on the plan"),
+])
+def test_a_pickup_over_the_plan_limits_is_rolled_back(db, pickups_used, weight, detail):
+    db.query(SubscriptionUsage).update({SubscriptionUsage.pickups_used: pickups_used})
+    db.commit()
+
+    with pytest.raises(HTTPException) as error:
+        PickupService.create_pickup(db, ORG, _request(weight), USER)
+
+    assert (error.value.status_code, error.value.detail) == (403, detail)
+    assert db.query(Pickup).count() == 0
+    assert db.query(UsageEvent).count() == 0
+    assert db.scheduled == []
+    assert _usage(db) == (pickups_used, 20.0)
@@ -0,0 +1,81 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.services.distance_service import DistanceMatrixService
+from app.utils.geo import haversine_matrix
+
+
+def test_matrix_applies_road_factor_and_speed_profile():
+    """
+    Test that distances are scaled by the road factor and timed at the hour's speed.
+    """
+    profile = [30.0] * 24
+    profile[8] = 15.0
+    service = DistanceMatrixService(road_factor=1.5, speed_profile_kmph=profile)
+
+    lats, lngs = [12.90, 12.95], [77.50, 77.55]
+    result = service.matrix(lats, lngs, lats, lngs, datetime(2026, 1, 5, 8, 30))
+
+    expected = haversine_matrix(lats, lngs, lats, lngs) * 1.5
+    assert np.allclose(result.distance_km, expected, rtol=1e-3)
+    assert np.allclose(result.duration_min, result.distance_km / 15.0 * 60.0)
+
+
+def test_repeated_and_reversed_requests_hit_the_cache():
+    """
+    Test that nearby coordinates in the same cells, and the transposed request, reuse the cached matrix.
+    """
+    service = DistanceMatrixService()
+
+    first = service.matrix([12.9001], [77.5001], [13.0, 13.1], [77.6, 77.7])
+    again = service.matrix([12.9002], [77.5002], [13.0, 13.1], [77.6, 77.7])
+    reverse = service.matrix([13.0, 13.1], [77.6, 77.7], [12.9001], [77.5001])
+
+    # counted per cell pair
+    assert service.misses == 2
+    assert service.hits == 4
+    assert np.array_equal(first.distance_km, again.distance_km)
+    assert np.array_equal(reverse.distance_km, first.distance_km.T)
+
+    with pytest.raises(ValueError):
+        first.distance_km[0, 0] = 0.0
+
+
+def test_cache_evicts_least_recently_used():
+    """
+    Test that the cache stays under its entry budget by dropping the oldest rows.
+    """
+    service = DistanceMatrixService(max_cached_cells=4)
+
+    service.matrix([1.0, 2.0], [1.0, 2.0], [3.0, 4.0], [3.0, 4.0])
+    service.matrix([5.0, 6.0], [5.0, 6.0], [7.0, 8.0], [7.0, 8.0])
+    service.matrix([1.0, 2.0], [1.0, 2.0], [3.0, 4.0], [3.0, 4.0])
+
+    assert service.misses == 12
+    assert service._cached_cells <= 4
+
+
+def test_overlapping_requests_only_compute_new_pairs():
+    """
+    Test that adding a pickup, moving a driver or reordering reuses every pair already seen.
+    """
+    service = DistanceMatrixService()
+    driver_lats, driver_lngs = [12.90, 12.95], [77.50, 77.55]
+    stop_lats, stop_lngs = [13.00, 13.05, 13.10], [77.60, 77.65, 77.70]
+
+    service.matrix(driver_lats, driver_lngs, stop_lats, stop_lngs)
+    assert (service.hits, service.misses) == (0, 6)
+
+    # one new stop, listed first
+    added = service.matrix(driver_lats, driver_lngs, [13.20] + stop_lats, [77.80] + stop_lngs)
+    assert (service.hits, service.misses) == (6, 8)
+
+    # the second driver moved, and the stops come in another order
+    moved = service.matrix([12.90, 12.99], [77.50, 77.59], stop_lats[::-1], stop_lngs[::-1])
+    assert (service.hits, service.misses) == (9, 11)
+
+    expected = haversine_matrix([12.90, 12.99], [77.50, 77.59], stop_lats[::-1], stop_lngs[::-1]) * 1.3
+    assert np.allclose(moved.distance_km, expected)
+    assert np.array_equal(added.distance_km[0, 1:], moved.distance_km[0, ::-1])
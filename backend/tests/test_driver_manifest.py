@@ -0,0 +1,89 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  registers every mapper
+from app.models.pickup import Pickup, PickupStatus, WasteType
+from app.models.pickup_assignment import AssignmentStatus, PickupAssignment
+from app.services import manifest_service
+from app.services.manifest_service import DriverManifestCache, ManifestService
+
+DAY = date(2026, 3, 2)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine("sqlite://")
+    Pickup.__table__.create(engine)
+    PickupAssignment.__table__.create(engine)
+    monkeypatch.setattr(manifest_service, "driver_manifest_cache", DriverManifestCache(ttl_seconds=60))
+    session = sessionmaker(bind=engine)()
+
+    def pickup(pickup_id, scheduled_at, status=PickupStatus.ASSIGNED, weight=10.0):
+        session.add(Pickup(
+            id=pickup_id, organization_id=1, waste_type=WasteType.GENERAL, waste_weight=weight,
+            address=f"{pickup_id} Route Rd", latitude=0.0, longitude=0.0,
+            status=status, scheduled_at=scheduled_at,
+        ))
+
+    pickup(1, datetime(2026, 3, 2, 15))
+    pickup(2, datetime(2026, 3, 2, 9), status=PickupStatus.COMPLETED, weight=4.0)
+    pickup(3, None)
+    pickup(4, datetime(2026, 3, 3, 9))  # another day
+    pickup(5, datetime(2026, 3, 2, 11))  # another driver's
+    pickup(6, datetime(2026, 3, 2, 12), status=PickupStatus.PENDING)  # rejected
+    session.flush()
+    session.add_all([
+        PickupAssignment(pickup_id=1, driver_id=7, status=AssignmentStatus.ASSIGNED),
+        # assigned twice; listed once, with the latest assignment
+        PickupAssignment(pickup_id=2, driver_id=7, status=AssignmentStatus.ASSIGNED),
+        PickupAssignment(pickup_id=2, driver_id=7, status=AssignmentStatus.COMPLETED),
+        PickupAssignment(pickup_id=3, driver_id=7, status=AssignmentStatus.ASSIGNED),
+        PickupAssignment(pickup_id=4, driver_id=7, status=AssignmentStatus.ASSIGNED),
+        PickupAssignment(pickup_id=5, driver_id=8, status=AssignmentStatus.ASSIGNED),
+        PickupAssignment(pickup_id=6, driver_id=7, status=AssignmentStatus.REJECTED),
+    ])
+    session.commit()
+    session.statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: session.statements.append(args[2]))
+    yield session
+    session.close()
+
+
+def test_manifest_is_one_query_in_visiting_order(db):
+    manifest = ManifestService.get_manifest(db, 7, DAY)
+
+    assert len(db.statements) == 1
+    assert [(s["sequence"], s["pickup_id"]) for s in manifest["stops"]] == [(1, 2), (2, 1), (3, 3)]
+    assert manifest["stops"][0]["assignment_status"] == AssignmentStatus.COMPLETED
+    assert manifest["summary"] == {
+        "total_stops": 3,
+        "open_stops": 2,
+        "completed_stops": 1,
+        "cancelled_stops": 0,
+        "overdue_stops": 0,
+        "planned_weight_kg": 24.0,
+        "collected_weight_kg": 4.0,
+    }
+    assert manifest["cached"] is False
+
+
+def test_manifest_is_cached_until_a_stop_or_assignment_changes(db):
+    cache = manifest_service.driver_manifest_cache
+    ManifestService.get_manifest(db, 7, DAY)
+
+    assert ManifestService.get_manifest(db, 7, DAY)["cached"] is True
+    assert len(db.statements) == 1
+
+    # a pickup that is not on the manifest leaves it alone
+    cache.invalidate_pickups([5])
+    assert ManifestService.get_manifest(db, 7, DAY)["cached"] is True
+
+    cache.invalidate_pickups([1])
+    assert ManifestService.get_manifest(db, 7, DAY)["cached"] is False
+
+    cache.invalidate_driver(7)
+    assert ManifestService.get_manifest(db, 7, DAY)["cached"] is False
+    assert len(db.statements) == 3
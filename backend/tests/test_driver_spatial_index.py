@@ -0,0 +1,88 @@
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  registers every mapper
+from app.models.driver import Driver, DriverAvailability
+from app.services import driver_service
+from app.services.driver_service import DriverService
+from app.services.driver_spatial_index import DriverSpatialIndex
+from app.utils.enums import DriverAvailabilityStatus
+from app.utils.geo import geohash_encode, haversine
+
+
+def test_nearest_returns_k_closest_in_order():
+    index = DriverSpatialIndex(cell_size_deg=0.01)
+    ids = [uuid.uuid4() for _ in range(5)]
+    # spread over several cells, and one driver in another org
+    for driver_id, (lat, lng) in zip(ids, [(12.97, 77.59), (12.975, 77.595), (13.05, 77.70), (12.90, 77.50), (12.971, 77.591)]):
+        index.upsert(1, driver_id, lat, lng)
+    index.upsert(2, uuid.uuid4(), 12.9701, 77.5901)
+
+    nearest = index.nearest(1, 12.97, 77.59, 3)
+
+    assert [row[0] for row in nearest] == [ids[0], ids[4], ids[1]]
+    assert nearest[1][3] == pytest.approx(haversine(12.97, 77.59, 12.971, 77.591))
+
+
+def test_nearest_searches_past_empty_rings_and_skips_stale_positions():
+    index = DriverSpatialIndex(cell_size_deg=0.01, max_age_seconds=60)
+    far, stale = uuid.uuid4(), uuid.uuid4()
+    index.upsert(1, far, 13.5, 78.0)
+    index.upsert(1, stale, 12.97, 77.59, updated_at=time.time() - 120)
+
+    assert [row[0] for row in index.nearest(1, 12.97, 77.59, 2)] == [far]
+
+
+def test_moving_a_driver_leaves_its_old_cell():
+    index = DriverSpatialIndex(cell_size_deg=0.01)
+    driver_id = uuid.uuid4()
+    index.upsert(1, driver_id, 12.97, 77.59)
+    index.upsert(1, driver_id, 13.50, 78.00)
+
+    assert index.count(1) == 1
+    assert index.nearest(1, 12.97, 77.59, 1)[0][1:3] == (13.50, 78.00)
+
+    index.remove(driver_id)
+    assert index.nearest(1, 12.97, 77.59, 1) == []
+
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine("sqlite://")
+    Driver.__table__.create(engine)
+    DriverAvailability.__table__.create(engine)
+    monkeypatch.setattr(driver_service, "driver_spatial_index", DriverSpatialIndex(max_age_seconds=900))
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _driver(db, name, lat, lng, seen_ago):
+    driver = Driver(organization_id=1, name=name, mobile="555" + name, created_by=1)
+    db.add(driver)
+    db.flush()
+    db.add(DriverAvailability(
+        driver_id=driver.id, status=DriverAvailabilityStatus.AVAILABLE, is_on_duty=True,
+        latitude=lat, longitude=lng, geohash=geohash_encode(lat, lng),
+        location_updated_at=datetime.now(timezone.utc) - seen_ago,
+    ))
+    db.commit()
+    return driver.id
+
+
+def test_db_fallback_skips_positions_older_than_max_age(db):
+    fresh = _driver(db, "fresh", 12.975, 77.595, timedelta(minutes=2))
+    _driver(db, "gone", 12.9701, 77.5901, timedelta(hours=3))
+
+    nearest = DriverService(db).get_nearest_drivers(1, 12.97, 77.59, k=2)
+
+    assert [row["driver_id"] for row in nearest] == [fresh]
+    # the loaded position keeps its own age rather than being stamped now
+    index = driver_service.driver_spatial_index
+    assert index._orgs[1].positions[fresh][3] < time.time() - 60
+    assert index.count(1) == 1
@@ -0,0 +1,87 @@
+import numpy as np
+
+from app.utils.geo import (
+    geohash_bounds,
+    geohash_encode,
+    geohash_neighbors,
+    haversine,
+    haversine_matrix,
+    path_distance_km,
+    simplify_polyline,
+)
+
+
+def test_haversine_known_distance():
+    """
+    Test that one degree of latitude is roughly 111 km.
+    """
+    assert abs(haversine(0.0, 0.0, 1.0, 0.0) - 111.19) < 0.1
+
+
+def test_haversine_matrix_shape_and_values():
+    """
+    Test that the matrix matches pairwise scalar distances.
+    """
+    lats_a, lngs_a = [12.97, 12.98], [77.59, 77.60]
+    lats_b, lngs_b = [12.90, 13.00, 13.10], [77.50, 77.70, 77.65]
+
+    matrix = haversine_matrix(lats_a, lngs_a, lats_b, lngs_b)
+
+    assert matrix.shape == (2, 3)
+    assert np.isclose(matrix[1, 2], haversine(12.98, 77.60, 13.10, 77.65))
+
+
+def test_path_distance_of_single_point_is_zero():
+    assert path_distance_km([12.97], [77.59]) == 0.0
+
+
+def test_simplify_drops_collinear_points():
+    """
+    Test that points on a straight line collapse to the endpoints.
+    """
+    lats = np.linspace(12.90, 13.00, 50)
+    lngs = np.full(50, 77.60)
+
+    keep = simplify_polyline(lats, lngs, tolerance_m=5)
+
+    assert keep.sum() == 2
+    assert keep[0] and keep[-1]
+
+
+def test_simplify_keeps_corner():
+    """
+    Test that a right-angle corner survives simplification.
+    """
+    lats = [12.90, 12.95, 13.00, 13.00, 13.00]
+    lngs = [77.60, 77.60, 77.60, 77.65, 77.70]
+
+    keep = simplify_polyline(lats, lngs, tolerance_m=10)
+
+    assert list(np.flatnonzero(keep)) == [0, 2, 4]
+
+
+def test_geohash_encodes_known_cell():
+    assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+
+def test_geohash_neighbors_cover_the_cell_edge():
+    """
+    Test that a point just across a cell edge lands in one of the neighbours.
+    """
+    cell = geohash_encode(12.9716, 77.5946, 6)
+    lat_min, lat_max, lng_min, lng_max = geohash_bounds(cell)
+    neighbors = geohash_neighbors(cell)
+
+    assert len(neighbors) == 9 and neighbors[4] == cell
+    for lat, lng in (
+        (lat_max + 1e-6, (lng_min + lng_max) / 2),
+        ((lat_min + lat_max) / 2, lng_min - 1e-6),
+        (lat_min - 1e-6, lng_max + 1e-6),
+    ):
+        across = geohash_encode(lat, lng, 6)
+        assert across != cell and across in neighbors
+
+
+def test_geohash_neighbors_wrap_the_antimeridian():
+    cell = geohash_encode(0.0, 179.9999, 4)
+    assert geohash_encode(0.0, -179.9999, 4) in geohash_neighbors(cell)
@@ -0,0 +1,58 @@
+import numpy as np
+
+from app.utils.matching import capacitated_assignment, _greedy
+
+
+def test_assignment_respects_capacity():
+    """
+    Test that no driver receives more pickups than its capacity.
+    """
+    cost = np.array([
+        [1.0, 5.0],
+        [1.0, 5.0],
+        [1.0, 5.0],
+    ])
+
+    columns, _ = capacitated_assignment(cost, capacity=[2, 1])
+
+    assert (columns == 0).sum() == 2
+    assert (columns == 1).sum() == 1
+
+
+def test_assignment_is_min_cost():
+    """
+    Test that the solver bumps a pickup to a second driver when that lowers the total.
+    """
+    # pickup 0 is close to both drivers, pickup 1 only to driver 0
+    cost = np.array([
+        [1.0, 2.0],
+        [1.5, 9.0],
+    ])
+
+    columns, solver = capacitated_assignment(cost, capacity=[1, 1])
+
+    assert solver == "hungarian"
+    assert list(columns) == [1, 0]
+
+
+def test_forbidden_pairs_stay_unassigned():
+    """
+    Test that pickups beyond the distance cutoff are left unassigned.
+    """
+    cost = np.array([
+        [1.0],
+        [np.inf],
+    ])
+
+    columns, _ = capacitated_assignment(cost, capacity=[5])
+
+    assert list(columns) == [0, -1]
+
+
+def test_greedy_respects_capacity():
+    cost = np.random.default_rng(0).random((50, 5))
+
+    columns = _greedy(cost, np.array([3, 3, 3, 3, 3]))
+
+    assert (columns >= 0).sum() == 15
+    assert all((columns == j).sum() == 3 for j in range(5))
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  registers every mapper
+from app.models.notification import Notification
+from app.models.outbox_event import OutboxEvent
+from app.models.pickup import Pickup, PickupStatus, WasteType
+from app.services import notification_service, outbox_service
+from app.services.outbox_service import OutboxDispatcher, emit_event, outbox_subscriber
+from app.utils.enums import NotificationType, OutboxStatus
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'outbox.db'}")
+    for model in (OutboxEvent, Pickup, Notification):
+        model.__table__.create(engine)
+    monkeypatch.setattr(outbox_service, "_subscribers", {})
+    return sessionmaker(bind=engine)
+
+
+def _emit(factory, event_type, commit=True):
+    db = factory()
+    try:
+        emit_event(db, event_type, "pickup", 7, 1, {"status": "PENDING"})
+        db.commit() if commit else db.rollback()
+    finally:
+        db.close()
+
+
+def _events(factory):
+    db = factory()
+    try:
+        return db.query(OutboxEvent).order_by(OutboxEvent.id).all()
+    finally:
+        db.close()
+
+
+def test_only_committed_events_reach_matching_subscribers(session_factory):
+    seen = []
+    outbox_subscriber("pickup.*")(lambda message: seen.append((message.event_type, message.payload)))
+
+    _emit(session_factory, "pickup.created")
+    _emit(session_factory, "pickup.cancelled", commit=False)
+    _emit(session_factory, "subscription.expired")
+
+    assert OutboxDispatcher(session_factory).run_once() == 2
+    assert seen == [("pickup.created", {"status": "PENDING"})]
+    assert [e.status for e in _events(session_factory)] == [OutboxStatus.DONE, OutboxStatus.DONE]
+
+
+def test_failing_subscriber_is_retried_then_given_up(session_factory):
+    calls = []
+
+    @outbox_subscriber("pickup.created")
+    def flaky(message):
+        calls.append(message.id)
+        raise RuntimeError("downstream is down")
+
+    _emit(session_factory, "pickup.created")
+    dispatcher = OutboxDispatcher(session_factory, max_attempts=2)
+
+    assert dispatcher.run_once() == 1
+    event = _events(session_factory)[0]
+    assert event.status == OutboxStatus.PENDING
+    assert event.attempts == 1
+    assert event.available_at > datetime.utcnow()
+    assert "downstream is down" in event.last_error
+    # backing off: nothing to claim yet
+    assert dispatcher.run_once() == 0
+
+    db = session_factory()
+    db.query(OutboxEvent).update({"available_at": datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    db.close()
+
+    assert dispatcher.run_once() == 1
+    event = _events(session_factory)[0]
+    assert event.status == OutboxStatus.FAILED
+    assert event.processed_at is not None
+    assert len(calls) == 2
+
+
+def test_dispatcher_stays_off_without_subscribers(session_factory):
+    dispatcher = OutboxDispatcher(session_factory)
+
+    dispatcher.start()
+
+    assert dispatcher._thread is None
+
+
+def test_assigned_driver_is_notified_once(session_factory, monkeypatch):
+    monkeypatch.setattr(notification_service, "SessionLocal", session_factory)
+    outbox_subscriber("pickup.assigned")(notification_service.notify_assigned_driver)
+
+    db = session_factory()
+    pickup = Pickup(
+        organization_id=1, waste_type=WasteType.GENERAL, waste_weight=1.0, address="1 Depot Rd",
+        latitude=0.0, longitude=0.0, status=PickupStatus.ASSIGNED, scheduled_at=datetime(2026, 3, 2, 9),
+    )
+    db.add(pickup)
+    db.flush()
+    emit_event(db, "pickup.assigned", "pickup", pickup.id, 1, {"status": "ASSIGNED", "driver_id": 5})
+    # a status change through PATCH names no driver
+    emit_event(db, "pickup.assigned", "pickup", pickup.id, 1, {"status": "ASSIGNED"})
+    db.commit()
+    db.close()
+
+    assert OutboxDispatcher(session_factory).run_once() == 2
+    # a redelivery after a crash between the notification and the outbox commit
+    notification_service.notify_assigned_driver(outbox_service.OutboxMessage(
+        id=_events(session_factory)[0].id, event_type="pickup.assigned", aggregate_type="pickup",
+        aggregate_id=1, organization_id=1, payload={"driver_id": 5}, created_at=datetime.utcnow(),
+    ))
+
+    db = session_factory()
+    notification = db.query(Notification).one()
+    assert (notification.user_id, notification.type) == (5, NotificationType.DRIVER_ASSIGNED)
+    assert notification.message == "Pickup #1 at 1 Depot Rd has been assigned to you for 2026-03-02 09:00 UTC."
+    db.close()
+    assert [e.status for e in _events(session_factory)] == [OutboxStatus.DONE, OutboxStatus.DONE]
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  registers every mapper
+from app.models.pickup import Pickup, PickupStatus, WasteType
+from app.models.pickup_assignment import PickupAssignment
+from app.repositories.pickup_repo import PickupRepository
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Pickup.__table__.create(engine)
+    PickupAssignment.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+
+    start = datetime(2026, 1, 1)
+    for i in range(23):
+        session.add(Pickup(
+            organization_id=1,
+            waste_type=WasteType.GENERAL,
+            waste_weight=1.0,
+            address=f"{i} Test St",
+            latitude=0.0,
+            longitude=0.0,
+            status=PickupStatus.PENDING,
+            # ties on created_at and some unscheduled pickups
+            created_at=start + timedelta(hours=i // 3),
+            scheduled_at=None if i % 4 == 0 else start + timedelta(days=i % 5),
+        ))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _walk(db, sort, limit):
+    ids, after = [], None
+    while True:
+        rows, _ = PickupRepository.list_org_pickups(db, 1, sort=sort, after=after, limit=limit)
+        ids += [row.id for row in rows[:limit]]
+        if len(rows) <= limit:
+            return ids
+        last = rows[limit - 1]
+        after = decode_cursor(encode_cursor(sort, (getattr(last, sort), last.id)), sort)
+
+
+def test_created_at_pages_cover_every_row_once_in_order(db):
+    """
+    Test that walking created_at pages yields each pickup once, newest first, across ties.
+    """
+    expected = [p.id for p in sorted(db.query(Pickup), key=lambda p: (p.created_at, p.id), reverse=True)]
+
+    assert _walk(db, "created_at", 5) == expected
+
+
+def test_scheduled_at_pages_put_unscheduled_last(db):
+    """
+    Test that scheduled_at pages run latest first and then continue into unscheduled pickups.
+    """
+    pickups = list(db.query(Pickup))
+    scheduled = sorted((p for p in pickups if p.scheduled_at), key=lambda p: (p.scheduled_at, p.id), reverse=True)
+    unscheduled = sorted((p for p in pickups if p.scheduled_at is None), key=lambda p: p.id, reverse=True)
+
+    assert _walk(db, "scheduled_at", 4) == [p.id for p in scheduled + unscheduled]
+
+
+def test_cursor_is_bound_to_its_sort():
+    """
+    Test that a cursor issued for one sort is rejected by another, as is garbage.
+    """
+    cursor = encode_cursor("created_at", (datetime(2026, 1, 1), 7))
+
+    assert decode_cursor(cursor, "created_at") == (datetime(2026, 1, 1), 7)
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "scheduled_at")
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor", "created_at")
+
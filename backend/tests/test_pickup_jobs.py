@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  registers every mapper
+from app.models.base import Base
+from app.models.driver import Driver, DriverAvailability
+from app.models.pickup import Pickup, PickupStatus, WasteType
+from app.models.pickup_assignment import PickupAssignment
+from app.models.scheduled_job import ScheduledJob
+from app.models.user import User
+from app.services.pickup_job_service import PICKUP_JOB_AUTO_ASSIGN, run_auto_assign
+from app.utils.enums import DriverAvailabilityStatus, DriverStatus
+
+SCHEDULED_AT = datetime(2026, 3, 2, 9)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    user = User(mobile="9000000001", is_active=True)
+    session.add(user)
+    session.flush()
+    driver = Driver(organization_id=1, name="Driver", mobile=user.mobile, status=DriverStatus.ACTIVE, created_by=user.id)
+    session.add(driver)
+    session.flush()
+    session.add(DriverAvailability(
+        driver_id=driver.id, status=DriverAvailabilityStatus.AVAILABLE, is_on_duty=True,
+        latitude=12.97, longitude=77.59,
+    ))
+    for i in range(4):
+        session.add(Pickup(
+            organization_id=1,
+            waste_type=WasteType.GENERAL,
+            waste_weight=1.0,
+            address=f"{i} Test St",
+            latitude=12.97 + i / 100,
+            longitude=77.59,
+            status=PickupStatus.PENDING,
+            # the others are due first, so a whole-queue dispatch would take them
+            scheduled_at=SCHEDULED_AT + timedelta(days=0 if i == 3 else -1),
+        ))
+    session.commit()
+    session.user_id = user.id
+    yield session
+    session.close()
+
+
+def test_fired_auto_assign_job_only_dispatches_its_own_pickup(db):
+    pickup = db.query(Pickup).filter(Pickup.address == "3 Test St").one()
+    job = ScheduledJob(
+        job_type=PICKUP_JOB_AUTO_ASSIGN,
+        organization_id=1,
+        entity_type="pickup",
+        entity_id=pickup.id,
+        payload={"scheduled_at": pickup.scheduled_at.isoformat()},
+        run_at=SCHEDULED_AT - timedelta(minutes=30),
+        created_by=db.user_id,
+    )
+
+    run_auto_assign(db, job)
+
+    statuses = {p.address: p.status for p in db.query(Pickup)}
+    assert statuses.pop("3 Test St") == PickupStatus.ASSIGNED
+    assert set(statuses.values()) == {PickupStatus.PENDING}
+    assert [a.pickup_id for a in db.query(PickupAssignment)] == [pickup.id]
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  registers every mapper
+from app.models.audit_log import AuditLog
+from app.models.outbox_event import OutboxEvent
+from app.models.pickup import Pickup, PickupStatus, WasteType
+from app.models.pickup_assignment import AssignmentStatus, PickupAssignment
+from app.services.pickup_state_machine import apply_transition
+
+DRIVER = SimpleNamespace(id=5)
+OTHER_DRIVER = SimpleNamespace(id=6)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    for model in (Pickup, PickupAssignment, AuditLog, OutboxEvent):
+        model.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(Pickup(
+        id=1, organization_id=1, waste_type=WasteType.GENERAL, waste_weight=2.0,
+        address="1 Test St", latitude=0.0, longitude=0.0, status=PickupStatus.ASSIGNED,
+    ))
+    session.add(PickupAssignment(pickup_id=1, driver_id=DRIVER.id, status=AssignmentStatus.ASSIGNED))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _status_code(call):
+    with pytest.raises(HTTPException) as exc:
+        call()
+    return exc.value.status_code
+
+
+def test_rejected_transitions_change_nothing(db):
+    assert _status_code(lambda: apply_transition(db, "accept", 1, OTHER_DRIVER)) == 403
+    assert _status_code(lambda: apply_transition(db, "complete", 1, DRIVER)) == 400
+    assert _status_code(lambda: apply_transition(db, "accept", 2, DRIVER)) == 404
+
+    assert db.get(Pickup, 1).status == PickupStatus.ASSIGNED
+    assert db.query(AuditLog).count() == 0
+
+
+def test_transitions_run_hooks_and_audit(db):
+    accepted = apply_transition(db, "accept", 1, DRIVER)
+    assert accepted.status == PickupStatus.IN_PROGRESS
+    assert _status_code(lambda: apply_transition(db, "accept", 1, DRIVER)) == 400
+
+    # back to ASSIGNED so the driver can turn it down
+    db.query(Pickup).update({Pickup.status: PickupStatus.ASSIGNED})
+    db.commit()
+
+    rejected = apply_transition(db, "reject", 1, DRIVER, params={"reason": "Truck broke down"})
+    assert rejected.status == PickupStatus.PENDING
+    assert db.query(PickupAssignment).count() == 0
+    assert [log.action for log in db.query(AuditLog).order_by(AuditLog.id)] == ["ACCEPT_PICKUP", "REJECT_PICKUP"]
+    assert [e.event_type for e in db.query(OutboxEvent).order_by(OutboxEvent.id)] == ["pickup.started", "pickup.rejected"]
@@ -60,7 +60,7 @@ def test_pickup_creation_enforces_pickup_count_limit(client: TestClient, db: Ses
 
 def test_expired_subscription_blocks_pickup(client: TestClient, db: Session, org_user_token: str):
     """
-    Test that an expired subscription transitions to EXPIRED and blocks the pickup.
+    Test that a subscription past its end_date blocks the pickup.
     """
     # Setup: Create subscription with end_date in the past
     
@@ -0,0 +1,185 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  registers every mapper
+from app.models.quota_lease import QuotaLease
+from app.models.subscription_usage import SubscriptionUsage
+from app.services.quota_service import QuotaLeaseManager
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'quota.db'}")
+    # no subscriptions table, so no foreign keys to satisfy
+    SubscriptionUsage.__table__.create(engine)
+    QuotaLease.__table__.create(engine)
+    factory = sessionmaker(bind=engine)
+
+    db = factory()
+    db.add(SubscriptionUsage(subscription_id=1, pickups_used=0, waste_weight_used=0.0, drivers_used=0))
+    db.commit()
+    db.close()
+    return factory
+
+
+def _usage(factory):
+    db = factory()
+    try:
+        usage = db.query(SubscriptionUsage).one()
+        return usage.pickups_used, usage.waste_weight_used
+    finally:
+        db.close()
+
+
+def _reserve(manager, factory, weight=1.0, pickup_limit=25, weight_limit=0.0):
+    db = factory()
+    try:
+        ok = manager.reserve(db, 1, 1, weight, pickup_limit, weight_limit)
+        db.commit()
+        return ok
+    finally:
+        db.close()
+
+
+def test_leases_never_exceed_the_plan_limit(session_factory):
+    workers = [QuotaLeaseManager(session_factory, block_pickups=10, block_weight=50.0, holder=f"w{i}") for i in range(3)]
+
+    granted = sum(_reserve(workers[i % 3], session_factory) for i in range(40))
+    # the first two workers lease 20 pickups, the third falls back for the last 5
+    assert granted == 25
+    assert _usage(session_factory)[0] <= 25
+
+    for worker in workers:
+        worker.release_all()
+    assert _usage(session_factory) == (25, 25.0)
+
+
+def test_cancellation_and_shutdown_return_unused_allowance(session_factory):
+    manager = QuotaLeaseManager(session_factory, block_pickups=10, block_weight=50.0)
+    for _ in range(3):
+        assert _reserve(manager, session_factory, weight=2.0)
+    assert _usage(session_factory) == (10, 50.0)
+
+    db = session_factory()
+    manager.release(db, 1, 1, 2.0)
+    db.commit()
+    db.close()
+
+    manager.release_all()
+    assert _usage(session_factory) == (2, 4.0)
+
+
+def test_expired_leases_of_dead_workers_are_reclaimed(session_factory):
+    dead = QuotaLeaseManager(session_factory, block_pickups=10, block_weight=50.0, holder="dead")
+    assert _reserve(dead, session_factory, pickup_limit=10)
+
+    db = session_factory()
+    db.query(QuotaLease).update({QuotaLease.expires_at: datetime.utcnow() - timedelta(hours=1)})
+    db.commit()
+    db.close()
+
+    alive = QuotaLeaseManager(session_factory, block_pickups=10, block_weight=50.0, holder="alive")
+    assert _reserve(alive, session_factory, pickup_limit=10)
+    alive.release_all()
+    assert _usage(session_factory) == (2, 2.0)
+
+
+class _CountingFactory:
+    "session_factory that counts the sessions a manager opens, optionally holding one at a gate"
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.opened = 0
+        self.gate = None
+
+    def __call__(self):
+        self.opened += 1
+        if self.gate is not None:
+            entered, proceed = self.gate
+            entered.set()
+            proceed.wait(5)
+        return self.factory()
+
+
+def test_plans_smaller_than_a_block_never_renew(session_factory):
+    factory = _CountingFactory(session_factory)
+    manager = QuotaLeaseManager(factory, block_pickups=10, block_weight=50.0)
+
+    assert [_reserve(manager, session_factory, pickup_limit=3) for _ in range(4)] == [True, True, True, False]
+    assert factory.opened == 0
+    assert _usage(session_factory) == (3, 3.0)
+
+
+def test_a_refused_renewal_is_not_retried_within_the_ttl(session_factory):
+    factory = _CountingFactory(session_factory)
+    manager = QuotaLeaseManager(factory, block_pickups=10, block_weight=50.0)
+
+    # 15 pickups left cannot spare a second block after the first
+    assert all(_reserve(manager, session_factory, pickup_limit=15) for _ in range(13))
+    assert factory.opened == 2
+    manager.release_all()
+    assert _usage(session_factory) == (13, 13.0)
+
+
+def test_reserving_after_touching_the_usage_row_skips_renewal(session_factory):
+    factory = _CountingFactory(session_factory)
+    manager = QuotaLeaseManager(factory, block_pickups=10, block_weight=50.0)
+
+    db = session_factory()
+    try:
+        manager.release(db, 1, 0, 0.0)
+        assert manager.reserve(db, 1, 2, 2.0, 25, 0.0)
+        db.commit()
+    finally:
+        db.close()
+
+    # a renewal would have waited on the row this transaction held
+    assert factory.opened == 0
+    assert _usage(session_factory) == (2, 2.0)
+
+
+def test_a_renewal_does_not_stall_other_subscriptions(session_factory):
+    db = session_factory()
+    db.add(SubscriptionUsage(subscription_id=2, pickups_used=0, waste_weight_used=0.0, drivers_used=0))
+    db.commit()
+    db.close()
+
+    factory = _CountingFactory(session_factory)
+    manager = QuotaLeaseManager(factory, block_pickups=10, block_weight=50.0)
+
+    def reserve(subscription_id):
+        db = session_factory()
+        try:
+            assert manager.reserve(db, subscription_id, 1, 1.0, 0, 0.0)
+            db.commit()
+        finally:
+            db.close()
+
+    reserve(2)  # subscription 2 holds a live lease
+    entered, proceed = threading.Event(), threading.Event()
+    factory.gate = (entered, proceed)
+    renewal = threading.Thread(target=reserve, args=(1,))
+    renewal.start()
+    assert entered.wait(5)
+
+    # served from subscription 2's lease and, for subscription 1, straight
+    # from its usage row while the renewal is stuck in its session
+    others = threading.Thread(target=lambda: (reserve(2), reserve(1)))
+    others.start()
+    others.join(5)
+    stalled = others.is_alive()
+
+    proceed.set()
+    renewal.join(5)
+    assert not stalled
+    manager.release_all()
+    db = session_factory()
+    try:
+        usage = {row.subscription_id: (row.pickups_used, row.waste_weight_used) for row in db.query(SubscriptionUsage)}
+    finally:
+        db.close()
+    assert usage == {1: (2, 2.0), 2: (2, 2.0)}
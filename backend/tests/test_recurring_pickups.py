@@ -0,0 +1,159 @@
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  registers every mapper
+from app.models.audit_log import AuditLog
+from app.models.outbox_event import OutboxEvent
+from app.models.pickup import Pickup, PickupStatus, WasteType
+from app.models.pickup_assignment import PickupAssignment
+from app.models.quota_lease import QuotaLease
+from app.models.recurring_pickup import RecurringPickup
+from app.models.subscription_usage import SubscriptionUsage
+from app.models.usage_event import UsageEvent
+from app.services import quota_service, recurring_pickup_service
+from app.services.quota_service import QuotaLeaseManager
+from app.services.recurring_pickup_service import RecurringPickupService, materialize_rules, withdraw_occurrences
+from app.utils.enums import RecurrenceFrequency
+from app.utils.recurrence import occurrences, parse_weekdays
+
+NOW = datetime(2026, 3, 2, 12)  # a Monday
+
+
+def test_weekly_occurrences_follow_interval_and_weekdays():
+    times = occurrences(
+        RecurrenceFrequency.WEEKLY, 2, date(2026, 2, 23), time(8),
+        after=NOW, until=NOW + timedelta(days=21), weekdays=parse_weekdays("MO,TH"),
+    )
+    # every other week from the week of Feb 23, so not the week of Mar 2
+    assert times == [datetime(2026, 3, 9, 8), datetime(2026, 3, 12, 8), datetime(2026, 3, 23, 8)]
+
+
+def test_monthly_occurrences_skip_short_months_and_stop_at_ends_on():
+    times = occurrences(
+        RecurrenceFrequency.MONTHLY, 1, date(2026, 1, 31), time(9),
+        after=datetime(2026, 1, 31, 9), until=datetime(2026, 12, 31), ends_on=date(2026, 6, 1),
+    )
+    assert times == [datetime(2026, 3, 31, 9), datetime(2026, 5, 31, 9)]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine("sqlite://")
+    for model in (RecurringPickup, Pickup, PickupAssignment, OutboxEvent, UsageEvent):
+        model.__table__.create(engine)
+
+    sub = SimpleNamespace(id=5, end_date=NOW + timedelta(days=30), reserved=[])
+    monkeypatch.setattr(recurring_pickup_service, "active_subscription_cache", SimpleNamespace(get=lambda db, org_id: sub))
+    monkeypatch.setattr(recurring_pickup_service, "zone_index_cache", SimpleNamespace(
+        get=lambda db, org_id: SimpleNamespace(locate_many=lambda lats, lngs: [None] * len(lats))
+    ))
+    monkeypatch.setattr(
+        recurring_pickup_service, "reserve_quota",
+        lambda db, sub, count, weight: sub.reserved.append((count, weight)) or True,
+    )
+    monkeypatch.setattr(recurring_pickup_service, "release_quota", lambda db, sub_id, count, weight: sub.reserved.append((-count, -weight)))
+    monkeypatch.setattr(recurring_pickup_service, "schedule_jobs_for_pickups", lambda db, pickups, created_by: [])
+    monkeypatch.setattr(recurring_pickup_service, "cancel_jobs_for_pickups", lambda db, pickup_ids: [])
+
+    session = sessionmaker(bind=engine)()
+    session.sub = sub
+    yield session
+    session.close()
+
+
+def _rule(db, **overrides):
+    values = dict(
+        organization_id=1, waste_type=WasteType.GENERAL, waste_weight=10.0, address="1 Depot Rd",
+        latitude=0.0, longitude=0.0, frequency=RecurrenceFrequency.DAILY, repeat_interval=1,
+        time_of_day=time(8), starts_on=date(2026, 3, 1), is_active=True, created_by=3,
+    )
+    values.update(overrides)
+    rule = RecurringPickup(**values)
+    db.add(rule)
+    db.flush()
+    return rule
+
+
+def test_materializing_fills_the_horizon_once(db):
+    rule = _rule(db)
+
+    pickup_ids, _ = materialize_rules(db, [rule], NOW)
+    db.commit()
+
+    assert len(pickup_ids) == 14
+    assert db.sub.reserved == [(14, 140.0)]
+    assert rule.materialized_until == NOW + timedelta(days=14)
+    assert db.query(OutboxEvent).count() == 14
+
+    # a cancelled occurrence is not brought back by the next run
+    db.query(Pickup).filter(Pickup.id == pickup_ids[0]).update({"status": PickupStatus.CANCELLED})
+    assert materialize_rules(db, [rule], NOW + timedelta(days=1))[0] == [pickup_ids[-1] + 1]
+
+
+def test_withdrawing_keeps_assigned_and_past_occurrences(db):
+    rule = _rule(db)
+    pickup_ids, _ = materialize_rules(db, [rule], NOW)
+    db.add(PickupAssignment(pickup_id=pickup_ids[1], driver_id=7))
+    db.commit()
+
+    withdrawn, _ = withdraw_occurrences(db, rule, NOW + timedelta(days=1))
+
+    assert withdrawn == pickup_ids[2:]
+    assert db.sub.reserved[-1] == (-12, -120.0)
+    assert [p.id for p in db.query(Pickup).order_by(Pickup.id)] == pickup_ids[:2]
+    # the usage ledger keeps every occurrence's history
+    assert db.query(UsageEvent).filter(UsageEvent.delta_pickups == -1).count() == 12
+
+
+@pytest.fixture
+def lease_db(tmp_path, monkeypatch):
+    "file database with real quota reservations served from leases"
+    engine = create_engine(f"sqlite:///{tmp_path / 'leases.db'}")
+    for model in (RecurringPickup, Pickup, PickupAssignment, OutboxEvent, UsageEvent, SubscriptionUsage, QuotaLease, AuditLog):
+        model.__table__.create(engine)
+    factory = sessionmaker(bind=engine)
+
+    sub = SimpleNamespace(id=5, end_date=NOW + timedelta(days=30), pickup_limit=100, waste_weight_limit=0.0)
+    monkeypatch.setattr(recurring_pickup_service, "active_subscription_cache", SimpleNamespace(get=lambda db, org_id: sub))
+    monkeypatch.setattr(recurring_pickup_service, "zone_index_cache", SimpleNamespace(
+        get=lambda db, org_id: SimpleNamespace(locate_many=lambda lats, lngs: [None] * len(lats))
+    ))
+    monkeypatch.setattr(recurring_pickup_service, "schedule_jobs_for_pickups", lambda db, pickups, created_by: [])
+    monkeypatch.setattr(recurring_pickup_service, "cancel_jobs_for_pickups", lambda db, pickup_ids: [])
+    monkeypatch.setattr(quota_service, "QUOTA_LEASE_ENABLED", True)
+
+    session = factory()
+    session.add(SubscriptionUsage(subscription_id=5, pickups_used=0, waste_weight_used=0.0, drivers_used=0))
+    session.commit()
+    session.factory = factory
+    yield session
+    session.close()
+
+
+def test_updating_a_rule_with_leases_reserves_without_a_second_session(lease_db, monkeypatch):
+    db = lease_db
+    creator = QuotaLeaseManager(db.factory, block_pickups=20, block_weight=500.0)
+    monkeypatch.setattr(quota_service, "quota_leases", creator)
+    rule = _rule(db)
+    db.commit()
+    materialize_rules(db, [rule], NOW)
+    db.commit()
+
+    # a worker with no live lease: withdrawing writes the usage row in the
+    # request's transaction, so renewing in another session would wait on it
+    opened = []
+    editor = QuotaLeaseManager(lambda: opened.append(1) or db.factory(), block_pickups=20, block_weight=500.0)
+    monkeypatch.setattr(quota_service, "quota_leases", editor)
+    monkeypatch.setattr(recurring_pickup_service, "datetime", SimpleNamespace(utcnow=lambda: NOW))
+    RecurringPickupService(db).update_rule(rule.id, 1, {"waste_weight": 20.0}, updated_by=3)
+
+    assert opened == []
+    creator.release_all()
+    usage = db.query(SubscriptionUsage).one()
+    db.refresh(usage)
+    assert (usage.pickups_used, usage.waste_weight_used) == (14, 280.0)
+    assert db.query(Pickup).filter(Pickup.waste_weight == 20.0).count() == 14
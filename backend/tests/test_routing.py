@@ -0,0 +1,71 @@
+import itertools
+
+import numpy as np
+
+from app.utils.geo import haversine_matrix
+from app.utils.routing import sequence_stops, simulate
+
+
+def _matrix(points):
+    lats = [p[0] for p in points]
+    lngs = [p[1] for p in points]
+    return haversine_matrix(lats, lngs, lats, lngs)
+
+
+def test_sequence_visits_points_along_a_line_in_order():
+    """
+    Test that stops on a straight road are visited outward from the start.
+    """
+    points = [(12.90, 77.50), (12.93, 77.50), (12.91, 77.50), (12.94, 77.50), (12.92, 77.50)]
+    dist = _matrix(points)
+    n = len(points) - 1
+
+    order = sequence_stops(dist, 25.0, np.full(n, -np.inf), np.full(n, np.inf))
+
+    assert order == [2, 4, 1, 3]
+
+
+def test_sequence_matches_brute_force_on_small_instances():
+    """
+    Test that the heuristic finds the optimal open route for a handful of stops.
+    """
+    rng = np.random.default_rng(7)
+
+    for _ in range(20):
+        points = list(zip(rng.uniform(12.9, 13.0, 7), rng.uniform(77.5, 77.6, 7)))
+        dist = _matrix(points)
+        n = len(points) - 1
+        ready = np.full(n, -np.inf)
+        due = np.full(n, np.inf)
+        travel = dist / 25.0 * 60.0
+        node_ready = np.r_[-np.inf, ready]
+        node_due = np.r_[np.inf, due]
+
+        order = sequence_stops(dist, 25.0, ready, due)
+        found, _, _ = simulate(order, dist, travel, node_ready, node_due, 0.0)
+
+        best = min(
+            simulate(list(p), dist, travel, node_ready, node_due, 0.0)[0]
+            for p in itertools.permutations(range(1, n + 1))
+        )
+        assert found <= best * 1.05
+
+
+def test_sequence_respects_time_windows():
+    """
+    Test that a nearby stop scheduled later is deferred behind farther due stops.
+    """
+    points = [(12.90, 77.50), (12.901, 77.50), (12.95, 77.50), (12.96, 77.50)]
+    dist = _matrix(points)
+
+    # stop 1 is next door but only opens in two hours
+    ready = np.array([120.0, -np.inf, -np.inf])
+    due = np.array([180.0, 60.0, 60.0])
+
+    order = sequence_stops(dist, 25.0, ready, due, service_minutes=5.0)
+
+    assert order == [2, 3, 1]
+    travel = dist / 25.0 * 60.0
+    _, arrivals, late = simulate(order, dist, travel, np.r_[-np.inf, ready], np.r_[np.inf, due], 5.0)
+    assert late == 0.0
+    assert arrivals[-1] == 120.0
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  registers every mapper
+from app.api.v1.drivers.driver_schemas import DriverResponse
+from app.api.v1.pickups.pickup_schemas import PickupListResponse
+from app.api.v1.pickups.pickup_service import PickupService
+from app.models.driver import Driver
+from app.models.pickup import Pickup, PickupStatus, WasteType
+from app.models.pickup_assignment import PickupAssignment
+from app.services.driver_service import DriverService
+from app.utils.enums import DriverStatus
+from app.utils.serialization import FastJSONResponse
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    for model in (Pickup, PickupAssignment, Driver):
+        model.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_projected_pickup_page_encodes_like_the_response_model(db):
+    start = datetime(2026, 1, 1)
+    for i in range(12):
+        db.add(Pickup(
+            organization_id=1,
+            waste_type=WasteType.GENERAL,
+            waste_weight=1.0 + i / 4,
+            address=f"{i} Test St",
+            latitude=0.0,
+            longitude=0.0,
+            status=PickupStatus.PENDING,
+            created_at=start + timedelta(hours=i),
+            scheduled_at=None if i % 4 == 0 else start + timedelta(days=i % 5),
+        ))
+    db.commit()
+
+    page = PickupService.list_pickups_for_org(db, 1, limit=10, sort="scheduled_at")
+    body = FastJSONResponse(page).body
+
+    by_id = {pickup.id: pickup for pickup in db.query(Pickup)}
+    expected = PickupListResponse(
+        pickups=[by_id[row["id"]] for row in page["pickups"]],
+        next_cursor=page["next_cursor"],
+    )
+    assert body == expected.model_dump_json().encode()
+
+
+def test_projected_driver_list_encodes_like_the_response_model(db):
+    """
+    Test that the column projection behind GET /drivers gives the same bytes as
+    DriverResponse over the loaded drivers, with the optional fields both set and empty.
+    """
+    db.add_all([
+        Driver(
+            organization_id=1, name="Set", mobile="9000000001", email="set@example.com",
+            license_number="KA-01", license_expiry=datetime(2027, 6, 30, 12, 0, 0, 250000),
+            status=DriverStatus.ACTIVE, created_by=3, updated_by=4,
+            created_at=datetime(2026, 1, 1, 8, 0, tzinfo=timezone.utc),
+            updated_at=datetime(2026, 1, 2, 9, 30, 15, 5, tzinfo=timezone.utc),
+        ),
+        Driver(
+            organization_id=1, name="Empty", mobile="9000000002", status=DriverStatus.INACTIVE,
+            created_by=3, created_at=datetime(2026, 1, 1, 8, 0, tzinfo=timezone.utc),
+        ),
+        Driver(
+            organization_id=2, name="Elsewhere", mobile="9000000003", created_by=3,
+            created_at=datetime(2026, 1, 1, 8, 0, tzinfo=timezone.utc),
+        ),
+    ])
+    db.commit()
+
+    rows = DriverService(db).list_drivers(1)
+    body = FastJSONResponse(rows).body
+
+    by_id = {driver.id: driver for driver in db.query(Driver)}
+    adapter = TypeAdapter(List[DriverResponse])
+    expected = adapter.validate_python([by_id[row["id"]] for row in rows], from_attributes=True)
+    assert {row["name"] for row in rows} == {"Set", "Empty"}
+    assert body == adapter.dump_json(expected)
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  registers every mapper
+from app.models.subscription import Subscription, SubscriptionStatus
+from app.models.subscription_plan import BillingCycle, CategoryType, PricingModel, SubscriptionPlan
+from app.api.v1.subscriptions.subscription_routes import get_plans
+from app.services import subscription_service
+from app.services.subscription_service import ActiveSubscriptionCache, PlanCatalogCache
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    SubscriptionPlan.__table__.create(engine)
+    Subscription.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(SubscriptionPlan(
+        id=1, name="Basic", category_type=CategoryType.APARTMENT, pricing_model=PricingModel.FIXED,
+        price=10, billing_cycle=BillingCycle.MONTHLY, pickup_limit=5, waste_weight_limit=50.0,
+    ))
+    session.add(Subscription(
+        id=1, organization_id=7, plan_id=1, status=SubscriptionStatus.ACTIVE,
+        start_date=datetime.utcnow(), end_date=datetime.utcnow() + timedelta(days=1),
+    ))
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_cache_serves_limits_until_invalidated(db):
+    cache = ActiveSubscriptionCache(ttl_seconds=60)
+    active = cache.get(db, 7)
+    assert (active.id, active.pickup_limit, active.waste_weight_limit) == (1, 5, 50.0)
+
+    db.query(SubscriptionPlan).update({SubscriptionPlan.pickup_limit: 9})
+    db.commit()
+    assert cache.get(db, 7).pickup_limit == 5
+
+    cache.invalidate_plan(1)
+    assert cache.get(db, 7).pickup_limit == 9
+
+
+def test_entries_do_not_outlive_end_date(db):
+    cache = ActiveSubscriptionCache(ttl_seconds=60)
+    db.query(Subscription).update({Subscription.end_date: datetime.utcnow() - timedelta(minutes=1)})
+    db.commit()
+    # still ACTIVE in the table until the sweeper expires it
+    assert cache.get(db, 7) is not None
+
+    db.query(Subscription).update({Subscription.status: SubscriptionStatus.EXPIRED})
+    db.commit()
+    assert cache.get(db, 7) is None
+
+
+def test_read_racing_an_invalidation_is_not_cached(db, monkeypatch):
+    cache = ActiveSubscriptionCache(ttl_seconds=60)
+    read = subscription_service.SubscriptionRepository.get_active_subscription
+
+    def read_then_cancel(db, organization_id):
+        sub = read(db, organization_id)
+        # a cancellation commits and invalidates while the read is in flight
+        db.query(Subscription).update({Subscription.status: SubscriptionStatus.CANCELLED})
+        db.commit()
+        cache.invalidate(organization_id)
+        return sub
+
+    monkeypatch.setattr(subscription_service.SubscriptionRepository, "get_active_subscription", staticmethod(read_then_cancel))
+    assert cache.get(db, 7).id == 1
+
+    monkeypatch.setattr(subscription_service.SubscriptionRepository, "get_active_subscription", staticmethod(read))
+    assert cache.get(db, 7) is None
+
+
+def test_plan_catalog_is_served_from_memory_until_invalidated(db, monkeypatch):
+    cache = PlanCatalogCache(ttl_seconds=60)
+    monkeypatch.setattr(subscription_service, "plan_catalog_cache", cache)
+    body, etag = cache.get(db)
+    assert b'"name":"Basic"' in body
+
+    db.query(SubscriptionPlan).update({SubscriptionPlan.name: "Starter"})
+    db.commit()
+    assert cache.get(None) == (body, etag)
+
+    cache.invalidate()
+    renamed, new_etag = cache.get(db)
+    assert b'"name":"Starter"' in renamed and new_etag != etag
+
+
+def test_plan_catalog_answers_matching_if_none_match_with_304(db, monkeypatch):
+    monkeypatch.setattr(subscription_service, "plan_catalog_cache", PlanCatalogCache(ttl_seconds=60))
+    response = get_plans(if_none_match=None, db=db)
+    etag = response.headers["etag"]
+    assert response.status_code == 200
+    assert response.headers["cache-control"].startswith("public, max-age=")
+
+    assert get_plans(if_none_match=f'"stale", W/{etag}', db=None).status_code == 304
+    assert get_plans(if_none_match='"stale"', db=None).body == response.body
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  registers every mapper
+from app.models.outbox_event import OutboxEvent
+from app.models.quota_lease import QuotaLease
+from app.models.subscription import Subscription, SubscriptionStatus
+from app.models.subscription_plan import BillingCycle, CategoryType, PricingModel, SubscriptionPlan
+from app.models.subscription_usage import SubscriptionUsage
+from app.models.subscription_usage_history import SubscriptionUsageHistory
+from app.models.usage_event import UsageEvent
+from app.services.subscription_job_service import reset_usage_cycles, sweep_lapsed_subscriptions
+
+NOW = datetime(2026, 3, 2, 12)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    for model in (SubscriptionPlan, Subscription, SubscriptionUsage, SubscriptionUsageHistory, QuotaLease, OutboxEvent, UsageEvent):
+        model.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    for plan_id, is_active in ((1, True), (2, False)):
+        session.add(SubscriptionPlan(
+            id=plan_id, name=f"Plan {plan_id}", category_type=CategoryType.APARTMENT, pricing_model=PricingModel.FIXED,
+            price=10, billing_cycle=BillingCycle.MONTHLY, is_active=is_active,
+        ))
+
+    def subscription(sub_id, org_id, end_date, plan_id=1, auto_renew=True):
+        session.add(Subscription(
+            id=sub_id, organization_id=org_id, plan_id=plan_id, status=SubscriptionStatus.ACTIVE,
+            start_date=end_date - timedelta(days=30), end_date=end_date, auto_renew=auto_renew,
+        ))
+
+    subscription(1, 10, NOW - timedelta(days=1))  # renews
+    subscription(2, 20, NOW - timedelta(days=75))  # idle for two periods
+    subscription(3, 30, NOW - timedelta(hours=1), auto_renew=False)  # expires
+    subscription(4, 40, NOW - timedelta(hours=2), plan_id=2)  # plan withdrawn, expires
+    subscription(5, 50, NOW + timedelta(days=3))  # still running
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_sweep_expires_and_renews_in_batches(db):
+    assert sweep_lapsed_subscriptions(db, NOW, limit=3) == (3, 2)
+    assert sweep_lapsed_subscriptions(db, NOW, limit=3) == (1, 0)
+    assert sweep_lapsed_subscriptions(db, NOW, limit=3) == (0, 0)
+
+    subs = {sub.id: sub for sub in db.query(Subscription)}
+    assert [subs[i].status for i in range(1, 6)] == [SubscriptionStatus.EXPIRED] * 4 + [SubscriptionStatus.ACTIVE]
+
+    renewed = {sub.organization_id: sub for sub in subs.values() if sub.id > 5}
+    assert sorted(renewed) == [10, 20]
+    assert renewed[10].start_date == NOW - timedelta(days=1)
+    # skips the periods nobody was around for, landing on the current one
+    assert renewed[20].start_date == NOW - timedelta(days=15)
+    assert renewed[20].end_date == NOW + timedelta(days=15)
+
+    usage = db.query(SubscriptionUsage).all()
+    assert sorted(u.subscription_id for u in usage) == sorted(s.id for s in renewed.values())
+    assert all(u.pickups_used == 0 for u in usage)
+    assert {u.subscription_id: u.last_reset_at for u in usage} == {s.id: s.start_date for s in renewed.values()}
+
+    events = sorted((e.event_type, e.organization_id) for e in db.query(OutboxEvent))
+    assert events == [
+        ("subscription.expired", 30), ("subscription.expired", 40),
+        ("subscription.renewed", 10), ("subscription.renewed", 20),
+    ]
+
+
+def test_usage_reset_snapshots_the_cycle_and_keeps_leased_allowance(db):
+    # a yearly subscription 65 days in, with 5 of its 12 pickups still leased out
+    db.add(SubscriptionUsage(
+        subscription_id=5, pickups_used=12, waste_weight_used=90.0, drivers_used=2,
+        last_reset_at=NOW - timedelta(days=65),
+    ))
+    db.add(QuotaLease(
+        subscription_id=5, holder="worker:1", pickups_remaining=5, weight_remaining=40.0,
+        expires_at=NOW + timedelta(seconds=30),
+    ))
+    db.query(Subscription).filter(Subscription.id == 5).update({Subscription.end_date: NOW + timedelta(days=300)})
+    db.commit()
+
+    assert reset_usage_cycles(db, NOW) == 1
+    assert reset_usage_cycles(db, NOW) == 0
+
+    usage = db.query(SubscriptionUsage).one()
+    assert (usage.pickups_used, usage.waste_weight_used, usage.drivers_used) == (5, 40.0, 2)
+    # anchored to the subscription's cycles, not to when the reset ran
+    assert usage.last_reset_at == NOW - timedelta(days=5)
+
+    history = db.query(SubscriptionUsageHistory).one()
+    assert (history.period_start, history.period_end) == (NOW - timedelta(days=65), NOW - timedelta(days=5))
+    assert (history.pickups_used, history.waste_weight_used, history.drivers_used) == (7, 50.0, 2)
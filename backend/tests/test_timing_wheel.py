@@ -0,0 +1,44 @@
+from app.utils.timing_wheel import TimingWheel
+
+
+def test_timers_fire_at_their_deadline_across_levels():
+    """
+    Test that near and far timers fire on the tick they are due and not before.
+    """
+    wheel = TimingWheel(tick_seconds=1.0, slots=8, levels=3, now=0)
+    wheel.schedule("soon", 3)
+    wheel.schedule("later", 70)
+    wheel.schedule("overflow", 1000)
+
+    assert wheel.advance(2) == []
+    assert [key for key, _ in wheel.advance(3)] == ["soon"]
+    assert wheel.advance(69) == []
+    assert [key for key, _ in wheel.advance(70)] == ["later"]
+    assert wheel.advance(999) == []
+    assert [key for key, _ in wheel.advance(1000.5)] == ["overflow"]
+    assert len(wheel) == 0
+
+
+def test_reschedule_moves_and_cancel_removes():
+    """
+    Test that re-arming a key moves its timer and cancelling stops it firing.
+    """
+    wheel = TimingWheel(tick_seconds=1.0, slots=8, levels=3, now=0)
+    wheel.schedule(1, 10, "pickup")
+    wheel.schedule(2, 20)
+    wheel.schedule(1, 40, "moved")
+
+    assert wheel.cancel(2)
+    assert not wheel.cancel(2)
+    assert wheel.advance(30) == []
+    assert wheel.advance(40) == [(1, "moved")]
+
+
+def test_past_deadline_fires_on_next_advance():
+    """
+    Test that a timer armed for a time already passed fires straight away.
+    """
+    wheel = TimingWheel(tick_seconds=1.0, now=100)
+    wheel.schedule("late", 50)
+
+    assert wheel.advance(100) == [("late", None)]
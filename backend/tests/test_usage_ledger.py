@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  registers every mapper
+from app.models.quota_lease import QuotaLease
+from app.models.subscription import Subscription, SubscriptionStatus
+from app.models.subscription_usage import SubscriptionUsage
+from app.models.subscription_usage_history import SubscriptionUsageHistory
+from app.models.usage_event import UsageEvent
+from app.repositories.subscription_repo import SubscriptionRepository
+from app.services import quota_service
+from app.services.quota_service import current_usage, record_usage, release_quota, reserve_quota, usage_entry
+from app.services.subscription_job_service import compact_usage_events, reset_usage_cycles
+from app.utils.enums import UsageEventType
+
+SUB = SimpleNamespace(id=1, pickup_limit=3, waste_weight_limit=100.0)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine("sqlite://")
+    for model in (Subscription, SubscriptionUsage, SubscriptionUsageHistory, QuotaLease, UsageEvent):
+        model.__table__.create(engine)
+    monkeypatch.setattr(quota_service, "USAGE_LEDGER_ENABLED", True)
+    session = sessionmaker(bind=engine)()
+    now = datetime.utcnow()
+    session.add(Subscription(
+        id=1, organization_id=7, plan_id=1, status=SubscriptionStatus.ACTIVE,
+        start_date=now - timedelta(days=40), end_date=now + timedelta(days=300),
+    ))
+    session.add(SubscriptionUsage(subscription_id=1, pickups_used=1, waste_weight_used=10.0, last_reset_at=now - timedelta(days=31)))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _create(db, pickup_id, weight):
+    assert reserve_quota(db, SUB, 1, weight)
+    record_usage(db, [usage_entry(UsageEventType.PICKUP_CREATED, pickup_id, 7, SUB.id, weight)])
+    db.commit()
+
+
+def test_quota_counts_unfolded_entries_until_compacted(db):
+    _create(db, 10, 20.0)
+    _create(db, 11, 30.0)
+    assert not reserve_quota(db, SUB, 1, 5.0)  # a third pickup hits the limit of 3
+
+    release_quota(db, SUB.id, 1, 30.0)
+    record_usage(db, [usage_entry(UsageEventType.PICKUP_CANCELLED, 11, 7, SUB.id, 30.0)])
+    db.commit()
+    assert current_usage(db, SUB.id) == (2, 30.0)
+    # nothing but the ledger has been written so far
+    assert db.query(SubscriptionUsage).one().pickups_used == 1
+
+    assert compact_usage_events(db) == 3
+    assert compact_usage_events(db) == 0
+    usage = db.query(SubscriptionUsage).one()
+    assert (usage.pickups_used, usage.waste_weight_used) == (2, 30.0)
+    assert current_usage(db, SUB.id) == (2, 30.0)
+    assert db.query(UsageEvent).count() == 3
+
+
+def test_cycle_reset_includes_uncompacted_entries(db):
+    _create(db, 10, 20.0)
+
+    assert reset_usage_cycles(db, datetime.utcnow()) == 1
+
+    history = db.query(SubscriptionUsageHistory).one()
+    assert (history.pickups_used, history.waste_weight_used) == (2, 30.0)
+    assert current_usage(db, SUB.id) == (0, 0.0)
+
+
+def test_usage_is_read_in_one_statement(db):
+    _create(db, 10, 20.0)
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    assert current_usage(db, SUB.id) == (2, 30.0)
+    assert current_usage(db, 99) is None
+    assert len(statements) == 2
+
+
+def test_reservations_near_the_limit_check_again_under_the_row_lock(db, monkeypatch):
+    locked = []
+
+    def lock_usage(db, subscription_id):
+        locked.append(subscription_id)
+        # another request's entry, committed while this one waited for the lock
+        record_usage(db, [usage_entry(UsageEventType.PICKUP_CREATED, 12, 7, subscription_id, 1.0)])
+        return True
+
+    monkeypatch.setattr(SubscriptionRepository, "lock_usage", staticmethod(lock_usage))
+
+    # 2 of 3 pickups used afterwards: clear of the 10% margin
+    _create(db, 10, 20.0)
+    assert locked == []
+
+    assert not reserve_quota(db, SUB, 1, 5.0)
+    assert locked == [SUB.id]
@@ -0,0 +1,46 @@
+from app.utils.zones import ZoneIndex
+
+
+SQUARE = [(12.90, 77.50), (12.90, 77.60), (13.00, 77.60), (13.00, 77.50)]
+INNER = [(12.94, 77.54), (12.94, 77.56), (12.96, 77.56), (12.96, 77.54), (12.94, 77.54)]
+# L-shaped: the notch at the top right is outside
+L_SHAPE = [
+    (13.10, 77.50), (13.10, 77.60), (13.15, 77.60),
+    (13.15, 77.55), (13.20, 77.55), (13.20, 77.50),
+]
+
+
+def test_locate_uses_exact_polygon_not_bounding_box():
+    """
+    Test that a point inside a zone's bounding box but outside its polygon is not matched.
+    """
+    index = ZoneIndex([(3, L_SHAPE)])
+
+    assert index.locate(13.12, 77.58) == 3
+    assert index.locate(13.18, 77.52) == 3
+    assert index.locate(13.18, 77.58) is None
+
+
+def test_overlapping_zones_resolve_to_smallest():
+    """
+    Test that a point in a nested zone reports the inner zone.
+    """
+    index = ZoneIndex([(1, SQUARE), (2, INNER)])
+
+    assert index.locate(12.95, 77.55) == 2
+    assert index.locate(12.91, 77.51) == 1
+    assert index.locate(12.80, 77.55) is None
+
+
+def test_locate_many_matches_single_lookups():
+    """
+    Test that the vectorized lookup agrees with per-point lookups.
+    """
+    index = ZoneIndex([(1, SQUARE), (2, INNER), (3, L_SHAPE)], cell_size_deg=0.02)
+    lats = [12.95, 12.91, 12.80, 13.12, 13.18, 13.18]
+    lngs = [77.55, 77.51, 77.55, 77.58, 77.52, 77.58]
+
+    assert index.locate_many(lats, lngs) == [
+        index.locate(lat, lng) for lat, lng in zip(lats, lngs)
+    ]
+    assert index.locate_many(lats, lngs) == [2, 1, None, 3, 3, None]